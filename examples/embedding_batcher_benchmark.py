@@ -0,0 +1,147 @@
+"""
+Embedding micro-batcher áteresztőképesség és késleltetés benchmark.
+
+Helyi stub embedding szervert indít (OpenAI kompatibilis /v1/embeddings
+végpont, hívásonként fix + szövegenkénti késleltetéssel), és ugyanazt a
+párhuzamos terhelést futtatja kérésenkénti API hívással és az
+EmbeddingBatcher-rel. Kiírja a hívások számát, kérés/s értéket és a
+p50 / p95 késleltetést. Futtatás:
+
+    python examples/embedding_batcher_benchmark.py --requests 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import random
+import time
+from typing import Awaitable, Callable, List
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from aiohttp import web
+from openai import AsyncOpenAI
+
+from src.integrations.database.embedding_batcher import EmbeddingBatcher
+
+EMBEDDING_DIMENSION = 1536
+WORDS = ["telefon", "laptop", "cipő", "fülhallgató", "tok", "töltő", "kábel", "óra", "táska", "monitor"]
+
+
+class StubEmbeddingServer:
+    """OpenAI kompatibilis stub: hívásonként base_latency, szövegenként per_text_latency"""
+
+    def __init__(self, base_latency_ms: float, per_text_latency_ms: float):
+        self.base_latency = base_latency_ms / 1000.0
+        self.per_text_latency = per_text_latency_ms / 1000.0
+        self.calls = 0
+        self.texts = 0
+        self.runner = None
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        self.calls += 1
+        self.texts += len(texts)
+        await asyncio.sleep(self.base_latency + self.per_text_latency * len(texts))
+
+        data = []
+        for index, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:4], "little")
+            vector = np.full(EMBEDDING_DIMENSION, (seed % 1000) / 1000.0, dtype=np.float32)
+            # Az openai kliens base64 kódolást kér (kisebb válasz, gyorsabb feldolgozás)
+            if payload.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        return web.json_response({
+            "object": "list",
+            "data": data,
+            "model": payload.get("model", "stub"),
+            "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)}
+        })
+
+    async def start(self, port: int) -> str:
+        app = web.Application()
+        app.router.add_post("/v1/embeddings", self.embeddings)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", port).start()
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def run_load(embed: Callable[[str], Awaitable[List[float]]], queries: List[str], concurrency: int):
+    """queries párhuzamosan, legfeljebb concurrency egyidejű kéréssel"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(text: str):
+        async with semaphore:
+            started = time.perf_counter()
+            await embed(text)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in queries))
+    return time.perf_counter() - started, sorted(latencies)
+
+
+async def run_benchmark(args):
+    server = StubEmbeddingServer(args.base_latency_ms, args.per_text_latency_ms)
+    base_url = await server.start(args.port)
+    client = AsyncOpenAI(api_key="stub", base_url=base_url, max_retries=0)
+
+    rng = random.Random(args.seed)
+    queries = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        for _ in range(args.requests)
+    ]
+
+    async def direct(text: str) -> List[float]:
+        response = await client.embeddings.create(model="text-embedding-3-small", input=text)
+        return response.data[0].embedding
+
+    async def embed_batch(texts: List[str]) -> List[List[float]]:
+        response = await client.embeddings.create(model="text-embedding-3-small", input=texts)
+        return [data.embedding for data in response.data]
+
+    batcher = EmbeddingBatcher(embed_batch, max_batch_size=args.batch_size, max_wait_ms=args.max_wait_ms)
+
+    print(f"{args.requests} kérés, {args.concurrency} párhuzamos, stub késleltetés "
+          f"{args.base_latency_ms} ms + {args.per_text_latency_ms} ms/szöveg")
+    print(f"{'mód':<10} {'API hívás':>10} {'kérés/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    try:
+        for mode, embed in (("egyenként", direct), ("batcher", batcher.embed)):
+            calls_before = server.calls
+            elapsed, latencies = await run_load(embed, queries, args.concurrency)
+            print(f"{mode:<10} {server.calls - calls_before:>10} {len(queries) / elapsed:>10.1f} "
+                  f"{latencies[len(latencies) // 2]:>8.2f} {latencies[int(len(latencies) * 0.95)]:>8.2f}")
+        print(f"batcher: {batcher.get_stats()}")
+    finally:
+        await client.close()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding micro-batcher benchmark stub szerverrel")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--base-latency-ms", type=float, default=40.0)
+    parser.add_argument("--per-text-latency-ms", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run_benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Keresési profilok (fast / balanced / exact) recall és késleltetés kalibrálása.
+
+A helyi ProductVectorIndex-en méri minden SEARCH_PROFILES profil, és
+opcionálisan egy ef_search sor recall@k értékét a pontos (flat) kereséshez
+képest, valamint a p50 / p95 késleltetést. Adat: egy mentett index
+snapshot (--snapshot, a saját katalógus embeddingjei) vagy szintetikus,
+origó körüli klaszterek. A kérdések tárolt vektorok zajos másolatai.
+
+Az ef_search hatása a HNSW backendet igényli (hnswlib); flat backenden
+minden profil pontos. A pgvector RPC (search_products_tuned) ugyanazokat a
+profil értékeket kapja, így a helyi mérés az ef_search hangolásához
+irányadó. Futtatás:
+
+    python examples/search_profile_calibration.py --products 20000 --ef-values 8 16 32 64 128
+    python examples/search_profile_calibration.py --snapshot data/vector_index
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Set
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.integrations.database.vector_index import ProductVectorIndex
+from src.integrations.database.vector_operations import SEARCH_PROFILES, VectorOperations
+
+
+def build_index(args) -> ProductVectorIndex:
+    if args.snapshot:
+        return ProductVectorIndex.load(args.snapshot, backend=args.backend)
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.normal(size=(args.clusters, args.dimension))
+    vectors = centers[rng.integers(0, args.clusters, args.products)] + rng.normal(
+        scale=0.8, size=(args.products, args.dimension)
+    )
+    index = ProductVectorIndex(dimension=args.dimension, backend=args.backend, initial_capacity=args.products)
+    index.upsert_many([{"id": f"p{row}", "embedding": vector} for row, vector in enumerate(vectors)])
+    return index
+
+
+def sample_queries(index: ProductVectorIndex, count: int, seed: int) -> np.ndarray:
+    """Tárolt vektorok zajos másolatai"""
+    rng = np.random.default_rng(seed + 1)
+    rows = rng.choice(index.get_stats()["rows"], size=count)
+    vectors = np.asarray(index._vectors[rows], dtype=np.float32)
+    return vectors + rng.normal(scale=0.5 / np.sqrt(index.dimension), size=vectors.shape).astype(np.float32)
+
+
+def measure(index: ProductVectorIndex, queries: np.ndarray, limit: int, options: Dict[str, Any]):
+    results: List[Set[str]] = []
+    latencies: List[float] = []
+    for query in queries:
+        started = time.perf_counter()
+        found = index.search(query, limit=limit, **options)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append({item["id"] for item in found})
+    return results, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keresési profilok recall / késleltetés kalibrálása")
+    parser.add_argument("--snapshot", help="Mentett ProductVectorIndex snapshot könyvtár")
+    parser.add_argument("--backend", default="auto", choices=("auto", "hnsw", "flat"))
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--ef-values", type=int, nargs="*", default=[])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    index = build_index(args)
+    queries = sample_queries(index, args.queries, args.seed)
+    truth, _ = measure(index, queries, args.limit, {"exact": True})
+
+    print(f"{index.size} termék, {index.dimension} dimenzió, backend: {index.backend}, "
+          f"{args.queries} kérdés, recall@{args.limit}")
+    if index.backend != "hnsw":
+        print("Megjegyzés: flat backenden az ef_search nem hat, minden profil pontos")
+    print(f"{'profil':<16} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+
+    runs = [(name, VectorOperations._local_search_options(profile)) for name, profile in SEARCH_PROFILES.items()]
+    runs += [(f"ef_search={ef}", {"ef_search": ef}) for ef in args.ef_values]
+    for name, options in runs:
+        found, latencies = measure(index, queries, args.limit, options)
+        recall = np.mean([len(expected & got) / len(expected) for expected, got in zip(truth, found) if expected])
+        print(f"{name:<16} {recall:>7.3f} {latencies[len(latencies) // 2]:>8.2f} "
+              f"{latencies[int(len(latencies) * 0.95)]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -290,6 +290,14 @@ class GDPRComplianceLayer:
                     'anonymized_at': datetime.now().isoformat()
                 }).eq('user_id', user_id).execute()
             
+            # Cached responses of the user (O(1) namespace invalidation)
+            try:
+                from src.integrations.cache import get_redis_cache_service
+                cache_service = await get_redis_cache_service()
+                await cache_service.performance_cache.invalidate_namespace(user=user_id)
+            except Exception as cache_error:
+                logger.warning(f"User cache invalidation error: {cache_error}")
+            
             # Audit log
             await self._log_gdpr_event(
                 "data_deletion_requested",
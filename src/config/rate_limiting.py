@@ -5,15 +5,14 @@ Ez a modul implementálja a rate limiting rendszert a ChatBuddy MVP
 biztonsági követelményeihez.
 """
 
+import math
 import os
 import time
-import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import logging
-from collections import defaultdict, deque
 
 logger = logging.getLogger(__name__)
 
@@ -47,26 +46,230 @@ class RateLimitConfig:
 
 
 @dataclass
-class RateLimitState:
-    """Rate limit állapot."""
-    identifier: str
-    limit_type: RateLimitType
-    window_start: datetime
-    request_count: int
-    last_request_time: datetime
-    blocked_until: Optional[datetime] = None
-    burst_count: int = 0
+class RateLimitDecision:
+    """Egy rate limit döntés eredménye."""
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the request would be allowed
+    reset_after: float  # seconds until the bucket is fully replenished
+    capacity: int
+
+
+# GCRA (Generic Cell Rate Algorithm) egyetlen atomi Redis hívásban.
+# A kulcs a "theoretical arrival time"-ot (TAT, ms) tárolja; a döntés, a
+# frissítés és a retry-after számítás egy round trip alatt történik, így
+# nincs szükség folyamatszintű lock-ra és több worker között sem versenyez.
+#
+# KEYS[1] - állapot kulcs
+# ARGV[1] - emission interval (ms / költségegység)
+# ARGV[2] - burst tolerancia (ms)
+# ARGV[3] - kérés költsége
+# ARGV[4] - "1" ha a döntést rögzíteni kell, "0" csak lekérdezéshez
+GCRA_LUA_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local emission_interval = tonumber(ARGV[1])
+local burst_tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local commit = ARGV[4] == "1"
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local tat = tonumber(redis.call("GET", KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission_interval * cost
+local allow_at = new_tat - burst_tolerance
+
+if now < allow_at then
+    return {0, 0, math.ceil(allow_at - now), math.ceil(tat - now)}
+end
+
+if commit and cost > 0 then
+    redis.call("SET", KEYS[1], string.format("%.3f", new_tat), "PX", math.max(1, math.ceil(new_tat - now)))
+end
+
+local remaining = math.floor((now - allow_at) / emission_interval + 1e-6)
+return {1, remaining, 0, math.ceil(new_tat - now)}
+"""
+
+
+class GCRARateLimitEngine:
+    """
+    Lock-mentes GCRA rate limiting motor.
+    
+    Redis esetén a teljes döntés a GCRA_LUA_SCRIPT-ben fut atomikusan,
+    Redis nélkül ugyanaz az algoritmus fut processzen belül (await nélkül,
+    így az event loop-on belül szintén atomi).
+    """
+    
+    def __init__(self, redis_client=None, script_runner=None, key_deleter=None):
+        """
+        Args:
+            redis_client: Redis kliens (register_script támogatással)
+            script_runner: Alternatív async hívható (keys, args) -> list,
+                pl. a cache connection pool run_script metódusa
+            key_deleter: script_runner mellé async hívható (key) -> bool,
+                ami az állapotot a közös poolon keresztül törli
+        """
+        self.redis_client = redis_client
+        self._script_runner = script_runner
+        self._key_deleter = key_deleter
+        self._script = None
+        self._local_tat: Dict[str, float] = {}
+    
+    @property
+    def uses_redis(self) -> bool:
+        """Redis backend használatban van-e."""
+        return self._script_runner is not None or self.redis_client is not None
+    
+    @staticmethod
+    def parameters(max_requests: int, window_size: int,
+                   burst_size: Optional[int] = None) -> Tuple[float, float, int]:
+        """
+        GCRA paraméterek számítása a konfigurációból.
+        
+        Returns:
+            (emission_interval_ms, burst_tolerance_ms, capacity)
+        """
+        max_requests = max(1, int(max_requests))
+        capacity = max(1, min(int(burst_size or max_requests), max_requests))
+        emission_interval = window_size * 1000.0 / max_requests
+        return emission_interval, emission_interval * capacity, capacity
+    
+    async def check(
+        self,
+        key: str,
+        max_requests: int,
+        window_size: int,
+        burst_size: Optional[int] = None,
+        cost: float = 1.0,
+        commit: bool = True
+    ) -> RateLimitDecision:
+        """
+        Rate limit döntés egyetlen atomi lépésben.
+        
+        Args:
+            key: Állapot kulcs
+            max_requests: Megengedett kérések száma ablakonként
+            window_size: Ablak mérete másodpercben
+            burst_size: Azonnal felhasználható keret
+            cost: Kérés költsége
+            commit: False esetén csak lekérdezés, állapot nem változik
+        """
+        emission_interval, burst_tolerance, capacity = self.parameters(
+            max_requests, window_size, burst_size
+        )
+        
+        if self.uses_redis:
+            try:
+                result = await self._run_script(
+                    [key],
+                    [emission_interval, burst_tolerance, cost, "1" if commit else "0"]
+                )
+                if result is not None:
+                    allowed, remaining, retry_after_ms, reset_after_ms = (int(value) for value in result)
+                    return RateLimitDecision(
+                        allowed=bool(allowed),
+                        remaining=remaining,
+                        retry_after=retry_after_ms / 1000.0,
+                        reset_after=reset_after_ms / 1000.0,
+                        capacity=capacity
+                    )
+            except Exception as e:
+                logger.error(f"Redis rate limit script error: {e}")
+            # Fallback to the in-process engine
+        
+        return self._check_local(key, emission_interval, burst_tolerance, capacity, cost, commit)
+    
+    async def _run_script(self, keys: List[str], args: List[Any]) -> Optional[List[Any]]:
+        """Lua script futtatása (EVALSHA, NOSCRIPT esetén EVAL)."""
+        if self._script_runner is not None:
+            return await self._script_runner(GCRA_LUA_SCRIPT, keys, args)
+        if self._script is None:
+            self._script = self.redis_client.register_script(GCRA_LUA_SCRIPT)
+        return await self._script(keys=keys, args=args)
+    
+    def _check_local(
+        self,
+        key: str,
+        emission_interval: float,
+        burst_tolerance: float,
+        capacity: int,
+        cost: float,
+        commit: bool
+    ) -> RateLimitDecision:
+        """Processzen belüli GCRA - ugyanaz a logika, mint a Lua scriptben."""
+        now = time.monotonic() * 1000.0
+        tat = max(self._local_tat.get(key, now), now)
+        new_tat = tat + emission_interval * cost
+        allow_at = new_tat - burst_tolerance
+        
+        if now < allow_at:
+            return RateLimitDecision(
+                allowed=False,
+                remaining=0,
+                retry_after=(allow_at - now) / 1000.0,
+                reset_after=(tat - now) / 1000.0,
+                capacity=capacity
+            )
+        
+        if commit and cost > 0:
+            self._local_tat[key] = new_tat
+        
+        return RateLimitDecision(
+            allowed=True,
+            remaining=math.floor((now - allow_at) / emission_interval + 1e-6),
+            retry_after=0.0,
+            reset_after=(new_tat - now) / 1000.0,
+            capacity=capacity
+        )
+    
+    async def reset(self, key: str) -> bool:
+        """Állapot törlése."""
+        self._local_tat.pop(key, None)
+        if self._key_deleter is not None:
+            await self._key_deleter(key)
+        elif self.redis_client is not None:
+            await self.redis_client.delete(key)
+        return True
+    
+    def cleanup_local(self) -> int:
+        """Lejárt (teljesen visszatöltődött) helyi állapotok törlése."""
+        now = time.monotonic() * 1000.0
+        expired_keys = [key for key, tat in self._local_tat.items() if tat <= now]
+        for key in expired_keys:
+            del self._local_tat[key]
+        return len(expired_keys)
 
 
 class RateLimiter:
-    """Rate limiting rendszer."""
+    """Rate limiting rendszer (GCRA, lock nélkül)."""
     
     def __init__(self, configs: Optional[Dict[str, RateLimitConfig]] = None, use_redis: bool = False, redis_client=None):
         self.use_redis = use_redis
         self.redis_client = redis_client
-        self.limit_states: Dict[str, RateLimitState] = {}
         self.configs: Dict[str, RateLimitConfig] = configs if configs is not None else self._load_default_configs()
-        self.lock = asyncio.Lock()
+        self.engine = GCRARateLimitEngine(
+            redis_client=redis_client if use_redis and redis_client else None
+        )
+        self._shared_cache = None
+    
+    def use_cache_service(self, rate_limit_cache) -> None:
+        """
+        Állapot tárolása a közös cache szolgáltatáson keresztül.
+        
+        A rate limit cache motorja (közös connection pool, egységes kulcs séma)
+        veszi át a döntéseket, így nem kell külön Redis kliens.
+        
+        Args:
+            rate_limit_cache: A cache szolgáltatás rate_limit_cache-e
+        """
+        self._shared_cache = rate_limit_cache
+        self.engine = rate_limit_cache.engine
+        self.use_redis = True
     
     def _load_default_configs(self) -> Dict[str, RateLimitConfig]:
         """Alapértelmezett rate limit konfigurációk betöltése."""
@@ -148,20 +351,12 @@ class RateLimiter:
         """Rate limit azonosító generálása."""
         return f"{limit_type.value}:{key}"
     
-    def _get_window_start(self, window: RateLimitWindow) -> datetime:
-        """Aktuális ablak kezdete."""
-        now = datetime.now(timezone.utc)
-        
-        if window == RateLimitWindow.SECOND:
-            return now.replace(microsecond=0)
-        elif window == RateLimitWindow.MINUTE:
-            return now.replace(second=0, microsecond=0)
-        elif window == RateLimitWindow.HOUR:
-            return now.replace(minute=0, second=0, microsecond=0)
-        elif window == RateLimitWindow.DAY:
-            return now.replace(hour=0, minute=0, second=0, microsecond=0)
-        else:
-            return now
+    def _get_state_key(self, config: RateLimitConfig, identifier: str) -> str:
+        """Állapot kulcs (Redis és memória backend közös sémája)."""
+        if self._shared_cache is not None:
+            # A pool a cache típussal (rate_limit) maga prefixeli a kulcsot
+            return self._get_identifier(config.limit_type, identifier)
+        return f"rate_limit:{self._get_identifier(config.limit_type, identifier)}"
     
     async def check_rate_limit(
         self,
@@ -174,6 +369,9 @@ class RateLimiter:
         """
         Rate limit ellenőrzése.
         
+        A döntés, az állapot frissítése és a retry-after számítása egyetlen
+        atomi lépés (Redis esetén egy Lua script hívás).
+        
         Args:
             config_key: Konfiguráció kulcs
             identifier: Azonosító (user_id, ip, endpoint)
@@ -184,191 +382,42 @@ class RateLimiter:
         Returns:
             (allowed, details)
         """
-        async with self.lock:
-            try:
-                config = self.configs.get(config_key)
-                if not config or not config.enabled:
-                    return True, {"reason": "no_limit", "remaining_requests": -1}
-                
-                # Get current window
-                window_start = self._get_window_start(config.window)
-                
-                # Create state key
-                state_key = self._get_identifier(config.limit_type, identifier)
-                
-                # Get or create state
-                state = await self._get_state(state_key, config, window_start)
-                
-                # Check if blocked
-                if state.blocked_until and datetime.now(timezone.utc) < state.blocked_until:
-                    return False, {
-                        "reason": "blocked",
-                        "blocked_until": state.blocked_until.isoformat(),
-                        "retry_after": int((state.blocked_until - datetime.now(timezone.utc)).total_seconds())
-                    }
-                
-                # Check burst limit
-                if config.burst_size and state.burst_count >= config.burst_size:
-                    # Block for a short period
-                    state.blocked_until = datetime.now(timezone.utc) + timedelta(seconds=30)
-                    await self._save_state(state_key, state)
-                    
-                    return False, {
-                        "reason": "burst_limit_exceeded",
-                        "burst_size": config.burst_size,
-                        "retry_after": 30
-                    }
-                
-                # Check regular limit
-                effective_cost = cost * config.cost_per_request
-                if state.request_count + effective_cost > config.max_requests:
-                    # Calculate retry after
-                    window_end = window_start + timedelta(seconds=config.window_size)
-                    retry_after = int((window_end - datetime.now(timezone.utc)).total_seconds())
-                    
-                    return False, {
-                        "reason": "rate_limit_exceeded",
-                        "max_requests": config.max_requests,
-                        "current_requests": state.request_count,
-                        "retry_after": max(0, retry_after)
-                    }
-                
-                # Update state
-                state.request_count += effective_cost
-                state.last_request_time = datetime.now(timezone.utc)
-                state.burst_count += 1
-                
-                # Reset burst count if window changed
-                if state.window_start != window_start:
-                    state.window_start = window_start
-                    state.request_count = effective_cost
-                    state.burst_count = 1
-                
-                await self._save_state(state_key, state)
-                
-                return True, {
-                    "reason": "allowed",
-                    "remaining_requests": max(0, config.max_requests - state.request_count),
-                    "reset_time": (window_start + timedelta(seconds=config.window_size)).isoformat()
-                }
-                
-            except Exception as e:
-                logger.error(f"Rate limit check error: {e}")
-                # Fail open on error
-                return True, {"reason": "error", "error": str(e)}
-    
-    async def _get_state(
-        self,
-        state_key: str,
-        config: RateLimitConfig,
-        window_start: datetime
-    ) -> RateLimitState:
-        """Rate limit állapot lekérése."""
-        if self.use_redis and self.redis_client:
-            return await self._get_redis_state(state_key, config, window_start)
-        else:
-            return self._get_memory_state(state_key, config, window_start)
-    
-    def _get_memory_state(
-        self,
-        state_key: str,
-        config: RateLimitConfig,
-        window_start: datetime
-    ) -> RateLimitState:
-        """Memória alapú állapot lekérése."""
-        if state_key not in self.limit_states:
-            self.limit_states[state_key] = RateLimitState(
-                identifier=state_key,
-                limit_type=config.limit_type,
-                window_start=window_start,
-                request_count=0,
-                last_request_time=datetime.now(timezone.utc),
-                burst_count=0
-            )
-        
-        state = self.limit_states[state_key]
-        
-        # Reset if window changed
-        if state.window_start != window_start:
-            state.window_start = window_start
-            state.request_count = 0
-            state.burst_count = 0
-            state.blocked_until = None
-        
-        return state
-    
-    async def _get_redis_state(
-        self,
-        state_key: str,
-        config: RateLimitConfig,
-        window_start: datetime
-    ) -> RateLimitState:
-        """Redis alapú állapot lekérése."""
         try:
-            # Get state from Redis
-            state_data = await self.redis_client.get(f"rate_limit:{state_key}")
-            
-            if state_data:
-                import json
-                state_dict = json.loads(state_data)  # Safe JSON deserialization
-                state = RateLimitState(**state_dict)
-                
-                # Reset if window changed
-                if state.window_start != window_start:
-                    state.window_start = window_start
-                    state.request_count = 0
-                    state.burst_count = 0
-                    state.blocked_until = None
-                
-                return state
-            else:
-                # Create new state
-                return RateLimitState(
-                    identifier=state_key,
-                    limit_type=config.limit_type,
-                    window_start=window_start,
-                    request_count=0,
-                    last_request_time=datetime.now(timezone.utc),
-                    burst_count=0
-                )
-                
-        except Exception as e:
-            logger.error(f"Redis state retrieval error: {e}")
-            # Fallback to memory state
-            return self._get_memory_state(state_key, config, window_start)
-    
-    async def _save_state(self, state_key: str, state: RateLimitState):
-        """Rate limit állapot mentése."""
-        if self.use_redis and self.redis_client:
-            await self._save_redis_state(state_key, state)
-        else:
-            self._save_memory_state(state_key, state)
-    
-    def _save_memory_state(self, state_key: str, state: RateLimitState):
-        """Memória alapú állapot mentése."""
-        self.limit_states[state_key] = state
-    
-    async def _save_redis_state(self, state_key: str, state: RateLimitState):
-        """Redis alapú állapot mentése."""
-        try:
-            # Convert to dict and serialize
-            state_dict = asdict(state)
-            state_dict["window_start"] = state.window_start.isoformat()
-            state_dict["last_request_time"] = state.last_request_time.isoformat()
-            if state.blocked_until:
-                state_dict["blocked_until"] = state.blocked_until.isoformat()
+            config = self.configs.get(config_key)
+            if not config or not config.enabled:
+                return True, {"reason": "no_limit", "remaining_requests": -1}
             
-            # Save to Redis with TTL
-            await self.redis_client.setex(
-                f"rate_limit:{state_key}",
-                3600,  # 1 hour TTL
-                str(state_dict)
+            effective_cost = cost * config.cost_per_request
+            decision = await self.engine.check(
+                key=self._get_state_key(config, identifier),
+                max_requests=config.max_requests,
+                window_size=config.window_size,
+                burst_size=config.burst_size,
+                cost=effective_cost
             )
             
+            now = datetime.now(timezone.utc)
+            if not decision.allowed:
+                # A burst keret kisebb az ablak keretnél: a burst korlátoz
+                burst_limited = decision.capacity < config.max_requests
+                return False, {
+                    "reason": "burst_limit_exceeded" if burst_limited else "rate_limit_exceeded",
+                    "max_requests": config.max_requests,
+                    "burst_size": decision.capacity,
+                    "retry_after": max(1, math.ceil(decision.retry_after)),
+                    "retry_at": (now + timedelta(seconds=decision.retry_after)).isoformat()
+                }
+            
+            return True, {
+                "reason": "allowed",
+                "remaining_requests": decision.remaining,
+                "reset_time": (now + timedelta(seconds=decision.reset_after)).isoformat()
+            }
+            
         except Exception as e:
-            logger.error(f"Redis state save error: {e}")
-            # Fallback to memory
-            self._save_memory_state(state_key, state)
+            logger.error(f"Rate limit check error: {e}")
+            # Fail open on error
+            return True, {"reason": "error", "error": str(e)}
     
     async def get_rate_limit_info(
         self,
@@ -390,25 +439,28 @@ class RateLimiter:
             if not config:
                 return {"error": "config_not_found"}
             
-            state_key = self._get_identifier(config.limit_type, identifier)
-            window_start = self._get_window_start(config.window)
-            
-            state = await self._get_state(state_key, config, window_start)
+            decision = await self.engine.check(
+                key=self._get_state_key(config, identifier),
+                max_requests=config.max_requests,
+                window_size=config.window_size,
+                burst_size=config.burst_size,
+                cost=0,
+                commit=False
+            )
             
+            now = datetime.now(timezone.utc)
             return {
                 "config_key": config_key,
                 "identifier": identifier,
                 "limit_type": config.limit_type.value,
                 "window": config.window.value,
                 "max_requests": config.max_requests,
-                "current_requests": state.request_count,
-                "remaining_requests": max(0, config.max_requests - state.request_count),
-                "window_start": state.window_start.isoformat(),
-                "window_end": (window_start + timedelta(seconds=config.window_size)).isoformat(),
-                "last_request": state.last_request_time.isoformat(),
-                "burst_count": state.burst_count,
-                "burst_size": config.burst_size,
-                "blocked_until": state.blocked_until.isoformat() if state.blocked_until else None
+                "current_requests": max(0, decision.capacity - decision.remaining),
+                "remaining_requests": decision.remaining,
+                "reset_time": (now + timedelta(seconds=decision.reset_after)).isoformat(),
+                "burst_size": decision.capacity,
+                "algorithm": "gcra",
+                "backend": "redis" if self.engine.uses_redis else "memory"
             }
             
         except Exception as e:
@@ -435,15 +487,7 @@ class RateLimiter:
             if not config:
                 return False
             
-            state_key = self._get_identifier(config.limit_type, identifier)
-            
-            if self.use_redis and self.redis_client:
-                await self.redis_client.delete(f"rate_limit:{state_key}")
-            else:
-                if state_key in self.limit_states:
-                    del self.limit_states[state_key]
-            
-            return True
+            return await self.engine.reset(self._get_state_key(config, identifier))
             
         except Exception as e:
             logger.error(f"Rate limit reset error: {e}")
@@ -462,31 +506,14 @@ class RateLimiter:
         """
         Lejárt állapotok tisztítása.
         
+        Redis esetén a kulcsok PX TTL-lel járnak le, itt csak a memória
+        backend állapotait kell takarítani.
+        
         Returns:
             Tisztított állapotok száma
         """
         try:
-            cleaned_count = 0
-            now = datetime.now(timezone.utc)
-            
-            # Clean memory states
-            expired_keys = []
-            for key, state in self.limit_states.items():
-                # Check if state is older than 1 hour
-                if (now - state.last_request_time) > timedelta(hours=1):
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                del self.limit_states[key]
-                cleaned_count += 1
-            
-            # Clean Redis states (TTL handles this automatically)
-            if self.use_redis and self.redis_client:
-                # Redis automatically expires keys based on TTL
-                pass
-            
-            return cleaned_count
-            
+            return self.engine.cleanup_local()
         except Exception as e:
             logger.error(f"Rate limit cleanup error: {e}")
             return 0
@@ -6,37 +6,59 @@ Ez a modul tartalmazza az optimalizált Redis cache integrációt:
 - Intelligens TTL beállítások
 - Kompresszió nagy objektumokhoz
 - Performance monitoring
+- Request-scoped batching of cache reads
+- Compact binary embedding storage
+- Namespace generation counters for bulk invalidation
+- Per-cache-type metrics in Prometheus format
+- Adaptive per-key TTLs within configurable bounds
+- Per-tenant memory quotas with oldest-first eviction
+- Warm-up of the most accessed keys after startup
 """
 
-import os
-
-# Feature flag for optimization
-REDIS_OPTIMIZATION_ENABLED = os.getenv("REDIS_OPTIMIZATION_ENABLED", "true").lower() == "true"
-
-if REDIS_OPTIMIZATION_ENABLED:
-    # Use optimized implementation
-    from .optimized_redis_service import (
-        OptimizedRedisCacheService as RedisCacheService,
-        OptimizedSessionCache as SessionCache, 
-        OptimizedPerformanceCache as PerformanceCache,
-        OptimizedRateLimitCache as RateLimitCache,
-        OptimizedSessionData as SessionData,
-        get_redis_cache_service,
-        shutdown_redis_cache_service
-    )
-    from .redis_connection_pool import OptimizedCacheConfig as CacheConfig
-else:
-    # Use original implementation
-    from .redis_cache import (
-        RedisCacheService,
-        SessionCache,
-        PerformanceCache,
-        RateLimitCache,
-        CacheConfig,
-        SessionData,
-        get_redis_cache_service,
-        shutdown_redis_cache_service
-    )
+# The single cache service: one connection pool, serialization format and key
+# schema for sessions, rate limits and performance caches
+from .optimized_redis_service import (
+    OptimizedRedisCacheService as RedisCacheService,
+    OptimizedSessionCache as SessionCache, 
+    OptimizedPerformanceCache as PerformanceCache,
+    OptimizedRateLimitCache as RateLimitCache,
+    OptimizedSessionData as SessionData,
+    get_redis_cache_service,
+    shutdown_redis_cache_service
+)
+from .redis_connection_pool import OptimizedCacheConfig as CacheConfig
+
+# Binary embedding blobs (used by the optimized performance cache)
+from .embedding_codec import (
+    decode_embedding,
+    encode_embedding
+)
+
+# Generation-versioned namespaces (O(1) bulk invalidation)
+from .namespaces import namespace_for
+
+# Per-cache-type metrics (Prometheus /metrics)
+from .metrics import CacheMetricsRegistry, get_cache_metrics
+
+# Adaptive TTLs learned from read frequency and change rate
+from .adaptive_ttl import AdaptiveTTLPolicy
+
+# Degraded mode while Redis is unavailable
+from .circuit_breaker import CircuitBreaker
+from .memory_cache import InMemoryCacheBackend
+
+# Per-tenant memory accounting and quotas
+from .quotas import TenantQuotaManager, tenant_scope
+
+# Warm-up of the most accessed keys (readiness follows its progress)
+from .warmup import CacheWarmer, get_cache_warmer, start_cache_warmup
+
+# Request-scoped read batching (binds to the optimized connection pool)
+from .request_loader import (
+    RequestCacheLoader,
+    get_request_loader,
+    request_cache_scope
+)
 
 __all__ = [
     "RedisCacheService",
@@ -46,5 +68,21 @@ __all__ = [
     "CacheConfig",
     "SessionData",
     "get_redis_cache_service",
-    "shutdown_redis_cache_service"
+    "shutdown_redis_cache_service",
+    "RequestCacheLoader",
+    "get_request_loader",
+    "request_cache_scope",
+    "encode_embedding",
+    "decode_embedding",
+    "namespace_for",
+    "CacheMetricsRegistry",
+    "get_cache_metrics",
+    "AdaptiveTTLPolicy",
+    "CircuitBreaker",
+    "InMemoryCacheBackend",
+    "TenantQuotaManager",
+    "tenant_scope",
+    "CacheWarmer",
+    "get_cache_warmer",
+    "start_cache_warmup"
 ] 
\ No newline at end of file
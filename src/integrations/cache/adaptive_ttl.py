@@ -0,0 +1,235 @@
+"""
+Adaptive TTLs learned from read frequency and observed change rate.
+
+Static TTLs are a compromise: stable products are re-fetched needlessly while
+fast-changing stock goes stale. This policy tracks, per key (or key class):
+
+- how often it is read, and
+- how often its content actually changes, observed whenever a refresh returns
+  identical or different content (compared by digest).
+
+Changes are modelled as a Poisson process with rate lambda. For an entry cached
+at time 0 and reads spread over its lifetime T, the expected fraction of stale
+reads is
+
+    stale(T) = 1 - (1 - exp(-lambda * T)) / (lambda * T)
+
+which only depends on x = lambda * T. The longest TTL whose stale fraction stays
+within the staleness budget maximises the hit rate, so T = x_budget / lambda,
+clamped to the configured bounds of the cache type. Refreshes only reveal
+whether *some* change happened in an interval, so lambda uses the bias-reduced
+estimator -ln((n - X + 0.5) / (n + 0.5)) / interval (n intervals, X changed).
+
+Until a key has min_samples refreshes it keeps the static TTL of its type.
+"""
+
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (cache_type, key class)
+StatsRef = Tuple[str, str]
+
+
+def stale_fraction(x: float) -> float:
+    """Expected stale-read fraction for lambda * TTL = x."""
+    if x <= 0:
+        return 0.0
+    return 1.0 - (1.0 - math.exp(-x)) / x
+
+
+def solve_change_budget(staleness_budget: float) -> float:
+    """The x = lambda * TTL at which the stale-read fraction equals the budget."""
+    if staleness_budget <= 0:
+        return 0.0
+    if staleness_budget >= 1:
+        return math.inf
+
+    low, high = 0.0, 1.0
+    while stale_fraction(high) < staleness_budget:
+        high *= 2
+    for _ in range(60):
+        middle = (low + high) / 2
+        if stale_fraction(middle) < staleness_budget:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def value_digest(value: Any) -> bytes:
+    """Short content digest used to tell whether a refresh changed the value."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+    else:
+        data = json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+@dataclass
+class KeyStats:
+    """Read and change observations of one key (class)."""
+    first_seen: float
+    reads: int = 0
+    refreshes: int = 0
+    changes: int = 0
+    observed: float = 0.0  # Seconds covered by consecutive refreshes
+    last_refresh: Optional[float] = None
+    digest: Optional[bytes] = None
+
+    def read_rate(self, now: float) -> float:
+        """Reads per second since the key was first seen."""
+        return self.reads / max(now - self.first_seen, 1.0)
+
+    def change_rate(self) -> Optional[float]:
+        """Estimated changes per second (None until two refreshes were seen)."""
+        intervals = self.refreshes - 1
+        if intervals < 1 or self.observed <= 0:
+            return None
+        mean_interval = self.observed / intervals
+        unchanged = (intervals - self.changes + 0.5) / (intervals + 0.5)
+        return -math.log(unchanged) / mean_interval
+
+
+class AdaptiveTTLPolicy:
+    """
+    Per-key TTLs within bounds, maximising hits for a staleness budget.
+
+    Args:
+        default_ttls: Static TTL of each cache type (used until enough samples)
+        bounds: (min_ttl, max_ttl) of every adaptive cache type
+        staleness_budget: Tolerated fraction of stale reads (0.05 = 5%)
+        min_samples: Refreshes needed before a key's TTL adapts
+        max_tracked: Key classes kept (least recently used dropped)
+        key_class: Maps (cache_type, key) to the tracked class (default: the key)
+        trace: Optional callable receiving access events for offline replay
+    """
+
+    def __init__(self, default_ttls: Dict[str, int], bounds: Dict[str, Tuple[int, int]],
+                 staleness_budget: float = 0.05, min_samples: int = 3,
+                 max_tracked: int = 10000,
+                 key_class: Optional[Callable[[str, str], str]] = None,
+                 trace: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.default_ttls = dict(default_ttls)
+        self.bounds = dict(bounds)
+        self.staleness_budget = staleness_budget
+        self.min_samples = min_samples
+        self.max_tracked = max_tracked
+        self.key_class = key_class or (lambda cache_type, key: key)
+        self.trace = trace
+        self._change_budget = solve_change_budget(staleness_budget)
+        self._stats: "OrderedDict[StatsRef, KeyStats]" = OrderedDict()
+
+    def tracks(self, cache_type: str) -> bool:
+        """Whether TTLs of this cache type adapt."""
+        return cache_type in self.bounds
+
+    def record_read(self, cache_type: str, key: str, now: Optional[float] = None):
+        """Count a read (hit or miss)."""
+        if not self.tracks(cache_type):
+            return
+        now = time.time() if now is None else now
+        self._stats_for(cache_type, key, now).reads += 1
+        if self.trace is not None:
+            self.trace({"ts": now, "op": "read", "cache_type": cache_type, "key": key})
+
+    def record_refresh(self, cache_type: str, key: str, value: Any,
+                       now: Optional[float] = None) -> Optional[bool]:
+        """
+        Record freshly loaded content.
+
+        Returns:
+            True if the content changed since the previous refresh, False if it
+            is identical, None for the first observation (or untracked types)
+        """
+        if not self.tracks(cache_type):
+            return None
+        now = time.time() if now is None else now
+        digest = value_digest(value)
+        stats = self._stats_for(cache_type, key, now)
+
+        changed = None
+        if stats.last_refresh is not None:
+            stats.observed += max(now - stats.last_refresh, 0.0)
+            changed = digest != stats.digest
+            if changed:
+                stats.changes += 1
+        stats.refreshes += 1
+        stats.last_refresh = now
+        stats.digest = digest
+
+        if self.trace is not None:
+            self.trace({"ts": now, "op": "fill", "cache_type": cache_type, "key": key,
+                        "digest": digest.hex()})
+        return changed
+
+    def ttl_for(self, cache_type: str, key: str, now: Optional[float] = None) -> int:
+        """Effective TTL of a key (the static TTL until enough samples)."""
+        default = self.default_ttls.get(cache_type, 0)
+        if not self.tracks(cache_type):
+            return default
+
+        stats = self._stats.get((cache_type, self.key_class(cache_type, key)))
+        if stats is None:
+            return default
+        return self._adapted_ttl(cache_type, stats, time.time() if now is None else now)
+
+    def _adapted_ttl(self, cache_type: str, stats: KeyStats, now: float) -> int:
+        default = self.default_ttls.get(cache_type, 0)
+        rate = stats.change_rate()
+        if stats.refreshes < self.min_samples or rate is None:
+            return default
+
+        min_ttl, max_ttl = self.bounds[cache_type]
+        ttl = self._change_budget / rate if rate > 0 else math.inf
+
+        # Keys read less than once per lifetime gain no hits from a longer TTL
+        if stats.read_rate(now) * min(ttl, max_ttl) < 1:
+            ttl = min(ttl, default)
+
+        return int(min(max(ttl, min_ttl), max_ttl))
+
+    def change_rate(self, cache_type: str, key: str) -> Optional[float]:
+        """Estimated changes per second of a key (None if unknown)."""
+        stats = self._stats.get((cache_type, self.key_class(cache_type, key)))
+        return stats.change_rate() if stats else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tracked key classes and adapted TTLs per cache type."""
+        now = time.time()
+        per_type: Dict[str, Dict[str, Any]] = {}
+        for (cache_type, _), stats in list(self._stats.items()):
+            summary = per_type.setdefault(cache_type, {"tracked": 0, "adapted": 0, "ttl_sum": 0})
+            summary["tracked"] += 1
+            if stats.refreshes >= self.min_samples:
+                summary["adapted"] += 1
+                summary["ttl_sum"] += self._adapted_ttl(cache_type, stats, now)
+
+        for summary in per_type.values():
+            ttl_sum = summary.pop("ttl_sum")
+            summary["avg_adapted_ttl"] = round(ttl_sum / summary["adapted"]) if summary["adapted"] else None
+
+        return {
+            "staleness_budget": self.staleness_budget,
+            "tracked": len(self._stats),
+            "by_cache_type": per_type
+        }
+
+    def _stats_for(self, cache_type: str, key: str, now: float) -> KeyStats:
+        ref = (cache_type, self.key_class(cache_type, key))
+        stats = self._stats.get(ref)
+        if stats is None:
+            stats = self._stats[ref] = KeyStats(first_seen=now)
+            if len(self._stats) > self.max_tracked:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(ref)
+        return stats
@@ -0,0 +1,108 @@
+"""
+Circuit breaker for the Redis connection.
+
+After failure_threshold consecutive connection errors or timeouts the circuit
+opens: cache calls stop waiting on Redis and are served by the in-process
+fallback at once. While open, a background probe checks Redis every
+recovery_timeout seconds; a successful probe closes the circuit again.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Args:
+        name: Name used in logs
+        failure_threshold: Consecutive failures that open the circuit
+        recovery_timeout: Seconds between recovery probes while open
+    """
+
+    def __init__(self, name: str = "redis", failure_threshold: int = 5, recovery_timeout: float = 5.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure: Optional[str] = None
+        self._stats = {
+            "opened": 0,
+            "rejected": 0,
+            "probes": 0
+        }
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to Redis (rejections are counted)."""
+        if self.state == CLOSED:
+            return True
+        self._stats["rejected"] += 1
+        return False
+
+    def record_success(self):
+        """A call or probe succeeded - close the circuit."""
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.name} closed after {time.time() - (self.opened_at or time.time()):.1f}s")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self, error: Optional[BaseException] = None) -> bool:
+        """
+        Count a failed call.
+
+        Returns:
+            True if this failure opened the circuit
+        """
+        self.consecutive_failures += 1
+        self.last_failure = str(error) if error is not None else None
+
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.trip()
+            return True
+        return False
+
+    def trip(self):
+        """Open the circuit (e.g. when the initial connection fails)."""
+        if self.state == CLOSED:
+            self._stats["opened"] += 1
+            logger.warning(f"Circuit {self.name} opened after {self.consecutive_failures} failures: "
+                           f"{self.last_failure}")
+        self.state = OPEN
+        self.opened_at = time.time()
+
+    def should_probe(self, now: Optional[float] = None) -> bool:
+        """Whether the recovery timeout has passed since the circuit opened."""
+        if self.state != OPEN or self.opened_at is None:
+            return False
+        now = time.time() if now is None else now
+        return now - self.opened_at >= self.recovery_timeout
+
+    def begin_probe(self):
+        """Mark a recovery probe in progress (calls keep using the fallback)."""
+        self.state = HALF_OPEN
+        self._stats["probes"] += 1
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_at": self.opened_at,
+            "last_failure": self.last_failure,
+            **self._stats
+        }
@@ -0,0 +1,85 @@
+"""
+Compact binary encoding of embedding vectors for the cache.
+
+A 1536-dimension OpenAI embedding is ~30 KB as a JSON list but 6 KB as raw
+float32 (3 KB as float16). The blob carries a small header so readers know the
+dtype and dimension without any metadata lookup:
+
+    magic  b"CBEV"   4 bytes
+    version          uint8
+    dtype code       uint8   (1 = float32, 2 = float16)
+    reserved         uint16
+    dimension        uint32
+    payload          dimension * itemsize bytes, little-endian
+
+Decoding is zero-copy: the returned numpy array is a read-only view of the blob.
+"""
+
+import struct
+from typing import Sequence, Union
+
+import numpy as np
+
+EMBEDDING_MAGIC = b"CBEV"
+EMBEDDING_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sBBHI")
+
+_DTYPE_CODES = {
+    "float32": 1,
+    "float16": 2
+}
+_CODE_DTYPES = {
+    1: np.dtype("<f4"),
+    2: np.dtype("<f2")
+}
+
+EmbeddingLike = Union[Sequence[float], np.ndarray]
+
+
+def encode_embedding(embedding: EmbeddingLike, dtype: str = "float32") -> bytes:
+    """
+    Encode an embedding as a header-prefixed little-endian blob.
+
+    Args:
+        embedding: Vector as a list of floats or a 1-D numpy array
+        dtype: Storage precision, "float32" or "float16"
+    """
+    if dtype not in _DTYPE_CODES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    code = _DTYPE_CODES[dtype]
+    vector = np.asarray(embedding, dtype=_CODE_DTYPES[code])
+    if vector.ndim != 1:
+        raise ValueError(f"Embedding must be one-dimensional, got shape {vector.shape}")
+
+    header = _HEADER.pack(EMBEDDING_MAGIC, EMBEDDING_FORMAT_VERSION, code, 0, vector.shape[0])
+    return header + vector.tobytes()
+
+
+def decode_embedding(blob: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    """
+    Decode a blob produced by encode_embedding into a read-only numpy view.
+
+    Raises:
+        ValueError: If the blob is not a valid embedding blob
+    """
+    if len(blob) < _HEADER.size:
+        raise ValueError("Embedding blob shorter than its header")
+
+    magic, version, code, _, dimension = _HEADER.unpack_from(blob)
+    if magic != EMBEDDING_MAGIC or version != EMBEDDING_FORMAT_VERSION:
+        raise ValueError("Not an embedding blob (bad magic or version)")
+    if code not in _CODE_DTYPES:
+        raise ValueError(f"Unknown embedding dtype code: {code}")
+
+    dtype = _CODE_DTYPES[code]
+    if len(blob) != _HEADER.size + dimension * dtype.itemsize:
+        raise ValueError("Embedding blob length does not match its header")
+
+    return np.frombuffer(blob, dtype=dtype, count=dimension, offset=_HEADER.size)
+
+
+def is_embedding_blob(value: object) -> bool:
+    """Check whether a cached value is an encoded embedding blob."""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:4]) == EMBEDDING_MAGIC
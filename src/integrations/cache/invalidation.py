@@ -0,0 +1,163 @@
+"""
+Non-blocking pattern invalidation for the Redis cache.
+
+KEYS walks the whole keyspace in one command and blocks the (single-threaded)
+Redis server while doing so. Invalidation here uses incremental SCAN cursors and
+UNLINK (memory is reclaimed in a background thread), runs as a background task
+with progress reporting, and is paced by an ops budget so bulk invalidation does
+not compete with live chat traffic.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class InvalidationJob:
+    """Progress of one pattern invalidation."""
+    job_id: str
+    match: str
+    status: str = "pending"  # pending | running | completed | failed | cancelled
+    scanned: int = 0
+    deleted: int = 0
+    batches: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    _task: Optional[asyncio.Task] = field(default=None, repr=False, compare=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "match": self.match,
+            "status": self.status,
+            "scanned": self.scanned,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error
+        }
+
+
+class CacheInvalidator:
+    """
+    Runs SCAN/UNLINK invalidation jobs against one Redis client.
+
+    Args:
+        redis_client: redis.asyncio client
+        scan_count: COUNT hint per SCAN call (keys examined per round trip)
+        ops_per_second: Budget of keys scanned + unlinked per second (0 = unpaced)
+        max_jobs: Finished jobs kept for progress queries
+    """
+
+    def __init__(self, redis_client: Any, scan_count: int = 500,
+                 ops_per_second: int = 5000, max_jobs: int = 50):
+        self.redis_client = redis_client
+        self.scan_count = scan_count
+        self.ops_per_second = ops_per_second
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, InvalidationJob] = {}
+
+    async def scan(self, match: str) -> List[bytes]:
+        """Collect keys matching a pattern with incremental SCAN calls."""
+        keys: List[bytes] = []
+        cursor = 0
+        while True:
+            cursor, batch = await self.redis_client.scan(cursor=cursor, match=match, count=self.scan_count)
+            keys.extend(batch)
+            if not cursor:
+                return keys
+
+    def start(self, match: str) -> InvalidationJob:
+        """Start a background invalidation job and return it for progress polling."""
+        job = InvalidationJob(job_id=uuid.uuid4().hex, match=match)
+        self._remember(job)
+        job._task = asyncio.create_task(self.run(job))
+        return job
+
+    async def invalidate(self, match: str) -> InvalidationJob:
+        """Run an invalidation to completion (still paced and incremental)."""
+        job = InvalidationJob(job_id=uuid.uuid4().hex, match=match)
+        self._remember(job)
+        await self.run(job)
+        return job
+
+    async def run(self, job: InvalidationJob) -> InvalidationJob:
+        """Walk the keyspace with SCAN and UNLINK every batch of matches."""
+        job.status = "running"
+        job.started_at = datetime.now()
+        cursor = 0
+
+        try:
+            while True:
+                batch_start = time.monotonic()
+                cursor, keys = await self.redis_client.scan(cursor=cursor, match=job.match, count=self.scan_count)
+                job.scanned += len(keys)
+                job.batches += 1
+
+                if keys:
+                    job.deleted += await self.redis_client.unlink(*keys)
+
+                if not cursor:
+                    break
+
+                await self._pace(self.scan_count + len(keys), time.monotonic() - batch_start)
+
+            job.status = "completed"
+            logger.info(f"Cache invalidation {job.job_id} ({job.match}): {job.deleted} keys removed")
+
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Cache invalidation {job.job_id} ({job.match}) failed: {e}")
+        finally:
+            job.finished_at = datetime.now()
+
+        return job
+
+    async def _pace(self, ops: int, elapsed: float):
+        """Sleep so the job stays within ops_per_second."""
+        if self.ops_per_second <= 0:
+            # Unpaced - still yield so other requests get the event loop
+            await asyncio.sleep(0)
+            return
+        await asyncio.sleep(max(ops / self.ops_per_second - elapsed, 0.0))
+
+    def get_job(self, job_id: str) -> Optional[InvalidationJob]:
+        """Look up a job by id."""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[InvalidationJob]:
+        """Known jobs, most recent last."""
+        return list(self._jobs.values())
+
+    async def close(self):
+        """Cancel running jobs."""
+        tasks = [job._task for job in self._jobs.values() if job._task and not job._task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _remember(self, job: InvalidationJob):
+        self._jobs[job.job_id] = job
+        # Forget the oldest finished jobs beyond max_jobs
+        finished = [job_id for job_id, known in self._jobs.items() if known.done]
+        for job_id in finished[:max(len(self._jobs) - self.max_jobs, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,233 @@
+"""
+Bounded in-process cache used while Redis is unavailable.
+
+Entries are keyed by the full Redis key, expire with their TTL and are evicted
+least-recently-used beyond max_entries. Mutable values are copied on the way in
+and out so callers cannot change cached state, matching Redis semantics.
+
+MemoryPipeline runs the subset of pipeline commands the cache layer queues
+(strings, HASH and ZSET commands used by sessions and refresh locks) against
+the same store, so pipeline-based callers keep working in degraded mode.
+"""
+
+import copy
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_IMMUTABLE = (str, bytes, int, float, bool, type(None), tuple, frozenset)
+
+
+class InMemoryCacheBackend:
+    """
+    TTL + LRU dictionary cache.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._live_entry(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return _copy(entry[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, nx: bool = False) -> bool:
+        if nx and self._live_entry(key) is not None:
+            return False
+        self.put(key, _copy(value), time.time() + ttl if ttl else None)
+        return True
+
+    def put(self, key: str, value: Any, expires_at: Optional[float] = None):
+        """Store a value as is (no copy), evicting the least recently used beyond the bound."""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._entries.pop(key, None) is not None)
+
+    def exists(self, key: str) -> bool:
+        return self._live_entry(key) is not None
+
+    def expire(self, key: str, ttl: int) -> bool:
+        entry = self._live_entry(key)
+        if entry is None:
+            return False
+        self._entries[key] = (entry[0], time.time() + ttl)
+        return True
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        entry = self._live_entry(key)
+        value = int(entry[0]) + amount if entry is not None else amount
+        self._entries[key] = (value, entry[1] if entry is not None else None)
+        return value
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        return [key for key in list(self._entries) if fnmatch.fnmatchcase(key, pattern) and self._live_entry(key)]
+
+    def delete_pattern(self, pattern: str) -> int:
+        return self.delete(*self.keys(pattern))
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries}
+
+    def _live_entry(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        return entry
+
+
+def _copy(value: Any) -> Any:
+    return value if isinstance(value, _IMMUTABLE) else copy.deepcopy(value)
+
+
+def _encode(value: Any) -> bytes:
+    """Encode like a redis client with decode_responses=False."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    return str(value).encode('utf-8')
+
+
+def _score_bound(bound: Any) -> float:
+    """ZSET score bound ("-inf" / "+inf" or a number)."""
+    return float(bound.decode('utf-8') if isinstance(bound, bytes) else bound)
+
+
+class MemoryPipeline:
+    """
+    In-memory stand-in for a redis pipeline.
+
+    Only the commands in COMMANDS can be queued; anything else raises
+    AttributeError so unsupported callers fail loudly instead of silently.
+    """
+
+    COMMANDS = frozenset({
+        "get", "set", "setex", "delete", "unlink", "exists", "expire",
+        "hset", "hget", "hgetall", "zadd", "zrem", "zremrangebyscore", "zrevrange"
+    })
+
+    def __init__(self, backend: InMemoryCacheBackend):
+        self._backend = backend
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name not in self.COMMANDS:
+            raise AttributeError(f"Command {name} is not available in degraded mode")
+
+        def queue(*args: Any, **kwargs: Any) -> "MemoryPipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [getattr(self, f"_{name}")(*args, **kwargs) for name, args, kwargs in commands]
+
+    # Strings
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._backend._live_entry(key)
+        return _encode(entry[0]) if entry is not None else None
+
+    def _set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        return True if self._backend.set(key, _encode(value), ex, nx) else None
+
+    def _setex(self, key: str, ttl: int, value: Any) -> bool:
+        return self._backend.set(key, _encode(value), ttl)
+
+    def _delete(self, *keys: str) -> int:
+        return self._backend.delete(*keys)
+
+    _unlink = _delete
+
+    def _exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._backend.exists(key))
+
+    def _expire(self, key: str, ttl: int) -> bool:
+        return self._backend.expire(key, ttl)
+
+    # Hashes and sorted sets (stored as dicts, mutated in place)
+
+    def _container(self, key: str, create: bool) -> Optional[Dict[bytes, Any]]:
+        entry = self._backend._live_entry(key)
+        if entry is not None and isinstance(entry[0], dict):
+            self._backend._entries.move_to_end(key)
+            return entry[0]
+        if not create:
+            return None
+        container: Dict[bytes, Any] = {}
+        self._backend.put(key, container)
+        return container
+
+    def _hset(self, key: str, field: Any = None, value: Any = None,
+              mapping: Optional[Dict[Any, Any]] = None) -> int:
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        container = self._container(key, create=True)
+        added = 0
+        for name, field_value in fields.items():
+            name = _encode(name)
+            added += name not in container
+            container[name] = _encode(field_value)
+        return added
+
+    def _hget(self, key: str, field: Any) -> Optional[bytes]:
+        container = self._container(key, create=False)
+        return container.get(_encode(field)) if container is not None else None
+
+    def _hgetall(self, key: str) -> Dict[bytes, bytes]:
+        container = self._container(key, create=False)
+        return dict(container) if container is not None else {}
+
+    def _zadd(self, key: str, mapping: Dict[Any, float]) -> int:
+        container = self._container(key, create=True)
+        added = 0
+        for member, score in mapping.items():
+            member = _encode(member)
+            added += member not in container
+            container[member] = float(score)
+        return added
+
+    def _zrem(self, key: str, *members: Any) -> int:
+        container = self._container(key, create=False)
+        if container is None:
+            return 0
+        return sum(1 for member in members if container.pop(_encode(member), None) is not None)
+
+    def _zremrangebyscore(self, key: str, minimum: Any, maximum: Any) -> int:
+        container = self._container(key, create=False)
+        if container is None:
+            return 0
+        low, high = _score_bound(minimum), _score_bound(maximum)
+        removed = [member for member, score in container.items() if low <= score <= high]
+        for member in removed:
+            del container[member]
+        return len(removed)
+
+    def _zrevrange(self, key: str, start: int, end: int) -> List[bytes]:
+        container = self._container(key, create=False)
+        if container is None:
+            return []
+        members = [member for member, _ in sorted(container.items(), key=lambda item: item[1], reverse=True)]
+        return members[start:] if end == -1 else members[start:end + 1]
@@ -0,0 +1,262 @@
+"""
+Per-cache-type metrics with Prometheus text exposition.
+
+The cache layers (Redis pool, workflow response cache, agent instance cache)
+record hits, misses, errors, value sizes and operation latencies here, labelled
+by layer and cache_type. Recording is a dict update and a bisect into a fixed
+bucket list - no locks, no I/O - so it is cheap enough for every cache call.
+The registry renders itself in the Prometheus text format for /metrics and as
+a JSON snapshot for the stats endpoints.
+"""
+
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+METRIC_PREFIX = "chatbuddy_cache"
+
+# Seconds - Redis round trips are sub-millisecond to tens of milliseconds
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+# Bytes - from small JSON records to large search result pages
+DEFAULT_SIZE_BUCKETS: Tuple[float, ...] = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576
+)
+
+# Counted events and their metric names
+EVENTS: Dict[str, str] = {
+    "hit": "hits",
+    "miss": "misses",
+    "error": "errors",
+    "set": "sets",
+    "delete": "deletes",
+    "compress": "compressions"
+}
+
+# (metric name, help, type, labels, value) produced by collectors at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed bucket list."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs including +Inf."""
+        pairs = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            pairs.append((_format_value(bound), running))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class CacheMetricsRegistry:
+    """
+    In-process cache metrics, labelled by layer and cache_type.
+
+    Args:
+        latency_buckets: Histogram buckets of operation latencies (seconds)
+        size_buckets: Histogram buckets of value sizes (bytes)
+    """
+
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+                 size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self._counters: Dict[Tuple[str, str, str], int] = {}
+        self._latencies: Dict[Tuple[str, str, str], Histogram] = {}
+        self._sizes: Dict[Tuple[str, str], Histogram] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def record(self, layer: str, cache_type: str, event: str, latency: Optional[float] = None,
+               size: Optional[int] = None, operation: Optional[str] = None):
+        """
+        Record one cache event.
+
+        Args:
+            layer: Cache layer ("redis", "workflow", "agent")
+            cache_type: Cache type within the layer
+            event: One of EVENTS
+            latency: Operation duration in seconds
+            size: Value size in bytes (hits and sets)
+            operation: Latency label, defaults to the event
+        """
+        key = (layer, cache_type, event)
+        self._counters[key] = self._counters.get(key, 0) + 1
+        if latency is not None:
+            self.observe_latency(layer, cache_type, operation or event, latency)
+        if size is not None:
+            self.observe_size(layer, cache_type, size)
+
+    def hit(self, layer: str, cache_type: str, latency: Optional[float] = None, size: Optional[int] = None):
+        self.record(layer, cache_type, "hit", latency, size, operation="get")
+
+    def miss(self, layer: str, cache_type: str, latency: Optional[float] = None):
+        self.record(layer, cache_type, "miss", latency, operation="get")
+
+    def error(self, layer: str, cache_type: str):
+        self.record(layer, cache_type, "error")
+
+    def observe_latency(self, layer: str, cache_type: str, operation: str, seconds: float):
+        key = (layer, cache_type, operation)
+        histogram = self._latencies.get(key)
+        if histogram is None:
+            histogram = self._latencies[key] = Histogram(self.latency_buckets)
+        histogram.observe(seconds)
+
+    def observe_size(self, layer: str, cache_type: str, size: int):
+        key = (layer, cache_type)
+        histogram = self._sizes.get(key)
+        if histogram is None:
+            histogram = self._sizes[key] = Histogram(self.size_buckets)
+        histogram.observe(size)
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[Sample]]):
+        """Register a callback that contributes samples at scrape time (replaces same name)."""
+        self._collectors[name] = collector
+
+    def snapshot(self, layer: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        JSON-friendly per-cache-type summary.
+
+        Returns:
+            {"layer:cache_type": {"hits", "misses", "errors", "sets", "deletes",
+             "hit_rate", "avg_value_bytes", "avg_get_ms"}}
+        """
+        summary: Dict[str, Dict[str, Any]] = {}
+
+        def entry(entry_layer: str, cache_type: str) -> Dict[str, Any]:
+            name = cache_type if layer else f"{entry_layer}:{cache_type}"
+            if name not in summary:
+                summary[name] = {metric: 0 for metric in EVENTS.values()}
+            return summary[name]
+
+        for (entry_layer, cache_type, event), count in self._counters.items():
+            if layer is None or entry_layer == layer:
+                entry(entry_layer, cache_type)[EVENTS.get(event, event)] = count
+
+        for (entry_layer, cache_type), histogram in self._sizes.items():
+            if (layer is None or entry_layer == layer) and histogram.count:
+                entry(entry_layer, cache_type)["avg_value_bytes"] = round(histogram.sum / histogram.count)
+
+        for (entry_layer, cache_type, operation), histogram in self._latencies.items():
+            if (layer is None or entry_layer == layer) and histogram.count:
+                entry(entry_layer, cache_type)[f"avg_{operation}_ms"] = round(
+                    histogram.sum / histogram.count * 1000, 3
+                )
+
+        for values in summary.values():
+            lookups = values["hits"] + values["misses"]
+            values["hit_rate"] = round(values["hits"] / lookups * 100, 2) if lookups else 0.0
+
+        return summary
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+
+        for event, name in EVENTS.items():
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            samples = [
+                ({"layer": layer, "cache_type": cache_type}, count)
+                for (layer, cache_type, counted), count in sorted(self._counters.items())
+                if counted == event
+            ]
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric} Cache {name} by layer and cache type")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, count in samples:
+                lines.append(f"{metric}{_format_labels(labels)} {count}")
+
+        self._render_histograms(
+            lines, f"{METRIC_PREFIX}_operation_seconds", "Cache operation latency in seconds",
+            dict(self._latencies), ("layer", "cache_type", "operation")
+        )
+        self._render_histograms(
+            lines, f"{METRIC_PREFIX}_value_bytes", "Size of cached values in bytes",
+            dict(self._sizes), ("layer", "cache_type")
+        )
+
+        for name, collector in list(self._collectors.items()):
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+                continue
+
+            described = set()
+            for metric, help_text, metric_type, labels, value in samples:
+                if metric not in described:
+                    lines.append(f"# HELP {metric} {help_text}")
+                    lines.append(f"# TYPE {metric} {metric_type}")
+                    described.add(metric)
+                lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: List[str], metric: str, help_text: str,
+                           histograms: Dict[Tuple[str, ...], Histogram], label_names: Tuple[str, ...]):
+        if not histograms:
+            return
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for label_values, histogram in sorted(histograms.items()):
+            labels = dict(zip(label_names, label_values))
+            for bound, count in histogram.cumulative():
+                lines.append(f"{metric}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+
+    def reset(self, layer: Optional[str] = None):
+        """Drop recorded values - of one layer, or all of them (collectors stay registered)."""
+        for store in (self._counters, self._latencies, self._sizes):
+            for key in [key for key in store if layer is None or key[0] == layer]:
+                del store[key]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+# Global registry shared by every cache layer of the process
+_cache_metrics: Optional[CacheMetricsRegistry] = None
+
+
+def get_cache_metrics() -> CacheMetricsRegistry:
+    """Get the process-wide cache metrics registry."""
+    global _cache_metrics
+    if _cache_metrics is None:
+        _cache_metrics = CacheMetricsRegistry()
+    return _cache_metrics
@@ -0,0 +1,170 @@
+"""
+Generation-versioned cache namespaces - O(1) bulk invalidation.
+
+Every namespace (a cache type, or a scope such as a tenant, user or product
+category) has a generation counter in Redis. The current generation is embedded
+in the keys derived from the namespace, so invalidating the whole namespace is
+a single INCR: new reads derive new keys and the old entries are never read
+again, ageing out through their TTL or LRU eviction.
+
+Generations are read from a local snapshot that a background task refreshes
+with one MGET per interval, so deriving a key costs no Redis round trip once a
+namespace is known (cache types are preloaded at startup, scopes are fetched on
+first use). A bump is visible immediately in the process that made it and
+within one refresh interval everywhere else. Cache type namespaces are pinned:
+the per-user and per-tenant scopes share a bounded LRU, and a cache type
+pushed out of it would silently restart at generation 0 (pre-invalidation keys).
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def namespace_for(cache_type: Optional[str] = None, **scope: Any) -> str:
+    """
+    Build a namespace name.
+
+    namespace_for('product_info') -> "product_info"
+    namespace_for(category='electronics') -> "category=electronics"
+
+    Raises:
+        ValueError: Unless exactly one cache type or one scope is given
+    """
+    if (1 if cache_type else 0) + len(scope) != 1:
+        raise ValueError("A namespace is either one cache type or one scope")
+    if cache_type:
+        return cache_type
+    (kind, value), = scope.items()
+    return f"{kind}={value}"
+
+
+class NamespaceGenerations:
+    """
+    Local snapshot of namespace generation counters.
+
+    Args:
+        redis_client: redis.asyncio client (None until connected)
+        key_prefix: Redis key prefix of the counters
+        max_tracked: Namespaces kept in the snapshot (least recently used dropped)
+        pinned: Namespaces always tracked, outside the LRU (the versioned cache types)
+    """
+
+    def __init__(self, redis_client: Any = None, key_prefix: str = "chatbuddy:v1:ns",
+                 max_tracked: int = 10000, pinned: Iterable[str] = ()):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.max_tracked = max_tracked
+        self._pinned: Dict[str, int] = {namespace: 0 for namespace in pinned}
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+
+    def counter_key(self, namespace: str) -> str:
+        """Redis key of a namespace counter."""
+        return f"{self.key_prefix}:{namespace}"
+
+    def current(self, namespace: str) -> int:
+        """Current generation from the local snapshot (tracked from now on)."""
+        if namespace in self._pinned:
+            return self._pinned[namespace]
+        if namespace in self._generations:
+            self._generations.move_to_end(namespace)
+            return self._generations[namespace]
+
+        self._track(namespace, 0)
+        return 0
+
+    def is_tracked(self, namespace: str) -> bool:
+        """Whether the generation is known locally (resolve() needs no Redis read)."""
+        return namespace in self._pinned or namespace in self._generations
+
+    async def resolve(self, namespace: str,
+                      read: Optional[Callable[[str], Awaitable[Any]]] = None) -> int:
+        """
+        Current generation, read from Redis the first time a namespace is seen.
+
+        Args:
+            namespace: Namespace name
+            read: Reads the counter key instead of a direct GET (e.g. the request loader)
+        """
+        if self.is_tracked(namespace) or self.redis_client is None:
+            return self.current(namespace)
+
+        value = await (read or self.redis_client.get)(self.counter_key(namespace))
+        generation = int(value) if value is not None else 0
+        self._track(namespace, generation)
+        return generation
+
+    async def preload(self, namespaces: List[str]):
+        """Load several generations with one MGET (e.g. every cache type at startup)."""
+        if self.redis_client is None or not namespaces:
+            return
+
+        values = await self.redis_client.mget([self.counter_key(ns) for ns in namespaces])
+        for namespace, value in zip(namespaces, values):
+            self._track(namespace, int(value) if value is not None else 0)
+
+    async def bump(self, namespace: str) -> Optional[int]:
+        """Invalidate a namespace with a single INCR."""
+        if self.redis_client is None:
+            return None
+
+        generation = await self.redis_client.incr(self.counter_key(namespace))
+        self._track(namespace, generation)
+        logger.info(f"Cache namespace {namespace} moved to generation {generation}")
+        return generation
+
+    def bump_local(self, namespace: str) -> int:
+        """Move a namespace to the next generation in this process only (Redis unavailable)."""
+        generation = self.current(namespace) + 1
+        self._track(namespace, generation)
+        return generation
+
+    async def refresh(self) -> int:
+        """Reload tracked generations with one MGET; returns the number of changes."""
+        if self.redis_client is None or not (self._pinned or self._generations):
+            return 0
+
+        namespaces: List[str] = list(self._pinned) + list(self._generations.keys())
+        values = await self.redis_client.mget([self.counter_key(ns) for ns in namespaces])
+
+        changed = 0
+        for namespace, value in zip(namespaces, values):
+            generation = int(value) if value is not None else 0
+            if namespace in self._pinned:
+                tracked = self._pinned
+            elif namespace in self._generations:
+                tracked = self._generations
+            else:
+                continue  # Dropped from tracking meanwhile - not re-added
+            if tracked[namespace] != generation:
+                tracked[namespace] = generation
+                changed += 1
+        return changed
+
+    async def run(self, interval: float):
+        """Refresh loop for the pool's background tasks."""
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Namespace generation refresh error: {e}")
+
+    def _track(self, namespace: str, generation: int):
+        if namespace in self._pinned:
+            self._pinned[namespace] = generation
+            return
+        self._generations[namespace] = generation
+        self._generations.move_to_end(namespace)
+        if len(self._generations) > self.max_tracked:
+            self._generations.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copy of the tracked generations."""
+        return {**self._generations, **self._pinned}
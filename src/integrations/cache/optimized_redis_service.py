@@ -11,16 +11,27 @@ as the existing cache services while delivering the optimization benefits:
 import asyncio
 import hashlib
 import json
+import math
+import random
 import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+import numpy as np
+
+from .embedding_codec import EmbeddingLike, decode_embedding, encode_embedding, is_embedding_blob
+from .invalidation import InvalidationJob
 from .redis_connection_pool import get_optimized_redis_pool, OptimizedRedisConnectionPool
 from src.config.logging import get_logger
+from src.config.rate_limiting import GCRARateLimitEngine
 
 logger = get_logger(__name__)
 
+# Marker of values stored with stale-while-revalidate bookkeeping
+SWR_ENVELOPE_KEY = "__swr__"
+
 
 @dataclass
 class OptimizedSessionData:
@@ -81,21 +92,196 @@ class OptimizedSessionData:
             session_data.expires_at = datetime.fromisoformat(data['expires_at'])
         
         return session_data
+    
+    def to_hash(self) -> Dict[str, str]:
+        """Convert to flat string fields for a Redis HASH."""
+        return self.encode_fields(self.to_dict())
+    
+    @staticmethod
+    def encode_fields(fields: Dict[str, Any]) -> Dict[str, str]:
+        """Encode field values as HASH strings."""
+        encoded = {}
+        for name, value in fields.items():
+            if value is None:
+                encoded[name] = ""
+            elif isinstance(value, bool):
+                encoded[name] = "1" if value else "0"
+            elif isinstance(value, dict):
+                encoded[name] = json.dumps(value)
+            elif isinstance(value, datetime):
+                encoded[name] = value.isoformat()
+            else:
+                encoded[name] = str(value)
+        return encoded
+    
+    @classmethod
+    def from_hash(cls, fields: Dict[Any, Any]) -> 'OptimizedSessionData':
+        """Create from the fields of a Redis HASH."""
+        decoded = {
+            (k.decode('utf-8') if isinstance(k, bytes) else k):
+            (v.decode('utf-8') if isinstance(v, bytes) else v)
+            for k, v in fields.items()
+        }
+        data: Dict[str, Any] = {name: (value or None) for name, value in decoded.items()}
+        data['is_active'] = decoded.get('is_active', '1') == '1'
+        for name in ('device_info', 'context'):
+            if data.get(name):
+                data[name] = json.loads(data[name])
+        return cls.from_dict(data)
+
+
+# Batch activity touch: for every (session HASH, user ZSET) key pair bump
+# last_activity and the TTLs - but only if the session still exists, so a
+# late flush never resurrects an expired or deleted session.
+#
+# KEYS    - session HASH, user ZSET pairs
+# ARGV[1] - session TTL (seconds)
+# ARGV    - session_id, last_activity ISO string, activity score per pair
+SESSION_TOUCH_LUA_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+local touched = 0
+for i = 1, #KEYS, 2 do
+    local offset = 2 + ((i - 1) / 2) * 3
+    local session_id = ARGV[offset]
+    if redis.call("EXISTS", KEYS[i]) == 1 then
+        redis.call("HSET", KEYS[i], "last_activity", ARGV[offset + 1])
+        redis.call("EXPIRE", KEYS[i], ttl)
+        redis.call("ZADD", KEYS[i + 1], ARGV[offset + 2], session_id)
+        redis.call("EXPIRE", KEYS[i + 1], ttl)
+        touched = touched + 1
+    else
+        redis.call("ZREM", KEYS[i + 1], session_id)
+    end
+end
+return touched
+"""
+
+
+# Release a refresh lock only if it still holds this worker's token - a
+# refresh outliving the lock TTL must not delete another worker's lock.
+#
+# KEYS[1] - lock key
+# ARGV[1] - token stored with SET NX
+RELEASE_LOCK_LUA_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class SessionActivityBuffer:
+    """
+    Write-coalescing buffer for session activity touches.
+    
+    Reads only record the latest activity timestamp in memory. A background
+    task flushes the buffered timestamps once per interval in a single
+    pipeline (HSET last_activity + EXPIRE + ZADD), so a session costs at
+    most one small write per interval instead of a rewrite on every read.
+    """
+    
+    def __init__(self, cache: 'OptimizedSessionCache', interval: int):
+        self.cache = cache
+        self.interval = interval
+        self._pending: Dict[str, tuple] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {"touches": 0, "flushes": 0, "sessions_written": 0}
+    
+    def touch(self, session_id: str, user_id: str, last_activity: Optional[datetime] = None):
+        """Record activity; only the latest timestamp per session is kept."""
+        self._stats["touches"] += 1
+        self._pending[session_id] = (user_id, last_activity or datetime.now())
+        self._ensure_flush_task()
+    
+    def _ensure_flush_task(self):
+        """Start the periodic flush task on first use."""
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                # No running loop - flush() must be called explicitly
+                self._flush_task = None
+    
+    async def _flush_loop(self):
+        """Flush buffered touches periodically."""
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Session activity flush error: {e}")
+    
+    async def flush(self) -> int:
+        """Write all buffered touches in one pipeline."""
+        if not self._pending:
+            return 0
+        
+        batch, self._pending = self._pending, {}
+        written = await self.cache._write_activity(batch)
+        
+        if written:
+            self._stats["flushes"] += 1
+            self._stats["sessions_written"] += len(batch)
+            return len(batch)
+        
+        # Keep the failed batch unless newer touches replaced it
+        for session_id, entry in batch.items():
+            self._pending.setdefault(session_id, entry)
+        return 0
+    
+    async def close(self):
+        """Stop the flush task and write what is left."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer statistics."""
+        touches = self._stats["touches"]
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "interval_seconds": self.interval,
+            "writes_saved": max(0, touches - self._stats["sessions_written"])
+        }
 
 
 class OptimizedSessionCache:
-    """Optimized session cache using unified connection pool."""
+    """
+    Optimized session cache built on native Redis structures.
+    
+    - Session fields live in a HASH, so updates are partial (HSET)
+    - User -> sessions is a ZSET scored by last activity
+    - Expiry is handled by key TTLs and score pruning, no JSON list rewrites
+    """
     
     def __init__(self, pool: OptimizedRedisConnectionPool):
         self.pool = pool
         self.cache_type = 'session'
+        self.activity = SessionActivityBuffer(self, pool.config.session_touch_interval)
+    
+    def _session_key(self, session_id: str) -> str:
+        """Redis key of the session HASH."""
+        return self.pool.key_for(self.cache_type, f"data:{session_id}")
+    
+    def _user_index_key(self, user_id: str) -> str:
+        """Redis key of the user's session ZSET."""
+        return self.pool.key_for(self.cache_type, f"user:{user_id}")
     
     async def create_session(self, user_id: str, device_info: Optional[Dict] = None,
                            ip_address: Optional[str] = None, user_agent: Optional[str] = None) -> Optional[str]:
-        """Create a new session."""
+        """Create a new session (HASH + user index in one transaction)."""
         try:
             import uuid
             session_id = str(uuid.uuid4())
+            ttl = self.pool.config.session_ttl
             
             session_data = OptimizedSessionData(
                 session_id=session_id,
@@ -103,19 +289,22 @@ class OptimizedSessionCache:
                 device_info=device_info,
                 ip_address=ip_address,
                 user_agent=user_agent,
-                expires_at=datetime.now() + timedelta(seconds=self.pool.config.session_ttl)
+                expires_at=datetime.now() + timedelta(seconds=ttl)
             )
             
-            # Store session data
-            success = await self.pool.set(
-                key=session_id,
-                value=session_data.to_dict(),
-                cache_type=self.cache_type
-            )
+            session_key = self._session_key(session_id)
+            index_key = self._user_index_key(user_id)
+            now = time.time()
             
-            if success:
-                # Update user sessions index
-                await self._add_to_user_sessions(user_id, session_id)
+            def build(pipe):
+                pipe.hset(session_key, mapping=session_data.to_hash())
+                pipe.expire(session_key, ttl)
+                pipe.zadd(index_key, {session_id: now})
+                pipe.expire(index_key, ttl)
+            
+            results = await self.pool.execute_pipeline(build)
+            
+            if results is not None:
                 logger.info(f"Session created: {session_id} for user: {user_id}")
                 return session_id
             else:
@@ -126,103 +315,147 @@ class OptimizedSessionCache:
             logger.error(f"Session creation error: {e}")
             return None
     
+    def prefetch_session(self, session_id: str):
+        """Register the session read with the request loader (joins its first batch)."""
+        self.pool.prefetch('hgetall', self._session_key(session_id))
+    
     async def get_session(self, session_id: str) -> Optional[OptimizedSessionData]:
-        """Get session data."""
+        """Get session data (read-only; the activity touch is buffered)."""
         try:
-            data = await self.pool.get(session_id, self.cache_type)
-            if data:
-                session_data = OptimizedSessionData.from_dict(data)
-                
-                # Update last activity
-                session_data.last_activity = datetime.now()
-                await self.update_session(session_id, session_data)
-                
-                return session_data
-            return None
+            fields = await self.pool.read('hgetall', self._session_key(session_id))
+            if not fields:
+                return None
+            
+            session_data = OptimizedSessionData.from_hash(fields)
+            
+            # Record activity - written lazily by the activity buffer
+            session_data.last_activity = datetime.now()
+            self.touch_session(session_id, session_data.user_id, session_data.last_activity)
+            
+            return session_data
         
         except Exception as e:
             logger.error(f"Session get error for {session_id}: {e}")
             return None
     
+    def touch_session(self, session_id: str, user_id: str,
+                      last_activity: Optional[datetime] = None):
+        """Buffer a last-activity bump; flushed at most once per interval."""
+        self.activity.touch(session_id, user_id, last_activity)
+    
+    async def _write_activity(self, batch: Dict[str, tuple]) -> bool:
+        """Write buffered activity timestamps and refresh TTLs (timestamp only)."""
+        keys: List[str] = []
+        args: List[Any] = [self.pool.config.session_ttl]
+        for session_id, (user_id, last_activity) in batch.items():
+            keys.extend([f"data:{session_id}", f"user:{user_id}"])
+            args.extend([session_id, last_activity.isoformat(), last_activity.timestamp()])
+        
+        try:
+            touched = await self.pool.run_script(
+                SESSION_TOUCH_LUA_SCRIPT, keys, args, cache_type=self.cache_type
+            )
+            return touched is not None
+        except Exception as e:
+            logger.error(f"Session activity write error: {e}")
+            return False
+    
     async def update_session(self, session_id: str, session_data: OptimizedSessionData) -> bool:
         """Update session data."""
         try:
-            return await self.pool.set(
-                key=session_id,
-                value=session_data.to_dict(),
-                cache_type=self.cache_type
+            return await self.update_session_fields(
+                session_id, session_data.user_id, **session_data.to_hash()
             )
         except Exception as e:
             logger.error(f"Session update error for {session_id}: {e}")
             return False
     
-    async def delete_session(self, session_id: str) -> bool:
-        """Delete session."""
+    async def update_session_fields(self, session_id: str, user_id: str, **fields: Any) -> bool:
+        """Partially update session fields (HSET only the given fields)."""
         try:
-            # Get session first to clean up user index
-            session_data = await self.get_session(session_id)
+            if not fields:
+                return True
             
-            success = await self.pool.delete(session_id, self.cache_type)
+            encoded = OptimizedSessionData.encode_fields(fields)
+            ttl = self.pool.config.session_ttl
+            session_key = self._session_key(session_id)
+            index_key = self._user_index_key(user_id)
             
-            if success and session_data:
-                await self._remove_from_user_sessions(session_data.user_id, session_id)
-                logger.info(f"Session deleted: {session_id}")
+            def build(pipe):
+                pipe.hset(session_key, mapping=encoded)
+                pipe.expire(session_key, ttl)
+                pipe.zadd(index_key, {session_id: time.time()})
+                pipe.expire(index_key, ttl)
             
-            return success
-        
+            return await self.pool.execute_pipeline(build) is not None
         except Exception as e:
-            logger.error(f"Session delete error for {session_id}: {e}")
+            logger.error(f"Session field update error for {session_id}: {e}")
             return False
     
-    async def _add_to_user_sessions(self, user_id: str, session_id: str):
-        """Add session to user's session list."""
+    async def delete_session(self, session_id: str) -> bool:
+        """Delete session and remove it from the user index."""
         try:
-            # Get existing sessions
-            existing_sessions = await self.pool.get(f"user_sessions:{user_id}", self.cache_type) or []
+            session_key = self._session_key(session_id)
             
-            # Add new session if not already present
-            if session_id not in existing_sessions:
-                existing_sessions.append(session_id)
-            
-            # Store updated list
-            await self.pool.set(
-                key=f"user_sessions:{user_id}",
-                value=existing_sessions,
-                cache_type=self.cache_type
+            lookup = await self.pool.execute_pipeline(
+                lambda pipe: pipe.hget(session_key, "user_id"),
+                transaction=False
             )
-        
-        except Exception as e:
-            logger.error(f"Error adding to user sessions: {e}")
-    
-    async def _remove_from_user_sessions(self, user_id: str, session_id: str):
-        """Remove session from user's session list."""
-        try:
-            existing_sessions = await self.pool.get(f"user_sessions:{user_id}", self.cache_type) or []
+            user_id = lookup[0] if lookup else None
+            if isinstance(user_id, bytes):
+                user_id = user_id.decode('utf-8')
+            
+            def build(pipe):
+                pipe.delete(session_key)
+                if user_id:
+                    pipe.zrem(self._user_index_key(user_id), session_id)
+            
+            results = await self.pool.execute_pipeline(build)
+            success = bool(results and results[0])
+            
+            if success:
+                logger.info(f"Session deleted: {session_id}")
             
-            if session_id in existing_sessions:
-                existing_sessions.remove(session_id)
-                
-                if existing_sessions:
-                    await self.pool.set(
-                        key=f"user_sessions:{user_id}",
-                        value=existing_sessions,
-                        cache_type=self.cache_type
-                    )
-                else:
-                    await self.pool.delete(f"user_sessions:{user_id}", self.cache_type)
+            return success
         
         except Exception as e:
-            logger.error(f"Error removing from user sessions: {e}")
+            logger.error(f"Session delete error for {session_id}: {e}")
+            return False
     
     async def get_user_sessions(self, user_id: str) -> List[OptimizedSessionData]:
-        """Get all sessions for a user."""
+        """Get all active sessions for a user (pipelined, most recent first)."""
         try:
-            session_ids = await self.pool.get(f"user_sessions:{user_id}", self.cache_type) or []
+            index_key = self._user_index_key(user_id)
+            cutoff = time.time() - self.pool.config.session_ttl
+            
+            def build_index(pipe):
+                # Sessions idle longer than the TTL have expired - prune them
+                pipe.zremrangebyscore(index_key, "-inf", cutoff)
+                pipe.zrevrange(index_key, 0, -1)
+            
+            index_results = await self.pool.execute_pipeline(build_index)
+            if not index_results:
+                return []
+            
+            session_ids = [
+                sid.decode('utf-8') if isinstance(sid, bytes) else sid
+                for sid in index_results[1]
+            ]
+            if not session_ids:
+                return []
+            
+            def build_fetch(pipe):
+                for sid in session_ids:
+                    pipe.hgetall(self._session_key(sid))
+            
+            hashes = await self.pool.execute_pipeline(build_fetch, transaction=False) or []
             
             sessions = []
-            for session_id in session_ids:
-                session_data = await self.get_session(session_id)
-                if session_data and session_data.is_active:
+            for fields in hashes:
+                if not fields:
+                    continue
+                session_data = OptimizedSessionData.from_hash(fields)
+                if session_data.is_active:
                     sessions.append(session_data)
             
             return sessions
@@ -233,16 +466,48 @@ class OptimizedSessionCache:
 
 
 class OptimizedPerformanceCache:
-    """Optimized performance cache using unified connection pool."""
+    """
+    Optimized performance cache using unified connection pool.
+    
+    Product info and search results use stale-while-revalidate: entries carry
+    a logical expiry and the recompute time ("delta") next to the value, and are
+    kept in Redis for an extra grace window. Readers get the stored value while
+    a single background task refreshes it, and XFetch probabilistic early
+    expiration spreads those refreshes before the logical expiry.
+    
+    Lookups that find nothing (a loader returning None or an empty list) are
+    cached as short-lived tombstones for the cache types in negative_cache_ttls,
+    so repeated misses do not reach the backend. A tombstone is an envelope
+    flagged "negative", which tells it apart from an absent key; loaders signal
+    failures by raising, which is never cached.
+    """
     
     def __init__(self, pool: OptimizedRedisConnectionPool):
         self.pool = pool
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._revalidation_stats = {
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "early_refreshes": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "negative_hits": 0,
+            "negative_stores": 0
+        }
     
-    async def cache_agent_response(self, query_hash: str, response: Any) -> bool:
-        """Cache agent response with intelligent TTL."""
+    async def cache_agent_response(self, query_hash: str, response: Any,
+                                   scope: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Cache agent response with intelligent TTL.
+        
+        Args:
+            scope: Namespaces the entry belongs to (e.g. {"user": user_id}),
+                invalidated together by invalidate_namespace
+        """
         try:
             return await self.pool.set(
-                key=query_hash,
+                key=await self.pool.versioned_key(query_hash, **(scope or {})),
                 value=response,
                 cache_type='agent_response'
             )
@@ -250,74 +515,327 @@ class OptimizedPerformanceCache:
             logger.error(f"Agent response cache error: {e}")
             return False
     
-    async def get_cached_agent_response(self, query_hash: str) -> Optional[Any]:
-        """Get cached agent response."""
+    async def get_cached_agent_response(self, query_hash: str,
+                                        scope: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Get cached agent response (scope as used when caching it)."""
         try:
-            return await self.pool.get(query_hash, 'agent_response')
+            key = await self.pool.versioned_key(query_hash, **(scope or {}))
+            return await self.pool.get(key, 'agent_response')
         except Exception as e:
             logger.error(f"Agent response get error: {e}")
             return None
     
-    async def cache_product_info(self, product_id: str, product_data: Dict[str, Any]) -> bool:
-        """Cache product information."""
+    def prefetch_scope(self, **scope: Any):
+        """Register the scope generations with the request loader (see versioned_key)."""
+        self.pool.prefetch_namespace(**scope)
+    
+    async def invalidate_namespace(self, cache_type: Optional[str] = None, **scope: Any) -> bool:
+        """
+        Invalidate a cache type (e.g. 'product_info') or a scope (e.g. user=...)
+        in O(1) by moving it to a new generation.
+        """
+        return await self.pool.bump_namespace(cache_type, **scope) is not None
+    
+    async def cache_product_info(self, product_id: str, product_data: Dict[str, Any],
+                                 compute_time: float = 0.0) -> bool:
+        """Cache product information (with stale-while-revalidate bookkeeping)."""
         try:
-            return await self.pool.set(
-                key=product_id,
-                value=product_data,
-                cache_type='product_info'
-            )
+            return await self._store_revalidating(product_id, 'product_info', product_data, compute_time)
         except Exception as e:
             logger.error(f"Product info cache error: {e}")
             return False
     
     async def get_cached_product_info(self, product_id: str) -> Optional[Dict[str, Any]]:
-        """Get cached product information."""
+        """Get cached product information (stale values within the grace window included)."""
         try:
-            return await self.pool.get(product_id, 'product_info')
+            return self._unwrap(await self.pool.get(product_id, 'product_info'))[0]
         except Exception as e:
             logger.error(f"Product info get error: {e}")
             return None
     
-    async def cache_search_result(self, query_hash: str, results: List[Dict[str, Any]]) -> bool:
-        """Cache search results."""
+    async def get_or_load_product_info(self, product_id: str,
+                                       loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+                                       ) -> Optional[Dict[str, Any]]:
+        """Get product information, loading or revalidating it through loader."""
+        return await self.get_or_load(product_id, 'product_info', loader)
+    
+    async def cache_search_result(self, query_hash: str, results: List[Dict[str, Any]],
+                                  compute_time: float = 0.0) -> bool:
+        """Cache search results (with stale-while-revalidate bookkeeping)."""
         try:
-            return await self.pool.set(
-                key=query_hash,
-                value=results,
-                cache_type='search_result'
-            )
+            return await self._store_revalidating(query_hash, 'search_result', results, compute_time)
         except Exception as e:
             logger.error(f"Search result cache error: {e}")
             return False
     
     async def get_cached_search_result(self, query_hash: str) -> Optional[List[Dict[str, Any]]]:
-        """Get cached search results."""
+        """Get cached search results (stale values within the grace window included)."""
         try:
-            return await self.pool.get(query_hash, 'search_result')
+            return self._unwrap(await self.pool.get(query_hash, 'search_result'))[0]
         except Exception as e:
             logger.error(f"Search result get error: {e}")
             return None
     
-    async def cache_embedding(self, text_hash: str, embedding: List[float]) -> bool:
-        """Cache embedding with longer TTL (expensive to compute)."""
+    async def get_or_load_search_result(self, query_hash: str,
+                                        loader: Callable[[], Awaitable[Optional[List[Dict[str, Any]]]]]
+                                        ) -> Optional[List[Dict[str, Any]]]:
+        """Get search results, loading or revalidating them through loader."""
+        return await self.get_or_load(query_hash, 'search_result', loader)
+    
+    async def get_or_load(self, key: str, cache_type: str,
+                          loader: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """
+        Stale-while-revalidate read.
+        
+        - Fresh entry: returned; with XFetch probability a refresh starts early
+        - Stale entry (inside the grace window): returned, one refresh starts
+        - Miss: loader runs once per process, concurrent callers share the result
+        
+        Args:
+            key: Cache key
+            cache_type: Type of cache ('product_info', 'search_result', ...)
+            loader: Coroutine function computing the current value
+        """
+        try:
+            entry = await self.pool.get(key, cache_type)
+        except Exception as e:
+            logger.error(f"Revalidating get error for {cache_type}:{key}: {e}")
+            entry = None
+        
+        value, envelope = self._unwrap(entry)
+        if envelope is None:
+            # Missing, or written without bookkeeping (older format) - reload
+            self._revalidation_stats["misses"] += 1
+            return await self._load_once(key, cache_type, loader)
+        
+        now = time.time()
+        if envelope.get("negative"):
+            # Known miss: served until the tombstone expires or is invalidated
+            self._revalidation_stats["negative_hits"] += 1
+        elif now >= envelope["expires_at"]:
+            self._revalidation_stats["stale_hits"] += 1
+            self._schedule_refresh(key, cache_type, loader)
+        elif self._should_refresh_early(envelope, now):
+            self._revalidation_stats["early_refreshes"] += 1
+            self._schedule_refresh(key, cache_type, loader)
+        else:
+            self._revalidation_stats["fresh_hits"] += 1
+        
+        return value
+    
+    async def load_with_negative_cache(self, key: str, cache_type: str,
+                                       loader: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """
+        Run loader, caching only the misses.
+        
+        For lookups whose hits must not be cached (e.g. order status) while
+        unknown IDs should stop reaching the backend.
+        """
+        try:
+            value, envelope = self._unwrap(await self.pool.get(key, cache_type))
+        except Exception as e:
+            logger.error(f"Negative cache get error for {cache_type}:{key}: {e}")
+            envelope = None
+        
+        if envelope is not None and envelope.get("negative"):
+            self._revalidation_stats["negative_hits"] += 1
+            return value
+        
+        value = await loader()
+        if self._is_empty_result(value):
+            await self.cache_negative(key, cache_type, value)
+        return value
+    
+    async def cache_negative(self, key: str, cache_type: str, value: Any = None) -> bool:
+        """
+        Store a tombstone: "looked up, nothing there" for the negative TTL of the type.
+        
+        Args:
+            value: The empty result returned to readers (None or an empty list)
+        """
+        ttl = self.pool.config.negative_cache_ttls.get(cache_type)
+        if not ttl:
+            return False
+        
         try:
+            stored = await self.pool.set(
+                key=key,
+                value={SWR_ENVELOPE_KEY: 1, "value": value, "expires_at": time.time() + ttl,
+                       "delta": 0.0, "negative": True},
+                cache_type=cache_type,
+                ttl=ttl
+            )
+            if stored:
+                self._revalidation_stats["negative_stores"] += 1
+            return stored
+        except Exception as e:
+            logger.error(f"Negative cache error for {cache_type}:{key}: {e}")
+            return False
+    
+    @staticmethod
+    def _is_empty_result(value: Any) -> bool:
+        """Whether a loader result means "nothing found"."""
+        return value is None or (isinstance(value, (list, tuple)) and not value)
+    
+    def _revalidation_windows(self, key: str, cache_type: str) -> Tuple[int, int]:
+        """Freshness TTL (adaptive per key) and stale grace window of a cache type."""
+        stale_windows = {
+            'product_info': self.pool.config.product_info_stale_ttl,
+            'search_result': self.pool.config.search_result_stale_ttl
+        }
+        return self.pool.ttl_for(cache_type, key), stale_windows.get(cache_type, 0)
+    
+    async def _store_revalidating(self, key: str, cache_type: str, value: Any,
+                                  compute_time: float) -> bool:
+        """Store value with its logical expiry; Redis keeps it for the grace window too."""
+        # The envelope changes on every write - the change rate is learned from the value
+        self.pool.observe_refresh(cache_type, key, value)
+        ttl, stale_ttl = self._revalidation_windows(key, cache_type)
+        envelope = {
+            SWR_ENVELOPE_KEY: 1,
+            "value": value,
+            "expires_at": time.time() + ttl,
+            "delta": compute_time
+        }
+        return await self.pool.set(key=key, value=envelope, cache_type=cache_type, ttl=ttl + stale_ttl)
+    
+    @staticmethod
+    def _unwrap(entry: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """Split a stored entry into (value, envelope); plain values have no envelope."""
+        if isinstance(entry, dict) and entry.get(SWR_ENVELOPE_KEY):
+            return entry.get("value"), entry
+        return entry, None
+    
+    def _should_refresh_early(self, envelope: Dict[str, Any], now: float) -> bool:
+        """XFetch: refresh when now - delta * beta * ln(U) reaches the expiry."""
+        delta = max(float(envelope.get("delta") or 0.0), 0.0)
+        if delta == 0.0:
+            return False
+        # 1 - random() is in (0, 1], so the logarithm is defined and <= 0
+        gap = -delta * self.pool.config.xfetch_beta * math.log(1.0 - random.random())
+        return now + gap >= envelope["expires_at"]
+    
+    async def _load_once(self, key: str, cache_type: str,
+                         loader: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """Run loader for a miss, sharing one in-flight call per key."""
+        ref = (cache_type, key)
+        task = self._inflight.get(ref)
+        if task is None:
+            task = self._track(ref, self._refresh(key, cache_type, loader))
+        # shield: a cancelled caller must not cancel the shared load
+        return await asyncio.shield(task)
+    
+    def _schedule_refresh(self, key: str, cache_type: str, loader: Callable[[], Awaitable[Any]]):
+        """Start a background refresh unless one is already running in this process."""
+        ref = (cache_type, key)
+        if ref not in self._inflight:
+            self._track(ref, self._background_refresh(key, cache_type, loader))
+    
+    def _track(self, ref: Tuple[str, str], coro: Awaitable[Any]) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._inflight[ref] = task
+        task.add_done_callback(lambda _: self._inflight.pop(ref, None))
+        return task
+    
+    async def _refresh(self, key: str, cache_type: str, loader: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """Recompute a value, measuring delta for XFetch, and store it."""
+        start_time = time.time()
+        value = await loader()
+        compute_time = time.time() - start_time
+        
+        self._revalidation_stats["refreshes"] += 1
+        if self._is_empty_result(value) and self.pool.config.negative_cache_ttls.get(cache_type):
+            await self.cache_negative(key, cache_type, value)
+        elif value is not None:
+            await self._store_revalidating(key, cache_type, value, compute_time)
+        return value
+    
+    async def _background_refresh(self, key: str, cache_type: str,
+                                  loader: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """Refresh under a short Redis lock so only one worker recomputes."""
+        lock_name = f"{cache_type}:{key}"
+        lock_key = self.pool.key_for('refresh_lock', lock_name)
+        token = uuid.uuid4().hex
+        acquired = await self.pool.execute_pipeline(
+            lambda pipe: pipe.set(lock_key, token, ex=self.pool.config.revalidation_lock_ttl, nx=True),
+            transaction=False
+        )
+        if not acquired or not acquired[0]:
+            return None
+        
+        try:
+            return await self._refresh(key, cache_type, loader)
+        except Exception as e:
+            # The stale value stays in place until the grace window ends
+            self._revalidation_stats["refresh_errors"] += 1
+            logger.warning(f"Background refresh failed for {cache_type}:{key}: {e}")
+            return None
+        finally:
+            try:
+                await self.pool.run_script(RELEASE_LOCK_LUA_SCRIPT, [lock_name], [token],
+                                           cache_type='refresh_lock')
+            except Exception as e:
+                # The lock expires on its own after revalidation_lock_ttl
+                logger.warning(f"Refresh lock release failed for {lock_name}: {e}")
+    
+    async def close(self):
+        """Wait for running refreshes so none outlives the pool."""
+        if self._inflight:
+            await asyncio.gather(*list(self._inflight.values()), return_exceptions=True)
+    
+    async def cache_embedding(self, text_hash: str, embedding: EmbeddingLike,
+                              dtype: Optional[str] = None) -> bool:
+        """Cache embedding as a compact binary blob with longer TTL (expensive to compute)."""
+        try:
+            blob = encode_embedding(embedding, dtype or self.pool.config.embedding_cache_dtype)
             return await self.pool.set(
                 key=text_hash,
-                value=embedding,
+                value=blob,
                 cache_type='embedding'
             )
         except Exception as e:
             logger.error(f"Embedding cache error: {e}")
             return False
     
-    async def get_cached_embedding(self, text_hash: str) -> Optional[List[float]]:
-        """Get cached embedding."""
+    async def get_cached_embedding(self, text_hash: str) -> Optional[np.ndarray]:
+        """Get cached embedding as a read-only numpy array."""
         try:
-            return await self.pool.get(text_hash, 'embedding')
+            value = await self.pool.get(text_hash, 'embedding')
+            if value is None:
+                return None
+            if is_embedding_blob(value):
+                return decode_embedding(value)
+            # Entries written as JSON lists before the binary format
+            return np.asarray(value, dtype=np.float32)
         except Exception as e:
             logger.error(f"Embedding get error: {e}")
             return None
     
+    async def get_cached_embeddings(self, text_hashes: List[str]) -> List[Optional[np.ndarray]]:
+        """Get several cached embeddings with one pipelined round trip (None for misses)."""
+        try:
+            values = await self.pool.get_many([(text_hash, 'embedding') for text_hash in text_hashes])
+        except Exception as e:
+            logger.error(f"Embedding get_many error: {e}")
+            return [None] * len(text_hashes)
+        
+        embeddings = []
+        for value in values:
+            if value is None:
+                embeddings.append(None)
+            elif is_embedding_blob(value):
+                embeddings.append(decode_embedding(value))
+            else:
+                embeddings.append(np.asarray(value, dtype=np.float32))
+        return embeddings
+    
+    async def cache_embeddings(self, embeddings: Dict[str, EmbeddingLike]) -> int:
+        """Cache several embeddings concurrently; returns how many were stored."""
+        results = await asyncio.gather(
+            *(self.cache_embedding(text_hash, embedding) for text_hash, embedding in embeddings.items())
+        )
+        return sum(1 for stored in results if stored)
+    
     async def invalidate_product_cache(self, product_id: str) -> bool:
         """Invalidate product cache."""
         try:
@@ -329,52 +847,51 @@ class OptimizedPerformanceCache:
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         try:
-            return await self.pool.get_performance_stats()
+            stats = await self.pool.get_performance_stats()
+            return {**stats, "revalidation": dict(self._revalidation_stats)}
         except Exception as e:
             logger.error(f"Cache stats error: {e}")
             return {}
 
 
 class OptimizedRateLimitCache:
-    """Optimized rate limit cache using unified connection pool."""
+    """Optimized rate limit cache using an atomic server-side GCRA script."""
     
     def __init__(self, pool: OptimizedRedisConnectionPool):
         self.pool = pool
         self.cache_type = 'rate_limit'
+        self.engine = GCRARateLimitEngine(script_runner=self._run_script, key_deleter=self._delete_key)
+    
+    async def _run_script(self, script: str, keys: List[str], args: List[Any]) -> Optional[Any]:
+        """Run the rate limit script through the unified connection pool."""
+        return await self.pool.run_script(script, keys, args, cache_type=self.cache_type)
+    
+    async def _delete_key(self, key: str) -> bool:
+        """Delete rate limit state through the unified connection pool."""
+        return await self.pool.delete(key, self.cache_type)
     
     async def check_rate_limit(self, identifier: str, limit_type: str, max_requests: int,
-                             window_seconds: int) -> Dict[str, Any]:
-        """Check rate limit with optimized implementation."""
+                             window_seconds: int, burst_size: Optional[int] = None,
+                             cost: float = 1.0) -> Dict[str, Any]:
+        """Check rate limit with a single atomic round trip."""
         try:
             key = f"{limit_type}:{identifier}"
             
-            # Get current count
-            current_count = await self.pool.get(key, self.cache_type) or 0
-            
-            if isinstance(current_count, str):
-                current_count = int(current_count)
-            
-            # Check limit
-            if current_count >= max_requests:
-                return {
-                    "allowed": False,
-                    "current_count": current_count,
-                    "max_requests": max_requests,
-                    "reset_time": window_seconds
-                }
-            
-            # Increment counter
-            new_count = await self.pool.incr(key, cache_type=self.cache_type)
-            
-            if new_count == 1:
-                # Set expiration for new key
-                await self.pool.expire(key, window_seconds, self.cache_type)
+            decision = await self.engine.check(
+                key=key,
+                max_requests=max_requests,
+                window_size=window_seconds,
+                burst_size=burst_size,
+                cost=cost
+            )
             
             return {
-                "allowed": True,
-                "current_count": new_count or current_count + 1,
+                "allowed": decision.allowed,
+                "current_count": max(0, decision.capacity - decision.remaining),
+                "remaining": decision.remaining,
                 "max_requests": max_requests,
-                "reset_time": window_seconds
+                "retry_after": decision.retry_after,
+                "reset_time": decision.reset_after
             }
         
         except Exception as e:
@@ -394,8 +911,7 @@ class OptimizedRateLimitCache:
     async def reset_rate_limit(self, identifier: str, limit_type: str) -> bool:
         """Reset rate limit."""
         try:
-            key = f"{limit_type}:{identifier}"
-            return await self.pool.delete(key, self.cache_type)
+            return await self.engine.reset(f"{limit_type}:{identifier}")
         except Exception as e:
             logger.error(f"Rate limit reset error: {e}")
             return False
@@ -453,12 +969,29 @@ class OptimizedRedisCacheService:
     async def shutdown(self):
         """Shutdown the cache service."""
         try:
+            if self.session_cache:
+                # Write buffered session activity before the pool closes
+                await self.session_cache.activity.close()
+            if self.performance_cache:
+                await self.performance_cache.close()
             if self.pool:
                 await self.pool.shutdown()
             logger.info("✅ Optimized Redis Cache Service shutdown complete")
         except Exception as e:
             logger.error(f"❌ Cache service shutdown error: {e}")
     
+    def start_invalidation(self, cache_type: str, pattern: str = '*') -> Optional[InvalidationJob]:
+        """Start a background SCAN + UNLINK invalidation of cache_type entries."""
+        if not self.pool:
+            return None
+        return self.pool.start_invalidation(cache_type, pattern)
+    
+    def get_invalidation_job(self, job_id: str) -> Optional[InvalidationJob]:
+        """Get the progress of an invalidation job."""
+        if not self.pool:
+            return None
+        return self.pool.get_invalidation_job(job_id)
+    
     async def health_check(self) -> Dict[str, Any]:
         """Comprehensive health check."""
         if not self.pool:
@@ -0,0 +1,258 @@
+"""
+Per-tenant cache memory accounting and quotas.
+
+Redis runs with a global maxmemory and allkeys-lru, so one large webshop (or a
+burst of long agent responses) can push every other tenant's entries out. The
+connection pool therefore accounts the bytes it writes per tenant and cache
+type, and once a tenant exceeds its quota it UNLINKs that tenant's own oldest
+entries - other tenants keep their share.
+
+The tenant of a write is taken from a tenant=... namespace in the key (see
+OptimizedRedisConnectionPool.versioned_key), else from the surrounding
+tenant_scope(), else it is the shared tenant. Accounting is approximate:
+sizes include Redis per-key overhead estimates, expired entries are dropped
+lazily, and at most max_tracked entries are followed.
+
+Quotas are per worker process. Each process accounts and evicts only the
+entries it wrote itself, so with N workers a tenant can hold up to N times its
+quota in Redis; size the quota as the per-worker share. Shared counters in
+Redis would not fix this: entries expire inside Redis without any process
+seeing it, so a global counter only ever grows.
+"""
+
+import fnmatch
+import heapq
+import itertools
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Writes without a tenant (no quota unless configured explicitly)
+SHARED_TENANT = "_shared"
+
+# Approximate Redis bookkeeping per key (dict entry, object header, SDS headers, expiry)
+REDIS_KEY_OVERHEAD = 64
+
+_TENANT_PART = re.compile(r"^tenant=(?P<tenant>.+)\.g\d+$")
+
+_current_tenant: ContextVar[Optional[str]] = ContextVar("chatbuddy_cache_tenant", default=None)
+
+
+@contextmanager
+def tenant_scope(tenant: Optional[str]) -> Iterator[None]:
+    """Attribute cache writes made inside the block to a tenant (webshop)."""
+    token = _current_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def get_current_tenant() -> Optional[str]:
+    """Tenant of the current context (None outside tenant_scope)."""
+    return _current_tenant.get()
+
+
+def tenant_of(key: str) -> Optional[str]:
+    """Tenant encoded in a versioned key ("...|tenant=shop1.g3|...|key"), if any."""
+    if "tenant=" not in key:
+        return None
+    for part in key.split("|")[:-1]:
+        match = _TENANT_PART.match(part)
+        if match:
+            return match.group("tenant")
+    return None
+
+
+def entry_size(cache_key: str, data_size: int, meta_size: int = 0) -> int:
+    """Estimated Redis memory of a data key and its metadata key."""
+    keys = 2 if meta_size else 1
+    return data_size + meta_size + keys * (len(cache_key) + REDIS_KEY_OVERHEAD)
+
+
+@dataclass
+class TrackedEntry:
+    """One accounted Redis entry."""
+    tenant: str
+    cache_type: str
+    size: int
+    expires_at: Optional[float]
+
+
+class TenantQuotaManager:
+    """
+    Byte accounting per tenant and cache type with oldest-first eviction.
+
+    Expiry times are kept in a heap per tenant, so an over-quota write only
+    pops the entries that actually expired and then evicts from the front of
+    the tenant's write order - never a walk over all of its keys.
+
+    Args:
+        default_quota_bytes: Quota of every named tenant, per worker process (0 = unlimited)
+        quotas: Per-tenant overrides (0 = unlimited); the shared tenant is
+            only limited when listed here
+        max_tracked: Entries followed (the oldest are forgotten, not evicted)
+    """
+
+    def __init__(self, default_quota_bytes: int = 0, quotas: Optional[Dict[str, int]] = None,
+                 max_tracked: int = 100000):
+        self.default_quota_bytes = default_quota_bytes
+        self.quotas = dict(quotas or {})
+        self.max_tracked = max_tracked
+        self._entries: "OrderedDict[str, TrackedEntry]" = OrderedDict()
+        self._by_tenant: Dict[str, "OrderedDict[str, None]"] = {}
+        self._expiry: Dict[str, List[Tuple[float, int, str, TrackedEntry]]] = {}  # Min-heap per tenant
+        self._sequence = itertools.count()
+        self._usage: Dict[Tuple[str, str], List[int]] = {}  # (tenant, cache_type) -> [bytes, entries]
+        self._tenant_bytes: Dict[str, int] = {}
+        self._evictions: Dict[str, int] = {}
+
+    def resolve_tenant(self, key: str) -> str:
+        """Tenant a write is attributed to."""
+        return tenant_of(key) or get_current_tenant() or SHARED_TENANT
+
+    def quota_for(self, tenant: str) -> int:
+        """Byte quota of a tenant (0 = unlimited)."""
+        if tenant in self.quotas:
+            return self.quotas[tenant]
+        return 0 if tenant == SHARED_TENANT else self.default_quota_bytes
+
+    def usage(self, tenant: str) -> int:
+        """Accounted bytes of a tenant."""
+        return self._tenant_bytes.get(tenant, 0)
+
+    def record_set(self, tenant: str, cache_type: str, cache_key: str, size: int,
+                   ttl: Optional[int] = None, now: Optional[float] = None) -> List[str]:
+        """
+        Account a write.
+
+        Returns:
+            Redis keys of the tenant's oldest entries to evict so it fits its
+            quota (never the entry just written)
+        """
+        now = time.time() if now is None else now
+        self.forget(cache_key)
+
+        entry = TrackedEntry(tenant, cache_type, size, now + ttl if ttl else None)
+        self._entries[cache_key] = entry
+        self._by_tenant.setdefault(tenant, OrderedDict())[cache_key] = None
+        self._add_usage(entry, 1)
+        if entry.expires_at is not None:
+            self._push_expiry(cache_key, entry)
+
+        while len(self._entries) > self.max_tracked:
+            self.forget(next(iter(self._entries)))
+
+        quota = self.quota_for(tenant)
+        if not quota:
+            return []
+        return self._evict_over_quota(tenant, quota, cache_key, now)
+
+    def forget(self, cache_key: str) -> Optional[TrackedEntry]:
+        """Stop accounting an entry (deleted, evicted or expired)."""
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return None
+        keys = self._by_tenant.get(entry.tenant)
+        if keys is not None:
+            keys.pop(cache_key, None)
+            if not keys:
+                del self._by_tenant[entry.tenant]
+                self._expiry.pop(entry.tenant, None)
+        self._add_usage(entry, -1)
+        return entry
+
+    def forget_matching(self, pattern: str) -> int:
+        """Forget every entry whose Redis key matches a glob pattern (bulk invalidation)."""
+        matching = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in matching:
+            self.forget(key)
+        return len(matching)
+
+    def _evict_over_quota(self, tenant: str, quota: int, keep: str, now: float) -> List[str]:
+        if self.usage(tenant) <= quota:
+            return []
+
+        # Expired entries are already gone from Redis - drop them first
+        heap = self._expiry.get(tenant, [])
+        while heap and heap[0][0] <= now:
+            _, _, key, entry = heapq.heappop(heap)
+            if self._entries.get(key) is entry:
+                self.forget(key)
+
+        evicted = []
+        keys = self._by_tenant.get(tenant, {})
+        while self.usage(tenant) > quota and keys:
+            key = next(iter(keys))
+            if key == keep:
+                break  # Only the entry just written (the newest) is left
+            self.forget(key)
+            evicted.append(key)
+
+        if evicted:
+            self._evictions[tenant] = self._evictions.get(tenant, 0) + len(evicted)
+            logger.info(f"Cache tenant {tenant} over quota ({quota} bytes): evicting {len(evicted)} entries")
+        return evicted
+
+    def _push_expiry(self, cache_key: str, entry: TrackedEntry):
+        heap = self._expiry.setdefault(entry.tenant, [])
+        heapq.heappush(heap, (entry.expires_at, next(self._sequence), cache_key, entry))
+        # Overwritten and forgotten entries leave stale items behind - rebuild when they dominate
+        if len(heap) > 2 * len(self._by_tenant.get(entry.tenant, ())) + 64:
+            heap[:] = [item for item in heap if self._entries.get(item[2]) is item[3]]
+            heapq.heapify(heap)
+
+    def _add_usage(self, entry: TrackedEntry, sign: int):
+        self._tenant_bytes[entry.tenant] = self._tenant_bytes.get(entry.tenant, 0) + sign * entry.size
+        if self._tenant_bytes[entry.tenant] <= 0 and entry.tenant not in self._by_tenant:
+            del self._tenant_bytes[entry.tenant]
+        used = self._usage.setdefault((entry.tenant, entry.cache_type), [0, 0])
+        used[0] += sign * entry.size
+        used[1] += sign
+        if used[1] <= 0:
+            del self._usage[(entry.tenant, entry.cache_type)]
+
+    def get_report(self) -> Dict[str, Any]:
+        """Memory by tenant and cache type, largest tenant first."""
+        tenants: Dict[str, Dict[str, Any]] = {}
+        for (tenant, cache_type), (size, entries) in sorted(self._usage.items()):
+            report = tenants.setdefault(tenant, {"bytes": 0, "entries": 0, "by_cache_type": {}})
+            report["bytes"] += size
+            report["entries"] += entries
+            report["by_cache_type"][cache_type] = {"bytes": size, "entries": entries}
+
+        for tenant in set(tenants) | set(self._evictions):
+            report = tenants.setdefault(tenant, {"bytes": 0, "entries": 0, "by_cache_type": {}})
+            quota = self.quota_for(tenant)
+            report["quota_bytes"] = quota or None
+            report["usage_percent"] = round(report["bytes"] / quota * 100, 2) if quota else None
+            report["evictions"] = self._evictions.get(tenant, 0)
+
+        total = sum(report["bytes"] for report in tenants.values())
+        return {
+            "total_bytes": total,
+            "tracked_entries": len(self._entries),
+            "tenants": dict(sorted(tenants.items(), key=lambda item: item[1]["bytes"], reverse=True))
+        }
+
+    def metric_samples(self) -> List[Tuple[str, str, str, Dict[str, str], float]]:
+        """Per-tenant gauges and eviction counters for /metrics."""
+        samples = [
+            ("chatbuddy_cache_tenant_bytes", "Accounted cache bytes by tenant and cache type", "gauge",
+             {"tenant": tenant, "cache_type": cache_type}, size)
+            for (tenant, cache_type), (size, _) in sorted(self._usage.items())
+        ]
+        samples.extend(
+            ("chatbuddy_cache_tenant_evictions_total", "Entries evicted to keep a tenant within its quota",
+             "counter", {"tenant": tenant}, count)
+            for tenant, count in sorted(self._evictions.items())
+        )
+        return samples
@@ -15,8 +15,8 @@ import os
 import pickle
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union, Tuple
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union, Tuple
+from dataclasses import dataclass, field
 import hashlib
 from contextlib import asynccontextmanager
 
@@ -25,9 +25,21 @@ from redis.asyncio.connection import ConnectionPool
 from redis.exceptions import RedisError, ConnectionError, TimeoutError
 
 from src.config.logging import get_logger
+from .adaptive_ttl import AdaptiveTTLPolicy
+from .circuit_breaker import CircuitBreaker
+from .invalidation import CacheInvalidator, InvalidationJob
+from .memory_cache import InMemoryCacheBackend, MemoryPipeline
+from .metrics import get_cache_metrics
+from .namespaces import NamespaceGenerations, namespace_for
+from .quotas import TenantQuotaManager, entry_size
+from .request_loader import get_request_loader
+from .warmup import AccessFrequencyRecorder
 
 logger = get_logger(__name__)
 
+# Errors meaning Redis itself is unreachable (these trip the circuit breaker)
+REDIS_OUTAGE_ERRORS = (ConnectionError, TimeoutError, OSError, asyncio.TimeoutError)
+
 
 @dataclass 
 class OptimizedCacheConfig:
@@ -50,12 +62,73 @@ class OptimizedCacheConfig:
     product_info_ttl: int = 3600  # 1 hour (changes less frequently)
     search_result_ttl: int = 600  # 10 minutes (search results change)
     embedding_cache_ttl: int = 7200  # 2 hours (expensive to compute)
+    embedding_cache_dtype: str = "float32"  # Binary embedding precision ("float32" or "float16")
     user_context_ttl: int = 1800  # 30 minutes (session-related)
     
+    # Adaptive TTLs (learned per key from read frequency and change rate)
+    adaptive_ttl_enabled: bool = True
+    adaptive_ttl_bounds: Dict[str, Tuple[int, int]] = field(default_factory=lambda: {
+        'agent_response': (60, 3600),
+        'product_info': (300, 86400),
+        'search_result': (60, 3600)
+    })
+    adaptive_ttl_staleness_budget: float = 0.05  # Tolerated fraction of stale reads
+    adaptive_ttl_min_samples: int = 3  # Refreshes before a key's TTL adapts
+    adaptive_ttl_max_tracked: int = 10000  # Keys with statistics (LRU)
+    
+    # Degraded mode (circuit breaker + bounded in-process fallback)
+    circuit_failure_threshold: int = 5  # Consecutive Redis errors before failing fast
+    circuit_recovery_timeout: float = 5.0  # Seconds between recovery probes
+    fallback_max_entries: int = 10000  # In-process entries kept while Redis is down
+    
+    # Per-tenant memory quotas (a tenant over quota loses its own oldest entries).
+    # Quotas apply per worker process: N workers let a tenant hold up to N x quota.
+    tenant_quota_enabled: bool = True
+    tenant_default_quota_bytes: int = 64 * 1024 * 1024  # A quarter of the 256MB maxmemory
+    tenant_quotas: Dict[str, int] = field(default_factory=dict)  # Per-tenant overrides (0 = unlimited)
+    tenant_max_tracked: int = 100000  # Entries accounted per process
+    
+    # Warm-up (top-N keys by access frequency are prefilled at startup)
+    warmup_enabled: bool = True
+    warmup_cache_types: Tuple[str, ...] = ('product_info', 'question')  # Rankings recorded
+    warmup_top_n: int = 200  # Keys warmed per source
+    warmup_concurrency: int = 8  # Loaders running at once
+    warmup_timeout: float = 120.0  # Seconds until the instance is ready regardless
+    warmup_min_coverage: float = 0.8  # Share of top keys warm before ready
+    warmup_max_keys: int = 1000  # Ranked keys kept per cache type
+    warmup_flush_interval: int = 60  # Seconds between ranking flushes
+    
     # Compression settings
     compression_threshold: int = 1024  # Compress objects larger than 1KB
     compression_level: int = 6  # Good balance between speed and compression
     
+    # Stale-while-revalidate grace windows (served stale while one task refreshes)
+    product_info_stale_ttl: int = 600  # 10 minutes past the 1h freshness window
+    search_result_stale_ttl: int = 120  # 2 minutes past the 10 min freshness window
+    xfetch_beta: float = 1.0  # XFetch early recomputation aggressiveness (>1 refreshes earlier)
+    revalidation_lock_ttl: int = 30  # Upper bound of one background refresh
+    
+    # Negative caching (short-lived tombstones for lookups that found nothing)
+    negative_cache_ttls: Dict[str, int] = field(default_factory=lambda: {
+        'product_info': 60,  # Discontinued / unknown product IDs
+        'search_result': 30,  # Searches without hits
+        'order': 30  # Invalid order IDs
+    })
+    
+    # Pattern invalidation (SCAN + UNLINK, never KEYS)
+    invalidation_scan_count: int = 500  # Keys examined per SCAN round trip
+    invalidation_ops_per_second: int = 5000  # Ops budget of bulk invalidation (0 = unpaced)
+    
+    # Generation-versioned namespaces (bulk invalidation is a single INCR)
+    versioned_cache_types: Tuple[str, ...] = (
+        'agent_response', 'product_info', 'search_result', 'order', 'embedding', 'user_context',
+        'performance'
+    )
+    namespace_refresh_interval: int = 5  # Seconds until other workers see a bump
+    
+    # Session activity write coalescing
+    session_touch_interval: int = 60  # Flush last_activity at most once per minute per session
+    
     # Cleanup intervals
     session_cleanup_interval: int = 1800  # 30 minutes
     performance_cleanup_interval: int = 900  # 15 minutes
@@ -124,8 +197,9 @@ class OptimizedRedisConnectionPool:
         self._pool: Optional[ConnectionPool] = None
         self._redis_client: Optional[redis.Redis] = None
         
-        # Metrics tracking
+        # Metrics tracking (global totals + per-cache-type registry)
         self._metrics = CacheMetrics()
+        self._cache_metrics = get_cache_metrics()
         
         # Connection state
         self._connected = False
@@ -135,40 +209,69 @@ class OptimizedRedisConnectionPool:
         # Cleanup tasks
         self._cleanup_tasks: List[asyncio.Task] = []
         
+        # Registered Lua scripts (keyed by script source hash)
+        self._scripts: Dict[str, Any] = {}
+        
+        # SCAN-based invalidation jobs (bound to the current client)
+        self._invalidator: Optional[CacheInvalidator] = None
+        
+        # Namespace generation counters (cache types pinned outside the scope LRU)
+        self._generations = NamespaceGenerations(pinned=self.config.versioned_cache_types)
+        
+        # Degraded mode: fail fast while Redis is down and serve from memory
+        self._breaker = CircuitBreaker(
+            "redis",
+            failure_threshold=self.config.circuit_failure_threshold,
+            recovery_timeout=self.config.circuit_recovery_timeout
+        )
+        self._fallback = InMemoryCacheBackend(self.config.fallback_max_entries)
+        self._pending_bumps: set = set()
+        self._probe_task: Optional[asyncio.Task] = None
+        self._cache_metrics.register_collector("redis_circuit", self._circuit_metric_samples)
+        
+        # Per-tenant memory accounting and quota eviction
+        self._quotas = TenantQuotaManager(
+            default_quota_bytes=self.config.tenant_default_quota_bytes if self.config.tenant_quota_enabled else 0,
+            quotas=self.config.tenant_quotas if self.config.tenant_quota_enabled else {},
+            max_tracked=self.config.tenant_max_tracked
+        )
+        self._cache_metrics.register_collector("cache_tenants", self._quotas.metric_samples)
+        
+        # Access frequency rankings for warm-up after deploys / Redis restarts
+        self.access_recorder = AccessFrequencyRecorder(
+            self,
+            cache_types=self.config.warmup_cache_types if self.config.warmup_enabled else (),
+            max_keys=self.config.warmup_max_keys
+        )
+        
+        # Adaptive TTLs (optionally recording an access trace for offline replay)
+        self._access_trace = None
+        trace_path = os.getenv("CACHE_ACCESS_TRACE")
+        if trace_path:
+            from .ttl_simulation import TraceRecorder
+            self._access_trace = TraceRecorder(trace_path)
+        self._ttl_policy = AdaptiveTTLPolicy(
+            default_ttls={cache_type: self._get_ttl_for_type(cache_type)
+                          for cache_type in self.config.adaptive_ttl_bounds},
+            bounds=self.config.adaptive_ttl_bounds if self.config.adaptive_ttl_enabled else {},
+            staleness_budget=self.config.adaptive_ttl_staleness_budget,
+            min_samples=self.config.adaptive_ttl_min_samples,
+            max_tracked=self.config.adaptive_ttl_max_tracked,
+            trace=self._access_trace
+        )
+        
         self._initialized = True
     
     async def initialize(self) -> bool:
-        """Initialize the Redis connection pool."""
+        """
+        Initialize the Redis connection pool.
+        
+        If Redis is unreachable the pool starts in degraded mode: calls are
+        served from the in-process fallback and a background probe connects
+        once Redis is back.
+        """
         try:
-            # Create connection pool
-            self._pool = ConnectionPool.from_url(
-                self.redis_url,
-                max_connections=self.config.max_connections,
-                retry_on_timeout=self.config.retry_on_timeout,
-                socket_connect_timeout=self.config.socket_connect_timeout,
-                socket_timeout=self.config.socket_timeout,
-                health_check_interval=self.config.health_check_interval,
-                decode_responses=False  # We handle encoding/decoding manually
-            )
-            
-            # Create Redis client with the pool
-            self._redis_client = redis.Redis(
-                connection_pool=self._pool,
-                decode_responses=False
-            )
-            
-            # Test connection
-            await self._redis_client.ping()
-            self._connected = True
-            
-            # Configure Redis memory policy
-            try:
-                await self._redis_client.config_set(
-                    "maxmemory-policy", 
-                    self.config.max_memory_policy
-                )
-            except Exception as e:
-                logger.warning(f"Could not set memory policy: {e}")
+            await self._connect()
             
             # Start cleanup tasks
             self._start_cleanup_tasks()
@@ -179,11 +282,150 @@ class OptimizedRedisConnectionPool:
         except Exception as e:
             logger.error(f"❌ Failed to initialize Redis connection pool: {e}")
             self._connected = False
+            self._breaker.record_failure(e)
+            self._breaker.trip()
+            self._enter_degraded_mode()
             return False
     
+    async def _connect(self):
+        """Create the connection pool and client and verify the connection."""
+        # Create connection pool
+        self._pool = ConnectionPool.from_url(
+            self.redis_url,
+            max_connections=self.config.max_connections,
+            retry_on_timeout=self.config.retry_on_timeout,
+            socket_connect_timeout=self.config.socket_connect_timeout,
+            socket_timeout=self.config.socket_timeout,
+            health_check_interval=self.config.health_check_interval,
+            decode_responses=False  # We handle encoding/decoding manually
+        )
+        
+        # Create Redis client with the pool
+        self._redis_client = redis.Redis(
+            connection_pool=self._pool,
+            decode_responses=False
+        )
+        
+        # Test connection
+        await self._redis_client.ping()
+        self._connected = True
+        
+        # Configure Redis memory policy
+        try:
+            await self._redis_client.config_set(
+                "maxmemory-policy", 
+                self.config.max_memory_policy
+            )
+        except Exception as e:
+            logger.warning(f"Could not set memory policy: {e}")
+        
+        # Load cache type generations so key derivation needs no round trip
+        self._generations.redis_client = self._redis_client
+        try:
+            await self._generations.preload(list(self.config.versioned_cache_types))
+        except Exception as e:
+            logger.warning(f"Could not load namespace generations: {e}")
+    
+    @property
+    def degraded(self) -> bool:
+        """True while Redis is unavailable and calls are served from memory."""
+        return self._breaker.is_open
+    
+    def _record_redis_success(self):
+        if self._breaker.consecutive_failures:
+            self._breaker.record_success()
+    
+    def _record_redis_error(self, error: BaseException):
+        """Count an outage error; enough of them in a row switch to degraded mode."""
+        if isinstance(error, REDIS_OUTAGE_ERRORS) and self._breaker.record_failure(error):
+            self._enter_degraded_mode()
+    
+    def _enter_degraded_mode(self):
+        """Serve from the in-process fallback and start probing Redis."""
+        # Generations stay local (bumps are queued) until Redis is back
+        self._generations.redis_client = None
+        self._fallback.clear()
+        logger.warning("⚠️ Redis unavailable - cache running in degraded in-memory mode")
+        
+        if self._probe_task is None or self._probe_task.done():
+            try:
+                self._probe_task = asyncio.create_task(self._probe_recovery())
+            except RuntimeError:
+                # No running event loop - the next initialize() retries
+                pass
+    
+    async def _probe_recovery(self):
+        """Ping Redis every recovery_timeout seconds while the circuit is open."""
+        while self._breaker.is_open:
+            await asyncio.sleep(self.config.circuit_recovery_timeout)
+            self._breaker.begin_probe()
+            try:
+                if self._redis_client is None:
+                    await self._connect()
+                else:
+                    await self._redis_client.ping()
+                await self._recover()
+            except Exception as e:
+                self._generations.redis_client = None
+                self._breaker.record_failure(e)
+                logger.debug(f"Redis recovery probe failed: {e}")
+    
+    async def _recover(self):
+        """Leave degraded mode after a successful probe."""
+        self._generations.redis_client = self._redis_client
+        
+        # Invalidations made while degraded reach Redis now
+        for namespace in sorted(self._pending_bumps):
+            await self._generations.bump(namespace)
+            self._pending_bumps.discard(namespace)
+        await self._generations.preload(list(self.config.versioned_cache_types))
+        await self._generations.refresh()
+        
+        # Entries written while degraded may be older than what other workers stored
+        self._fallback.clear()
+        self._connected = True
+        self._breaker.record_success()
+        
+        if not self._cleanup_tasks:
+            self._start_cleanup_tasks()
+        logger.info("✅ Redis reachable again - degraded mode ended")
+    
+    def _circuit_metric_samples(self) -> List[Tuple[str, str, str, Dict[str, str], float]]:
+        """Degraded-mode state for /metrics."""
+        stats = self._breaker.get_stats()
+        return [
+            ("chatbuddy_cache_degraded", "1 while the cache serves from the in-process fallback", "gauge",
+             {}, 1 if self.degraded else 0),
+            ("chatbuddy_cache_circuit_opened_total", "Times the Redis circuit opened", "counter",
+             {}, stats["opened"]),
+            ("chatbuddy_cache_circuit_rejected_total", "Calls served without trying Redis", "counter",
+             {}, stats["rejected"]),
+            ("chatbuddy_cache_fallback_entries", "Entries in the in-process fallback", "gauge",
+             {}, len(self._fallback))
+        ]
+    
     async def shutdown(self):
         """Shutdown the Redis connection pool."""
         try:
+            # Stop probing for recovery
+            if self._probe_task and not self._probe_task.done():
+                self._probe_task.cancel()
+                try:
+                    await self._probe_task
+                except asyncio.CancelledError:
+                    pass
+            
+            # Stop running invalidation jobs
+            if self._invalidator:
+                await self._invalidator.close()
+            
+            if self._access_trace:
+                self._access_trace.flush()
+            
+            # Keep the access rankings of this process for the next warm-up
+            if self._connected and not self.degraded:
+                await self.access_recorder.flush()
+            
             # Stop cleanup tasks
             for task in self._cleanup_tasks:
                 task.cancel()
@@ -206,7 +448,18 @@ class OptimizedRedisConnectionPool:
             logger.error(f"❌ Error during Redis shutdown: {e}")
     
     async def health_check(self) -> Dict[str, Any]:
-        """Comprehensive health check."""
+        """Comprehensive health check (status is "degraded" while serving from memory)."""
+        if self.degraded:
+            return {
+                "status": "degraded",
+                "mode": "memory_fallback",
+                "connected": False,
+                "redis_connection": False,
+                "circuit": self._breaker.get_stats(),
+                "fallback": self._fallback.get_stats(),
+                "last_check": datetime.now().isoformat()
+            }
+        
         try:
             start_time = time.time()
             
@@ -234,8 +487,11 @@ class OptimizedRedisConnectionPool:
             
             return {
                 "status": "healthy",
+                "mode": "redis",
                 "ping_time_ms": round(ping_time * 1000, 2),
                 "connected": self._connected,
+                "redis_connection": self._connected,
+                "circuit": self._breaker.get_stats(),
                 "pool_info": pool_info,
                 "memory_usage_percent": round(memory_usage, 2),
                 "used_memory_mb": round(used_memory / 1024 / 1024, 2),
@@ -250,8 +506,10 @@ class OptimizedRedisConnectionPool:
             
         except Exception as e:
             logger.error(f"Health check failed: {e}")
+            self._record_redis_error(e)
             return {
                 "status": "unhealthy",
+                "redis_connection": False,
                 "error": str(e),
                 "last_check": datetime.now().isoformat()
             }
@@ -287,8 +545,11 @@ class OptimizedRedisConnectionPool:
     def _serialize_value(self, value: Any) -> bytes:
         """Serialize value to bytes."""
         try:
+            # Binary blobs (e.g. encoded embeddings) are stored as is
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                return bytes(value)
             # Always try JSON first for better compatibility
-            if isinstance(value, (str, int, float, bool, type(None))):
+            elif isinstance(value, (str, int, float, bool, type(None))):
                 return json.dumps(value).encode('utf-8')
             elif isinstance(value, (dict, list)):
                 # Try JSON for dict/list - better compatibility
@@ -308,7 +569,9 @@ class OptimizedRedisConnectionPool:
         """Deserialize bytes to value."""
         try:
             # Check if it's JSON or pickle based on metadata
-            if metadata.get('type') == 'pickle':
+            if metadata.get('type') == 'raw':
+                return data
+            elif metadata.get('type') == 'pickle':
                 return pickle.loads(data)
             else:
                 return json.loads(data.decode('utf-8'))
@@ -318,9 +581,88 @@ class OptimizedRedisConnectionPool:
     
     def _generate_cache_key(self, prefix: str, key: str) -> str:
         """Generate standardized cache key."""
-        # Add prefix for namespacing
+        # Add prefix for namespacing (cache types carry their generation)
+        if prefix in self.config.versioned_cache_types:
+            return f"chatbuddy:v1:{prefix}:g{self._generations.current(prefix)}:{key}"
         return f"chatbuddy:v1:{prefix}:{key}"
     
+    def _generation_pattern(self, cache_type: str, pattern: str) -> str:
+        """SCAN pattern matching every generation of a cache type."""
+        if pattern == '*' or cache_type not in self.config.versioned_cache_types:
+            return f"chatbuddy:v1:{cache_type}:{pattern}"
+        return f"chatbuddy:v1:{cache_type}:g*:{pattern}"
+    
+    async def versioned_key(self, key: str, **scope: Any) -> str:
+        """
+        Derive a key inside scoped namespaces (e.g. user=..., tenant=..., category=...).
+        
+        Each scope's generation is embedded in the key, so bump_namespace(user=...)
+        invalidates every entry derived for that user with one INCR.
+        """
+        if not scope:
+            return key
+        
+        # Inside a request scope unknown generations join the request's batch
+        read = None
+        loader = get_request_loader()
+        if loader is not None and loader.pool is self:
+            read = lambda counter_key: loader.load_command('get', counter_key)
+        
+        parts = []
+        for kind, value in sorted(scope.items()):
+            namespace = namespace_for(**{kind: value})
+            parts.append(f"{namespace}.g{await self._generations.resolve(namespace, read)}")
+        return f"{'|'.join(parts)}|{key}"
+    
+    def prefetch_namespace(self, **scope: Any):
+        """
+        Register the generation reads of scoped namespaces with the request loader.
+        
+        Called at request entry so the counters arrive in the request's first
+        batch; generations already known locally are skipped.
+        """
+        loader = get_request_loader()
+        if loader is None or loader.pool is not self or self._generations.redis_client is None:
+            return
+        for kind, value in scope.items():
+            namespace = namespace_for(**{kind: value})
+            if not self._generations.is_tracked(namespace):
+                loader.register_command('get', self._generations.counter_key(namespace))
+    
+    async def bump_namespace(self, cache_type: Optional[str] = None, **scope: Any) -> Optional[int]:
+        """
+        Invalidate a whole namespace - a cache type or one scope - with a single INCR.
+        
+        Old entries are no longer addressed and age out via TTL / LRU.
+        
+        Returns:
+            The new generation, or None when disconnected
+        """
+        namespace = namespace_for(cache_type, **scope)
+        if not self._breaker.allow_request():
+            return self._bump_local(namespace)
+        if not self._connected:
+            return None
+        
+        try:
+            generation = await self._generations.bump(namespace)
+            self._record_redis_success()
+            self._forget_request_memo()
+            return generation
+        except Exception as e:
+            logger.error(f"Namespace bump error for {cache_type or scope}: {e}")
+            self._metrics.errors += 1
+            self._record_redis_error(e)
+            if self.degraded:
+                return self._bump_local(namespace)
+            return None
+    
+    def _bump_local(self, namespace: str) -> int:
+        """Bump while degraded - applied locally now, replayed on Redis at recovery."""
+        self._pending_bumps.add(namespace)
+        self._forget_request_memo()
+        return self._generations.bump_local(namespace)
+    
     def _get_ttl_for_type(self, cache_type: str) -> int:
         """Get intelligent TTL based on cache type."""
         ttl_mapping = {
@@ -336,6 +678,21 @@ class OptimizedRedisConnectionPool:
         
         return ttl_mapping.get(cache_type, self.config.performance_cache_ttl)
     
+    def ttl_for(self, cache_type: str, key: str) -> int:
+        """Effective TTL of a key - adaptive for configured types, static otherwise."""
+        if self._ttl_policy.tracks(cache_type):
+            return self._ttl_policy.ttl_for(cache_type, key)
+        return self._get_ttl_for_type(cache_type)
+    
+    def observe_refresh(self, cache_type: str, key: str, value: Any) -> Optional[bool]:
+        """
+        Report freshly loaded content so the adaptive TTL learns the change rate.
+        
+        Returns:
+            Whether the content changed since the previous refresh (None if unknown)
+        """
+        return self._ttl_policy.record_refresh(cache_type, key, value)
+    
     async def set(self, key: str, value: Any, cache_type: str = 'performance', 
                   ttl: Optional[int] = None, nx: bool = False) -> bool:
         """
@@ -348,6 +705,8 @@ class OptimizedRedisConnectionPool:
             ttl: Custom TTL (overrides intelligent TTL)
             nx: Only set if key doesn't exist
         """
+        if not self._breaker.allow_request():
+            return self._fallback_set(key, value, cache_type, ttl, nx)
         if not self._connected:
             return False
         
@@ -361,10 +720,18 @@ class OptimizedRedisConnectionPool:
             serialized_data = self._serialize_value(value)
             
             # Determine data type for deserialization
-            data_type = 'json' if isinstance(value, (str, int, float, bool, list, dict)) else 'pickle'
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                data_type = 'raw'
+            elif isinstance(value, (str, int, float, bool, list, dict)):
+                data_type = 'json'
+            else:
+                data_type = 'pickle'
             
-            # Compress if needed
-            compressed_data, is_compressed = self._compress_data(serialized_data)
+            # Compress if needed (raw binary payloads barely shrink - skip gzip)
+            if data_type == 'raw':
+                compressed_data, is_compressed = serialized_data, False
+            else:
+                compressed_data, is_compressed = self._compress_data(serialized_data)
             
             # Create metadata
             metadata = {
@@ -375,47 +742,118 @@ class OptimizedRedisConnectionPool:
                 'size_stored': len(compressed_data)
             }
             
-            # Get TTL
-            effective_ttl = ttl if ttl is not None else self._get_ttl_for_type(cache_type)
+            # Get TTL (a write without explicit TTL is a refresh of the content)
+            if ttl is None:
+                self._ttl_policy.record_refresh(cache_type, key, serialized_data)
+                effective_ttl = self.ttl_for(cache_type, key)
+            else:
+                effective_ttl = ttl
             
             # Store data and metadata
+            metadata_bytes = json.dumps(metadata).encode('utf-8')
             pipe = self._redis_client.pipeline()
             
             if nx:
                 pipe.set(cache_key, compressed_data, ex=effective_ttl, nx=True)
-                pipe.set(f"{cache_key}:meta", json.dumps(metadata).encode('utf-8'), ex=effective_ttl, nx=True)
+                pipe.set(f"{cache_key}:meta", metadata_bytes, ex=effective_ttl, nx=True)
             else:
                 pipe.setex(cache_key, effective_ttl, compressed_data)
-                pipe.setex(f"{cache_key}:meta", effective_ttl, json.dumps(metadata).encode('utf-8'))
+                pipe.setex(f"{cache_key}:meta", effective_ttl, metadata_bytes)
             
             results = await pipe.execute()
+            self._record_redis_success()
             success = results[0] is not False
             
             # Update metrics
             if success:
                 self._metrics.sets += 1
-                self._update_avg_response_time(time.time() - start_time)
+                elapsed = time.time() - start_time
+                self._update_avg_response_time(elapsed)
+                self._cache_metrics.record('redis', cache_type, 'set', latency=elapsed,
+                                           size=len(serialized_data))
+                if is_compressed:
+                    self._cache_metrics.record('redis', cache_type, 'compress')
+                
+                self._update_request_memo(key, cache_type, value, nx)
+                await self._account_tenant_write(
+                    key, cache_type, cache_key,
+                    entry_size(cache_key, len(compressed_data), len(metadata_bytes)), effective_ttl
+                )
             else:
                 self._metrics.errors += 1
+                self._cache_metrics.error('redis', cache_type)
             
             return success
             
         except Exception as e:
             logger.error(f"Cache set error for key {key}: {e}")
             self._metrics.errors += 1
+            self._cache_metrics.error('redis', cache_type)
+            self._record_redis_error(e)
             return False
     
+    async def _account_tenant_write(self, key: str, cache_type: str, cache_key: str,
+                                    size: int, ttl: int):
+        """Account a write to its tenant; UNLINK the tenant's oldest entries when over quota."""
+        tenant = self._quotas.resolve_tenant(key)
+        evicted = self._quotas.record_set(tenant, cache_type, cache_key, size, ttl)
+        if not evicted:
+            return
+        
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for evicted_key in evicted:
+                pipe.unlink(evicted_key, f"{evicted_key}:meta")
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Quota eviction failed for tenant {tenant}: {e}")
+    
+    def get_tenant_memory_report(self) -> Dict[str, Any]:
+        """Cache memory by tenant and cache type (accounted by this process)."""
+        return self._quotas.get_report()
+    
+    def _fallback_set(self, key: str, value: Any, cache_type: str,
+                      ttl: Optional[int], nx: bool) -> bool:
+        """set() while degraded - bounded in-process store."""
+        effective_ttl = ttl if ttl is not None else self.ttl_for(cache_type, key)
+        stored = self._fallback.set(self._generate_cache_key(cache_type, key), value, effective_ttl, nx)
+        if stored:
+            self._cache_metrics.record('memory', cache_type, 'set')
+            self._update_request_memo(key, cache_type, value, nx)
+        return stored
+    
+    def _update_request_memo(self, key: str, cache_type: str, value: Any, nx: bool):
+        """Keep the request memo consistent with what was written."""
+        loader = get_request_loader()
+        if loader is not None and loader.pool is self:
+            if nx:
+                loader.clear(key, cache_type)
+            else:
+                loader.prime(key, cache_type, value)
+    
     async def get(self, key: str, cache_type: str = 'performance') -> Optional[Any]:
         """
         Get a value from cache with decompression.
         
+        Inside a request scope the read is batched by the request loader.
+        
         Args:
             key: Cache key
             cache_type: Type of cache
         """
-        if not self._connected:
+        if not self._connected and not self.degraded:
             return None
         
+        self._ttl_policy.record_read(cache_type, key)
+        self.access_recorder.record(cache_type, key)
+        
+        loader = get_request_loader()
+        if loader is not None and loader.pool is self:
+            return await loader.load(key, cache_type)
+        
+        if not self._breaker.allow_request():
+            return self._fallback_get(key, cache_type)
+        
         start_time = time.time()
         
         try:
@@ -427,40 +865,130 @@ class OptimizedRedisConnectionPool:
             pipe.get(cache_key)
             pipe.get(f"{cache_key}:meta")
             results = await pipe.execute()
+            self._record_redis_success()
             
             data, metadata_raw = results
             
             if data is None:
                 self._metrics.misses += 1
+                self._cache_metrics.miss('redis', cache_type, time.time() - start_time)
                 return None
             
-            # Parse metadata
-            metadata = {}
-            if metadata_raw:
-                try:
-                    metadata = json.loads(metadata_raw.decode('utf-8'))
-                except Exception:
-                    pass
-            
-            # Decompress if needed
-            decompressed_data = self._decompress_data(data, metadata.get('compressed', False))
-            
-            # Deserialize
-            value = self._deserialize_value(decompressed_data, metadata)
+            value = self._decode_entry(data, metadata_raw)
             
             # Update metrics
             self._metrics.hits += 1
-            self._update_avg_response_time(time.time() - start_time)
+            elapsed = time.time() - start_time
+            self._update_avg_response_time(elapsed)
+            self._cache_metrics.hit('redis', cache_type, elapsed)
             
             return value
             
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {e}")
             self._metrics.errors += 1
+            self._cache_metrics.error('redis', cache_type)
+            self._record_redis_error(e)
             return None
     
+    def _fallback_get(self, key: str, cache_type: str) -> Optional[Any]:
+        """get() while degraded."""
+        value = self._fallback.get(self._generate_cache_key(cache_type, key))
+        if value is None:
+            self._cache_metrics.miss('memory', cache_type)
+        else:
+            self._cache_metrics.hit('memory', cache_type)
+        return value
+    
+    async def get_many(self, items: List[Tuple[str, str]],
+                       commands: Optional[List[Tuple[str, str]]] = None) -> List[Optional[Any]]:
+        """
+        Get several values with a single pipelined round trip.
+        
+        Args:
+            items: List of (key, cache_type) pairs
+            commands: Native read-only commands as (command, redis_key) pairs
+                (e.g. ('hgetall', session key)) sent in the same pipeline
+            
+        Returns:
+            Values in the order of items (None for misses), followed by the raw
+            results of commands
+        """
+        commands = commands or []
+        if not items and not commands:
+            return []
+        if not self._breaker.allow_request():
+            raw = await self._execute_memory_pipeline(
+                lambda pipe: [getattr(pipe, command)(redis_key) for command, redis_key in commands]
+            ) if commands else []
+            return ([self._fallback_get(key, cache_type) for key, cache_type in items]
+                    + list(raw or [None] * len(commands)))
+        if not self._connected:
+            return [None] * (len(items) + len(commands))
+        
+        start_time = time.time()
+        
+        try:
+            pipe = self._redis_client.pipeline()
+            for key, cache_type in items:
+                cache_key = self._generate_cache_key(cache_type, key)
+                pipe.get(cache_key)
+                pipe.get(f"{cache_key}:meta")
+            for command, redis_key in commands:
+                getattr(pipe, command)(redis_key)
+            results = await pipe.execute()
+            self._record_redis_success()
+            
+            # One round trip serves every key - each lookup is charged its latency
+            elapsed = time.time() - start_time
+            
+            values = []
+            for index, (_, cache_type) in enumerate(items):
+                data, metadata_raw = results[2 * index], results[2 * index + 1]
+                if data is None:
+                    self._metrics.misses += 1
+                    self._cache_metrics.miss('redis', cache_type, elapsed)
+                    values.append(None)
+                else:
+                    self._metrics.hits += 1
+                    self._cache_metrics.hit('redis', cache_type, elapsed)
+                    values.append(self._decode_entry(data, metadata_raw))
+            
+            self._update_avg_response_time(elapsed)
+            return values + list(results[2 * len(items):])
+            
+        except Exception as e:
+            logger.error(f"Cache get_many error for {len(items)} keys: {e}")
+            self._metrics.errors += 1
+            for _, cache_type in items:
+                self._cache_metrics.error('redis', cache_type)
+            self._record_redis_error(e)
+            return [None] * (len(items) + len(commands))
+    
+    def _decode_entry(self, data: bytes, metadata_raw: Optional[bytes]) -> Any:
+        """Decode a stored value using its metadata record."""
+        # Parse metadata
+        metadata = {}
+        if metadata_raw:
+            try:
+                metadata = json.loads(metadata_raw.decode('utf-8'))
+            except Exception:
+                pass
+        
+        # Decompress if needed
+        decompressed_data = self._decompress_data(data, metadata.get('compressed', False))
+        
+        # Deserialize
+        return self._deserialize_value(decompressed_data, metadata)
+    
     async def delete(self, key: str, cache_type: str = 'performance') -> bool:
         """Delete a key from cache."""
+        if not self._breaker.allow_request():
+            success = self._fallback.delete(self._generate_cache_key(cache_type, key)) > 0
+            if success:
+                self._cache_metrics.record('memory', cache_type, 'delete')
+            self._update_request_memo(key, cache_type, None, nx=False)
+            return success
         if not self._connected:
             return False
         
@@ -472,69 +1000,276 @@ class OptimizedRedisConnectionPool:
             pipe.delete(cache_key)
             pipe.delete(f"{cache_key}:meta")
             results = await pipe.execute()
+            self._record_redis_success()
+            self._quotas.forget(cache_key)
             
             success = any(results)
             if success:
                 self._metrics.deletes += 1
+                self._cache_metrics.record('redis', cache_type, 'delete')
+            
+            self._update_request_memo(key, cache_type, None, nx=False)
             
             return success
             
         except Exception as e:
             logger.error(f"Cache delete error for key {key}: {e}")
             self._metrics.errors += 1
+            self._cache_metrics.error('redis', cache_type)
+            self._record_redis_error(e)
             return False
     
     async def exists(self, key: str, cache_type: str = 'performance') -> bool:
         """Check if key exists in cache."""
+        if not self._breaker.allow_request():
+            cache_key = self._generate_cache_key(cache_type, key)
+            return self._fallback.exists(cache_key)
         if not self._connected:
             return False
         
         try:
             cache_key = self._generate_cache_key(cache_type, key)
-            return await self._redis_client.exists(cache_key) > 0
+            result = await self._redis_client.exists(cache_key) > 0
+            self._record_redis_success()
+            return result
         except Exception as e:
             logger.error(f"Cache exists error for key {key}: {e}")
+            self._record_redis_error(e)
             return False
     
     async def expire(self, key: str, ttl: int, cache_type: str = 'performance') -> bool:
         """Set expiration for a key."""
+        if not self._breaker.allow_request():
+            cache_key = self._generate_cache_key(cache_type, key)
+            return self._fallback.expire(cache_key, ttl)
         if not self._connected:
             return False
         
         try:
             cache_key = self._generate_cache_key(cache_type, key)
-            return await self._redis_client.expire(cache_key, ttl)
+            result = await self._redis_client.expire(cache_key, ttl)
+            self._record_redis_success()
+            return result
         except Exception as e:
             logger.error(f"Cache expire error for key {key}: {e}")
+            self._record_redis_error(e)
             return False
     
     async def incr(self, key: str, amount: int = 1, cache_type: str = 'performance') -> Optional[int]:
         """Increment a numeric value."""
+        if not self._breaker.allow_request():
+            cache_key = self._generate_cache_key(cache_type, key)
+            return self._fallback.incr(cache_key, amount)
         if not self._connected:
             return None
         
         try:
             cache_key = self._generate_cache_key(cache_type, key)
-            return await self._redis_client.incr(cache_key, amount)
+            result = await self._redis_client.incr(cache_key, amount)
+            self._record_redis_success()
+            return result
         except Exception as e:
             logger.error(f"Cache incr error for key {key}: {e}")
+            self._record_redis_error(e)
             return None
     
     async def get_keys_by_pattern(self, pattern: str, cache_type: str = 'performance') -> List[str]:
-        """Get keys matching pattern."""
+        """Get keys matching pattern (incremental SCAN - never blocks Redis like KEYS)."""
+        cache_pattern = self._generate_cache_key(cache_type, pattern)
+        # Remove the cache prefix to return original keys
+        prefix = self._generate_cache_key(cache_type, '')
+        
+        if not self._breaker.allow_request():
+            return [key.replace(prefix, '') for key in self._fallback.keys(cache_pattern)
+                    if not key.endswith(':meta')]
         if not self._connected:
             return []
         
         try:
-            cache_pattern = self._generate_cache_key(cache_type, pattern)
-            keys = await self._redis_client.keys(cache_pattern)
-            # Remove the cache prefix to return original keys
-            prefix = self._generate_cache_key(cache_type, '')
+            keys = await self._get_invalidator().scan(cache_pattern)
+            self._record_redis_success()
             return [key.decode('utf-8').replace(prefix, '') for key in keys]
         except Exception as e:
             logger.error(f"Cache keys error for pattern {pattern}: {e}")
+            self._record_redis_error(e)
             return []
     
+    async def clear_cache_type(self, cache_type: str, pattern: str = '*') -> int:
+        """
+        Remove the entries of a cache type matching pattern.
+        
+        Runs SCAN + UNLINK batches within the invalidation ops budget and waits
+        for completion; use start_invalidation for a background job.
+        
+        Returns:
+            Number of removed keys (data and metadata keys)
+        """
+        if not self._breaker.allow_request():
+            deleted = self._fallback.delete_pattern(self._generation_pattern(cache_type, pattern))
+            if pattern == '*' and cache_type in self.config.versioned_cache_types:
+                # Entries other workers hold in Redis go with the replayed bump
+                self._bump_local(cache_type)
+            self._forget_request_memo()
+            return deleted
+        if not self._connected:
+            return 0
+        
+        job = await self._get_invalidator().invalidate(self._generation_pattern(cache_type, pattern))
+        self._quotas.forget_matching(self._generation_pattern(cache_type, pattern))
+        self._forget_request_memo()
+        if job.status != "completed":
+            self._metrics.errors += 1
+        return job.deleted
+    
+    def start_invalidation(self, cache_type: str, pattern: str = '*') -> Optional[InvalidationJob]:
+        """
+        Start a background invalidation of cache_type entries matching pattern.
+        
+        Returns:
+            The job (poll it via get_invalidation_job), or None when disconnected
+            or degraded (use clear_cache_type then)
+        """
+        if not self._connected or self.degraded:
+            return None
+        
+        job = self._get_invalidator().start(self._generation_pattern(cache_type, pattern))
+        self._quotas.forget_matching(self._generation_pattern(cache_type, pattern))
+        self._forget_request_memo()
+        return job
+    
+    def get_invalidation_job(self, job_id: str) -> Optional[InvalidationJob]:
+        """Get the progress of an invalidation job."""
+        return self._invalidator.get_job(job_id) if self._invalidator else None
+    
+    def _get_invalidator(self) -> CacheInvalidator:
+        """Invalidator bound to the current Redis client."""
+        if self._invalidator is None or self._invalidator.redis_client is not self._redis_client:
+            self._invalidator = CacheInvalidator(
+                self._redis_client,
+                scan_count=self.config.invalidation_scan_count,
+                ops_per_second=self.config.invalidation_ops_per_second
+            )
+        return self._invalidator
+    
+    def _forget_request_memo(self):
+        """Drop the current request's memoized reads after an invalidation."""
+        loader = get_request_loader()
+        if loader is not None and loader.pool is self:
+            loader.clear()
+    
+    def _forget_request_commands(self):
+        """Drop the current request's memoized native reads after a native write."""
+        loader = get_request_loader()
+        if loader is not None and loader.pool is self:
+            loader.clear_commands()
+    
+    async def read(self, command: str, redis_key: str) -> Optional[Any]:
+        """
+        Run a native read-only command (e.g. HGETALL of a HASH) on a full Redis key.
+        
+        Inside a request scope the read joins the request loader's batch.
+        """
+        loader = get_request_loader()
+        if loader is not None and loader.pool is self:
+            return await loader.load_command(command, redis_key)
+        
+        results = await self.execute_pipeline(
+            lambda pipe: getattr(pipe, command)(redis_key), transaction=False
+        )
+        return results[0] if results else None
+    
+    def prefetch(self, command: str, redis_key: str):
+        """Register a native read with the request loader (no-op outside a request scope)."""
+        loader = get_request_loader()
+        if loader is not None and loader.pool is self:
+            loader.register_command(command, redis_key)
+    
+    def key_for(self, cache_type: str, key: str) -> str:
+        """Public access to the standardized cache key schema."""
+        return self._generate_cache_key(cache_type, key)
+    
+    async def execute_pipeline(self, build: Callable[[Any], None],
+                               transaction: bool = True) -> Optional[List[Any]]:
+        """
+        Run the commands queued by build(pipe) in a single round trip.
+        
+        Used for native Redis structures (HASH, ZSET) that do not fit the
+        value + metadata layout of set/get.
+        
+        Args:
+            build: Callable that queues commands on the given pipeline
+            transaction: Wrap the commands in MULTI/EXEC
+            
+        Returns:
+            Command results, or None when Redis is unavailable or fails
+        """
+        self._forget_request_commands()
+        if not self._breaker.allow_request():
+            return await self._execute_memory_pipeline(build)
+        if not self._connected:
+            return None
+        
+        start_time = time.time()
+        
+        try:
+            pipe = self._redis_client.pipeline(transaction=transaction)
+            build(pipe)
+            results = await pipe.execute()
+            self._record_redis_success()
+            self._update_avg_response_time(time.time() - start_time)
+            return results
+        except Exception as e:
+            logger.error(f"Cache pipeline error: {e}")
+            self._metrics.errors += 1
+            self._record_redis_error(e)
+            return None
+    
+    async def _execute_memory_pipeline(self, build: Callable[[Any], None]) -> Optional[List[Any]]:
+        """execute_pipeline() while degraded (commands run against the fallback)."""
+        try:
+            pipe = MemoryPipeline(self._fallback)
+            build(pipe)
+            return await pipe.execute()
+        except AttributeError as e:
+            logger.warning(f"Pipeline not available in degraded mode: {e}")
+            return None
+    
+    async def run_script(self, script: str, keys: List[str], args: List[Any],
+                         cache_type: str = 'performance') -> Optional[Any]:
+        """
+        Run a Lua script atomically on the server (EVALSHA with EVAL fallback).
+        
+        Args:
+            script: Lua script source
+            keys: Keys touched by the script (namespaced like other cache keys)
+            args: Script arguments
+            cache_type: Type of cache used for key namespacing
+            
+        Returns:
+            The script result, or None when Redis is unavailable (scripts are
+            not emulated in degraded mode - callers fall back locally)
+        """
+        if not self._connected or not self._breaker.allow_request():
+            return None
+        
+        self._forget_request_commands()
+        try:
+            script_id = hashlib.sha1(script.encode('utf-8')).hexdigest()
+            registered = self._scripts.get(script_id)
+            if registered is None:
+                registered = self._redis_client.register_script(script)
+                self._scripts[script_id] = registered
+            
+            cache_keys = [self._generate_cache_key(cache_type, key) for key in keys]
+            result = await registered(keys=cache_keys, args=args)
+            self._record_redis_success()
+            return result
+        except Exception as e:
+            logger.error(f"Cache script error for keys {keys}: {e}")
+            self._metrics.errors += 1
+            self._record_redis_error(e)
+            raise
+    
     def _update_avg_response_time(self, response_time: float):
         """Update average response time metric."""
         total_ops = self._metrics.hits + self._metrics.misses + self._metrics.sets
@@ -573,6 +1308,26 @@ class OptimizedRedisConnectionPool:
         
         cleanup_task = asyncio.create_task(cleanup_expired_keys())
         self._cleanup_tasks.append(cleanup_task)
+        
+        # Pick up namespace bumps made by other workers
+        generations_task = asyncio.create_task(
+            self._generations.run(self.config.namespace_refresh_interval)
+        )
+        self._cleanup_tasks.append(generations_task)
+        
+        async def flush_access_rankings():
+            """Persist access counts for the next warm-up."""
+            while True:
+                try:
+                    await asyncio.sleep(self.config.warmup_flush_interval)
+                    await self.access_recorder.flush()
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    logger.error(f"Access ranking flush error: {e}")
+        
+        if self.config.warmup_enabled:
+            self._cleanup_tasks.append(asyncio.create_task(flush_access_rankings()))
     
     async def get_performance_stats(self) -> Dict[str, Any]:
         """Get comprehensive performance statistics."""
@@ -581,6 +1336,9 @@ class OptimizedRedisConnectionPool:
             
             return {
                 "hit_rate": self._metrics.hit_rate,
+                "by_cache_type": self._cache_metrics.snapshot(layer='redis'),
+                "adaptive_ttl": self._ttl_policy.get_stats(),
+                "tenant_memory": self._quotas.get_report(),
                 "cache_operations": {
                     "hits": self._metrics.hits,
                     "misses": self._metrics.misses,
@@ -631,6 +1389,7 @@ class OptimizedRedisConnectionPool:
     async def reset_metrics(self):
         """Reset performance metrics."""
         self._metrics = CacheMetrics()
+        self._cache_metrics.reset('redis')
         logger.info("Cache metrics reset")
 
 
@@ -0,0 +1,246 @@
+"""
+Request-scoped cache loader - DataLoader-style batching of Redis reads.
+
+A single chat request touches the cache many times in sequence (session,
+coordinator response, workflow and agent caches, embeddings). This module
+collects those reads into one pipelined round trip:
+- Components register the keys they will need up front
+- Lookups issued within one event-loop tick are coalesced into one pipeline
+- Native Redis reads (session HASH, namespace counters) join the same pipeline
+- Results (and writes made during the request) are memoized until the request ends
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (cache_type, key) - the same pair the connection pool uses to build Redis keys
+CacheRef = Tuple[str, str]
+
+# ("redis", command, redis_key) - a read-only native command on a full Redis key
+CommandRef = Tuple[str, str, str]
+
+_current_loader: ContextVar[Optional['RequestCacheLoader']] = ContextVar(
+    "chatbuddy_request_cache_loader", default=None
+)
+
+
+class RequestCacheLoader:
+    """
+    Coalesces cache reads of a single request into pipelined batches.
+
+    The loader is bound to one connection pool and lives for the duration of
+    one request. Every read first consults the per-request memo, then joins the
+    batch that is dispatched on the next event-loop tick.
+    """
+
+    def __init__(self, pool: Any, max_batch_size: int = 100):
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+
+        self._memo: Dict[Tuple[str, ...], Any] = {}
+        self._pending: Dict[Tuple[str, ...], asyncio.Future] = {}
+        self._queue: List[Tuple[str, ...]] = []
+        self._dispatch_scheduled = False
+        self._tasks: List[asyncio.Task] = []
+
+        self._stats = {
+            "loads": 0,
+            "memo_hits": 0,
+            "keys_fetched": 0,
+            "round_trips": 0
+        }
+
+    def register(self, refs: Iterable[CacheRef]) -> None:
+        """
+        Register keys the request will need so they join the next batch.
+
+        Args:
+            refs: Iterable of (cache_type, key) pairs
+        """
+        for ref in refs:
+            self._enqueue(ref)
+
+    def register_command(self, command: str, redis_key: str) -> None:
+        """
+        Register a native read (e.g. HGETALL of the session) for the next batch.
+
+        Args:
+            command: Read-only Redis command ('get' or 'hgetall')
+            redis_key: Full Redis key
+        """
+        self._enqueue(("redis", command, redis_key))
+
+    async def load(self, key: str, cache_type: str = 'performance') -> Optional[Any]:
+        """
+        Load a single value, batching it with other reads of the same tick.
+
+        Args:
+            key: Cache key
+            cache_type: Type of cache
+        """
+        self._stats["loads"] += 1
+        ref = (cache_type, key)
+
+        if ref in self._memo:
+            self._stats["memo_hits"] += 1
+            return self._memo[ref]
+
+        future = self._enqueue(ref)
+        # shield: a cancelled caller must not cancel the shared future
+        return await asyncio.shield(future)
+
+    async def load_command(self, command: str, redis_key: str) -> Optional[Any]:
+        """
+        Run a native read as part of the next batch (memoized like load()).
+
+        Args:
+            command: Read-only Redis command ('get' or 'hgetall')
+            redis_key: Full Redis key
+        """
+        self._stats["loads"] += 1
+        ref = ("redis", command, redis_key)
+
+        if ref in self._memo:
+            self._stats["memo_hits"] += 1
+            return self._memo[ref]
+
+        return await asyncio.shield(self._enqueue(ref))
+
+    async def load_many(self, refs: Iterable[CacheRef]) -> List[Optional[Any]]:
+        """Load several values in (at most) one batch."""
+        refs = list(refs)
+        return list(await asyncio.gather(*(self.load(key, cache_type) for cache_type, key in refs)))
+
+    def prime(self, key: str, cache_type: str, value: Any) -> None:
+        """Store a known value (e.g. one just written) in the request memo."""
+        self._memo[(cache_type, key)] = value
+
+    def clear(self, key: Optional[str] = None, cache_type: Optional[str] = None) -> None:
+        """Forget memoized values - one key, or everything when key is None."""
+        if key is None:
+            self._memo.clear()
+        else:
+            self._memo.pop((cache_type or 'performance', key), None)
+
+    def clear_commands(self) -> None:
+        """Forget memoized native reads (after a native write, e.g. a pipeline or script)."""
+        for ref in [ref for ref in self._memo if len(ref) == 3]:
+            del self._memo[ref]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loader statistics for the current request."""
+        return {**self._stats, "memoized_keys": len(self._memo)}
+
+    def _enqueue(self, ref: Tuple[str, ...]) -> asyncio.Future:
+        """Add a key to the next batch unless it is already known or in flight."""
+        if ref in self._pending:
+            return self._pending[ref]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if ref in self._memo:
+            future.set_result(self._memo[ref])
+            return future
+
+        self._pending[ref] = future
+        self._queue.append(ref)
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._schedule_dispatch)
+
+        return future
+
+    def _schedule_dispatch(self) -> None:
+        """Hand the collected keys to a background batch task."""
+        self._dispatch_scheduled = False
+        batch, self._queue = self._queue, []
+
+        for start in range(0, len(batch), self.max_batch_size):
+            chunk = batch[start:start + self.max_batch_size]
+            task = asyncio.ensure_future(self._dispatch(chunk))
+            self._tasks.append(task)
+            task.add_done_callback(self._tasks.remove)
+
+    async def _dispatch(self, batch: List[Tuple[str, ...]]) -> None:
+        """Fetch one batch with a single pipelined round trip."""
+        # Cache values first, native reads after them - the order get_many returns
+        batch = [ref for ref in batch if len(ref) == 2] + [ref for ref in batch if len(ref) == 3]
+        items = [(ref[1], ref[0]) for ref in batch if len(ref) == 2]
+        commands = [(ref[1], ref[2]) for ref in batch if len(ref) == 3]
+        try:
+            if commands:
+                values = await self.pool.get_many(items, commands=commands)
+            else:
+                values = await self.pool.get_many(items)
+            self._stats["round_trips"] += 1
+            self._stats["keys_fetched"] += len(batch)
+        except Exception as e:
+            logger.error(f"Request cache batch load error: {e}")
+            values = [None] * len(batch)
+
+        for ref, value in zip(batch, values):
+            # Writes made while the batch was in flight take precedence
+            if ref not in self._memo:
+                self._memo[ref] = value
+            future = self._pending.pop(ref, None)
+            if future is not None and not future.done():
+                future.set_result(self._memo[ref])
+
+    async def close(self) -> None:
+        """Wait for in-flight batches so no task outlives the request."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+def get_request_loader() -> Optional[RequestCacheLoader]:
+    """Get the cache loader of the current request, if any."""
+    return _current_loader.get()
+
+
+@asynccontextmanager
+async def request_cache_scope(pool: Any = None, register: Optional[Iterable[CacheRef]] = None):
+    """
+    Open a request-scoped cache loader for the enclosed block.
+
+    Args:
+        pool: Connection pool to batch against (defaults to the optimized pool)
+        register: Keys to prefetch as soon as the scope opens
+
+    Yields:
+        RequestCacheLoader, or None when the cache is unavailable
+    """
+    existing = _current_loader.get()
+    if existing is not None:
+        # Nested scopes share the outer request's loader
+        if register:
+            existing.register(register)
+        yield existing
+        return
+
+    if pool is None:
+        try:
+            from .redis_connection_pool import get_optimized_redis_pool
+            pool = await get_optimized_redis_pool()
+        except Exception as e:
+            logger.warning(f"Request cache scope unavailable: {e}")
+            yield None
+            return
+
+    loader = RequestCacheLoader(pool)
+    token = _current_loader.set(loader)
+    try:
+        if register:
+            loader.register(register)
+        yield loader
+    finally:
+        _current_loader.reset(token)
+        await loader.close()
+        logger.debug(f"Request cache loader stats: {loader.get_stats()}")
@@ -0,0 +1,210 @@
+"""
+Offline replay of recorded cache access traces against TTL policies.
+
+Traces are JSON lines written by TraceRecorder (enable them with the
+CACHE_ACCESS_TRACE environment variable):
+
+    {"ts": 1700000000.0, "op": "read", "cache_type": "product_info", "key": "p1"}
+    {"ts": 1700000003.2, "op": "fill", "cache_type": "product_info", "key": "p1", "digest": "9f2c..."}
+
+Fill events reveal the source content at that moment; between fills the source
+is assumed unchanged. Replay runs a simulated cache in trace time and reports
+hit rate, stale-read rate and origin fetches, so static and adaptive TTLs can be
+compared before changing production settings:
+
+    python -m src.integrations.cache.ttl_simulation trace.jsonl --budget 0.05
+"""
+
+import argparse
+import bisect
+import json
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.config.logging import get_logger
+from .adaptive_ttl import AdaptiveTTLPolicy
+
+logger = get_logger(__name__)
+
+
+class TraceRecorder:
+    """
+    Appends access events as JSON lines (opt-in, for offline analysis).
+
+    Args:
+        path: Trace file (appended to)
+        buffer_size: Events buffered before a write
+    """
+
+    def __init__(self, path: str, buffer_size: int = 256):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict[str, Any]):
+        with self._lock:
+            self._buffer.append(json.dumps(event))
+            if len(self._buffer) >= self.buffer_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(self._buffer) + "\n")
+        except OSError as e:
+            logger.warning(f"Cache access trace write failed ({self.path}): {e}")
+        self._buffer.clear()
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """Read a JSON-lines trace, ordered by timestamp."""
+    events = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    events.sort(key=lambda event: event["ts"])
+    return events
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of one replay."""
+    reads: int = 0
+    hits: int = 0
+    stale_hits: int = 0
+    fetches: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.reads if self.reads else 0.0
+
+    @property
+    def stale_rate(self) -> float:
+        return self.stale_hits / self.reads if self.reads else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4), "stale_rate": round(self.stale_rate, 4)}
+
+
+def replay(events: Iterable[Dict[str, Any]], ttl_for: Callable[[str, str, float], float],
+           on_fill: Optional[Callable[[str, str, str, float], None]] = None,
+           on_read: Optional[Callable[[str, str, float], None]] = None) -> SimulationResult:
+    """
+    Replay a trace against a simulated cache.
+
+    Args:
+        events: Trace events ordered by timestamp
+        ttl_for: (cache_type, key, now) -> TTL used when the simulated cache fills
+        on_fill: Called with (cache_type, key, digest, now) on every simulated fill
+        on_read: Called with (cache_type, key, now) on every read
+    """
+    events = list(events)
+
+    # Source content timeline per key, as revealed by recorded fills
+    timeline: Dict[Tuple[str, str], Tuple[List[float], List[str]]] = {}
+    for event in events:
+        if event["op"] == "fill":
+            times, digests = timeline.setdefault((event["cache_type"], event["key"]), ([], []))
+            times.append(event["ts"])
+            digests.append(event["digest"])
+
+    def source_digest(ref: Tuple[str, str], now: float) -> Optional[str]:
+        if ref not in timeline:
+            return None
+        times, digests = timeline[ref]
+        # Before the first recorded fill the earliest known content is used
+        return digests[max(bisect.bisect_right(times, now) - 1, 0)]
+
+    cache: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+    result = SimulationResult()
+
+    for event in events:
+        if event["op"] != "read":
+            continue
+        now = event["ts"]
+        ref = (event["cache_type"], event["key"])
+        result.reads += 1
+        if on_read is not None:
+            on_read(ref[0], ref[1], now)
+
+        current = source_digest(ref, now)
+        entry = cache.get(ref)
+        if entry is not None and now < entry[1]:
+            result.hits += 1
+            if entry[0] != current:
+                result.stale_hits += 1
+            continue
+
+        result.fetches += 1
+        if on_fill is not None:
+            on_fill(ref[0], ref[1], current, now)
+        cache[ref] = (current, now + ttl_for(ref[0], ref[1], now))
+
+    return result
+
+
+def replay_static(events: Iterable[Dict[str, Any]], ttls: Dict[str, int]) -> SimulationResult:
+    """Replay with one fixed TTL per cache type."""
+    return replay(events, lambda cache_type, key, now: ttls.get(cache_type, 0))
+
+
+def replay_adaptive(events: Iterable[Dict[str, Any]], policy: AdaptiveTTLPolicy) -> SimulationResult:
+    """Replay with an adaptive policy learning from the simulated refreshes."""
+    return replay(
+        events,
+        ttl_for=lambda cache_type, key, now: policy.ttl_for(cache_type, key, now=now),
+        on_fill=lambda cache_type, key, digest, now: policy.record_refresh(cache_type, key, digest, now=now),
+        on_read=lambda cache_type, key, now: policy.record_read(cache_type, key, now=now)
+    )
+
+
+def compare(events: Iterable[Dict[str, Any]], default_ttls: Dict[str, int],
+            bounds: Dict[str, Tuple[int, int]], staleness_budget: float = 0.05,
+            min_samples: int = 3) -> Dict[str, Dict[str, Any]]:
+    """Replay a trace with static and adaptive TTLs side by side."""
+    events = list(events)
+    policy = AdaptiveTTLPolicy(default_ttls, bounds, staleness_budget=staleness_budget,
+                               min_samples=min_samples)
+    return {
+        "static": replay_static(events, default_ttls).to_dict(),
+        "adaptive": replay_adaptive(events, policy).to_dict()
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: compare static and adaptive TTLs on a trace."""
+    from .redis_connection_pool import OptimizedCacheConfig
+
+    parser = argparse.ArgumentParser(description="Replay a cache access trace against TTL policies")
+    parser.add_argument("trace", help="JSON-lines trace recorded with CACHE_ACCESS_TRACE")
+    parser.add_argument("--budget", type=float, default=None, help="Staleness budget (default: config)")
+    parser.add_argument("--min-samples", type=int, default=None, help="Refreshes before a TTL adapts")
+    args = parser.parse_args(argv)
+
+    config = OptimizedCacheConfig()
+    default_ttls = {
+        cache_type: getattr(config, f"{cache_type}_ttl", config.performance_cache_ttl)
+        for cache_type in config.adaptive_ttl_bounds
+    }
+    report = compare(
+        load_trace(args.trace),
+        default_ttls,
+        dict(config.adaptive_ttl_bounds),
+        staleness_budget=config.adaptive_ttl_staleness_budget if args.budget is None else args.budget,
+        min_samples=config.adaptive_ttl_min_samples if args.min_samples is None else args.min_samples
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Cache warm-up after startup, deployments and Redis restarts.
+
+A cold cache makes the first hour after a deploy slow: every product page,
+search and embedding misses. Warm-up has two halves:
+
+- AccessFrequencyRecorder counts reads per cache type in-process and flushes
+  the counts into one Redis ZSET per cache type (trimmed to the most accessed
+  keys), so the ranking survives deployments.
+- CacheWarmer takes the top-N keys of every registered source and replays
+  them through the source's read-through loader (webshop product lookup,
+  vector search of frequent questions, ...) with bounded concurrency. The
+  loaders fill the cache the same way a user request would.
+
+Readiness is reported separately from liveness: an instance is ready once
+warm-up finished with enough of the top keys cached, or its deadline passed.
+The app registers its sources at startup, before warm-up starts; a source
+created later joins a running warm-up or is warmed in the background without
+holding back readiness.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Set inside warm-up loads - those reads are not counted as user traffic
+_warming: ContextVar[bool] = ContextVar("chatbuddy_cache_warming", default=False)
+
+
+class AccessFrequencyRecorder:
+    """
+    Access counts per cache type, persisted as Redis ZSETs.
+
+    Args:
+        pool: Connection pool (execute_pipeline / key_for)
+        cache_types: Cache types whose reads are counted
+        max_keys: Keys kept per cache type in Redis (the most accessed)
+        max_pending: Distinct keys counted locally between flushes
+    """
+
+    def __init__(self, pool: Any, cache_types: tuple = (), max_keys: int = 1000,
+                 max_pending: int = 10000):
+        self.pool = pool
+        self.cache_types = set(cache_types)
+        self.max_keys = max_keys
+        self.max_pending = max_pending
+        self._pending: Dict[str, Counter] = {}
+
+    def record(self, cache_type: str, key: str, count: int = 1):
+        """Count a read (cheap, in-process; warm-up reads are ignored)."""
+        if cache_type not in self.cache_types or _warming.get():
+            return
+        counts = self._pending.setdefault(cache_type, Counter())
+        if key in counts or len(counts) < self.max_pending:
+            counts[key] += count
+
+    def ranking_key(self, cache_type: str) -> str:
+        return self.pool.key_for('warmup', cache_type)
+
+    async def flush(self) -> bool:
+        """Add the local counts to the Redis rankings (one pipeline)."""
+        pending, self._pending = self._pending, {}
+        if not any(pending.values()):
+            return True
+
+        def build(pipe):
+            for cache_type, counts in pending.items():
+                ranking = self.ranking_key(cache_type)
+                for key, count in counts.items():
+                    pipe.zincrby(ranking, count, key)
+                # Keep only the most accessed keys
+                pipe.zremrangebyrank(ranking, 0, -(self.max_keys + 1))
+
+        if await self.pool.execute_pipeline(build, transaction=False) is None:
+            # Redis unavailable - keep the counts for the next flush
+            for cache_type, counts in pending.items():
+                for key, count in counts.items():
+                    self.record(cache_type, key, count)
+            return False
+        return True
+
+    async def top(self, cache_type: str, limit: int) -> List[str]:
+        """Most accessed keys of a cache type, most accessed first."""
+        if limit <= 0:
+            return []
+        await self.flush()
+        results = await self.pool.execute_pipeline(
+            lambda pipe: pipe.zrevrange(self.ranking_key(cache_type), 0, limit - 1),
+            transaction=False
+        )
+        if not results:
+            return []
+        return [key.decode('utf-8') if isinstance(key, bytes) else key for key in results[0]]
+
+
+# Re-reads a key through the normal read-through path; returns the value or None
+WarmupLoader = Callable[[str], Awaitable[Any]]
+
+
+@dataclass
+class WarmupSource:
+    """A cache type (or logical key space) that can be regenerated key by key."""
+    name: str
+    cache_type: str
+    loader: WarmupLoader
+    key_prefix: str = ""
+
+
+@dataclass
+class WarmupReport:
+    """Progress and outcome of a warm-up run."""
+    state: str = "pending"  # pending, running, completed, timed_out, skipped
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempted: int = 0
+    warmed: int = 0
+    failed: int = 0
+    by_source: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def coverage(self) -> float:
+        """Fraction of the top keys found or regenerated (expected hit rate on them)."""
+        return self.warmed / self.attempted if self.attempted else 1.0
+
+
+class CacheWarmer:
+    """
+    Prefills the most accessed keys of every registered source.
+
+    Args:
+        top_n: Keys warmed per source
+        concurrency: Loaders running at once
+        timeout: Seconds until warm-up gives up (the instance becomes ready anyway)
+        min_coverage: Fraction of top keys that must be warm to report ready early
+    """
+
+    def __init__(self, top_n: int = 200, concurrency: int = 8, timeout: float = 120.0,
+                 min_coverage: float = 0.8):
+        self.top_n = top_n
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.min_coverage = min_coverage
+        self.recorder: Optional[AccessFrequencyRecorder] = None
+        self.report = WarmupReport()
+        self._sources: Dict[str, WarmupSource] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._late_tasks: set = set()
+
+    def register_source(self, name: str, cache_type: str, loader: WarmupLoader, key_prefix: str = ""):
+        """
+        Register (or replace) a source; loader(key) re-reads one recorded key.
+
+        A source registered while warm-up runs joins that run; one registered
+        after warm-up finished is warmed in the background.
+        """
+        replaced = name in self._sources
+        source = self._sources[name] = WarmupSource(name, cache_type, loader, key_prefix)
+        if self.recorder is None or replaced or name in self.report.by_source:
+            return
+        if self._task is not None and not self._task.done():
+            return  # Picked up by the running warm-up
+        try:
+            task = asyncio.get_running_loop().create_task(self._warm_late_source(source))
+        except RuntimeError:
+            return  # No event loop - picked up by the next start()
+        self._late_tasks.add(task)
+        task.add_done_callback(self._late_tasks.discard)
+
+    def record_access(self, cache_type: str, key: str):
+        """Count a logical access (e.g. a search question) for a source without pool reads."""
+        if self.recorder is not None:
+            self.recorder.record(cache_type, key)
+
+    def start(self, recorder: Optional[AccessFrequencyRecorder]) -> Optional[asyncio.Task]:
+        """Run warm-up in the background (readiness follows its progress)."""
+        self.recorder = recorder
+        if recorder is None or not self._sources:
+            self.report = WarmupReport(state="skipped")
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.warm_up())
+        return self._task
+
+    async def warm_up(self) -> WarmupReport:
+        """Warm every source; stops at the deadline."""
+        self.report = WarmupReport(state="running", started_at=time.time())
+        try:
+            await asyncio.wait_for(self._warm_sources(), timeout=self.timeout)
+            self.report.state = "completed"
+        except asyncio.TimeoutError:
+            self.report.state = "timed_out"
+            logger.warning(f"Cache warm-up timed out after {self.timeout}s "
+                           f"({self.report.warmed}/{self.report.attempted} keys warm)")
+        self.report.finished_at = time.time()
+        logger.info(f"Cache warm-up {self.report.state}: {self.report.warmed}/{self.report.attempted} keys "
+                    f"in {self.report.finished_at - self.report.started_at:.1f}s")
+        return self.report
+
+    async def _warm_sources(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        warmed = set()
+        while True:
+            # Sources registered during the run are warmed in the same run
+            pending = [source for source in self._sources.values() if source.name not in warmed]
+            if not pending:
+                return
+            for source in pending:
+                warmed.add(source.name)
+                await self._warm_source(source, semaphore)
+
+    async def _warm_late_source(self, source: WarmupSource):
+        try:
+            await asyncio.wait_for(self._warm_source(source, asyncio.Semaphore(self.concurrency)),
+                                   timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Cache warm-up of {source.name} timed out after {self.timeout}s")
+        except Exception as e:
+            logger.warning(f"Cache warm-up of {source.name} failed: {e}")
+
+    async def _warm_source(self, source: WarmupSource, semaphore: asyncio.Semaphore):
+        token = _warming.set(True)
+        try:
+            keys = [key for key in await self.recorder.top(source.cache_type, self.top_n)
+                    if key.startswith(source.key_prefix)]
+            stats = self.report.by_source.setdefault(source.name, {"attempted": 0, "warmed": 0, "failed": 0})
+            await asyncio.gather(*(self._warm_key(source, key, semaphore, stats) for key in keys))
+        finally:
+            _warming.reset(token)
+
+    async def _warm_key(self, source: WarmupSource, key: str, semaphore: asyncio.Semaphore,
+                        stats: Dict[str, int]):
+        async with semaphore:
+            self.report.attempted += 1
+            stats["attempted"] += 1
+            try:
+                value = await source.loader(key)
+            except Exception as e:
+                self.report.failed += 1
+                stats["failed"] += 1
+                logger.debug(f"Warm-up of {source.name}:{key} failed: {e}")
+                return
+            if value is not None:
+                self.report.warmed += 1
+                stats["warmed"] += 1
+
+    def readiness(self) -> Dict[str, Any]:
+        """Readiness: warm-up finished with enough coverage, or its deadline passed."""
+        report = self.report
+        if report.state in ("skipped", "timed_out"):
+            ready = True
+        elif report.state == "completed":
+            ready = report.coverage >= self.min_coverage or self._deadline_passed()
+        else:
+            ready = self._deadline_passed()
+
+        return {
+            "ready": ready,
+            "state": report.state,
+            "attempted": report.attempted,
+            "warmed": report.warmed,
+            "failed": report.failed,
+            "coverage": round(report.coverage, 3),
+            "by_source": report.by_source,
+            "duration_seconds": round((report.finished_at or time.time()) - report.started_at, 2)
+            if report.started_at else None
+        }
+
+    def _deadline_passed(self) -> bool:
+        return self.report.started_at is not None and time.time() - self.report.started_at >= self.timeout
+
+    async def stop(self):
+        """Cancel running warm-ups."""
+        tasks = [task for task in (self._task, *self._late_tasks) if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global warmer - sources register themselves, the app starts it after the cache is up
+_cache_warmer: Optional[CacheWarmer] = None
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get the process-wide cache warmer."""
+    global _cache_warmer
+    if _cache_warmer is None:
+        _cache_warmer = CacheWarmer()
+    return _cache_warmer
+
+
+def start_cache_warmup(pool: Any) -> Optional[asyncio.Task]:
+    """
+    Start warm-up with the pool's settings and access rankings.
+    
+    Args:
+        pool: Optimized connection pool, or None (legacy cache - warm-up skipped)
+    """
+    warmer = get_cache_warmer()
+    if pool is None or not pool.config.warmup_enabled:
+        return warmer.start(None)
+
+    warmer.top_n = pool.config.warmup_top_n
+    warmer.concurrency = pool.config.warmup_concurrency
+    warmer.timeout = pool.config.warmup_timeout
+    warmer.min_coverage = pool.config.warmup_min_coverage
+    return warmer.start(pool.access_recorder)
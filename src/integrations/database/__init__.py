@@ -5,17 +5,20 @@ This module contains database integration components:
 - Supabase connection and configuration
 - Database schema management
 - Vector database operations
+- In-process ANN index for product embeddings
 - Row Level Security (RLS) policies
 """
 
 from .supabase_client import SupabaseClient
 from .schema_manager import SchemaManager
 from .vector_operations import VectorOperations
+from .vector_index import ProductVectorIndex
 from .rls_policies import RLSPolicyManager
 
 __all__ = [
     "SupabaseClient",
     "SchemaManager", 
     "VectorOperations",
+    "ProductVectorIndex",
     "RLSPolicyManager"
 ]
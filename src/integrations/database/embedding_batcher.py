@@ -0,0 +1,214 @@
+"""
+Async micro-batching for embedding requests.
+
+Concurrent generate_embedding calls each used to pay a full OpenAI round
+trip for one short string. The batcher coalesces them:
+- requests arriving within max_wait_ms are sent as one batched call,
+  bounded by max_batch_size and an estimated token budget
+- identical texts in flight share one slot and one result
+- results (or the batch error) fan back out to every awaiting caller
+- a failed batch is bisected, so a text the API rejects fails only its own
+  callers instead of every request coalesced with it
+
+chunk_texts applies the same size / token bounds to bulk embedding jobs.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Set
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Durva token becslés (~4 karakter / token), tiktoken nélkül
+CHARS_PER_TOKEN = 4
+
+EmbedBatchFunction = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Becsült token szám egy szövegre"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_texts(texts: List[str], max_texts: int, max_tokens: int) -> Iterator[List[str]]:
+    """
+    Szövegek darabolása API hívásonként küldhető csomagokra.
+
+    Egy csomag legfeljebb max_texts szöveg és (becsülten) max_tokens token;
+    a keretnél hosszabb szöveg egyedül kerül egy csomagba.
+    """
+    chunk: List[str] = []
+    chunk_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if chunk and (len(chunk) >= max_texts or chunk_tokens + tokens > max_tokens):
+            yield chunk
+            chunk, chunk_tokens = [], 0
+        chunk.append(text)
+        chunk_tokens += tokens
+    if chunk:
+        yield chunk
+
+
+class EmbeddingBatcher:
+    """
+    Egyidejű embedding kérések összevonása batch hívásokba.
+
+    Args:
+        embed_batch: Szövegek -> embeddingek (azonos sorrendben), egy API hívás
+        max_batch_size: Szövegek száma batch-enként
+        max_batch_tokens: Becsült token keret batch-enként
+        max_wait_ms: Az első várakozó kérés után ennyit vár további kérésekre
+    """
+
+    def __init__(self, embed_batch: EmbedBatchFunction, max_batch_size: int = 64,
+                 max_batch_tokens: int = 8000, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError("A max_batch_size legalább 1")
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._pending: List[str] = []
+        self._pending_tokens = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self._requests = 0
+        self._deduplicated = 0
+        self._batches = 0
+        self._batched_texts = 0
+        self._failed_batches = 0
+        self._failed_texts = 0
+        self._batch_latency_total = 0.0
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Egy szöveg embeddingje a következő batch-ből.
+
+        Azonos, már várakozó vagy futó szöveg ugyanazt az eredményt kapja.
+        Hiba csak annál a szövegnél jelenik meg kivételként, amelyet az API
+        önmagában is elutasít (vagy mindenkinél, ha a hiba nem szövegfüggő).
+        """
+        self._requests += 1
+        future = self._inflight.get(text)
+        if future is not None:
+            self._deduplicated += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[text] = future
+            tokens = estimate_tokens(text)
+            if self._pending and (
+                len(self._pending) >= self.max_batch_size
+                or self._pending_tokens + tokens > self.max_batch_tokens
+            ):
+                self._flush()
+            self._pending.append(text)
+            self._pending_tokens += tokens
+            if len(self._pending) >= self.max_batch_size or self._pending_tokens >= self.max_batch_tokens:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+        # A hívó megszakítása nem szakítja meg a közös eredményt
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        """A várakozó szövegek elküldése egy batch-ben"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        texts = self._pending
+        self._pending = []
+        self._pending_tokens = 0
+        task = asyncio.get_running_loop().create_task(self._run_batch(texts))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, texts: List[str]):
+        started = time.perf_counter()
+        try:
+            error = await self._embed_group(texts)
+            if error is not None:
+                self._failed_batches += 1
+                logger.warning(f"Embedding batch hiba ({len(texts)} szöveg): {error}")
+                await self._isolate_failure(texts, error)
+        finally:
+            self._batches += 1
+            self._batched_texts += len(texts)
+            self._batch_latency_total += time.perf_counter() - started
+        logger.debug(f"Embedding batch: {len(texts)} szöveg")
+
+    async def _embed_group(self, texts: List[str]) -> Optional[Exception]:
+        """Egy API hívás a szövegekre; siker esetén a várakozók megkapják az eredményt"""
+        try:
+            embeddings = await self.embed_batch(texts)
+            if len(embeddings) != len(texts):
+                raise RuntimeError(
+                    f"Embedding batch méret eltérés: {len(embeddings)} eredmény {len(texts)} szövegre"
+                )
+        except Exception as e:
+            return e
+
+        for text, embedding in zip(texts, embeddings):
+            future = self._inflight.pop(text, None)
+            if future is not None and not future.done():
+                future.set_result(embedding)
+        return None
+
+    async def _isolate_failure(self, texts: List[str], error: Exception):
+        """
+        Hibás batch felezése, hogy csak az elutasított szöveg hívói kapjanak hibát.
+
+        Ha mindkét fél hibázik, a hiba nem egy szövegtől függ (rate limit,
+        kiesés): a batch összes szövege hibát kap további hívások nélkül.
+        """
+        if len(texts) == 1:
+            self._fail(texts, error)
+            return
+
+        middle = len(texts) // 2
+        halves = [texts[:middle], texts[middle:]]
+        errors = await asyncio.gather(*(self._embed_group(half) for half in halves))
+        if all(errors):
+            for half, half_error in zip(halves, errors):
+                self._fail(half, half_error)
+            return
+        for half, half_error in zip(halves, errors):
+            if half_error is not None:
+                await self._isolate_failure(half, half_error)
+
+    def _fail(self, texts: List[str], error: Exception):
+        """A szövegek várakozóinak értesítése a hibáról"""
+        self._failed_texts += len(texts)
+        for text in texts:
+            future = self._inflight.pop(text, None)
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    async def flush(self):
+        """Várakozó kérések azonnali elküldése és a futó batch-ek bevárása"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Batcher statisztikák"""
+        return {
+            "requests": self._requests,
+            "deduplicated": self._deduplicated,
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+            "failed_texts": self._failed_texts,
+            "avg_batch_size": self._batched_texts / self._batches if self._batches else 0.0,
+            "avg_batch_latency_ms": self._batch_latency_total / self._batches * 1000 if self._batches else 0.0,
+            "pending": len(self._pending),
+            "inflight": len(self._inflight)
+        }
@@ -0,0 +1,296 @@
+"""
+Lexical retrieval and rank fusion for hybrid product search.
+
+- analyze_hungarian: accent folding, stopwords and Hungarian stemming, the
+  in-process counterpart of the hungarian_unaccent text search configuration
+- BM25Index: in-process BM25 over product name, brand, tags and description
+  (field-weighted term frequencies)
+- matches_filters: the hybrid search filters evaluated on a product row
+- reciprocal_rank_fusion: merges the lexical and vector rankings; RRF only
+  uses ranks, so BM25 scores and cosine similarities need no calibration
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import snowballstemmer
+except ImportError:  # Opcionális függőség - nélküle egyszerű toldalék levágás
+    snowballstemmer = None
+
+# Mezők súlya a term frekvenciában (a névben talált szó többet ér)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "brand": 2.0,
+    "tags": 2.0,
+    "short_description": 1.0,
+    "description": 1.0
+}
+
+# RRF konstans (Cormack et al.: k=60 robusztus alapérték)
+RRF_K = 60
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+# Gyakori magyar szavak ékezet nélkül (a keresésben nem hordoznak jelentést)
+HUNGARIAN_STOPWORDS = frozenset("""
+    az egy es is vagy de hogy nem meg mar van volt lesz ez azt ezt ezek azok mint csak
+    ha mi mit ami amit amely milyen melyik hol kell kellene szeretnek keresek nekem
+    nincs vannak el ki be fel le ra re ban ben nal nel
+""".split())
+
+# Esetragok ékezet nélkül, hosszabbak elöl (a snowball stemmer hiányában)
+_CASE_SUFFIXES = (
+    "kent", "nak", "nek", "val", "vel", "nal", "nel", "bol", "rol", "tol", "ban", "ben",
+    "hoz", "hez", "ert", "ig", "ba", "be", "ra", "re", "ul", "t"
+)
+_VOWELS = frozenset("aeiou")
+_MIN_STEM_LENGTH = 3
+
+_SNOWBALL_STEMMER = snowballstemmer.stemmer("hungarian") if snowballstemmer is not None else None
+
+
+def tokenize(text: str) -> List[str]:
+    """Kisbetűs szavak (egybetűs, nem szám tokenek nélkül)"""
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1 or token.isdigit()]
+
+
+def fold_accents(text: str) -> str:
+    """Ékezetek eltávolítása (cipő -> cipo), mint a Postgres unaccent"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _strip_suffix(word: str, suffixes: Iterable[str]) -> str:
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def stem_hungarian(word: str) -> str:
+    """
+    Magyar szótő ékezet nélküli szóból.
+
+    Snowball stemmerrel, ha telepítve van (ugyanaz az algoritmus, mint a
+    Postgres hungarian_stem); egyébként esetrag, kötőhangzó, többes szám
+    jel és szóvégi magánhangzó levágása (telefonokat -> telefon,
+    cipok -> cip, cipo -> cip). A kérdés és az index ugyanígy
+    normalizálódik, így a szóalakok egyeznek.
+    """
+    if _SNOWBALL_STEMMER is not None:
+        return _SNOWBALL_STEMMER.stemWord(word)
+    if len(word) <= _MIN_STEM_LENGTH or not word.isalpha():
+        return word
+
+    word = _strip_suffix(word, _CASE_SUFFIXES)
+    for _ in range(2):
+        # Kötőhangzó / szóvégi magánhangzó, majd a többes szám jele
+        if word[-1] in _VOWELS and len(word) > _MIN_STEM_LENGTH:
+            word = word[:-1]
+        if word.endswith("k") and len(word) > _MIN_STEM_LENGTH and word[-2] in _VOWELS:
+            word = word[:-1]
+        else:
+            break
+    return word
+
+
+def analyze_hungarian(text: str) -> List[str]:
+    """Tokenek ékezet nélkül, stopszavak nélkül, szótőre hozva"""
+    return [
+        stem_hungarian(token) for token in tokenize(fold_accents(text))
+        if token not in HUNGARIAN_STOPWORDS
+    ]
+
+
+def _field_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple, set)):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+
+def matches_filters(product: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    """
+    Hibrid keresési szűrők egy termék soron.
+
+    Támogatott: category_id, brand, min_price, max_price, in_stock. Hiányzó
+    mező (pl. készlet az RPC eredményben) nem zárja ki a terméket.
+    """
+    if not filters:
+        return True
+    if filters.get("category_id") is not None and "category_id" in product:
+        if str(product["category_id"]) != str(filters["category_id"]):
+            return False
+    if filters.get("brand") and product.get("brand") is not None:
+        if str(product["brand"]).lower() != str(filters["brand"]).lower():
+            return False
+    price = product.get("price")
+    if price is not None:
+        if filters.get("min_price") is not None and float(price) < float(filters["min_price"]):
+            return False
+        if filters.get("max_price") is not None and float(price) > float(filters["max_price"]):
+            return False
+    if filters.get("in_stock") and product.get("stock_quantity") is not None:
+        if float(product["stock_quantity"]) <= 0:
+            return False
+    return True
+
+
+class BM25Index:
+    """
+    BM25 index termékekhez.
+
+    Args:
+        k1: Term frekvencia telítődés
+        b: Dokumentum hossz normalizálás
+        analyzer: Szöveg -> tokenek (alapértelmezés: analyze_hungarian)
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75,
+                 analyzer: Callable[[str], List[str]] = analyze_hungarian):
+        self.k1 = k1
+        self.b = b
+        self.analyzer = analyzer
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._lengths: Dict[str, float] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._total_length = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self._docs)
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._docs)
+
+    @classmethod
+    def from_products(cls, products: Iterable[Dict[str, Any]], **kwargs: Any) -> "BM25Index":
+        index = cls(**kwargs)
+        for product in products:
+            index.upsert(product)
+        return index
+
+    def analyze_product(self, product: Dict[str, Any]) -> Counter:
+        """Súlyozott term frekvenciák egy termékre"""
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in self.analyzer(_field_text(product.get(field))):
+                terms[token] += weight
+        return terms
+
+    def upsert(self, product: Dict[str, Any]) -> bool:
+        """Termék felvétele vagy frissítése (nem aktív termék kikerül)"""
+        product_id = str(product["id"])
+        self.remove(product_id)
+        if product.get("status", "active") != "active":
+            return False
+        terms = self.analyze_product(product)
+        if not terms:
+            return False
+
+        payload = {key: value for key, value in product.items() if key != "embedding"}
+        payload["id"] = product_id
+        self._docs[product_id] = payload
+        self._terms[product_id] = terms
+        length = sum(terms.values())
+        self._lengths[product_id] = length
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[product_id] = frequency
+        return True
+
+    def remove(self, product_id: str) -> bool:
+        product_id = str(product_id)
+        terms = self._terms.pop(product_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(product_id)
+        del self._docs[product_id]
+        return True
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        return self._docs.get(str(product_id))
+
+    def search(self, query_text: str, limit: int = 10,
+               filters: Optional[Dict[str, Any]] = None,
+               match_all: bool = False) -> List[Dict[str, Any]]:
+        """
+        Legjobb BM25 találatok.
+
+        Args:
+            match_all: Csak a kérdés minden szavát tartalmazó termékek
+
+        Returns:
+            Termék sorok bm25_score mezővel, csökkenő sorrendben
+        """
+        query_terms = set(self.analyzer(query_text))
+        if not query_terms or not self._docs or limit <= 0:
+            return []
+
+        count = len(self._docs)
+        average_length = self._total_length / count
+        scores: Dict[str, float] = {}
+        matched: Counter = Counter()
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for product_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[product_id] / average_length)
+                scores[product_id] = scores.get(product_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+                matched[product_id] += 1
+
+        if match_all:
+            scores = {product_id: score for product_id, score in scores.items()
+                      if matched[product_id] == len(query_terms)}
+
+        if filters:
+            scores = {product_id: score for product_id, score in scores.items()
+                      if matches_filters(self._docs[product_id], filters)}
+
+        results = []
+        for product_id, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            item = dict(self._docs[product_id])
+            item["bm25_score"] = score
+            results.append(item)
+        return results
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, Sequence[str]],
+    k: int = RRF_K,
+    weights: Optional[Dict[str, float]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Reciprocal rank fusion: score(d) = sum(weight / (k + rank)).
+
+    Args:
+        rankings: Forrás neve -> azonosítók a legjobbtól kezdve
+        k: Simító konstans (nagyobb k = a mélyebb találatok is számítanak)
+        weights: Forrásonkénti súly (alapértelmezés 1.0)
+
+    Returns:
+        (azonosító, pontszám) párok csökkenő pontszám szerint
+    """
+    scores: Dict[str, float] = {}
+    for source, ranked_ids in rankings.items():
+        weight = (weights or {}).get(source, 1.0)
+        for rank, item_id in enumerate(ranked_ids, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
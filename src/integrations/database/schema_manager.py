@@ -334,11 +334,57 @@ class SchemaManager:
             $$;
             """
             
+            # search_products_tuned RPC függvény: keresési minőség hívásonként
+            # (hnsw.ef_search / ivfflat.probes, exact_search: index nélküli pontos keresés)
+            search_tuned_function = """
+            CREATE OR REPLACE FUNCTION search_products_tuned(
+                query_embedding VECTOR(1536),
+                similarity_threshold FLOAT DEFAULT 0.5,
+                match_count INT DEFAULT 10,
+                ef_search INT DEFAULT 40,
+                probes INT DEFAULT 1,
+                exact_search BOOLEAN DEFAULT false
+            )
+            RETURNS TABLE (
+                id UUID,
+                name TEXT,
+                description TEXT,
+                price DECIMAL(10,2),
+                brand TEXT,
+                category_id UUID,
+                similarity FLOAT,
+                metadata JSONB
+            )
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                -- Tranzakció szintű beállítások: csak erre a hívásra hatnak
+                -- A HNSW index legfeljebb ef_search sort ad vissza (a pgvector maximuma 1000)
+                PERFORM set_config('hnsw.ef_search', LEAST(1000, GREATEST(ef_search, match_count))::TEXT, true);
+                PERFORM set_config('ivfflat.probes', GREATEST(probes, 1)::TEXT, true);
+                IF exact_search THEN
+                    PERFORM set_config('enable_indexscan', 'off', true);
+                END IF;
+                
+                RETURN QUERY
+                SELECT p.id, p.name, p.description, p.price, p.brand, p.category_id,
+                       (1 - (p.embedding <=> query_embedding))::FLOAT, p.metadata
+                FROM products p
+                WHERE p.status = 'active'
+                AND p.embedding IS NOT NULL
+                AND 1 - (p.embedding <=> query_embedding) >= similarity_threshold
+                ORDER BY p.embedding <=> query_embedding
+                LIMIT match_count;
+            END;
+            $$;
+            """
+            
             # Függvények létrehozása
             functions = [
                 search_products_function,
                 search_by_category_function,
-                hybrid_search_function
+                hybrid_search_function,
+                search_tuned_function
             ]
             
             for function_sql in functions:
@@ -495,6 +541,464 @@ class SchemaManager:
             logger.error(f"Hiba a products tábla beállításakor: {e}")
             return False
     
+    def setup_embedding_sync(self) -> bool:
+        """
+        Inkrementális embedding szinkron a products táblához
+        
+        embedding_hash oszlop (a beágyazott szöveg hash-e, csak a változott
+        termékek embeddelődnek újra) és a bulk_update_product_embeddings RPC
+        függvény (egy UPDATE utasítás csomagonként soronkénti update helyett).
+        """
+        try:
+            # embedding_hash oszlop
+            add_embedding_hash_column = """
+            ALTER TABLE products ADD COLUMN IF NOT EXISTS embedding_hash TEXT;
+            """
+            
+            # bulk_update_product_embeddings RPC függvény
+            # updates: [{"id": ..., "embedding": [...], "embedding_hash": ...}, ...]
+            bulk_update_function = """
+            CREATE OR REPLACE FUNCTION bulk_update_product_embeddings(updates JSONB)
+            RETURNS TABLE (id UUID)
+            LANGUAGE SQL
+            AS $$
+            UPDATE products p
+            SET embedding = (u->>'embedding')::VECTOR(1536),
+                embedding_hash = u->>'embedding_hash',
+                updated_at = NOW()
+            FROM jsonb_array_elements(updates) AS u
+            WHERE p.id = (u->>'id')::UUID
+            RETURNING p.id;
+            $$;
+            """
+            
+            # SQL parancsok végrehajtása
+            sql_commands = [
+                add_embedding_hash_column,
+                bulk_update_function
+            ]
+            
+            for sql in sql_commands:
+                try:
+                    result = self.supabase.execute_query(sql)
+                    # Ellenőrizzük, hogy a válasz sikeres-e, még akkor is, ha JSON parsing hiba van
+                    if result is not None or "success" in str(result) or "true" in str(result):
+                        logger.debug("Embedding szinkron SQL parancs végrehajtva")
+                    else:
+                        logger.warning(f"Embedding szinkron SQL hiba: {result}")
+                except Exception as e:
+                    # Ha a hiba JSON parsing hiba, de a művelet sikeres volt
+                    if "JSON could not be generated" in str(e) and ("success" in str(e) or "true" in str(e)):
+                        logger.debug("Embedding szinkron SQL parancs végrehajtva (JSON parsing hiba, de sikeres)")
+                    else:
+                        logger.warning(f"Embedding szinkron SQL hiba: {e}")
+                    continue
+            
+            logger.info("Embedding szinkron séma beállítva")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Hiba az embedding szinkron séma beállításakor: {e}")
+            return False
+    
+    def create_vector_statistics_function(self) -> bool:
+        """
+        Létrehozza a get_vector_statistics RPC függvényt
+        
+        A statisztikák az adatbázisban számolódnak (a válasz mérete nem függ a
+        katalógus méretétől): darabszámok, kategóriánkénti lefedettség, index
+        és tábla állapot; a normák eloszlása BERNOULLI mintavételből.
+        """
+        try:
+            vector_statistics_function = """
+            CREATE OR REPLACE FUNCTION get_vector_statistics(sample_size INT DEFAULT 1000)
+            RETURNS JSONB
+            LANGUAGE plpgsql
+            STABLE
+            AS $$
+            DECLARE
+                total_count BIGINT;
+                active_count BIGINT;
+                embedded_count BIGINT;
+                unhashed_count BIGINT;
+                sample_percent FLOAT;
+            BEGIN
+                SELECT
+                    count(*),
+                    count(*) FILTER (WHERE p.status = 'active'),
+                    count(p.embedding),
+                    count(*) FILTER (WHERE p.embedding IS NOT NULL AND p.embedding_hash IS NULL)
+                INTO total_count, active_count, embedded_count, unhashed_count
+                FROM products p;
+                
+                sample_percent := LEAST(100.0, GREATEST(sample_size, 1) * 100.0 / GREATEST(embedded_count, 1));
+                
+                RETURN jsonb_build_object(
+                    'total_products', total_count,
+                    'active_products', active_count,
+                    'products_with_embedding', embedded_count,
+                    'products_without_embedding', total_count - embedded_count,
+                    'embeddings_without_hash', unhashed_count,
+                    'embedding_dimensions', (
+                        SELECT vector_dims(p.embedding) FROM products p WHERE p.embedding IS NOT NULL LIMIT 1
+                    ),
+                    'norms', (
+                        SELECT jsonb_build_object(
+                            'sample_size', count(*),
+                            'min', min(norm),
+                            'avg', avg(norm),
+                            'max', max(norm),
+                            'stddev', stddev_samp(norm),
+                            'p05', percentile_cont(0.05) WITHIN GROUP (ORDER BY norm),
+                            'p50', percentile_cont(0.5) WITHIN GROUP (ORDER BY norm),
+                            'p95', percentile_cont(0.95) WITHIN GROUP (ORDER BY norm),
+                            'zero_vectors', count(*) FILTER (WHERE norm = 0)
+                        )
+                        FROM (
+                            SELECT vector_norm(p.embedding) AS norm
+                            FROM products p TABLESAMPLE BERNOULLI (sample_percent)
+                            WHERE p.embedding IS NOT NULL
+                            LIMIT sample_size
+                        ) sampled
+                    ),
+                    'categories', (
+                        SELECT coalesce(jsonb_agg(jsonb_build_object(
+                            'category_id', per_category.category_id,
+                            'products', per_category.products,
+                            'with_embedding', per_category.with_embedding
+                        ) ORDER BY per_category.products DESC), '[]'::JSONB)
+                        FROM (
+                            SELECT p.category_id, count(*) AS products, count(p.embedding) AS with_embedding
+                            FROM products p
+                            WHERE p.status = 'active'
+                            GROUP BY p.category_id
+                        ) per_category
+                    ),
+                    'indexes', (
+                        SELECT coalesce(jsonb_agg(jsonb_build_object(
+                            'name', s.indexrelname,
+                            'valid', i.indisvalid,
+                            'ready', i.indisready,
+                            'size_bytes', pg_relation_size(i.indexrelid),
+                            'scans', s.idx_scan
+                        )), '[]'::JSONB)
+                        FROM pg_index i
+                        JOIN pg_stat_user_indexes s ON s.indexrelid = i.indexrelid
+                        WHERE i.indrelid = 'products'::REGCLASS
+                    ),
+                    'table', (
+                        SELECT jsonb_build_object(
+                            'live_rows', t.n_live_tup,
+                            'dead_rows', t.n_dead_tup,
+                            'last_analyze', GREATEST(t.last_analyze, t.last_autoanalyze),
+                            'last_vacuum', GREATEST(t.last_vacuum, t.last_autovacuum)
+                        )
+                        FROM pg_stat_user_tables t
+                        WHERE t.relid = 'products'::REGCLASS
+                    )
+                );
+            END;
+            $$;
+            """
+            
+            try:
+                result = self.supabase.execute_query(vector_statistics_function)
+                # Ellenőrizzük, hogy a válasz sikeres-e, még akkor is, ha JSON parsing hiba van
+                if result is not None or "success" in str(result) or "true" in str(result):
+                    logger.debug("Vector statisztika függvény létrehozva")
+                else:
+                    logger.warning(f"Vector statisztika függvény létrehozási hiba: {result}")
+            except Exception as e:
+                # Ha a hiba JSON parsing hiba, de a művelet sikeres volt
+                if "JSON could not be generated" in str(e) and ("success" in str(e) or "true" in str(e)):
+                    logger.debug("Vector statisztika függvény létrehozva (JSON parsing hiba, de sikeres)")
+                else:
+                    logger.warning(f"Vector statisztika függvény létrehozási hiba: {e}")
+            
+            logger.info("Vector statisztika RPC függvény létrehozva")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Hiba a vector statisztika függvény létrehozásakor: {e}")
+            return False
+    
+    def create_quantized_vector_indexes(self) -> bool:
+        """
+        Kvantált vector indexek és a search_products_quantized RPC függvény
+        
+        pgvector-ban nincs int8 típus: a kompakt reprezentáció halfvec (2x
+        kisebb) vagy binary_quantize bit vektor (32x kisebb) kifejezés index.
+        A jelöltek (match_count * rescore_factor) a kvantált indexből jönnek,
+        a végső sorrend a teljes pontosságú embedding távolsága.
+        """
+        try:
+            # HNSW kifejezés indexek a kvantált reprezentációkra
+            halfvec_index = """
+            CREATE INDEX IF NOT EXISTS idx_products_embedding_halfvec_hnsw
+            ON products
+            USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops)
+            WITH (m = 16, ef_construction = 64);
+            """
+            
+            binary_index = """
+            CREATE INDEX IF NOT EXISTS idx_products_embedding_bit_hnsw
+            ON products
+            USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops)
+            WITH (m = 16, ef_construction = 64);
+            """
+            
+            # search_products_quantized RPC függvény (search_products kimenettel)
+            search_quantized_function = """
+            CREATE OR REPLACE FUNCTION search_products_quantized(
+                query_embedding VECTOR(1536),
+                similarity_threshold FLOAT DEFAULT 0.5,
+                match_count INT DEFAULT 10,
+                rescore_factor INT DEFAULT 4,
+                quantization TEXT DEFAULT 'binary'
+            )
+            RETURNS TABLE (
+                id UUID,
+                name TEXT,
+                description TEXT,
+                price DECIMAL(10,2),
+                brand TEXT,
+                category_id UUID,
+                similarity FLOAT,
+                metadata JSONB
+            )
+            LANGUAGE plpgsql
+            AS $$
+            DECLARE
+                -- A hnsw.ef_search felső határa 1000, több jelöltet az index nem ad
+                candidate_count INT := LEAST(1000, match_count * GREATEST(rescore_factor, 1));
+            BEGIN
+                -- A HNSW index legfeljebb ef_search sort ad vissza
+                PERFORM set_config('hnsw.ef_search', LEAST(1000, GREATEST(40, candidate_count))::TEXT, true);
+                
+                IF quantization = 'halfvec' THEN
+                    RETURN QUERY
+                    WITH candidates AS (
+                        SELECT p.id
+                        FROM products p
+                        WHERE p.status = 'active'
+                        AND p.embedding IS NOT NULL
+                        ORDER BY p.embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+                        LIMIT candidate_count
+                    )
+                    SELECT p.id, p.name, p.description, p.price, p.brand, p.category_id,
+                           (1 - (p.embedding <=> query_embedding))::FLOAT, p.metadata
+                    FROM products p
+                    JOIN candidates c ON c.id = p.id
+                    WHERE 1 - (p.embedding <=> query_embedding) >= similarity_threshold
+                    ORDER BY p.embedding <=> query_embedding
+                    LIMIT match_count;
+                ELSE
+                    RETURN QUERY
+                    WITH candidates AS (
+                        SELECT p.id
+                        FROM products p
+                        WHERE p.status = 'active'
+                        AND p.embedding IS NOT NULL
+                        ORDER BY binary_quantize(p.embedding)::bit(1536) <~> binary_quantize(query_embedding)
+                        LIMIT candidate_count
+                    )
+                    SELECT p.id, p.name, p.description, p.price, p.brand, p.category_id,
+                           (1 - (p.embedding <=> query_embedding))::FLOAT, p.metadata
+                    FROM products p
+                    JOIN candidates c ON c.id = p.id
+                    WHERE 1 - (p.embedding <=> query_embedding) >= similarity_threshold
+                    ORDER BY p.embedding <=> query_embedding
+                    LIMIT match_count;
+                END IF;
+            END;
+            $$;
+            """
+            
+            # SQL parancsok végrehajtása
+            sql_commands = [
+                halfvec_index,
+                binary_index,
+                search_quantized_function
+            ]
+            
+            for sql in sql_commands:
+                try:
+                    result = self.supabase.execute_query(sql)
+                    # Ellenőrizzük, hogy a válasz sikeres-e, még akkor is, ha JSON parsing hiba van
+                    if result is not None or "success" in str(result) or "true" in str(result):
+                        logger.debug("Kvantált vector search SQL parancs végrehajtva")
+                    else:
+                        logger.warning(f"Kvantált vector search SQL hiba: {result}")
+                except Exception as e:
+                    # Ha a hiba JSON parsing hiba, de a művelet sikeres volt
+                    if "JSON could not be generated" in str(e) and ("success" in str(e) or "true" in str(e)):
+                        logger.debug("Kvantált vector search SQL parancs végrehajtva (JSON parsing hiba, de sikeres)")
+                    else:
+                        logger.warning(f"Kvantált vector search SQL hiba: {e}")
+                    continue
+            
+            logger.info("Kvantált vector indexek és search_products_quantized létrehozva")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Hiba a kvantált vector indexek létrehozásakor: {e}")
+            return False
+    
+    def setup_hungarian_full_text_search(self) -> bool:
+        """
+        Magyar full-text keresés a products táblához
+        
+        unaccent + hungarian_stem text search konfiguráció, triggerrel
+        karbantartott, GIN indexelt search_vector oszlop és a
+        search_products_text RPC függvény (embedding nélküli kulcsszavas keresés).
+        """
+        try:
+            # unaccent extension
+            unaccent_extension = "CREATE EXTENSION IF NOT EXISTS unaccent;"
+            
+            # Ékezet független magyar konfiguráció: előbb unaccent, utána snowball szótövezés
+            text_search_configuration = """
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_ts_config WHERE cfgname = 'hungarian_unaccent'
+                ) THEN
+                    CREATE TEXT SEARCH CONFIGURATION hungarian_unaccent (COPY = pg_catalog.hungarian);
+                    ALTER TEXT SEARCH CONFIGURATION hungarian_unaccent
+                        ALTER MAPPING FOR hword, hword_part, word
+                        WITH unaccent, hungarian_stem;
+                END IF;
+            END $$;
+            """
+            
+            # search_vector oszlop
+            add_search_vector_column = """
+            ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+            """
+            
+            # Súlyozott tsvector: név (A), márka és címkék (B), rövid leírás (C), leírás (D)
+            create_search_vector_trigger = """
+            CREATE OR REPLACE FUNCTION update_products_search_vector()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('hungarian_unaccent', coalesce(NEW.name, '')), 'A') ||
+                    setweight(to_tsvector('hungarian_unaccent', coalesce(NEW.brand, '')), 'B') ||
+                    setweight(to_tsvector('hungarian_unaccent', array_to_string(coalesce(NEW.tags, '{}'), ' ')), 'B') ||
+                    setweight(to_tsvector('hungarian_unaccent', coalesce(NEW.short_description, '')), 'C') ||
+                    setweight(to_tsvector('hungarian_unaccent', coalesce(NEW.description, '')), 'D');
+                RETURN NEW;
+            END;
+            $$ language 'plpgsql';
+            
+            DROP TRIGGER IF EXISTS update_products_search_vector ON products;
+            CREATE TRIGGER update_products_search_vector
+                BEFORE INSERT OR UPDATE OF name, brand, tags, short_description, description ON products
+                FOR EACH ROW
+                EXECUTE FUNCTION update_products_search_vector();
+            """
+            
+            # Meglévő termékek feltöltése (a trigger számolja ki)
+            backfill_search_vector = """
+            UPDATE products SET name = name WHERE search_vector IS NULL;
+            """
+            
+            # GIN index
+            search_vector_index = """
+            CREATE INDEX IF NOT EXISTS idx_products_search_vector
+            ON products
+            USING GIN (search_vector);
+            """
+            
+            # search_products_text RPC függvény (match_all = FALSE: bármely szó elég)
+            search_products_text_function = """
+            CREATE OR REPLACE FUNCTION search_products_text(
+                query_text TEXT,
+                search_filters JSONB DEFAULT '{}',
+                match_count INT DEFAULT 10,
+                match_all BOOLEAN DEFAULT TRUE
+            )
+            RETURNS TABLE (
+                id UUID,
+                name TEXT,
+                description TEXT,
+                short_description TEXT,
+                price DECIMAL(10,2),
+                brand TEXT,
+                category_id UUID,
+                tags TEXT[],
+                stock_quantity INTEGER,
+                rank FLOAT,
+                metadata JSONB
+            )
+            LANGUAGE SQL
+            STABLE
+            AS $$
+            WITH q AS (
+                SELECT CASE
+                    WHEN match_all THEN websearch_to_tsquery('hungarian_unaccent', query_text)
+                    ELSE replace(plainto_tsquery('hungarian_unaccent', query_text)::TEXT, ' & ', ' | ')::TSQUERY
+                END AS query
+            )
+            SELECT
+                p.id,
+                p.name,
+                p.description,
+                p.short_description,
+                p.price,
+                p.brand,
+                p.category_id,
+                p.tags,
+                p.stock_quantity,
+                ts_rank_cd(p.search_vector, q.query)::FLOAT AS rank,
+                p.metadata
+            FROM products p, q
+            WHERE p.status = 'active'
+            AND p.search_vector @@ q.query
+            AND (search_filters->>'category_id' IS NULL OR p.category_id = (search_filters->>'category_id')::UUID)
+            AND (search_filters->>'brand' IS NULL OR p.brand = search_filters->>'brand')
+            AND (search_filters->>'min_price' IS NULL OR p.price >= (search_filters->>'min_price')::DECIMAL)
+            AND (search_filters->>'max_price' IS NULL OR p.price <= (search_filters->>'max_price')::DECIMAL)
+            AND (NOT coalesce((search_filters->>'in_stock')::BOOLEAN, FALSE) OR p.stock_quantity > 0)
+            ORDER BY rank DESC
+            LIMIT match_count;
+            $$;
+            """
+            
+            # SQL parancsok végrehajtása
+            sql_commands = [
+                unaccent_extension,
+                text_search_configuration,
+                add_search_vector_column,
+                create_search_vector_trigger,
+                backfill_search_vector,
+                search_vector_index,
+                search_products_text_function
+            ]
+            
+            for sql in sql_commands:
+                try:
+                    result = self.supabase.execute_query(sql)
+                    # Ellenőrizzük, hogy a válasz sikeres-e, még akkor is, ha JSON parsing hiba van
+                    if result is not None or "success" in str(result) or "true" in str(result):
+                        logger.debug("Full-text SQL parancs végrehajtva")
+                    else:
+                        logger.warning(f"Full-text SQL hiba: {result}")
+                except Exception as e:
+                    # Ha a hiba JSON parsing hiba, de a művelet sikeres volt
+                    if "JSON could not be generated" in str(e) and ("success" in str(e) or "true" in str(e)):
+                        logger.debug("Full-text SQL parancs végrehajtva (JSON parsing hiba, de sikeres)")
+                    else:
+                        logger.warning(f"Full-text SQL hiba: {e}")
+                    continue
+            
+            logger.info("Magyar full-text keresés beállítva")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Hiba a full-text keresés beállításakor: {e}")
+            return False
+    
     def setup_user_preferences_table(self) -> bool:
         """Beállítja a user_preferences táblát"""
         try:
@@ -627,6 +1131,18 @@ class SchemaManager:
             # 4. Vector search függvények
             results["vector_search_functions"] = self.create_vector_search_functions()
             
+            # 5. Magyar full-text keresés (tsvector + GIN + search_products_text RPC)
+            results["full_text_search"] = self.setup_hungarian_full_text_search()
+            
+            # 6. Inkrementális embedding szinkron (embedding_hash + bulk update RPC)
+            results["embedding_sync"] = self.setup_embedding_sync()
+            
+            # 7. Szerver oldali vector statisztikák (get_vector_statistics RPC)
+            results["vector_statistics_function"] = self.create_vector_statistics_function()
+            
+            # 8. Kvantált vector indexek (halfvec / bit) és újrapontozó RPC
+            results["quantized_vector_search"] = self.create_quantized_vector_indexes()
+            
             # Összefoglaló
             success_count = sum(1 for success in results.values() if success)
             total_count = len(results)
@@ -6,11 +6,15 @@ This module provides a Supabase client wrapper with:
 - Authentication handling
 - Error handling and retry logic
 - Configuration management
+- Async PostgREST clients on one shared, pooled HTTP/2 connection pool
 """
 
 import os
 import logging
 from typing import Optional, Dict, Any
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from supabase import create_client, Client
 from supabase.lib.client_options import ClientOptions
 from pydantic import BaseModel, Field
@@ -22,6 +26,11 @@ logger = get_logger(__name__)
 # Global Supabase client instance
 _supabase_client_instance: Optional['SupabaseClient'] = None
 
+# Az async PostgREST kliensek közös HTTP/2 connection pool-ja (folyamatonként egy)
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+CLIENT_INFO_HEADER = "chatbuddy-mvp/1.0.0"
+
 def get_supabase_client() -> 'SupabaseClient':
     """Visszaadja a globális Supabase client instance-t"""
     global _supabase_client_instance
@@ -30,12 +39,43 @@ def get_supabase_client() -> 'SupabaseClient':
     return _supabase_client_instance
 
 
+def get_async_http_client(pool_size: int = 20, timeout: float = 30.0) -> httpx.AsyncClient:
+    """
+    Visszaadja a közös async HTTP/2 klienst
+    
+    Az első hívás paraméterei (pool méret, timeout) határozzák meg a pool-t;
+    HTTP/2-n a párhuzamos kérések kevés kapcsolaton multiplexelődnek.
+    """
+    global _async_http_client
+    if _async_http_client is None or _async_http_client.is_closed:
+        _async_http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            follow_redirects=True
+        )
+        logger.info(f"Async adatbázis HTTP pool létrehozva (pool méret: {pool_size})")
+    return _async_http_client
+
+
+async def shutdown_async_database_clients():
+    """Lezárja a közös async HTTP pool-t (alkalmazás leállításakor)"""
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+    if _supabase_client_instance is not None:
+        _supabase_client_instance._async_clients.clear()
+
+
 class SupabaseConfig(BaseModel):
     """Supabase konfiguráció"""
     url: str = Field(..., description="Supabase projekt URL")
     key: str = Field(..., description="Supabase API kulcs")
     service_role_key: Optional[str] = Field(default=None, description="Service role kulcs")
     openai_api_key: Optional[str] = Field(default=None, description="OpenAI API kulcs")
+    pool_size: int = Field(default=20, description="Async HTTP connection pool mérete")
+    http_timeout: float = Field(default=30.0, description="Async adatbázis kérések timeout-ja (s)")
     
     class Config:
         env_prefix = "SUPABASE_"
@@ -48,6 +88,8 @@ class SupabaseClient:
         """Inicializálja a Supabase klienst"""
         self.config = config or self._load_config()
         self.client: Optional[Client] = None
+        self._service_client: Optional[Client] = None
+        self._async_clients: Dict[bool, AsyncPostgrestClient] = {}
         self._initialize_client()
     
     def _load_config(self) -> SupabaseConfig:
@@ -55,7 +97,9 @@ class SupabaseClient:
         return SupabaseConfig(
             url=os.getenv("SUPABASE_URL", ""),
             key=os.getenv("SUPABASE_ANON_KEY", ""),
-            service_role_key=os.getenv("SUPABASE_SERVICE_KEY")
+            service_role_key=os.getenv("SUPABASE_SERVICE_KEY"),
+            pool_size=int(os.getenv("SUPABASE_POOL_SIZE", "20")),
+            http_timeout=float(os.getenv("SUPABASE_HTTP_TIMEOUT", "30"))
         )
     
     def _initialize_client(self):
@@ -69,7 +113,7 @@ class SupabaseClient:
             options = ClientOptions(
                 schema="public",
                 headers={
-                    "X-Client-Info": "chatbuddy-mvp/1.0.0"
+                    "X-Client-Info": CLIENT_INFO_HEADER
                 }
             )
             
@@ -98,22 +142,55 @@ class SupabaseClient:
         return self.client
     
     def get_service_client(self) -> Client:
-        """Visszaadja a service role klienst"""
+        """Visszaadja a service role klienst (egyszer jön létre)"""
         if not self.config.service_role_key:
             raise ValueError("Service role kulcs nincs beállítva")
         
-        options = ClientOptions(
-            schema="public",
-            headers={
-                "X-Client-Info": "chatbuddy-mvp/1.0.0"
-            }
-        )
+        if self._service_client is None:
+            options = ClientOptions(
+                schema="public",
+                headers={
+                    "X-Client-Info": CLIENT_INFO_HEADER
+                }
+            )
+            
+            self._service_client = create_client(
+                self.config.url,
+                self.config.service_role_key,
+                options=options
+            )
+        return self._service_client
+    
+    def get_async_client(self, service_role: bool = False) -> AsyncPostgrestClient:
+        """
+        Visszaadja az async PostgREST klienst
         
-        return create_client(
-            self.config.url,
-            self.config.service_role_key,
-            options=options
-        )
+        A lekérdezések ugyanazzal a builder API-val készülnek, mint a
+        szinkron kliensnél, de az `await ....execute()` nem blokkolja az
+        event loop-ot. Minden kliens a közös HTTP/2 pool-t használja.
+        Mock módban (hiányzó konfiguráció) a get_client mock kliensét adja.
+        """
+        key = self.config.service_role_key if service_role else self.config.key
+        if service_role and not key:
+            raise ValueError("Service role kulcs nincs beállítva")
+        if not self.config.url or not key:
+            return self.get_client()
+        
+        client = self._async_clients.get(service_role)
+        if client is None:
+            client = AsyncPostgrestClient(
+                f"{self.config.url.rstrip('/')}/rest/v1",
+                schema="public",
+                headers={
+                    **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                    "apikey": key,
+                    "Authorization": f"Bearer {key}",
+                    "X-Client-Info": CLIENT_INFO_HEADER
+                },
+                http_client=get_async_http_client(self.config.pool_size, self.config.http_timeout)
+            )
+            self._async_clients[service_role] = client
+        return client
     
     def test_connection(self) -> bool:
         """Teszteli a kapcsolatot"""
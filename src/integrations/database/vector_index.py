@@ -0,0 +1,513 @@
+"""
+In-process vector index for product embeddings.
+
+pgvector (Supabase) remains the source of truth; this index is a local
+replica of products.embedding so similarity search does not need a network
+round trip:
+- HNSW graph via hnswlib when installed, otherwise an exact numpy scan
+  (fast enough for catalogs of tens of thousands of products)
+- Incremental upsert / remove on product changes
+- Category, price and stock filters evaluated on columnar numpy arrays
+- Disk snapshot whose vector matrix is memory-mapped on load
+- Optional int8 / binary quantized copies for the flat scan: candidates
+  come from the compact codes, the full vectors only rescore them
+"""
+
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config.logging import get_logger
+
+try:
+    import hnswlib
+except ImportError:  # Opcionális függőség - nélküle pontos numpy keresés
+    hnswlib = None
+
+logger = get_logger(__name__)
+
+# A search_products RPC által visszaadott termék mezők
+# (plusz a hibrid keresés szöveges indexéhez szükséges mezők)
+PAYLOAD_FIELDS = ("id", "name", "description", "price", "brand", "category_id", "metadata",
+                  "short_description", "tags", "stock_quantity")
+
+SNAPSHOT_VECTORS = "vectors.npy"
+SNAPSHOT_META = "meta.json"
+SNAPSHOT_HNSW = "hnsw.bin"
+SNAPSHOT_CODES = "codes.npy"
+
+QUANTIZATIONS = ("int8", "binary")
+
+# Kvantált kódok pontozása ennyi soros blokkokban (korlátos átmeneti memória)
+SCAN_BLOCK_ROWS = 4096
+
+# Bájtonkénti 1-es bitek száma (numpy < 2.0, ahol nincs np.bitwise_count)
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _parse_embedding(embedding: Any) -> Optional[np.ndarray]:
+    """pgvector érték (lista vagy PostgREST szöveg "[0.1,...]") -> float32 vektor"""
+    if embedding is None:
+        return None
+    if isinstance(embedding, str):
+        embedding = json.loads(embedding)
+    vector = np.asarray(embedding, dtype=np.float32)
+    return vector if vector.size else None
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT[values]
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class ProductVectorIndex:
+    """
+    Termék embedding index koszinusz hasonlósággal.
+
+    Args:
+        dimension: Embedding dimenzió
+        backend: "auto" (hnsw ha elérhető), "hnsw" vagy "flat"
+        initial_capacity: Kezdeti sorok száma (automatikusan nő)
+        m: HNSW kapcsolatok száma csúcsonként
+        ef_construction: HNSW építési pontosság
+        ef_search: HNSW keresési pontosság
+        quantization: None, "int8" (4x kisebb) vagy "binary" (32x kisebb)
+            kvantált másolat a flat kereséshez
+        rescore_factor: Kvantált keresésnél limit * rescore_factor jelölt
+            kerül teljes pontosságú újrapontozásra
+    """
+
+    def __init__(self, dimension: int = 1536, backend: str = "auto", initial_capacity: int = 1024,
+                 m: int = 16, ef_construction: int = 200, ef_search: int = 64,
+                 quantization: Optional[str] = None, rescore_factor: int = 4):
+        if quantization is not None and quantization not in QUANTIZATIONS:
+            raise ValueError(f"Ismeretlen kvantálás: {quantization}")
+        if quantization is not None and backend == "hnsw":
+            raise ValueError("A kvantálás a flat backenddel használható")
+        if backend == "hnsw" and hnswlib is None:
+            raise ImportError("A hnsw backendhez a hnswlib csomag szükséges")
+        if backend not in ("auto", "hnsw", "flat"):
+            raise ValueError(f"Ismeretlen vector index backend: {backend}")
+        self.dimension = dimension
+        # Kvantált kódokkal a flat scan fut (a gráf a teljes vektorokat tartaná memóriában)
+        self.backend = "hnsw" if backend != "flat" and quantization is None and hnswlib is not None else "flat"
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+
+        self._count = 0
+        self._vectors = np.zeros((initial_capacity, dimension), dtype=np.float32)
+        self._live = np.zeros(initial_capacity, dtype=bool)
+        self._price = np.full(initial_capacity, math.nan)
+        self._stock = np.full(initial_capacity, math.nan)
+        self._category: List[Optional[str]] = []
+        self._ids: List[str] = []
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}  # Termék -> sor (törölt termékeké is, újrafelhasználáshoz)
+        self._graph = self._new_graph(initial_capacity) if self.backend == "hnsw" else None
+        self._codes = self._new_codes(initial_capacity)
+        self._scales = np.zeros(initial_capacity if quantization == "int8" else 0, dtype=np.float32)
+
+    @property
+    def size(self) -> int:
+        """Indexelt (nem törölt) termékek száma"""
+        return int(self._live[:self._count].sum())
+
+    @property
+    def ready(self) -> bool:
+        """Használható-e keresésre"""
+        return self.size > 0
+
+    def __contains__(self, product_id: str) -> bool:
+        row = self._rows.get(str(product_id))
+        return row is not None and bool(self._live[row])
+
+    # Módosítás
+
+    def upsert(self, product: Dict[str, Any], embedding: Any = None) -> bool:
+        """
+        Termék felvétele vagy frissítése.
+
+        Nem aktív vagy embedding nélküli termék kikerül az indexből.
+
+        Args:
+            product: Termék sor (id, name, price, category_id, stock_quantity, status, ...)
+            embedding: Embedding (alapértelmezés: product["embedding"])
+        """
+        product_id = str(product["id"])
+        vector = _parse_embedding(embedding if embedding is not None else product.get("embedding"))
+        if vector is None or product.get("status", "active") != "active":
+            self.remove(product_id)
+            return False
+        if vector.shape != (self.dimension,):
+            raise ValueError(f"Hibás embedding dimenzió: {vector.shape[0]} (várt: {self.dimension})")
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            self.remove(product_id)
+            return False
+
+        row = self._rows.get(product_id)
+        if row is None:
+            row = self._append_row(product_id)
+        self._vectors[row] = vector / norm
+        if self.quantization is not None:
+            self._encode_row(row)
+        self._live[row] = True
+        self._price[row] = _to_float(product.get("price"))
+        self._stock[row] = _to_float(product.get("stock_quantity"))
+        self._category[row] = str(product["category_id"]) if product.get("category_id") is not None else None
+        self._payloads[row] = {field: product.get(field) for field in PAYLOAD_FIELDS}
+        self._payloads[row]["id"] = product_id
+
+        if self._graph is not None:
+            # Meglévő címke esetén a hnswlib frissíti a pontot (és törölt jelölését is leveszi)
+            self._graph.add_items(self._vectors[row:row + 1], np.array([row]))
+        return True
+
+    def update_attributes(self, product: Dict[str, Any]) -> bool:
+        """
+        Szűrő és payload mezők frissítése újra-embeddelés nélkül (ár, készlet, státusz szinkron).
+
+        Csak a product-ban szereplő mezők változnak; nem aktív termék kikerül az indexből.
+
+        Returns:
+            A termék benne van-e (még) az indexben
+        """
+        product_id = str(product["id"])
+        row = self._rows.get(product_id)
+        if row is None or not self._live[row]:
+            return False
+        if product.get("status", "active") != "active":
+            self.remove(product_id)
+            return False
+
+        if "price" in product:
+            self._price[row] = _to_float(product["price"])
+        if "stock_quantity" in product:
+            self._stock[row] = _to_float(product["stock_quantity"])
+        if "category_id" in product:
+            self._category[row] = str(product["category_id"]) if product["category_id"] is not None else None
+        self._payloads[row].update({field: product[field] for field in PAYLOAD_FIELDS
+                                    if field in product and field != "id"})
+        return True
+
+    def upsert_many(self, products: Sequence[Dict[str, Any]]) -> int:
+        """Több termék felvétele; visszaadja az indexelt termékek számát"""
+        return sum(1 for product in products if self.upsert(product))
+
+    def remove(self, product_id: str) -> bool:
+        """Termék eltávolítása (a sor újrafelhasználódik, ha a termék visszatér)"""
+        row = self._rows.get(str(product_id))
+        if row is None or not self._live[row]:
+            return False
+        self._live[row] = False
+        self._payloads[row] = None
+        if self._graph is not None:
+            self._graph.mark_deleted(row)
+        return True
+
+    def _append_row(self, product_id: str) -> int:
+        if self._count == len(self._live):
+            self._grow(max(1024, self._count * 2))
+        row = self._count
+        self._count += 1
+        self._ids.append(product_id)
+        self._category.append(None)
+        self._payloads.append(None)
+        self._rows[product_id] = row
+        return row
+
+    def _grow(self, capacity: int):
+        extra = capacity - len(self._live)
+        self._vectors = np.concatenate([self._vectors, np.zeros((extra, self.dimension), dtype=np.float32)])
+        self._live = np.concatenate([self._live, np.zeros(extra, dtype=bool)])
+        self._price = np.concatenate([self._price, np.full(extra, math.nan)])
+        self._stock = np.concatenate([self._stock, np.full(extra, math.nan)])
+        if self._codes is not None:
+            self._codes = np.concatenate([self._codes, self._new_codes(extra)])
+        if self.quantization == "int8":
+            self._scales = np.concatenate([self._scales, np.zeros(extra, dtype=np.float32)])
+        if self._graph is not None:
+            self._graph.resize_index(capacity)
+
+    # Kvantálás
+
+    def _new_codes(self, rows: int) -> Optional[np.ndarray]:
+        if self.quantization == "int8":
+            return np.zeros((rows, self.dimension), dtype=np.int8)
+        if self.quantization == "binary":
+            return np.zeros((rows, (self.dimension + 7) // 8), dtype=np.uint8)
+        return None
+
+    def _quantize(self, vectors: np.ndarray):
+        """Egységvektorok -> (kódok, skálák); int8: soronkénti max-abs skála, binary: előjel bitek"""
+        if self.quantization == "binary":
+            return np.packbits(vectors > 0, axis=-1), None
+        scales = np.abs(vectors).max(axis=-1, keepdims=True) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales).astype(np.int8)
+        return codes, scales[..., 0].astype(np.float32)
+
+    def _encode_row(self, row: int):
+        codes, scales = self._quantize(self._vectors[row])
+        self._codes[row] = codes
+        if scales is not None:
+            self._scales[row] = scales
+
+    def _encode_all(self):
+        """Kódok újraszámolása a vektor mátrixból (blokkonként, memory-mapped mátrixon is)"""
+        self._codes = self._new_codes(self._count)
+        if self.quantization == "int8":
+            self._scales = np.zeros(self._count, dtype=np.float32)
+        for start in range(0, self._count, SCAN_BLOCK_ROWS):
+            block = np.asarray(self._vectors[start:start + SCAN_BLOCK_ROWS])
+            codes, scales = self._quantize(block)
+            self._codes[start:start + len(block)] = codes
+            if scales is not None:
+                self._scales[start:start + len(block)] = scales
+
+    def _coarse_scores(self, query: np.ndarray) -> np.ndarray:
+        """Közelítő pontszám minden sorra a kódokból (nagyobb = hasonlóbb)"""
+        scores = np.empty(self._count, dtype=np.float32)
+        query_code = np.packbits(query > 0) if self.quantization == "binary" else None
+        for start in range(0, self._count, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, self._count)
+            block = self._codes[start:end]
+            if query_code is not None:
+                # Hamming távolság: eltérő bitek száma
+                scores[start:end] = -_popcount(block ^ query_code).sum(axis=1, dtype=np.int32)
+            else:
+                scores[start:end] = (block @ query) * self._scales[start:end]
+        return scores
+
+    def _new_graph(self, capacity: int):
+        graph = hnswlib.Index(space="cosine", dim=self.dimension)
+        graph.init_index(max_elements=capacity, M=self.m, ef_construction=self.ef_construction,
+                         allow_replace_deleted=False)
+        graph.set_ef(self.ef_search)
+        return graph
+
+    # Keresés
+
+    def filter_mask(self, filters: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Élő sorok maszkja a szűrőkkel.
+
+        Támogatott szűrők: category_id, brand, min_price, max_price, in_stock
+        """
+        mask = self._live[:self._count].copy()
+        if not filters:
+            return mask
+        if filters.get("category_id") is not None:
+            category = str(filters["category_id"])
+            mask &= np.fromiter((value == category for value in self._category), dtype=bool, count=self._count)
+        if filters.get("brand"):
+            brand = str(filters["brand"]).lower()
+            mask &= np.fromiter(
+                (payload is not None and str(payload.get("brand") or "").lower() == brand
+                 for payload in self._payloads),
+                dtype=bool, count=self._count
+            )
+        if filters.get("min_price") is not None:
+            mask &= self._price[:self._count] >= float(filters["min_price"])
+        if filters.get("max_price") is not None:
+            mask &= self._price[:self._count] <= float(filters["max_price"])
+        if filters.get("in_stock"):
+            mask &= self._stock[:self._count] > 0
+        return mask
+
+    def search(self, query_embedding: Any, limit: int = 10, similarity_threshold: float = 0.0,
+               filters: Optional[Dict[str, Any]] = None, ef_search: Optional[int] = None,
+               exact: bool = False) -> List[Dict[str, Any]]:
+        """
+        Legközelebbi termékek a search_products RPC formátumában.
+
+        Args:
+            ef_search: HNSW keresési pontosság erre a hívásra (None: az index beállítása)
+            exact: Pontos flat scan a teljes vektorokon (HNSW gráf és kódok nélkül)
+
+        Returns:
+            Termék sorok similarity és similarity_score mezővel, csökkenő sorrendben
+        """
+        query = _parse_embedding(query_embedding)
+        if query is None or limit <= 0 or not self.ready:
+            return []
+        norm = float(np.linalg.norm(query))
+        if not norm:
+            return []
+        query = query / norm
+
+        mask = self.filter_mask(filters)
+        candidates = int(mask.sum())
+        if not candidates:
+            return []
+
+        rows = None
+        if self._graph is not None and not exact:
+            k = min(limit, candidates)
+            if ef_search is not None:
+                self._graph.set_ef(max(ef_search, k))
+            try:
+                labels, distances = self._graph.knn_query(query, k=k, filter=lambda label: bool(mask[label]))
+                rows, similarities = labels[0], 1.0 - distances[0]
+            except RuntimeError:
+                # Szűk szűrőnél a gráfbejárás k-nál kevesebb elemet ér el - pontos scan a szűrt sorokon
+                logger.debug(f"HNSW szűrt keresés {k} helyett kevesebb találatot ért el, pontos scan")
+            finally:
+                if ef_search is not None:
+                    self._graph.set_ef(self.ef_search)
+
+        if rows is None and self.quantization is not None and not exact:
+            # Jelöltek a kódokból, újrapontozás csak rájuk a teljes vektorokkal
+            scores = self._coarse_scores(query)
+            scores[~mask] = -np.inf
+            shortlist = np.argpartition(-scores, min(limit * self.rescore_factor, candidates) - 1)[
+                :min(limit * self.rescore_factor, candidates)
+            ]
+            shortlist.sort()
+            exact = np.asarray(self._vectors[shortlist]) @ query
+            k = min(limit, len(shortlist))
+            order = np.argsort(-exact)[:k]
+            rows, similarities = shortlist[order], exact[order]
+        elif rows is None:
+            scores = self._vectors[:self._count] @ query
+            scores[~mask] = -np.inf
+            k = min(limit, candidates)
+            rows = np.argpartition(-scores, k - 1)[:k]
+            rows = rows[np.argsort(-scores[rows])]
+            similarities = scores[rows]
+
+        results = []
+        for row, similarity in zip(rows, similarities):
+            similarity = float(similarity)
+            if similarity < similarity_threshold:
+                continue
+            item = dict(self._payloads[int(row)])
+            item["similarity"] = similarity
+            item["similarity_score"] = similarity
+            results.append(item)
+        return results
+
+    def products(self) -> List[Dict[str, Any]]:
+        """Indexelt termékek (payload) - pl. a szöveges index újraépítéséhez"""
+        return [dict(payload) for payload in self._payloads if payload is not None]
+
+    # Snapshot
+
+    def save(self, path: str):
+        """Snapshot mentése egy könyvtárba (vektor mátrix .npy, metaadat JSON, HNSW gráf)"""
+        os.makedirs(path, exist_ok=True)
+        vectors_path = os.path.join(path, SNAPSHOT_VECTORS)
+        with open(vectors_path + ".tmp", "wb") as handle:
+            np.save(handle, self._vectors[:self._count])
+        os.replace(vectors_path + ".tmp", vectors_path)
+
+        if self._graph is not None:
+            graph_path = os.path.join(path, SNAPSHOT_HNSW)
+            self._graph.save_index(graph_path + ".tmp")
+            os.replace(graph_path + ".tmp", graph_path)
+
+        if self.quantization is not None:
+            codes_path = os.path.join(path, SNAPSHOT_CODES)
+            with open(codes_path + ".tmp", "wb") as handle:
+                np.save(handle, self._codes[:self._count])
+            os.replace(codes_path + ".tmp", codes_path)
+
+        meta = {
+            "dimension": self.dimension,
+            "backend": self.backend,
+            "quantization": self.quantization,
+            "scales": self._scales[:self._count].tolist() if self.quantization == "int8" else None,
+            "ids": self._ids,
+            "live": self._live[:self._count].tolist(),
+            "price": [None if math.isnan(value) else value for value in self._price[:self._count].tolist()],
+            "stock": [None if math.isnan(value) else value for value in self._stock[:self._count].tolist()],
+            "category": self._category,
+            "payloads": self._payloads
+        }
+        meta_path = os.path.join(path, SNAPSHOT_META)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump(meta, handle, ensure_ascii=False, default=str)
+        os.replace(meta_path + ".tmp", meta_path)
+        logger.info(f"Vector index snapshot mentve: {path} ({self.size} termék)")
+
+    @classmethod
+    def load(cls, path: str, backend: str = "auto", **kwargs: Any) -> "ProductVectorIndex":
+        """
+        Snapshot betöltése.
+
+        A vektor mátrix memory-mapped (copy-on-write): a betöltés nem másolja a
+        teljes mátrixot, a későbbi módosítások csak a memóriában történnek.
+        Kvantált indexnél a kompakt kódok a memóriába töltődnek, a teljes
+        vektorokból csak az újrapontozott jelöltek sorai olvasódnak.
+        """
+        with open(os.path.join(path, SNAPSHOT_META), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        vectors = np.load(os.path.join(path, SNAPSHOT_VECTORS), mmap_mode="c")
+
+        index = cls(dimension=meta["dimension"], backend=backend, initial_capacity=0, **kwargs)
+        index._count = len(meta["ids"])
+        index._vectors = vectors
+        index._live = np.array(meta["live"], dtype=bool)
+        index._price = np.array([_to_float(value) for value in meta["price"]])
+        index._stock = np.array([_to_float(value) for value in meta["stock"]])
+        index._category = meta["category"]
+        index._ids = meta["ids"]
+        index._payloads = meta["payloads"]
+        index._rows = {product_id: row for row, product_id in enumerate(index._ids)}
+
+        if index.quantization is not None:
+            codes_path = os.path.join(path, SNAPSHOT_CODES)
+            if meta.get("quantization") == index.quantization and os.path.exists(codes_path):
+                index._codes = np.load(codes_path)
+                if index.quantization == "int8":
+                    index._scales = np.array(meta["scales"], dtype=np.float32)
+            else:
+                index._encode_all()
+
+        if index.backend == "hnsw":
+            index._graph = index._load_graph(path, meta)
+        logger.info(f"Vector index snapshot betöltve: {path} ({index.size} termék, {index.backend})")
+        return index
+
+    def _load_graph(self, path: str, meta: Dict[str, Any]):
+        capacity = max(1024, self._count)
+        graph_path = os.path.join(path, SNAPSHOT_HNSW)
+        if meta.get("backend") == "hnsw" and os.path.exists(graph_path):
+            graph = hnswlib.Index(space="cosine", dim=self.dimension)
+            graph.load_index(graph_path, max_elements=capacity)
+            graph.set_ef(self.ef_search)
+            return graph
+        # Flat snapshot: gráf újraépítése a vektorokból
+        graph = self._new_graph(capacity)
+        live_rows = np.flatnonzero(self._live)
+        if live_rows.size:
+            graph.add_items(np.asarray(self._vectors[live_rows]), live_rows)
+        return graph
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index statisztikák"""
+        return {
+            "backend": self.backend,
+            "products": self.size,
+            "rows": self._count,
+            "dimension": self.dimension,
+            "memory_mapped": isinstance(self._vectors, np.memmap),
+            "quantization": self.quantization,
+            "vector_bytes": int(self._vectors[:self._count].nbytes),
+            "code_bytes": int(self._codes[:self._count].nbytes + self._scales[:self._count].nbytes)
+            if self._codes is not None else 0
+        }
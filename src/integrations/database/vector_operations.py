@@ -2,35 +2,155 @@
 Vector operations for Chatbuddy MVP.
 
 This module provides vector database operations:
-- OpenAI embeddings generation
+- OpenAI embeddings generation (concurrent single requests micro-batched)
 - Vector similarity search
 - Batch processing
 - Performance optimization
+- Incremental re-embedding: products.embedding_hash records the embedded
+  text, unchanged products are skipped, writes go out as chunked bulk updates
+- Optional in-process ANN index (pgvector stays the source of truth)
+- Hybrid search: BM25 / text matches fused with vector results (RRF)
+- Hungarian full-text search (search_products_text RPC / local BM25), keyword
+  queries answered without an embedding call
 """
 
 import logging
 import asyncio
 import json
 import hashlib
-from typing import List, Dict, Any, Optional, Tuple
+import random
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple
 import numpy as np
 from decimal import Decimal
 import os
 
 from openai import AsyncOpenAI
 from src.config.logging import get_logger
-from .supabase_client import SupabaseClient
-from src.integrations.cache import get_redis_cache_service
+from .supabase_client import SupabaseClient, get_supabase_client
+from .embedding_batcher import EmbeddingBatcher, chunk_texts
+from .hybrid_search import BM25Index, analyze_hungarian, matches_filters, reciprocal_rank_fusion, tokenize
+from .vector_index import ProductVectorIndex
+from src.integrations.cache import get_cache_warmer, get_redis_cache_service
 
 logger = get_logger(__name__)
 
+# Ennél hosszabb kérdések nem kerülnek a warm-up rangsorba
+MAX_WARMUP_QUERY_LENGTH = 200
+
+# A helyi vector index építésekor lekért termék oszlopok
+INDEX_PRODUCT_COLUMNS = (
+    "id, name, description, short_description, price, brand, category_id, tags, "
+    "metadata, stock_quantity, status, embedding"
+)
+
+# Hibrid keresésnél ágonként ennyiszer több jelölt, mint a kért találat
+HYBRID_CANDIDATE_FACTOR = 4
+
+# Szöveges jelöltek lekérésénél figyelembe vett kérdés szavak (ILIKE fallback)
+MAX_LEXICAL_QUERY_TERMS = 8
+
+# Legfeljebb ennyi szavas kérdés számít kulcsszavas keresésnek (embedding nélkül)
+KEYWORD_QUERY_MAX_TERMS = 4
+
+# Kvantált pgvector keresés: reprezentációk és a teljes pontossággal újrapontozott jelöltek szorzója
+DB_QUANTIZATIONS = ("binary", "halfvec")
+QUANTIZED_RESCORE_FACTOR = 4
+
+# Keresési minőség profilok: pgvector hnsw.ef_search / ivfflat.probes (lists = 100),
+# "exact": index nélküli pontos keresés (helyi indexnél teljes flat scan)
+SEARCH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {"ef_search": 16, "probes": 1, "exact": False},
+    "balanced": {"ef_search": 64, "probes": 10, "exact": False},
+    "exact": {"ef_search": 1000, "probes": 100, "exact": True}
+}
+
+# Batch embedding: szövegek és becsült tokenek API hívásonként (OpenAI: 2048 szöveg / 300k token)
+EMBEDDING_CHUNK_MAX_TEXTS = 256
+EMBEDDING_CHUNK_MAX_TOKENS = 100_000
+
+# Sikertelen batch embedding csomag újrapróbálása exponenciális várakozással
+EMBEDDING_RETRY_BASE_DELAY = 1.0
+
+# Termékek száma egy bulk_update_product_embeddings RPC hívásban
+EMBEDDING_WRITE_CHUNK_SIZE = 200
+
+# Az embedding szinkron által olvasott termék oszlopok (embedding nélkül)
+EMBEDDING_SYNC_COLUMNS = (
+    "id, name, description, short_description, price, brand, category_id, categories(name), "
+    "tags, metadata, stock_quantity, status, embedding_hash"
+)
+
+
+def resolve_search_profile(search_profile: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Keresési profil neve -> ef_search / probes / exact beállítások (None: alapbeállítás)"""
+    if search_profile is None:
+        return None
+    if search_profile not in SEARCH_PROFILES:
+        raise ValueError(f"Ismeretlen keresési profil: {search_profile}")
+    return SEARCH_PROFILES[search_profile]
+
+
+def build_product_embedding_text(product: Dict[str, Any]) -> str:
+    """Az embedding alapjául szolgáló szöveg egy termékből"""
+    text_parts = []
+    
+    if product.get("name"):
+        text_parts.append(product["name"])
+    
+    if product.get("description"):
+        text_parts.append(product["description"])
+    
+    if product.get("short_description"):
+        text_parts.append(product["short_description"])
+    
+    if product.get("brand"):
+        text_parts.append(f"Brand: {product['brand']}")
+    
+    if product.get("tags"):
+        if isinstance(product["tags"], list):
+            text_parts.extend(product["tags"])
+        else:
+            text_parts.append(str(product["tags"]))
+    
+    # A kategória név a szinkron lekérdezésben a categories(name) beágyazásból jön
+    category = product.get("category")
+    if not category and isinstance(product.get("categories"), dict):
+        category = product["categories"].get("name")
+    if category:
+        text_parts.append(f"Category: {category}")
+    
+    return " ".join(text_parts)
+
+
+def embedding_content_hash(text: str, model: str) -> str:
+    """products.embedding_hash: a modell és a beágyazott szöveg SHA-256 hash-e"""
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
 
 class VectorOperations:
     """Vector műveletek kezelő"""
     
-    def __init__(self, supabase_client: SupabaseClient, openai_api_key: str):
-        """Inicializálja a vector operations kezelőt"""
+    def __init__(self, supabase_client: SupabaseClient, openai_api_key: str,
+                 vector_index: Optional[ProductVectorIndex] = None,
+                 quantization: Optional[str] = None):
+        """
+        Inicializálja a vector operations kezelőt
+        
+        Args:
+            vector_index: Opcionális helyi ANN index; ha kész, a similarity
+                search ezt használja a Supabase RPC helyett
+            quantization: "binary" vagy "halfvec" esetén a similarity search a
+                search_products_quantized RPC-t hívja (kvantált index + újrapontozás)
+        """
+        if quantization is not None and quantization not in DB_QUANTIZATIONS:
+            raise ValueError(f"Ismeretlen kvantálás: {quantization}")
         self.supabase = supabase_client
+        self.vector_index = vector_index
+        self.quantization = quantization
+        # Helyi szöveges (BM25) index a hibrid kereséshez, a vector index-szel együtt töltődik
+        self.text_index: Optional[BM25Index] = (
+            BM25Index.from_products(vector_index.products()) if vector_index is not None else None
+        )
         self.embedding_dimension = 1536  # OpenAI text-embedding-3-small
         if not openai_api_key:
             raise ValueError("OpenAI API kulcs szükséges")
@@ -38,6 +158,10 @@ class VectorOperations:
             api_key=openai_api_key
         )
         self.embedding_model = "text-embedding-3-small"
+        # Egyidejű generate_embedding hívások egy batch API hívásba vonva
+        self.embedding_batcher = EmbeddingBatcher(self._create_embeddings)
+        # A gyakori kérdések keresési eredményei induláskor újra cache-be kerülnek
+        get_cache_warmer().register_source("question", "question", self.warm_search)
     
     async def generate_embedding(self, text: str) -> Optional[List[float]]:
         """Generál egy embedding-et a megadott szövegből OpenAI API-val"""
@@ -52,19 +176,17 @@ class VectorOperations:
                 text_hash = hashlib.md5(text.encode()).hexdigest()
                 cached_embedding = await cache_service.performance_cache.get_cached_embedding(text_hash)
                 
-                if cached_embedding:
+                if cached_embedding is not None and len(cached_embedding):
                     logger.debug(f"Cache-elt embedding használva: {text_hash}")
+                    # Bináris cache bejegyzés: numpy nézet, a Supabase RPC listát vár
+                    if isinstance(cached_embedding, np.ndarray):
+                        return cached_embedding.tolist()
                     return cached_embedding
             except Exception as cache_error:
                 logger.warning(f"Cache hiba, OpenAI API használata: {cache_error}")
             
-            # OpenAI embeddings API hívás
-            response = await self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            
-            embedding = response.data[0].embedding
+            # OpenAI embeddings API hívás (a párhuzamos kérésekkel egy batch-ben)
+            embedding = await self.embedding_batcher.embed(text)
             
             # Cache-elés
             try:
@@ -81,72 +203,141 @@ class VectorOperations:
             logger.error(f"Hiba az embedding generálásakor: {e}")
             return None
     
-    async def generate_embeddings_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
-        """Batch embedding generálás több szöveghez"""
+    async def _create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Egy OpenAI embeddings API hívás több szövegre (a batcher használja)"""
+        response = await self.openai_client.embeddings.create(
+            model=self.embedding_model,
+            input=texts
+        )
+        return [data.embedding for data in response.data]
+    
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        progress_callback: Optional[Callable[[int, int], Any]] = None
+    ) -> List[Optional[List[float]]]:
+        """
+        Batch embedding generálás több szöveghez
+        
+        A cache-ben lévő szövegekhez nincs API hívás (egy pipeline-os lekérés);
+        a többi token keretes csomagokban, legfeljebb max_concurrency
+        párhuzamos hívással, hibánál exponenciális várakozással újrapróbálva
+        készül. Minden kész csomag azonnal cache-be kerül, így egy megszakadt
+        katalógus újra-embeddelés folytatásakor csak a hiányzó szövegek
+        mennek az API-hoz.
+        
+        Args:
+            max_concurrency: Egyidejű API hívások száma
+            max_retries: Újrapróbálások száma csomagonként
+            progress_callback: (kész, összes) egyedi szöveg minden csomag után
+        
+        Returns:
+            Embeddingek a texts sorrendjében (None: üres szöveg vagy végleg sikertelen csomag)
+        """
         try:
             if not texts:
                 return []
             
-            # Szűrjük ki az üres szövegeket
-            valid_texts = [text for text in texts if text.strip()]
-            if not valid_texts:
+            # Egyedi, nem üres szövegek
+            unique_texts = list(dict.fromkeys(text for text in texts if text.strip()))
+            if not unique_texts:
                 logger.warning("Nincs érvényes szöveg a batch embedding generáláshoz")
                 return [None] * len(texts)
             
-            # OpenAI batch embeddings API hívás
-            response = await self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=valid_texts
-            )
-            
-            embeddings = [data.embedding for data in response.data]
-            
-            # Visszaadunk None-t az üres szövegekhez
-            result = []
-            text_index = 0
-            for original_text in texts:
-                if original_text.strip():
-                    result.append(embeddings[text_index])
-                    text_index += 1
-                else:
-                    result.append(None)
+            hashes = {text: hashlib.md5(text.encode()).hexdigest() for text in unique_texts}
+            embeddings: Dict[str, List[float]] = {}
             
-            logger.info(f"Batch embedding generálva: {len(embeddings)}/{len(texts)} sikeres")
+            # Cache ellenőrzése egy körben
+            cache_service = None
+            try:
+                cache_service = await get_redis_cache_service()
+                cached = await cache_service.performance_cache.get_cached_embeddings(
+                    [hashes[text] for text in unique_texts]
+                )
+                for text, embedding in zip(unique_texts, cached):
+                    if embedding is not None and len(embedding):
+                        embeddings[text] = embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
+            except Exception as cache_error:
+                logger.warning(f"Cache hiba, OpenAI API használata: {cache_error}")
+                cache_service = None
+            
+            missing = [text for text in unique_texts if text not in embeddings]
+            total = len(unique_texts)
+            done = len(embeddings)
+            if progress_callback and done:
+                progress_callback(done, total)
+            
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            
+            async def embed_chunk(chunk: List[str]):
+                nonlocal done
+                async with semaphore:
+                    chunk_embeddings = await self._create_embeddings_with_retry(chunk, max_retries)
+                if chunk_embeddings is None:
+                    return
+                
+                embeddings.update(zip(chunk, chunk_embeddings))
+                if cache_service:
+                    try:
+                        await cache_service.performance_cache.cache_embeddings(
+                            {hashes[text]: embedding for text, embedding in zip(chunk, chunk_embeddings)}
+                        )
+                    except Exception as cache_error:
+                        logger.warning(f"Embedding cache-elés hiba: {cache_error}")
+                
+                done += len(chunk)
+                logger.info(f"Batch embedding: {done}/{total} kész")
+                if progress_callback:
+                    progress_callback(done, total)
+            
+            await asyncio.gather(*(
+                embed_chunk(chunk)
+                for chunk in chunk_texts(missing, EMBEDDING_CHUNK_MAX_TEXTS, EMBEDDING_CHUNK_MAX_TOKENS)
+            ))
+            
+            result = [embeddings.get(text) if text.strip() else None for text in texts]
+            
+            success_count = sum(1 for embedding in result if embedding is not None)
+            logger.info(
+                f"Batch embedding generálva: {success_count}/{len(texts)} sikeres "
+                f"({total - len(missing)} cache-ből, {len(missing)} API-ból)"
+            )
             return result
             
         except Exception as e:
             logger.error(f"Hiba a batch embedding generálásakor: {e}")
             return [None] * len(texts)
     
+    async def _create_embeddings_with_retry(
+        self,
+        chunk: List[str],
+        max_retries: int
+    ) -> Optional[List[List[float]]]:
+        """Egy csomag embeddingje újrapróbálással; végleges hibánál None"""
+        for attempt in range(max_retries + 1):
+            try:
+                chunk_embeddings = await self._create_embeddings(chunk)
+                if len(chunk_embeddings) != len(chunk):
+                    raise RuntimeError(
+                        f"Embedding batch méret eltérés: {len(chunk_embeddings)} eredmény {len(chunk)} szövegre"
+                    )
+                return chunk_embeddings
+            except Exception as e:
+                if attempt == max_retries:
+                    logger.error(f"Batch embedding csomag sikertelen ({len(chunk)} szöveg): {e}")
+                    return None
+                delay = EMBEDDING_RETRY_BASE_DELAY * (2 ** attempt)
+                logger.warning(f"Batch embedding hiba, újrapróbálás {delay:.1f}s múlva: {e}")
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+        return None
+    
     async def generate_product_embedding(self, product_data: Dict[str, Any]) -> Optional[List[float]]:
         """Generál embedding-et egy termékhez"""
         try:
-            # Termék szöveges adatok összegyűjtése
-            text_parts = []
-            
-            if product_data.get("name"):
-                text_parts.append(product_data["name"])
-            
-            if product_data.get("description"):
-                text_parts.append(product_data["description"])
-            
-            if product_data.get("short_description"):
-                text_parts.append(product_data["short_description"])
-            
-            if product_data.get("brand"):
-                text_parts.append(f"Brand: {product_data['brand']}")
-            
-            if product_data.get("tags"):
-                if isinstance(product_data["tags"], list):
-                    text_parts.extend(product_data["tags"])
-                else:
-                    text_parts.append(str(product_data["tags"]))
-            
-            if product_data.get("category"):
-                text_parts.append(f"Category: {product_data['category']}")
-            
-            # Szöveg összefűzése
-            combined_text = " ".join(text_parts)
+            # Termék szöveges adatok összefűzése
+            combined_text = build_product_embedding_text(product_data)
             
             if not combined_text.strip():
                 logger.warning("Nincs szöveges adat az embedding generálásához")
@@ -161,7 +352,7 @@ class VectorOperations:
             return None
     
     async def update_product_embedding(self, product_id: str, product_data: Dict[str, Any]) -> bool:
-        """Frissíti egy termék embedding-jét"""
+        """Frissíti egy termék embedding-jét (és a tartalom hash-t)"""
         try:
             embedding = await self.generate_product_embedding(product_data)
             
@@ -170,14 +361,18 @@ class VectorOperations:
                 return False
             
             # Embedding frissítése az adatbázisban
-            client = self.supabase.get_client()
+            client = self.supabase.get_async_client()
             
-            result = client.table("products").update({
+            result = await client.table("products").update({
                 "embedding": embedding,
+                "embedding_hash": embedding_content_hash(
+                    build_product_embedding_text(product_data), self.embedding_model
+                ),
                 "updated_at": "now()"
             }).eq("id", product_id).execute()
             
             if result.data:
+                self._index_product(result.data[0], embedding)
                 logger.info(f"Termék embedding frissítve: {product_id}")
                 return True
             else:
@@ -188,39 +383,28 @@ class VectorOperations:
             logger.error(f"Hiba a termék embedding frissítésekor: {e}")
             return False
     
-    async def batch_update_product_embeddings(self, products: List[Dict[str, Any]]) -> Dict[str, bool]:
-        """Batch frissíti több termék embedding-jét"""
-        results = {}
+    async def batch_update_product_embeddings(
+        self,
+        products: List[Dict[str, Any]],
+        progress_callback: Optional[Callable[[int, int], Any]] = None,
+        force: bool = False
+    ) -> Dict[str, bool]:
+        """
+        Batch frissíti több termék embedding-jét
         
-        # Batch embedding generálás
-        product_texts = []
-        for product in products:
-            text_parts = []
-            
-            if product.get("name"):
-                text_parts.append(product["name"])
-            if product.get("description"):
-                text_parts.append(product["description"])
-            if product.get("short_description"):
-                text_parts.append(product["short_description"])
-            if product.get("brand"):
-                text_parts.append(f"Brand: {product['brand']}")
-            if product.get("tags"):
-                if isinstance(product["tags"], list):
-                    text_parts.extend(product["tags"])
-                else:
-                    text_parts.append(str(product["tags"]))
-            if product.get("category"):
-                text_parts.append(f"Category: {product['category']}")
-            
-            combined_text = " ".join(text_parts)
-            product_texts.append(combined_text)
-        
-        # Batch embedding generálás
-        embeddings = await self.generate_embeddings_batch(product_texts)
+        Csak azok a termékek kapnak új embeddinget, amelyek szövegének hash-e
+        eltér a tárolt embedding_hash-től (force=True: mind). Az írás
+        EMBEDDING_WRITE_CHUNK_SIZE termékes bulk RPC hívásokkal történik.
         
-        # Adatbázis frissítések
-        client = self.supabase.get_client()
+        Args:
+            progress_callback: Embedding generálás állapota, lásd generate_embeddings_batch
+            force: Változatlan termékek újra-embeddelése is (pl. modellváltás után)
+        
+        Returns:
+            Termék ID -> siker (változatlan termék: True)
+        """
+        results: Dict[str, bool] = {}
+        changed: List[Tuple[Dict[str, Any], str, str]] = []
         
         for i, product in enumerate(products):
             product_id = product.get("id")
@@ -229,96 +413,361 @@ class VectorOperations:
                 results[f"product_{i}"] = False
                 continue
             
-            embedding = embeddings[i]
+            text = build_product_embedding_text(product)
+            content_hash = embedding_content_hash(text, self.embedding_model)
+            if not force and product.get("embedding_hash") == content_hash:
+                results[str(product_id)] = True
+                continue
+            changed.append((product, text, content_hash))
+        
+        unchanged_count = len(products) - len(changed)
+        if not changed:
+            logger.info(f"Batch embedding frissítés: nincs változott termék ({unchanged_count} változatlan)")
+            return results
+        
+        # Batch embedding generálás csak a változott termékekre
+        embeddings = await self.generate_embeddings_batch(
+            [text for _, text, _ in changed], progress_callback=progress_callback
+        )
+        
+        rows = []
+        for (product, _, content_hash), embedding in zip(changed, embeddings):
+            product_id = str(product["id"])
             if not embedding:
                 logger.warning(f"Nem sikerült embedding generálni a termékhez: {product_id}")
                 results[product_id] = False
                 continue
+            rows.append({"id": product_id, "embedding": embedding, "embedding_hash": content_hash})
+        
+        # Adatbázis frissítések
+        written = await self._write_product_embeddings(rows)
+        
+        for (product, _, content_hash), embedding in zip(changed, embeddings):
+            product_id = str(product["id"])
+            if product_id in results:
+                continue
+            results[product_id] = product_id in written
+            if product_id in written:
+                self._index_product({**product, "embedding_hash": content_hash}, embedding)
+        
+        success_count = sum(1 for success in results.values() if success)
+        logger.info(
+            f"Batch embedding frissítés: {success_count}/{len(products)} sikeres "
+            f"({len(changed)} újra-embeddelve, {unchanged_count} változatlan)"
+        )
+        
+        return results
+    
+    async def _write_product_embeddings(self, rows: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Embeddingek írása EMBEDDING_WRITE_CHUNK_SIZE soros bulk RPC hívásokkal
+        
+        Ha a bulk_update_product_embeddings függvény még nincs telepítve,
+        az adott csomag soronkénti update-tel íródik.
+        
+        Returns:
+            A sikeresen frissített termék ID-k
+        """
+        client = self.supabase.get_async_client()
+        written = set()
+        
+        for start in range(0, len(rows), EMBEDDING_WRITE_CHUNK_SIZE):
+            chunk = rows[start:start + EMBEDDING_WRITE_CHUNK_SIZE]
+            try:
+                result = await client.rpc("bulk_update_product_embeddings", {"updates": chunk}).execute()
+                written.update(
+                    str(item["id"] if isinstance(item, dict) else item) for item in result.data or []
+                )
+                continue
+            except Exception as e:
+                logger.warning(f"Bulk embedding írás sikertelen, soronkénti frissítés: {e}")
             
+            for row in chunk:
+                try:
+                    result = await client.table("products").update({
+                        "embedding": row["embedding"],
+                        "embedding_hash": row["embedding_hash"],
+                        "updated_at": "now()"
+                    }).eq("id", row["id"]).execute()
+                    if result.data:
+                        written.add(row["id"])
+                except Exception as e:
+                    logger.error(f"Hiba a termék embedding frissítésekor: {row['id']} - {e}")
+        
+        return written
+    
+    async def sync_product_embeddings(
+        self,
+        page_size: int = 1000,
+        force: bool = False,
+        progress_callback: Optional[Callable[[int, int], Any]] = None
+    ) -> Dict[str, int]:
+        """
+        Inkrementális embedding szinkron a teljes katalógusra
+        
+        Lapozva olvassa az aktív termékeket (embedding nélkül) és csak a
+        megváltozott tartalmú termékeket embeddeli újra, így a költség és az
+        idő a változással arányos.
+        
+        Returns:
+            checked / reembedded / failed termékszámok
+        """
+        stats = {"checked": 0, "reembedded": 0, "failed": 0}
+        client = self.supabase.get_async_client()
+        offset = 0
+        while True:
+            result = await client.table("products").select(EMBEDDING_SYNC_COLUMNS).eq(
+                "status", "active"
+            ).order("id").range(offset, offset + page_size - 1).execute()
+            rows = result.data or []
+            
+            changed_ids = {
+                str(row["id"]) for row in rows
+                if force or row.get("embedding_hash") != embedding_content_hash(
+                    build_product_embedding_text(row), self.embedding_model
+                )
+            }
+            page_results = await self.batch_update_product_embeddings(
+                rows, progress_callback=progress_callback, force=force
+            )
+            # Változatlan szövegű termékek ára / készlete / státusza is átkerül a helyi indexbe
+            self._index_attributes([row for row in rows if str(row["id"]) not in changed_ids])
+            stats["checked"] += len(rows)
+            stats["reembedded"] += sum(1 for product_id in changed_ids if page_results.get(product_id))
+            stats["failed"] += sum(1 for success in page_results.values() if not success)
+            
+            if len(rows) < page_size:
+                break
+            offset += page_size
+        
+        logger.info(
+            f"Embedding szinkron: {stats['checked']} termék, {stats['reembedded']} újra-embeddelve, "
+            f"{stats['failed']} sikertelen"
+        )
+        return stats
+    
+    def _index_product(self, product: Dict[str, Any], embedding: List[float]):
+        """Frissített termék átvezetése a helyi indexekbe (ha vannak)"""
+        if self.vector_index is None:
+            return
+        try:
+            self.vector_index.upsert(product, embedding)
+            if self.text_index is not None:
+                self.text_index.upsert(product)
+        except Exception as e:
+            logger.warning(f"Helyi vector index frissítési hiba: {product.get('id')} - {e}")
+    
+    def _index_attributes(self, products: List[Dict[str, Any]]):
+        """Szűrő mezők (ár, készlet, státusz) frissítése a helyi indexben újra-embeddelés nélkül"""
+        if self.vector_index is None:
+            return
+        for product in products:
             try:
-                result = client.table("products").update({
-                    "embedding": embedding,
-                    "updated_at": "now()"
-                }).eq("id", product_id).execute()
-                
-                results[product_id] = bool(result.data)
-                
+                self.vector_index.update_attributes(product)
             except Exception as e:
-                logger.error(f"Hiba a termék embedding frissítésekor: {product_id} - {e}")
-                results[product_id] = False
+                logger.warning(f"Helyi vector index frissítési hiba: {product.get('id')} - {e}")
+    
+    async def load_vector_index(
+        self,
+        snapshot_path: Optional[str] = None,
+        backend: str = "auto",
+        page_size: int = 1000
+    ) -> ProductVectorIndex:
+        """
+        Helyi ANN index betöltése snapshotból, vagy felépítése a products.embedding oszlopból
         
-        success_count = sum(1 for success in results.values() if success)
-        logger.info(f"Batch embedding frissítés: {success_count}/{len(products)} sikeres")
+        Args:
+            snapshot_path: Snapshot könyvtár; ha létezik innen töltődik
+                (memory-mapped), különben az épített index ide mentődik
+            backend: "auto", "hnsw" vagy "flat"
+            page_size: Egy lekérdezésben olvasott termékek száma
+        """
+        if snapshot_path and os.path.exists(os.path.join(snapshot_path, "meta.json")):
+            self.vector_index = ProductVectorIndex.load(snapshot_path, backend=backend)
+            self.text_index = BM25Index.from_products(self.vector_index.products())
+            return self.vector_index
         
-        return results
+        index = ProductVectorIndex(dimension=self.embedding_dimension, backend=backend)
+        text_index = BM25Index()
+        client = self.supabase.get_async_client()
+        offset = 0
+        while True:
+            result = await client.table("products").select(INDEX_PRODUCT_COLUMNS).eq(
+                "status", "active"
+            ).range(offset, offset + page_size - 1).execute()
+            rows = result.data or []
+            for row in rows:
+                if index.upsert(row):
+                    text_index.upsert(row)
+            if len(rows) < page_size:
+                break
+            offset += page_size
+        
+        logger.info(f"Helyi vector index felépítve: {index.size} termék ({index.backend})")
+        if snapshot_path:
+            index.save(snapshot_path)
+        self.vector_index = index
+        self.text_index = text_index
+        return index
+    
+    def save_vector_index(self, snapshot_path: str) -> bool:
+        """Helyi index snapshot mentése (pl. leállításkor vagy időzítve)"""
+        if self.vector_index is None:
+            return False
+        self.vector_index.save(snapshot_path)
+        return True
     
     async def search_similar_products(
         self, 
         query_text: str, 
         limit: int = 10, 
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = 0.7,
+        search_profile: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Keres hasonló termékeket"""
+        """
+        Keres hasonló termékeket
+        
+        Cache-elt eredménynél stale-while-revalidate: lejárt (de türelmi időn
+        belüli) találatot azonnal visszaad, a frissítést egyetlen háttér task végzi.
+        A találat nélküli keresések rövid ideig negatív bejegyzésként cache-elődnek.
+        
+        Args:
+            search_profile: "fast", "balanced" vagy "exact" (SEARCH_PROFILES);
+                None esetén az index alapbeállításai
+        """
+        profile = resolve_search_profile(search_profile)
         try:
+            async def load() -> List[Dict[str, Any]]:
+                return await self._search_similar_products_uncached(
+                    query_text, limit, similarity_threshold, search_profile=profile
+                )
+            
             # Cache ellenőrzése
             try:
                 cache_service = await get_redis_cache_service()
-                query_hash = hashlib.md5(f"{query_text}:{limit}:{similarity_threshold}".encode()).hexdigest()
-                cached_results = await cache_service.performance_cache.get_cached_search_result(query_hash)
-                
-                if cached_results:
-                    logger.debug(f"Cache-elt search result használva: {query_hash}")
-                    return cached_results
+                cache_key = f"{query_text}:{limit}:{similarity_threshold}"
+                if search_profile is not None:
+                    cache_key += f":{search_profile}"
+                query_hash = hashlib.md5(cache_key.encode()).hexdigest()
             except Exception as cache_error:
                 logger.warning(f"Cache hiba, adatbázis keresés: {cache_error}")
+                cache_service = None
+            
+            if cache_service:
+                if len(query_text) <= MAX_WARMUP_QUERY_LENGTH:
+                    get_cache_warmer().record_access(
+                        "question", f"{limit}:{similarity_threshold}:{query_text}"
+                    )
+                results = await cache_service.performance_cache.get_or_load_search_result(query_hash, load)
+            else:
+                results = await load()
             
-            # Query embedding generálása
-            query_embedding = await self.generate_embedding(query_text)
-            
-            if not query_embedding:
-                logger.error("Nem sikerült query embedding generálni")
-                return []
-            
-            # Vector similarity search pgvector-rel
-            client = self.supabase.get_client()
-            
-            # pgvector similarity search query
-            result = await client.rpc(
-                "search_products",
-                {
-                    "query_embedding": query_embedding,
-                    "similarity_threshold": similarity_threshold,
-                    "match_count": limit
-                }
-            ).execute()
-            
-            if not result.data:
-                logger.info("Nincs találat a similarity search-ben")
-                return []
-            
-            # Szűrés similarity threshold alapján
-            filtered_results = []
-            for item in result.data:
-                similarity = float(item.get("similarity", 0))
-                if similarity >= similarity_threshold:
-                    item["similarity_score"] = similarity
-                    filtered_results.append(item)
-            
-            # Cache-elés
-            try:
-                if cache_service:
-                    query_hash = hashlib.md5(f"{query_text}:{limit}:{similarity_threshold}".encode()).hexdigest()
-                    await cache_service.performance_cache.cache_search_result(query_hash, filtered_results)
-            except Exception as cache_error:
-                logger.warning(f"Search result cache-elés hiba: {cache_error}")
-            
-            logger.info(f"Similarity search: {len(filtered_results)} találat")
-            return filtered_results
+            return results or []
             
         except Exception as e:
             logger.error(f"Hiba a similarity search során: {e}")
             return []
     
+    async def warm_search(self, question_key: str) -> List[Dict[str, Any]]:
+        """Cache warm-up: egy gyakori kérdés ("limit:küszöb:kérdés") keresésének újrafuttatása"""
+        limit, similarity_threshold, query_text = question_key.split(":", 2)
+        return await self.search_similar_products(query_text, int(limit), float(similarity_threshold))
+    
+    async def _search_similar_products_uncached(
+        self,
+        query_text: str,
+        limit: int,
+        similarity_threshold: float,
+        search_profile: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        pgvector similarity search cache nélkül
+        
+        Üres lista: nincs találat (negatívan cache-elhető). Hiba esetén kivételt
+        dob, hogy a sikertelen keresés ne kerüljön cache-be.
+        """
+        # Query embedding generálása
+        query_embedding = await self.generate_embedding(query_text)
+        
+        if not query_embedding:
+            raise RuntimeError("Nem sikerült query embedding generálni")
+        
+        # Helyi ANN index, ha betöltve (nincs hálózati kör)
+        if self.vector_index is not None and self.vector_index.ready:
+            local_results = self.vector_index.search(
+                query_embedding, limit, similarity_threshold, **self._local_search_options(search_profile)
+            )
+            logger.info(f"Similarity search (helyi index): {len(local_results)} találat")
+            return local_results
+        
+        # Vector similarity search pgvector-rel
+        result = await self._vector_search_rpc(query_embedding, similarity_threshold, limit, search_profile)
+        
+        if not result.data:
+            logger.info("Nincs találat a similarity search-ben")
+            return []
+        
+        # Szűrés similarity threshold alapján
+        filtered_results = []
+        for item in result.data:
+            similarity = float(item.get("similarity", 0))
+            if similarity >= similarity_threshold:
+                item["similarity_score"] = similarity
+                filtered_results.append(item)
+        
+        logger.info(f"Similarity search: {len(filtered_results)} találat")
+        return filtered_results
+    
+    @staticmethod
+    def _local_search_options(search_profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Keresési profil -> ProductVectorIndex.search paraméterek"""
+        if search_profile is None:
+            return {}
+        return {"ef_search": search_profile["ef_search"], "exact": search_profile["exact"]}
+    
+    async def _vector_search_rpc(
+        self,
+        query_embedding: List[float],
+        similarity_threshold: float,
+        match_count: int,
+        search_profile: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        pgvector similarity search RPC hívás
+        
+        Sorrend: kvantált index (ha be van állítva és nem pontos keresés),
+        profil szerint hangolt search_products_tuned, végül search_products.
+        A hiányzó RPC függvény a következő lehetőségre vált.
+        """
+        client = self.supabase.get_async_client()
+        params = {
+            "query_embedding": query_embedding,
+            "similarity_threshold": similarity_threshold,
+            "match_count": match_count
+        }
+        
+        if self.quantization is not None and not (search_profile and search_profile["exact"]):
+            try:
+                return await client.rpc(
+                    "search_products_quantized",
+                    {**params, "rescore_factor": QUANTIZED_RESCORE_FACTOR, "quantization": self.quantization}
+                ).execute()
+            except Exception as e:
+                logger.warning(f"search_products_quantized nem elérhető, teljes pontosságú keresés: {e}")
+        
+        if search_profile is not None:
+            try:
+                return await client.rpc("search_products_tuned", {
+                    **params,
+                    "ef_search": search_profile["ef_search"],
+                    "probes": search_profile["probes"],
+                    "exact_search": search_profile["exact"]
+                }).execute()
+            except Exception as e:
+                logger.warning(f"search_products_tuned nem elérhető, alapbeállítású keresés: {e}")
+        
+        return await client.rpc("search_products", params).execute()
+    
     async def search_products_by_category(
         self, 
         category_id: str, 
@@ -332,7 +781,10 @@ class VectorOperations:
             if not query_embedding:
                 return []
             
-            client = self.supabase.get_client()
+            if self.vector_index is not None and self.vector_index.ready:
+                return self.vector_index.search(query_embedding, limit, filters={"category_id": category_id})
+            
+            client = self.supabase.get_async_client()
             
             # Kategória-specifikus similarity search
             result = await client.rpc(
@@ -365,7 +817,7 @@ class VectorOperations:
     ) -> List[Dict[str, Any]]:
         """Termékajánlások generálása felhasználói preferenciák alapján"""
         try:
-            client = self.supabase.get_client()
+            client = self.supabase.get_async_client()
             
             # Felhasználói preferenciák lekérdezése
             user_prefs_result = await client.table("user_preferences").select(
@@ -386,7 +838,7 @@ class VectorOperations:
             # TODO: Implementálni a felhasználói viselkedés elemzését
             
             # Egyelőre featured/bestseller termékek
-            result = client.table("products").select(
+            result = await client.table("products").select(
                 "id, name, description, price, brand, is_featured, is_bestseller, is_new, metadata"
             ).eq("status", "active").order("is_featured", desc=True).order("is_bestseller", desc=True).limit(limit).execute()
             
@@ -401,59 +853,227 @@ class VectorOperations:
         self, 
         query_text: str, 
         filters: Optional[Dict[str, Any]] = None,
-        limit: int = 10
+        limit: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        search_profile: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Hibrid keresés: vector + szöveges szűrők"""
+        """
+        Hibrid keresés: szöveges (BM25) + vector similarity, reciprocal rank fusion-nel
+        
+        A két ág párhuzamosan fut, mindkettő limit * HYBRID_CANDIDATE_FACTOR
+        jelöltet ad a szűrőkkel; a végső sorrendet az RRF pontszám adja.
+        Ha az egyik ág hibára fut, a másik eredménye érvényes marad.
+        
+        Args:
+            weights: Ágankénti RRF súly ("lexical", "vector"), alapértelmezés 1.0
+            search_profile: A vector ág keresési profilja (SEARCH_PROFILES)
+        """
+        profile = resolve_search_profile(search_profile)
         try:
-            query_embedding = await self.generate_embedding(query_text)
-            
-            if not query_embedding:
-                return []
-            
-            client = self.supabase.get_client()
-            
-            # Alap query builder
-            query = client.table("products").select(
-                "id, name, description, price, brand, category_id, metadata"
-            ).eq("status", "active")
+            candidates = limit * HYBRID_CANDIDATE_FACTOR
+            legs = dict(zip(("lexical", "vector"), await asyncio.gather(
+                self._lexical_candidates(query_text, candidates, filters),
+                self._vector_candidates(query_text, candidates, filters, search_profile=profile),
+                return_exceptions=True
+            )))
+            
+            products: Dict[str, Dict[str, Any]] = {}
+            rankings: Dict[str, List[str]] = {}
+            for name, items in legs.items():
+                if isinstance(items, Exception):
+                    logger.warning(f"Hibrid keresés {name} ág hiba: {items}")
+                    continue
+                rankings[name] = []
+                for rank, item in enumerate(items, start=1):
+                    product_id = str(item["id"])
+                    rankings[name].append(product_id)
+                    merged = products.setdefault(product_id, {"lexical_rank": None, "vector_rank": None})
+                    for key, value in item.items():
+                        merged.setdefault(key, value)
+                    merged[f"{name}_rank"] = rank
+            
+            results = []
+            for product_id, score in reciprocal_rank_fusion(rankings, weights=weights)[:limit]:
+                item = products[product_id]
+                item["hybrid_score"] = score
+                item["similarity_score"] = float(item.get("similarity") or 0.0)
+                results.append(item)
+            
+            logger.info(f"Hibrid keresés: {len(results)} találat")
+            return results
             
-            # Szűrők hozzáadása
-            if filters:
-                if filters.get("category_id"):
-                    query = query.eq("category_id", filters["category_id"])
-                
-                if filters.get("brand"):
-                    query = query.eq("brand", filters["brand"])
-                
-                if filters.get("min_price"):
-                    query = query.gte("price", filters["min_price"])
-                
-                if filters.get("max_price"):
-                    query = query.lte("price", filters["max_price"])
-                
-                if filters.get("in_stock"):
-                    query = query.gt("stock_quantity", 0)
+        except Exception as e:
+            logger.error(f"Hiba a hibrid keresés során: {e}")
+            return []
+    
+    async def search_products_text(
+        self,
+        query_text: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        match_all: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Magyar full-text keresés embedding generálás nélkül
+        
+        Ékezet független és szótövező (cipő = cipo, telefonok = telefon):
+        helyi BM25 index, ha betöltve, különben a GIN indexelt search_vector
+        oszlopon futó search_products_text RPC.
+        
+        Args:
+            match_all: Csak a kérdés minden szavát tartalmazó termékek
+        
+        Returns:
+            Termékek text_score mezővel, csökkenő relevancia szerint
+        """
+        try:
+            if self.text_index is not None and self.text_index.ready:
+                results = self.text_index.search(query_text, limit, filters, match_all=match_all)
+                for item in results:
+                    item["text_score"] = item["bm25_score"]
+            else:
+                results = await self._search_products_text_rpc(query_text, limit, filters, match_all)
             
-            # Vector similarity search hozzáadása
-            # Megjegyzés: Ez egy egyszerűsített implementáció
-            # A teljes hibrid search-hez custom RPC függvény kell
+            logger.info(f"Full-text keresés: {len(results)} találat")
+            return results
             
-            result = query.limit(limit).execute()
+        except Exception as e:
+            logger.error(f"Hiba a full-text keresés során: {e}")
+            return []
+    
+    async def keyword_first_search(
+        self,
+        query_text: str,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Kulcsszavas kérdésre full-text találat, egyébként hibrid keresés
+        
+        Rövid (legfeljebb KEYWORD_QUERY_MAX_TERMS szavas) kérdésnél először a
+        full-text index fut minden szóra; ha ad találatot, nincs embedding hívás.
+        Hosszabb, természetes nyelvű kérdés vagy üres eredmény esetén a
+        hibrid keresés (BM25 + vector) adja az eredményt.
+        """
+        terms = analyze_hungarian(query_text)
+        if 0 < len(terms) <= KEYWORD_QUERY_MAX_TERMS:
+            results = await self.search_products_text(query_text, limit, filters)
+            if results:
+                for item in results:
+                    item["search_method"] = "text"
+                return results
+        
+        results = await self.hybrid_search(query_text, filters, limit)
+        for item in results:
+            item["search_method"] = "hybrid"
+        return results
+    
+    async def _search_products_text_rpc(
+        self,
+        query_text: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        match_all: bool
+    ) -> List[Dict[str, Any]]:
+        """search_products_text RPC (hungarian_unaccent tsvector, GIN index)"""
+        client = self.supabase.get_async_client()
+        result = await client.rpc(
+            "search_products_text",
+            {
+                "query_text": query_text,
+                "search_filters": filters or {},
+                "match_count": limit,
+                "match_all": match_all
+            }
+        ).execute()
+        
+        items = list(result.data or [])
+        for item in items:
+            item["text_score"] = float(item.get("rank") or 0.0)
+        return items
+    
+    async def _lexical_candidates(
+        self,
+        query_text: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Szöveges ág: helyi BM25 index, a search_products_text RPC (bármely szóra),
+        vagy - ha az RPC még nincs telepítve - ILIKE jelöltek BM25 rangsorral
+        
+        Az ILIKE ágon az IDF csak a lekért jelöltekből számolódik (közelítés).
+        """
+        if self.text_index is not None and self.text_index.ready:
+            return self.text_index.search(query_text, limit, filters)
+        
+        try:
+            return await self._search_products_text_rpc(query_text, limit, filters, match_all=False)
+        except Exception as e:
+            logger.warning(f"search_products_text RPC nem elérhető, ILIKE keresés: {e}")
+        
+        terms = list(dict.fromkeys(tokenize(query_text)))[:MAX_LEXICAL_QUERY_TERMS]
+        if not terms:
+            return []
+        
+        client = self.supabase.get_async_client()
+        query = self._apply_product_filters(
+            client.table("products").select(
+                "id, name, description, short_description, price, brand, category_id, tags, metadata, stock_quantity"
+            ).eq("status", "active"),
+            filters
+        ).or_(",".join(
+            f"{field}.ilike.%{term}%" for term in terms for field in ("name", "brand", "description")
+        )).limit(limit * HYBRID_CANDIDATE_FACTOR)
+        
+        result = await query.execute()
+        return BM25Index.from_products(result.data or []).search(query_text, limit, filters)
+    
+    async def _vector_candidates(
+        self,
+        query_text: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        search_profile: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Vector ág: helyi ANN index szűrőkkel, vagy vector search RPC utólagos szűréssel"""
+        query_embedding = await self.generate_embedding(query_text)
+        if not query_embedding:
+            raise RuntimeError("Nem sikerült query embedding generálni")
+        
+        if self.vector_index is not None and self.vector_index.ready:
+            return self.vector_index.search(
+                query_embedding, limit, filters=filters, **self._local_search_options(search_profile)
+            )
+        
+        result = await self._vector_search_rpc(
+            query_embedding, 0.0, limit * (HYBRID_CANDIDATE_FACTOR if filters else 1), search_profile
+        )
+        
+        items = [item for item in result.data or [] if matches_filters(item, filters)][:limit]
+        for item in items:
+            item["similarity_score"] = float(item.get("similarity", 0))
+        return items
+    
+    @staticmethod
+    def _apply_product_filters(query: Any, filters: Optional[Dict[str, Any]]) -> Any:
+        """Hibrid keresési szűrők PostgREST lekérdezésre"""
+        if filters:
+            if filters.get("category_id"):
+                query = query.eq("category_id", filters["category_id"])
             
-            if not result.data:
-                return []
+            if filters.get("brand"):
+                query = query.eq("brand", filters["brand"])
             
-            # Similarity score kiszámítása (egyszerűsített)
-            for item in result.data:
-                # TODO: Implementálni a valódi similarity számítást
-                item["similarity_score"] = 0.8  # Placeholder
+            if filters.get("min_price"):
+                query = query.gte("price", filters["min_price"])
             
-            logger.info(f"Hibrid keresés: {len(result.data)} találat")
-            return result.data
+            if filters.get("max_price"):
+                query = query.lte("price", filters["max_price"])
             
-        except Exception as e:
-            logger.error(f"Hiba a hibrid keresés során: {e}")
-            return []
+            if filters.get("in_stock"):
+                query = query.gt("stock_quantity", 0)
+        return query
     
     async def optimize_vector_indexes(self) -> bool:
         """Optimalizálja a vector indexeket"""
@@ -486,30 +1106,51 @@ class VectorOperations:
             logger.error(f"Hiba a vector indexek optimalizálásakor: {e}")
             return False
     
-    async def get_vector_statistics(self) -> Dict[str, Any]:
-        """Lekéri a vector adatbázis statisztikáit"""
+    async def get_vector_statistics(self, sample_size: int = 1000) -> Dict[str, Any]:
+        """
+        Lekéri a vector adatbázis statisztikáit
+        
+        A get_vector_statistics RPC az adatbázisban számol (darabszámok,
+        normák eloszlása mintából, kategóriánkénti lefedettség, index
+        állapot), embedding nem töltődik le. Ha a függvény még nincs
+        telepítve, csak a darabszámok jönnek count lekérdezésekkel.
+        
+        Args:
+            sample_size: A norma eloszláshoz mintavételezett embeddingek száma
+        """
         try:
-            stats = {}
-            client = self.supabase.get_client()
+            client = self.supabase.get_async_client()
             
-            # Termékek száma embedding-gel
-            result = client.table("products").select("id, embedding").execute()
-            
-            total_products = len(result.data)
-            products_with_embedding = sum(1 for item in result.data if item.get("embedding"))
-            products_without_embedding = total_products - products_with_embedding
+            try:
+                result = await client.rpc("get_vector_statistics", {"sample_size": sample_size}).execute()
+                stats = result.data[0] if isinstance(result.data, list) else result.data
+                if not isinstance(stats, dict):
+                    raise RuntimeError(f"Váratlan get_vector_statistics válasz: {stats!r}")
+                stats = dict(stats)
+            except Exception as rpc_error:
+                logger.warning(f"get_vector_statistics RPC nem elérhető, csak darabszámok: {rpc_error}")
+                total_result, embedded_result = await asyncio.gather(
+                    client.table("products").select("id", count="exact", head=True).execute(),
+                    client.table("products").select(
+                        "id", count="exact", head=True
+                    ).not_.is_("embedding", "null").execute()
+                )
+                total_products = total_result.count or 0
+                products_with_embedding = embedded_result.count or 0
+                stats = {
+                    "total_products": total_products,
+                    "products_with_embedding": products_with_embedding,
+                    "products_without_embedding": total_products - products_with_embedding
+                }
             
-            stats.update({
-                "total_products": total_products,
-                "products_with_embedding": products_with_embedding,
-                "products_without_embedding": products_without_embedding,
-                "embedding_coverage": f"{(products_with_embedding/total_products*100):.1f}%" if total_products > 0 else "0%"
-            })
+            total_products = stats.get("total_products") or 0
+            products_with_embedding = stats.get("products_with_embedding") or 0
+            stats["embedding_coverage"] = (
+                f"{(products_with_embedding/total_products*100):.1f}%" if total_products > 0 else "0%"
+            )
             
-            # Embedding dimenziók
-            if products_with_embedding > 0:
-                sample_embedding = next(item["embedding"] for item in result.data if item.get("embedding"))
-                stats["embedding_dimensions"] = len(sample_embedding)
+            if self.vector_index is not None:
+                stats["local_index"] = self.vector_index.get_stats()
             
             logger.info(f"Vector statisztikák lekérdezve")
             return stats
@@ -521,18 +1162,39 @@ class VectorOperations:
     async def cleanup_orphaned_embeddings(self) -> int:
         """Törli a árva embedding-eket"""
         try:
-            client = self.supabase.get_client()
+            client = self.supabase.get_async_client()
             
             # Termékek embedding-jeinek tisztítása
-            result = client.table("products").update({
+            result = await client.table("products").update({
                 "embedding": None
             }).or_("name.is.null,name.eq.''").or_("description.is.null,description.eq.''").execute()
             
             cleaned_count = len(result.data) if result.data else 0
+            if self.vector_index is not None:
+                for item in result.data or []:
+                    self.vector_index.remove(item.get("id"))
+                    if self.text_index is not None:
+                        self.text_index.remove(item.get("id"))
             
             logger.info(f"Árva embedding-ek törölve: {cleaned_count}")
             return cleaned_count
             
         except Exception as e:
             logger.error(f"Hiba az árva embedding-ek törlésekor: {e}")
-            return 0 
\ No newline at end of file
+            return 0 
+
+
+# Globális vector operations példány (a gyakori kérdések warm-up forrása is)
+_vector_operations: Optional[VectorOperations] = None
+
+
+def get_vector_operations() -> Optional[VectorOperations]:
+    """Visszaadja a globális VectorOperations példányt (None, ha nincs OPENAI_API_KEY)"""
+    global _vector_operations
+    if _vector_operations is None:
+        openai_api_key = os.getenv("OPENAI_API_KEY")
+        if not openai_api_key:
+            logger.warning("OPENAI_API_KEY hiányzik - vector műveletek nem elérhetők")
+            return None
+        _vector_operations = VectorOperations(get_supabase_client(), openai_api_key=openai_api_key)
+    return _vector_operations
\ No newline at end of file
@@ -20,7 +20,7 @@ class AbandonedCartDetector:
     
     def __init__(self):
         """Abandoned cart detector inicializálása"""
-        self.supabase = get_supabase_client().get_client()
+        self.supabase = get_supabase_client().get_async_client()
         self.email_service = SendGridEmailService()
         self.sms_service = TwilioSMSService()
         self.discount_service = DiscountService()
@@ -17,7 +17,7 @@ class MarketingAnalytics:
     
     def __init__(self):
         """Marketing analytics inicializálása"""
-        self.supabase = get_supabase_client().get_client()
+        self.supabase = get_supabase_client().get_async_client()
         self.abandoned_cart_detector = AbandonedCartDetector()
         self.discount_service = DiscountService()
         
@@ -20,7 +20,7 @@ class DiscountService:
     
     def __init__(self):
         """Discount service inicializálása"""
-        self.supabase = get_supabase_client().get_client()
+        self.supabase = get_supabase_client().get_async_client()
         self.is_testing = os.getenv('TESTING') == 'true'
         logger.info("Discount service inicializálva")
     
@@ -6,7 +6,7 @@ Mock alapú implementáció valós webshop nélkül.
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable
 from dataclasses import dataclass
 from enum import Enum
 
@@ -24,6 +24,23 @@ class SyncJobType(Enum):
     FULL_SYNC = "full_sync"
 
 
+# A termékadatokat módosító job-ok után a katalógus cache-ek érvénytelenek
+CATALOG_SYNC_JOBS = {
+    SyncJobType.PRODUCT_SYNC,
+    SyncJobType.INVENTORY_SYNC,
+    SyncJobType.PRICE_SYNC,
+    SyncJobType.FULL_SYNC
+}
+CATALOG_CACHE_TYPES = ("product_info", "search_result")
+
+# Rendelés szinkronizáció után a hiányzó rendelés bejegyzések (negatív cache) érvénytelenek
+ORDER_SYNC_JOBS = {
+    SyncJobType.ORDER_SYNC,
+    SyncJobType.FULL_SYNC
+}
+ORDER_CACHE_TYPES = ("order",)
+
+
 @dataclass
 class SyncJobConfig:
     """Szinkronizációs job konfiguráció"""
@@ -38,8 +55,10 @@ class SyncJobConfig:
 class SyncScheduler:
     """Szinkronizációs job scheduler"""
     
-    def __init__(self, sync_manager: MockSyncManager):
+    def __init__(self, sync_manager: MockSyncManager, vector_index: Optional[Any] = None):
         self.sync_manager = sync_manager
+        # Helyi termék vector index (ProductVectorIndex) - az ár és készlet szűrők forrása
+        self.vector_index = vector_index
         self.jobs: Dict[str, SyncJobConfig] = {}
         self.running_jobs: Dict[str, asyncio.Task] = {}
         self.job_history: List[Dict] = []
@@ -127,6 +146,15 @@ class SyncScheduler:
                 self.job_history.append(job_result)
                 logger.info(f"Job sikeres: {job_id} ({execution_time:.2f}s)")
                 
+                # Ár és készlet változások átvezetése a helyi vector indexbe
+                self._update_vector_index(config.job_type, result)
+                
+                # Katalógus cache-ek érvénytelenítése (O(1) névtér generáció váltás)
+                if config.job_type in CATALOG_SYNC_JOBS:
+                    await self._invalidate_catalog_caches()
+                if config.job_type in ORDER_SYNC_JOBS:
+                    await self._invalidate_caches(ORDER_CACHE_TYPES)
+                
                 # Event handler-ek hívása
                 await self._notify_event_handlers(job_result)
                 
@@ -188,6 +216,48 @@ class SyncScheduler:
             "results": results
         }
     
+    def _update_vector_index(self, job_type: SyncJobType, result: Dict) -> int:
+        """Ár / készlet szinkron eredményének átvezetése a helyi indexbe; visszaadja a frissített termékek számát"""
+        if self.vector_index is None:
+            return 0
+        
+        if job_type == SyncJobType.FULL_SYNC:
+            results = result.get("results", {})
+            prices, inventory = results.get("prices", {}), results.get("inventory", {})
+        elif job_type == SyncJobType.PRICE_SYNC:
+            prices, inventory = result, {}
+        elif job_type == SyncJobType.INVENTORY_SYNC:
+            prices, inventory = {}, result
+        else:
+            return 0
+        
+        updates = [{"id": update["product_id"], "price": update["new_price"]}
+                   for update in prices.get("price_updates", [])]
+        updates += [{"id": update["product_id"], "stock_quantity": update["new_stock"]}
+                    for update in inventory.get("inventory_updates", [])]
+        
+        updated = 0
+        for update in updates:
+            try:
+                updated += self.vector_index.update_attributes(update)
+            except Exception as e:
+                logger.warning(f"Vector index frissítés hiba: {update['id']} - {e}")
+        return updated
+    
+    async def _invalidate_catalog_caches(self):
+        """Termék és keresési cache-ek érvénytelenítése szinkronizáció után"""
+        await self._invalidate_caches(CATALOG_CACHE_TYPES)
+    
+    async def _invalidate_caches(self, cache_types):
+        """Cache típusok érvénytelenítése (a negatív bejegyzésekkel együtt)"""
+        try:
+            from src.integrations.cache import get_redis_cache_service
+            cache_service = await get_redis_cache_service()
+            for cache_type in cache_types:
+                await cache_service.performance_cache.invalidate_namespace(cache_type)
+        except Exception as e:
+            logger.warning(f"Cache érvénytelenítés hiba ({', '.join(cache_types)}): {e}")
+    
     def add_event_handler(self, handler: Callable):
         """Event handler hozzáadása"""
         self.event_handlers.append(handler)
@@ -8,6 +8,7 @@ allowing the chatbot to work with different e-commerce systems seamlessly.
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 import logging
+import os
 from enum import Enum
 
 from .base import BaseWebshopAPI, Product, Order, Customer, OrderStatus, ProductCategory, OrderItem
@@ -15,6 +16,7 @@ from .shoprenter import ShoprenterAPI, MockShoprenterAPI
 from .unas import UNASAPI, MockUNASAPI
 from .woocommerce import WooCommerceAPI, MockWooCommerceAPI
 from .shopify import ShopifyAPI, MockShopifyAPI
+from src.integrations.cache import get_cache_warmer, get_redis_cache_service, tenant_scope
 
 logger = logging.getLogger(__name__)
 
@@ -31,12 +33,20 @@ class WebshopPlatform(str, Enum):
 class UnifiedWebshopAPI:
     """Egységes webshop API interfész több platformhoz"""
     
-    def __init__(self, platform: WebshopPlatform, api_key: str, base_url: str):
+    def __init__(self, platform: WebshopPlatform, api_key: str, base_url: str,
+                 tenant: Optional[str] = None):
         self.platform = platform
         self.api_key = api_key
         self.base_url = base_url
+        # Cache tenant: a webshop cache használata a saját memória kvótájába számít
+        self.tenant = tenant or platform.value
         self.api_client = self._create_api_client()
     
+    @property
+    def cache_key_prefix(self) -> str:
+        """Cache kulcs előtag: azonos platformú webshopok kulcsai nem ütközhetnek"""
+        return f"{self.tenant}:{self.platform.value}:"
+    
     def _create_api_client(self) -> BaseWebshopAPI:
         """API kliens létrehozása a platform alapján"""
         if self.platform == WebshopPlatform.SHOPRENTER:
@@ -75,13 +85,43 @@ class UnifiedWebshopAPI:
             return []
     
     async def get_product(self, product_id: str) -> Optional[Product]:
-        """Egy termék lekérése egységes interfészen keresztül"""
+        """
+        Egy termék lekérése egységes interfészen keresztül
+        
+        A termék adatok a performance cache-ben stale-while-revalidate módon
+        tárolódnak, így egy népszerű termék lejárata nem okoz API kérés-lavinát.
+        A nem létező termékek rövid élettartamú negatív bejegyzést kapnak.
+        """
+        async def load() -> Optional[Dict[str, Any]]:
+            product = await self.api_client.get_product(product_id)
+            return product.model_dump(mode="json") if product else None
+        
         try:
-            return await self.api_client.get_product(product_id)
+            try:
+                cache_service = await get_redis_cache_service()
+            except Exception as cache_error:
+                logger.warning(f"Cache hiba, közvetlen API lekérés: {cache_error}")
+                cache_service = None
+            
+            if cache_service:
+                with tenant_scope(self.tenant):
+                    product_data = await cache_service.performance_cache.get_or_load_product_info(
+                        f"{self.cache_key_prefix}{product_id}", load
+                    )
+            else:
+                product_data = await load()
+            
+            return Product(**product_data) if product_data else None
         except Exception as e:
             logger.error(f"Unified API hiba - get_product: {e}")
             return None
     
+    async def warm_product(self, cache_key: str) -> Optional[Product]:
+        """Cache warm-up: egy gyakran kért termék ("tenant:platform:azonosító") újratöltése"""
+        if not cache_key.startswith(self.cache_key_prefix):
+            return None
+        return await self.get_product(cache_key[len(self.cache_key_prefix):])
+    
     async def search_products(self, query: str, limit: int = 20) -> List[Product]:
         """Termék keresés egységes interfészen keresztül"""
         try:
@@ -99,9 +139,29 @@ class UnifiedWebshopAPI:
             return []
     
     async def get_order(self, order_id: str) -> Optional[Order]:
-        """Egy rendelés lekérése egységes interfészen keresztül"""
-        try:
+        """
+        Egy rendelés lekérése egységes interfészen keresztül
+        
+        A rendelés státusza változik, ezért csak a hiányzó rendelések kerülnek
+        cache-be (rövid TTL), így az érvénytelen azonosítókkal való próbálkozás
+        nem terheli a webshop API-t.
+        """
+        async def load() -> Optional[Order]:
             return await self.api_client.get_order(order_id)
+        
+        try:
+            try:
+                cache_service = await get_redis_cache_service()
+            except Exception as cache_error:
+                logger.warning(f"Cache hiba, közvetlen API lekérés: {cache_error}")
+                cache_service = None
+            
+            if cache_service:
+                with tenant_scope(self.tenant):
+                    return await cache_service.performance_cache.load_with_negative_cache(
+                        f"{self.cache_key_prefix}{order_id}", "order", load
+                    )
+            return await load()
         except Exception as e:
             logger.error(f"Unified API hiba - get_order: {e}")
             return None
@@ -145,7 +205,12 @@ class WebshopManager:
     def add_webshop(self, name: str, platform: WebshopPlatform, 
                     api_key: str, base_url: str) -> None:
         """Webshop hozzáadása a kezelőhöz"""
-        self.webshops[name] = UnifiedWebshopAPI(platform, api_key, base_url)
+        self.webshops[name] = UnifiedWebshopAPI(platform, api_key, base_url, tenant=name)
+        # A gyakran kért termékek induláskor újra cache-be kerülnek
+        get_cache_warmer().register_source(
+            f"webshop:{name}", "product_info", self.webshops[name].warm_product,
+            key_prefix=self.webshops[name].cache_key_prefix
+        )
         logger.info(f"Webshop hozzáadva: {name} ({platform.value})")
     
     def get_webshop(self, name: str) -> Optional[UnifiedWebshopAPI]:
@@ -225,4 +290,37 @@ def create_shopify_api(api_key: str, base_url: str, use_mock: bool = False) -> U
 
 def create_mock_api() -> UnifiedWebshopAPI:
     """Mock API létrehozása fejlesztéshez"""
-    return UnifiedWebshopAPI(WebshopPlatform.MOCK, "mock_key", "https://mock.webshop.com") 
\ No newline at end of file
+    return UnifiedWebshopAPI(WebshopPlatform.MOCK, "mock_key", "https://mock.webshop.com")
+
+
+# Globális webshop kezelő (a környezeti változókban beállított webshopokkal)
+_webshop_manager: Optional[WebshopManager] = None
+
+
+def get_webshop_manager() -> WebshopManager:
+    """
+    Visszaadja a globális webshop kezelőt
+    
+    Az első hívás felveszi azokat a platformokat, amelyekhez a
+    <PLATFORM>_API_KEY és <PLATFORM>_BASE_URL változók be vannak állítva
+    (pl. SHOPRENTER_API_KEY); így a termék warm-up forrásaik is regisztrálódnak.
+    """
+    global _webshop_manager
+    if _webshop_manager is None:
+        _webshop_manager = WebshopManager()
+        for platform in WebshopPlatform:
+            if platform == WebshopPlatform.MOCK:
+                continue
+            api_key = os.getenv(f"{platform.value.upper()}_API_KEY")
+            base_url = os.getenv(f"{platform.value.upper()}_BASE_URL")
+            if api_key and base_url:
+                _webshop_manager.add_webshop(platform.value, platform, api_key, base_url)
+    return _webshop_manager
+
+
+async def shutdown_webshop_manager():
+    """A globális webshop kezelő kapcsolatainak lezárása"""
+    global _webshop_manager
+    if _webshop_manager is not None:
+        await _webshop_manager.close_all()
+        _webshop_manager = None 
\ No newline at end of file
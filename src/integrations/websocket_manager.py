@@ -18,7 +18,7 @@ from dataclasses import dataclass, asdict
 
 from fastapi import WebSocket, WebSocketDisconnect
 from src.config.logging import get_logger
-from src.integrations.cache.redis_cache import get_redis_cache_service
+from src.integrations.cache import SessionData, get_redis_cache_service
 from src.models.chat import ChatMessage, ChatSession, WebSocketMessage, ChatError, MessageType
 from src.workflows.coordinator import process_coordinator_message
 from src.models.user import User
@@ -572,7 +572,6 @@ class ChatWebSocketHandler:
         
         try:
             # SessionData létrehozása
-            from src.integrations.cache.redis_cache import SessionData
             session_data = SessionData(
                 session_id=session.session_id,
                 user_id=session.user_id or "anonymous",
@@ -13,7 +13,7 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 
 from src.config.logging import setup_logging
@@ -24,8 +24,14 @@ from src.models.chat import ChatRequest, ChatResponse
 from src.models.user import User
 from src.config.audit_logging import get_audit_logger, AuditSeverity
 from src.config.gdpr_compliance import get_gdpr_compliance
-from src.integrations.cache import get_redis_cache_service, shutdown_redis_cache_service
+from src.integrations.cache import (
+    get_redis_cache_service, shutdown_redis_cache_service, request_cache_scope, tenant_scope,
+    get_cache_warmer, start_cache_warmup
+)
 from src.integrations.websocket_manager import websocket_manager, chat_handler
+from src.integrations.database.supabase_client import shutdown_async_database_clients
+from src.integrations.database.vector_operations import get_vector_operations
+from src.integrations.webshop.unified import get_webshop_manager, shutdown_webshop_manager
 from src.config.logging import get_logger
 
 # Load environment variables from .env file
@@ -104,8 +110,23 @@ async def lifespan_context(app):
         try:
             redis_cache_service = await get_redis_cache_service()
             print("✅ Redis cache service initialized")
+            # Rate limit állapot a közös connection poolon
+            if redis_cache_service.rate_limit_cache:
+                get_rate_limiter().use_cache_service(redis_cache_service.rate_limit_cache)
+            # Warm-up források: a beállított webshopok termék lekérése és a
+            # gyakori kérdések vector keresése (létrehozáskor regisztrálódnak)
+            try:
+                webshop_manager = get_webshop_manager()
+                vector_operations = get_vector_operations()
+                print(f"✅ Cache warm-up sources registered ({len(webshop_manager.webshops)} webshops, "
+                      f"question search {'on' if vector_operations else 'off'})")
+            except Exception as e:
+                print(f"⚠️ Cache warm-up source registration failed: {e}")
+            # Leggyakoribb kulcsok előtöltése a háttérben (readiness ezt követi)
+            start_cache_warmup(getattr(redis_cache_service, "pool", None))
         except Exception as e:
             print(f"⚠️ Redis cache service initialization failed: {e}")
+            start_cache_warmup(None)
         
         # WebSocket handler inicializálása
         try:
@@ -139,12 +160,26 @@ async def lifespan_context(app):
         except Exception as e:
             print(f"⚠️ LangGraph SDK authentication shutdown failed: {e}")
         
+        # Webshop kapcsolatok lezárása
+        try:
+            await shutdown_webshop_manager()
+        except Exception as e:
+            print(f"⚠️ Webshop manager shutdown failed: {e}")
+        
         # Redis cache leállítása
         try:
+            await get_cache_warmer().stop()
             await shutdown_redis_cache_service()
             print("✅ Redis cache service stopped")
         except Exception as e:
             print(f"⚠️ Redis cache service shutdown failed: {e}")
+        
+        # Async adatbázis connection pool lezárása
+        try:
+            await shutdown_async_database_clients()
+            print("✅ Async database connection pool closed")
+        except Exception as e:
+            print(f"⚠️ Async database connection pool shutdown failed: {e}")
             
     except Exception as e:
         print(f"❌ Error shutting down security systems: {e}")
@@ -214,13 +249,17 @@ async def health_check():
         try:
             redis_cache_service = await get_redis_cache_service()
             redis_health = await redis_cache_service.health_check()
-            services_status["redis"] = "connected" if redis_health["redis_connection"] else "disconnected"
+            if redis_health.get("status") == "degraded":
+                # Redis down - cache served from the in-process fallback
+                services_status["redis"] = "degraded"
+            else:
+                services_status["redis"] = "connected" if redis_health.get("redis_connection") else "disconnected"
         except Exception as e:
             services_status["redis"] = "error"
             print(f"Redis health check error: {e}")
         
         # Overall status
-        if missing_vars:
+        if missing_vars or services_status.get("redis") == "degraded":
             status = "degraded"
         else:
             status = "healthy"
@@ -246,6 +285,56 @@ async def health_check():
         )
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """
+    Liveness probe: the process is up and serving requests.
+    
+    Does not depend on the cache or other services, so a cold or degraded
+    cache never gets the instance restarted.
+    """
+    return {
+        "status": "alive",
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe: the cache warm-up finished (or hit its deadline).
+    
+    Returns 503 while the most accessed keys are still being prefilled, so
+    the load balancer keeps traffic on warm instances during a rollout.
+    """
+    readiness = get_cache_warmer().readiness()
+    body = {
+        "status": "ready" if readiness["ready"] else "warming_up",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "cache_warmup": readiness
+    }
+    if not readiness["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrikák (text exposition format 0.0.4).
+    
+    Cache rétegenként (redis, workflow, agent) és cache típusonként:
+    hit/miss/error számlálók, érték méret és latencia hisztogramok,
+    valamint az agent cache statisztikái.
+    """
+    from src.integrations.cache.metrics import get_cache_metrics
+    
+    return PlainTextResponse(
+        get_cache_metrics().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/api/v1/status")
 async def api_status():
     """
@@ -464,11 +553,15 @@ async def chat_endpoint(request: ChatRequest, request_obj: Request):
             user = User(id=request.user_id, email="user@example.com")  # Placeholder email
         
         # Koordinátor agent hívása biztonsági paraméterekkel
-        agent_response = await process_coordinator_message(
-            message=request.message,
-            user=user,
-            session_id=request.session_id
-        )
+        # (a kérés cache olvasásai egy Redis round trip-be vannak kötegelve,
+        # a cache írások a webshop memória kvótájába számítanak)
+        with tenant_scope((request.context or {}).get("webshop_id")):
+            async with request_cache_scope():
+                agent_response = await process_coordinator_message(
+                    message=request.message,
+                    user=user,
+                    session_id=request.session_id
+                )
         
         # ChatResponse létrehozása
         response = ChatResponse(
@@ -565,8 +658,9 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                 # Üzenet fogadása
                 message_data = await websocket.receive_json()
                 
-                # Üzenet feldolgozása
-                response = await chat_handler.handle_message(websocket, connection_id, message_data)
+                # Üzenet feldolgozása (üzenetenkénti cache scope)
+                async with request_cache_scope():
+                    response = await chat_handler.handle_message(websocket, connection_id, message_data)
                 
                 # Válasz küldése (JSON-safe response)
                 safe_response = _make_json_safe(response)
@@ -672,6 +766,7 @@ async def cache_stats():
     """
     try:
         from src.integrations.cache import get_redis_cache_service
+        from src.integrations.cache.metrics import get_cache_metrics
         
         redis_cache_service = await get_redis_cache_service()
         stats = await redis_cache_service.get_stats()
@@ -681,6 +776,7 @@ async def cache_stats():
             "cache_performance": {
                 "stats": stats,
                 "health": health,
+                "by_cache_type": get_cache_metrics().snapshot(),
                 "cache_type": "Redis",
                 "features": [
                     "Session Caching",
@@ -700,31 +796,53 @@ async def cache_stats():
         )
 
 
-@app.post("/api/v1/cache/invalidate")
-async def invalidate_cache(pattern: str = None):
+@app.get("/api/v1/cache/tenants")
+async def cache_tenant_memory():
     """
-    Cache érvénytelenítése.
+    Cache memória használat webshop (tenant) és cache típus szerint.
     
-    Args:
-        pattern: Opcionális pattern a szelektív érvénytelenítéshez
-        
     Returns:
-        Érvénytelenítés eredménye
+        Tenantonkénti bájtok, kvóták és kvóta miatti kiürítések
     """
     try:
-        from src.workflows.langgraph_workflow import get_enhanced_workflow_manager
-        
-        workflow_manager = get_enhanced_workflow_manager()
-        await workflow_manager.invalidate_cache(pattern)
+        redis_cache_service = await get_redis_cache_service()
+        pool = getattr(redis_cache_service, "pool", None)
+        if pool is None or not hasattr(pool, "get_tenant_memory_report"):
+            raise HTTPException(status_code=503, detail="Tenant memória riport nem elérhető")
         
         return {
-            "cache_invalidation": {
-                "status": "success",
-                "pattern": pattern,
-                "message": f"Cache érvénytelenítve: {pattern if pattern else 'all'}"
-            },
+            "tenant_memory": pool.get_tenant_memory_report(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_info = get_error_message("GENERIC_ERROR", error_code="E001")
+        logger.error(f"Hiba a tenant memória riport lekérésekor: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=error_info
+        )
+
+
+@app.post("/api/v1/cache/invalidate", status_code=202)
+async def invalidate_cache(pattern: str = None, cache_type: str = "agent_response"):
+    """
+    Cache érvénytelenítése.
+    
+    Az érvénytelenítés háttér taskként fut (SCAN + UNLINK, ops budget-tel), így
+    nem blokkolja a Redis-t; az előrehaladás a job azonosítóval lekérdezhető.
+    
+    Args:
+        pattern: Opcionális pattern a szelektív érvénytelenítéshez
+        cache_type: Érvénytelenítendő cache típus (alapértelmezés: agent válaszok)
+        
+    Returns:
+        Érvénytelenítési job adatai
+    """
+    try:
+        redis_cache_service = await get_redis_cache_service()
+        job = redis_cache_service.start_invalidation(cache_type, pattern or "*")
     except Exception as e:
         error_info = get_error_message("GENERIC_ERROR", error_code="E001")
         logger.error(f"Hiba a cache érvénytelenítésekor: {e}", exc_info=True)
@@ -732,6 +850,47 @@ async def invalidate_cache(pattern: str = None):
             status_code=500,
             detail=error_info
         )
+    
+    if job is None:
+        raise HTTPException(
+            status_code=503,
+            detail=get_error_message("NETWORK_ERROR")
+        )
+    
+    return {
+        "cache_invalidation": {
+            **job.to_dict(),
+            "cache_type": cache_type,
+            "pattern": pattern,
+            "message": f"Cache érvénytelenítés elindítva: {cache_type}:{pattern if pattern else 'all'}"
+        },
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+
+@app.get("/api/v1/cache/invalidate/{job_id}")
+async def invalidation_status(job_id: str):
+    """
+    Cache érvénytelenítési job előrehaladásának lekérése.
+    
+    Args:
+        job_id: Az érvénytelenítés indításakor kapott azonosító
+        
+    Returns:
+        Job állapota (scanned / deleted kulcsok, státusz)
+    """
+    redis_cache_service = await get_redis_cache_service()
+    job = redis_cache_service.get_invalidation_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=get_error_message("INVALID_INPUT")
+        )
+    
+    return {
+        "cache_invalidation": job.to_dict(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
 
 
 # Development only endpoints
@@ -8,7 +8,7 @@ optimization plan.
 
 import asyncio
 import time
-from typing import Dict, Any, Optional, Type
+from typing import Dict, Any, List, Optional, Tuple, Type
 from dataclasses import dataclass
 from threading import Lock
 from datetime import datetime, timedelta
@@ -22,6 +22,7 @@ from ..agents.recommendations.agent import create_recommendation_agent
 from ..agents.marketing.agent import create_marketing_agent
 from ..agents.social_media.agent import create_social_media_agent
 from ..models.agent import AgentType
+from ..integrations.cache.metrics import get_cache_metrics
 
 
 @dataclass
@@ -68,6 +69,7 @@ class AgentCacheManager:
             "agents_created": 0,
             "last_cleanup": datetime.now()
         }
+        get_cache_metrics().register_collector("agent_cache", self.get_metric_samples)
         self._initialized = True
     
     def get_agent(self, agent_type: AgentType) -> Agent:
@@ -241,6 +243,28 @@ class AgentCacheManager:
             "memory_usage": self._estimate_memory_usage()
         }
     
+    def get_metric_samples(self) -> List[Tuple[str, str, str, Dict[str, str], float]]:
+        """
+        Agent cache statistics as Prometheus samples (collected on /metrics scrape).
+        
+        Returns:
+            List of (metric name, help, type, labels, value) tuples
+        """
+        samples = [
+            ("chatbuddy_agent_cache_hits_total", "Agent instance cache hits", "counter",
+             {}, self._stats["cache_hits"]),
+            ("chatbuddy_agent_cache_misses_total", "Agent instance cache misses", "counter",
+             {}, self._stats["cache_misses"]),
+            ("chatbuddy_agent_cache_agents_created_total", "Agent instances created", "counter",
+             {}, self._stats["agents_created"]),
+            ("chatbuddy_agent_cache_size", "Cached agent instances", "gauge",
+             {}, len(self._agent_cache))
+        ]
+        for agent_type, cached_agent in list(self._agent_cache.items()):
+            samples.append(("chatbuddy_agent_cache_usage_total", "Uses of a cached agent instance", "counter",
+                            {"agent_type": agent_type.value}, cached_agent.usage_count))
+        return samples
+    
     def _estimate_memory_usage(self) -> str:
         """
         Estimate memory usage of cached agents.
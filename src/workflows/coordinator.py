@@ -7,8 +7,9 @@ LangGraph workflow architektúrával, amely agent caching, enhanced routing
 """
 
 import asyncio
+import hashlib
+import json
 import time
-from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, AsyncGenerator
 from dataclasses import dataclass
 
@@ -89,6 +90,21 @@ class CoordinatorAgent:
                     print(f"⚠️ Redis cache initialization failed: {e}")
                 self._cache_initialized = True  # Mark as initialized to avoid retries
     
+    def _generate_response_cache_key(
+        self,
+        message: str,
+        user: Optional[User],
+        session_id: Optional[str]
+    ) -> str:
+        """Koordinátor válasz cache kulcs generálása."""
+        cache_data = {
+            "message": message,
+            "user_id": user.id if user else "anonymous",
+            "session_id": session_id,
+            "timestamp": int(time.time() / 300)  # 5-minute cache window
+        }
+        return f"coordinator_response:{hashlib.md5(json.dumps(cache_data, sort_keys=True).encode()).hexdigest()}"
+    
     async def _preload_agents(self):
         """Preload all agents for faster response times."""
         if not self._agents_preloaded:
@@ -138,6 +154,13 @@ class CoordinatorAgent:
             await self._initialize_cache()
             await self._preload_agents()
             
+            # Register the session and the user's namespace generation with the
+            # request loader: they arrive in one batch while the message is checked
+            if self._session_cache and session_id:
+                self._session_cache.prefetch_session(session_id)
+            if self._performance_cache and user:
+                self._performance_cache.prefetch_scope(user=user.id)
+            
             # 2. Input validation and sanitization
             sanitized_message = self._input_validator.sanitize_string(message)
             if sanitized_message != message:
@@ -154,29 +177,25 @@ class CoordinatorAgent:
                 )
                 return
             
-            # 4. Check Redis cache for session
+            # 4. Response cache key - scoped to the user's namespace so all of
+            #    a user's cached responses can be invalidated at once
+            cache_key = None
+            cache_scope = {"user": user.id} if user else None
+            if self._performance_cache:
+                cache_key = self._generate_response_cache_key(message, user, session_id)
+            
+            # 5-6. Session and response cache reads - the session and the
+            #    generation come from the prefetched batch, only the response
+            #    GET needs a second round trip. The activity touch is buffered.
+            cache_reads = []
             if self._session_cache and session_id:
-                session_data = await self._session_cache.get_session(session_id)
-                if session_data:
-                    # Update session activity
-                    session_data.last_activity = datetime.now()
-                    await self._session_cache.update_session(session_id, session_data)
+                cache_reads.append(self._session_cache.get_session(session_id))
+            if self._performance_cache:
+                cache_reads.append(self._performance_cache.get_cached_agent_response(cache_key, scope=cache_scope))
+            cache_results = await asyncio.gather(*cache_reads)
             
-            # 5. Check Redis cache for response
             if self._performance_cache:
-                import hashlib
-                import json
-                
-                # Generate cache key for response
-                cache_data = {
-                    "message": message,
-                    "user_id": user.id if user else "anonymous",
-                    "session_id": session_id,
-                    "timestamp": int(time.time() / 300)  # 5-minute cache window
-                }
-                cache_key = f"coordinator_response:{hashlib.md5(json.dumps(cache_data, sort_keys=True).encode()).hexdigest()}"
-                
-                cached_response = await self._performance_cache.get_cached_agent_response(cache_key)
+                cached_response = cache_results[-1]
                 if cached_response:
                     # Check if cache response is valid
                     if isinstance(cached_response, dict) and "error" not in cached_response:
@@ -195,7 +214,7 @@ class CoordinatorAgent:
                         )
                         return
             
-            # 6. Create dependencies
+            # 7. Create dependencies
             if dependencies is None:
                 dependencies = CoordinatorDependencies(
                     user=user,
@@ -208,7 +227,7 @@ class CoordinatorAgent:
                     gdpr_compliance=self._gdpr_compliance
                 )
             
-            # 7. Process message through correct LangGraph workflow (streaming)
+            # 8. Process message through correct LangGraph workflow (streaming)
             user_context = {
                 "user_id": user.id if user else None,
                 "email": user.email if user else None,
@@ -283,7 +302,7 @@ class CoordinatorAgent:
                     }
                 )
 
-            # 8. Cache the final response in Redis
+            # 9. Cache the final response in Redis
             if self._performance_cache and full_response_text:
                 response_data = {
                     "response_text": full_response_text,
@@ -292,9 +311,9 @@ class CoordinatorAgent:
                     "processing_time": asyncio.get_event_loop().time() - start_time,
                     "created_at": time.time()
                 }
-                await self._performance_cache.cache_agent_response(cache_key, response_data)
+                await self._performance_cache.cache_agent_response(cache_key, response_data, scope=cache_scope)
             
-            # 9. Audit logging for successful interaction
+            # 10. Audit logging for successful interaction
             await log_agent_interaction(
                 user_id=user.id if user else "anonymous",
                 agent_name="coordinator",
@@ -33,6 +33,7 @@ from ..config.security import get_threat_detector, InputValidator
 from ..config.gdpr_compliance import get_gdpr_compliance, ConsentType, DataCategory
 # Redis cache imports
 from ..integrations.cache import get_redis_cache_service, PerformanceCache
+from ..integrations.cache.metrics import get_cache_metrics
 
 
 class OptimizedPydanticAIToolNode:
@@ -103,8 +104,10 @@ class OptimizedPydanticAIToolNode:
                     "agent_name": self.agent_name
                 })
                 
+                lookup_start = time.time()
                 cached_response = await self._redis_cache.get_cached_agent_response(query_hash)
                 if cached_response:
+                    get_cache_metrics().hit('agent', self.agent_name, time.time() - lookup_start)
                     # Return cached response
                     state = update_state_with_response(
                         state=state,
@@ -119,6 +122,7 @@ class OptimizedPydanticAIToolNode:
                     )
                     state["current_agent"] = self.agent_name
                     return state
+                get_cache_metrics().miss('agent', self.agent_name, time.time() - lookup_start)
             
             # 7. Create dependencies if not exists
             if not self._dependencies:
@@ -930,6 +934,7 @@ class LangGraphWorkflowManager:
                 if cached_result:
                     # Cache hit
                     self._performance_metrics["cache_hits"] += 1
+                    get_cache_metrics().hit('workflow', 'workflow_result', time.time() - start_time)
                     self._performance_metrics["cache_hit_rate"] = (
                         self._performance_metrics["cache_hits"] / 
                         self._performance_metrics["total_requests"]
@@ -956,6 +961,7 @@ class LangGraphWorkflowManager:
             # 4. Cache miss - process normally
             if self._redis_cache:
                 self._performance_metrics["cache_misses"] += 1
+                get_cache_metrics().miss('workflow', 'workflow_result', time.time() - start_time)
                 self._performance_metrics["cache_hit_rate"] = (
                     self._performance_metrics["cache_hits"] / 
                     self._performance_metrics["total_requests"]
@@ -1040,9 +1046,9 @@ class LangGraphWorkflowManager:
     async def _invalidate_all_workflow_cache(self):
         """Összes workflow cache érvénytelenítése."""
         try:
-            # This would clear all workflow-related cache entries
-            # Implementation depends on Redis key patterns
-            pass
+            # Workflow and agent results live in the agent_response namespace -
+            # moving it to a new generation is a single INCR, old entries age out
+            await self._redis_cache.invalidate_namespace('agent_response')
         except Exception as e:
             # Log error but don't fail
             pass
@@ -21,7 +21,7 @@ class TestAbandonedCartDetectorInitialization:
     def test_initialization_default_config(self, mock_discount, mock_sms, mock_email, mock_supabase):
         """Alapértelmezett konfiguráció inicializálás teszt"""
         mock_supabase_client = Mock()
-        mock_supabase.return_value.get_client.return_value = mock_supabase_client
+        mock_supabase.return_value.get_async_client.return_value = mock_supabase_client
         
         detector = AbandonedCartDetector()
         
@@ -45,7 +45,7 @@ class TestAbandonedCartDetectorInitialization:
     def test_initialization_custom_config(self, mock_discount, mock_sms, mock_email, mock_supabase):
         """Egyedi konfiguráció inicializálás teszt"""
         mock_supabase_client = Mock()
-        mock_supabase.return_value.get_client.return_value = mock_supabase_client
+        mock_supabase.return_value.get_async_client.return_value = mock_supabase_client
         
         detector = AbandonedCartDetector()
         
@@ -404,7 +404,7 @@ class TestCleanupOldAbandonedCarts:
                 mock_table.delete = lambda: mock_delete
                 mock_client.table = lambda table_name: mock_table
                 
-                mock_supabase.return_value.get_client.return_value = mock_client
+                mock_supabase.return_value.get_async_client.return_value = mock_client
                 detector = AbandonedCartDetector()
                 detector.supabase = mock_client
                 return detector
@@ -466,7 +466,7 @@ class TestMarkCartReturned:
                 mock_table.update.return_value = mock_update
                 mock_client.table.return_value = mock_table
                 
-                mock_supabase.return_value.get_client.return_value = mock_client
+                mock_supabase.return_value.get_async_client.return_value = mock_client
                 detector = AbandonedCartDetector()
                 detector.supabase = mock_client
                 detector.is_testing = False  # Explicit módon beállítjuk
@@ -778,7 +778,7 @@ class TestStatistics:
                             mock_table.select.return_value = mock_select
                             mock_client.table.return_value = mock_table
                             
-                            mock_supabase.return_value.get_client.return_value = mock_client
+                            mock_supabase.return_value.get_async_client.return_value = mock_client
                             detector = AbandonedCartDetector()
                             detector.supabase = mock_client
                             return detector
@@ -0,0 +1,130 @@
+
+import random
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from src.integrations.cache.adaptive_ttl import (
+    AdaptiveTTLPolicy,
+    solve_change_budget,
+    stale_fraction
+)
+from src.integrations.cache.redis_connection_pool import OptimizedRedisConnectionPool
+from src.integrations.cache.ttl_simulation import (
+    TraceRecorder,
+    compare,
+    load_trace
+)
+
+
+@pytest.fixture
+def policy():
+    """Fixture for a policy with one adaptive cache type"""
+    return AdaptiveTTLPolicy(
+        default_ttls={"product_info": 3600},
+        bounds={"product_info": (300, 86400)},
+        staleness_budget=0.05,
+        min_samples=3
+    )
+
+
+def _observe(policy, key, contents, interval, reads_per_interval=10):
+    now = 0.0
+    for content in contents:
+        for _ in range(reads_per_interval):
+            policy.record_read("product_info", key, now=now)
+        policy.record_refresh("product_info", key, content, now=now)
+        now += interval
+    return now
+
+
+def test_change_budget_matches_stale_fraction():
+    """The solved lambda * TTL yields exactly the staleness budget"""
+    x = solve_change_budget(0.05)
+    assert stale_fraction(x) == pytest.approx(0.05, rel=1e-6)
+    assert solve_change_budget(0.0) == 0.0
+
+
+def test_static_ttl_until_enough_samples(policy):
+    """Keys keep the static TTL until min_samples refreshes"""
+    now = _observe(policy, "p1", [{"price": 1}, {"price": 1}], interval=600)
+    assert policy.ttl_for("product_info", "p1", now=now) == 3600
+    assert policy.ttl_for("search_result", "q", now=now) == 0
+
+
+def test_stable_key_gets_longer_ttl(policy):
+    """Identical refreshes stretch the TTL up to the upper bound"""
+    now = _observe(policy, "stable", [{"price": 1}] * 6, interval=3600)
+    assert policy.ttl_for("product_info", "stable", now=now) == 86400
+
+
+def test_changing_key_gets_shorter_ttl(policy):
+    """Content that changes on every refresh gets a TTL below the static one"""
+    now = _observe(policy, "stock", [{"stock": n} for n in range(6)], interval=600)
+    ttl = policy.ttl_for("product_info", "stock", now=now)
+    assert 300 <= ttl < 3600
+    assert policy.change_rate("product_info", "stock") > 1 / 600
+
+
+def test_cold_key_does_not_grow_past_static_ttl(policy):
+    """Keys read less than once per lifetime gain nothing from a longer TTL"""
+    now = _observe(policy, "cold", [{"price": 1}] * 6, interval=3600, reads_per_interval=0)
+    assert policy.ttl_for("product_info", "cold", now=now) == 3600
+
+
+def _record_trace(path, keys, change_every):
+    """One read per key per minute for a week; fills reveal the content every refresh period"""
+    rng = random.Random(7)
+    recorder = TraceRecorder(path, buffer_size=1000)
+    for step in range(0, 7 * 24 * 3600, 60):
+        for key in keys:
+            recorder({"ts": step, "op": "read", "cache_type": "product_info", "key": key})
+            if step % 600 == 0:
+                digest = str(rng.random()) if change_every and step % change_every == 0 else "same"
+                recorder({"ts": step, "op": "fill", "cache_type": "product_info", "key": key, "digest": digest})
+    recorder.flush()
+    return load_trace(path)
+
+
+def test_replay_stable_keys_gain_hits(tmp_path):
+    """Content that never changes is served longer than the static TTL"""
+    events = _record_trace(str(tmp_path / "stable.jsonl"), ["p1", "p2"], change_every=None)
+    report = compare(events, {"product_info": 600}, {"product_info": (60, 86400)})
+    assert report["adaptive"]["hit_rate"] > report["static"]["hit_rate"]
+    assert report["adaptive"]["fetches"] < report["static"]["fetches"]
+    assert report["adaptive"]["stale_rate"] == 0.0
+
+
+def test_replay_volatile_keys_stay_within_budget(tmp_path):
+    """Fast-changing content gets a TTL that keeps stale reads within the budget"""
+    events = _record_trace(str(tmp_path / "volatile.jsonl"), ["stock"], change_every=600)
+    report = compare(events, {"product_info": 3600}, {"product_info": (60, 86400)},
+                     staleness_budget=0.05)
+    assert report["static"]["stale_rate"] > 0.5
+    assert report["adaptive"]["stale_rate"] <= 0.05
+
+
+@pytest.mark.asyncio
+async def test_pool_set_uses_adaptive_ttl():
+    """Writes without an explicit TTL use the learned per-key TTL"""
+    pool = OptimizedRedisConnectionPool()
+    original = pool._redis_client, pool._connected, pool._ttl_policy
+    
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True, True])
+    client = MagicMock()
+    client.pipeline.return_value = pipe
+    policy = MagicMock()
+    policy.tracks.return_value = True
+    policy.ttl_for.return_value = 7200
+    
+    pool._redis_client, pool._connected, pool._ttl_policy = client, True, policy
+    try:
+        assert await pool.set("p1", {"price": 1}, cache_type="product_info")
+        await pool.set("p2", {"price": 1}, cache_type="product_info", ttl=10)
+    finally:
+        pool._redis_client, pool._connected, pool._ttl_policy = original
+    
+    assert pipe.setex.call_args_list[0].args[1] == 7200
+    assert pipe.setex.call_args_list[2].args[1] == 10
+    policy.record_refresh.assert_called_once()
@@ -0,0 +1,206 @@
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from unittest.mock import MagicMock, AsyncMock
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.integrations.cache.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from src.integrations.cache.memory_cache import InMemoryCacheBackend, MemoryPipeline
+from src.integrations.cache.namespaces import NamespaceGenerations
+from src.integrations.cache.optimized_redis_service import OptimizedSessionCache
+from src.integrations.cache.redis_connection_pool import OptimizedRedisConnectionPool
+
+
+@pytest_asyncio.fixture
+async def pool():
+    """Fixture for a fresh pool instance (the shared singleton is restored afterwards)"""
+    saved = OptimizedRedisConnectionPool._instance
+    OptimizedRedisConnectionPool._instance = None
+    fresh = OptimizedRedisConnectionPool()
+    fresh.config.circuit_recovery_timeout = 60
+    fresh._breaker.recovery_timeout = 60
+    fresh._breaker.failure_threshold = 3
+    yield fresh
+
+    tasks = list(fresh._cleanup_tasks)
+    if fresh._probe_task is not None:
+        tasks.append(fresh._probe_task)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    OptimizedRedisConnectionPool._instance = saved
+
+
+@pytest.fixture
+def failing_redis_client():
+    """Fixture for a redis client whose every call fails with a connection error"""
+    error = RedisConnectionError("Connection refused")
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(side_effect=error)
+    client = MagicMock()
+    client.pipeline = MagicMock(return_value=pipe)
+    client.exists = AsyncMock(side_effect=error)
+    return client
+
+
+def test_breaker_opens_after_threshold():
+    """Consecutive failures open the circuit, a success resets the count"""
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure(OSError("down"))
+    breaker.record_success()
+    assert breaker.consecutive_failures == 0
+
+    assert breaker.record_failure(OSError("down")) is False
+    assert breaker.record_failure(OSError("down")) is False
+    assert breaker.record_failure(OSError("down")) is True
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_breaker_probe_cycle():
+    """A failed probe re-opens the circuit, a successful one closes it"""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5)
+    breaker.record_failure()
+    assert not breaker.should_probe(now=breaker.opened_at + 1)
+    assert breaker.should_probe(now=breaker.opened_at + 5)
+
+    breaker.begin_probe()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is False
+    assert breaker.record_failure() is True
+    assert breaker.state == OPEN
+
+    breaker.begin_probe()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.get_stats()["opened"] == 1
+
+
+def test_memory_backend_ttl_and_lru():
+    """Entries expire with their TTL and the least recently used is evicted"""
+    backend = InMemoryCacheBackend(max_entries=2)
+    backend.put("expired", "x", expires_at=time.time() - 1)
+    assert backend.get("expired") is None
+
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+    assert len(backend) == 2
+
+    assert backend.set("a", 5, nx=True) is False
+    assert backend.incr("a", 2) == 3
+
+
+def test_memory_backend_copies_values():
+    """Cached mutable values cannot be changed through the caller's reference"""
+    backend = InMemoryCacheBackend()
+    value = {"items": [1]}
+    backend.set("k", value)
+    value["items"].append(2)
+    backend.get("k")["items"].append(3)
+    assert backend.get("k") == {"items": [1]}
+
+
+@pytest.mark.asyncio
+async def test_memory_pipeline_hash_and_zset():
+    """Pipeline commands answer like a redis client with decode_responses=False"""
+    backend = InMemoryCacheBackend()
+    pipe = MemoryPipeline(backend)
+    pipe.hset("h", mapping={"user_id": "u1", "count": 2})
+    pipe.expire("h", 60)
+    pipe.zadd("z", {"s1": 1.0, "s2": 2.0})
+    pipe.zremrangebyscore("z", "-inf", 1.5)
+    pipe.hgetall("h")
+    pipe.zrevrange("z", 0, -1)
+
+    assert await pipe.execute() == [2, True, 2, 1, {b"user_id": b"u1", b"count": b"2"}, [b"s2"]]
+    with pytest.raises(AttributeError):
+        pipe.eval("return 1", 0)
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_starts_degraded(pool):
+    """A failed initial connection serves the cache from memory at once"""
+    pool.redis_url = "redis://localhost:1"
+
+    assert await pool.initialize() is False
+    assert pool.degraded
+
+    assert await pool.set("p1", {"name": "Laptop"}, cache_type="product_info") is True
+    assert await pool.get("p1", cache_type="product_info") == {"name": "Laptop"}
+    assert await pool.exists("p1", cache_type="product_info") is True
+    assert await pool.delete("p1", cache_type="product_info") is True
+    assert await pool.get("p1", cache_type="product_info") is None
+
+    health = await pool.health_check()
+    assert health["status"] == "degraded"
+    assert health["mode"] == "memory_fallback"
+    assert health["redis_connection"] is False
+    assert "chatbuddy_cache_degraded 1" in pool._cache_metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_connection_errors_open_circuit(pool, failing_redis_client):
+    """After the failure threshold calls stop waiting on Redis"""
+    pool._redis_client = failing_redis_client
+    pool._connected = True
+
+    for _ in range(3):
+        assert await pool.get("k") is None
+    assert pool.degraded
+
+    calls = failing_redis_client.pipeline.call_count
+    assert await pool.set("k", "v") is True
+    assert await pool.get("k") == "v"
+    assert failing_redis_client.pipeline.call_count == calls
+
+
+@pytest.mark.asyncio
+async def test_sessions_work_while_degraded(pool):
+    """Session HASH/ZSET pipelines run against the in-memory backend"""
+    pool._breaker.trip()
+    sessions = OptimizedSessionCache(pool)
+
+    session_id = await sessions.create_session("u1", device_info={"os": "linux"})
+    assert session_id is not None
+
+    session = await sessions.get_session(session_id)
+    assert session.user_id == "u1"
+    assert [s.session_id for s in await sessions.get_user_sessions("u1")] == [session_id]
+    assert await pool.run_script("return 1", [], []) is None
+
+
+@pytest.mark.asyncio
+async def test_recovery_replays_invalidations(pool):
+    """Namespace bumps made while degraded reach Redis when it comes back"""
+    counters = {}
+
+    async def incr(key):
+        counters[key] = counters.get(key, 0) + 1
+        return counters[key]
+
+    client = MagicMock()
+    client.incr = AsyncMock(side_effect=incr)
+    client.mget = AsyncMock(side_effect=lambda keys: [counters.get(key) for key in keys])
+    pool._generations = NamespaceGenerations()
+    pool._breaker.trip()
+
+    assert await pool.bump_namespace("product_info") == 1
+    assert pool.key_for("product_info", "p1") == "chatbuddy:v1:product_info:g1:p1"
+    await pool.set("p1", "stale", cache_type="product_info")
+
+    pool._redis_client = client
+    await pool._recover()
+
+    assert not pool.degraded
+    client.incr.assert_awaited_once_with("chatbuddy:v1:ns:product_info")
+    assert pool._pending_bumps == set()
+    assert len(pool._fallback) == 0
+    assert (await pool.health_check())["status"] != "degraded"
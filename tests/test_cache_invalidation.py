@@ -0,0 +1,89 @@
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from src.integrations.cache.invalidation import CacheInvalidator
+
+
+@pytest.fixture
+def mock_redis_client():
+    """Fixture for a redis client whose SCAN walks three cursor pages"""
+    client = MagicMock()
+    pages = {
+        0: (11, [b"chatbuddy:v1:agent_response:a", b"chatbuddy:v1:agent_response:a:meta"]),
+        11: (22, []),
+        22: (0, [b"chatbuddy:v1:agent_response:b"])
+    }
+    client.scan = AsyncMock(side_effect=lambda cursor, match, count: pages[cursor])
+    client.unlink = AsyncMock(side_effect=lambda *keys: len(keys))
+    client.keys = AsyncMock(side_effect=AssertionError("KEYS must not be used"))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_invalidate_walks_cursor_with_unlink(mock_redis_client):
+    """Every SCAN page is unlinked; empty pages do not end the walk early"""
+    invalidator = CacheInvalidator(mock_redis_client, scan_count=100, ops_per_second=0)
+    job = await invalidator.invalidate("chatbuddy:v1:agent_response:*")
+    
+    assert job.status == "completed"
+    assert job.scanned == 3
+    assert job.deleted == 3
+    assert job.batches == 3
+    assert mock_redis_client.unlink.await_count == 2
+    mock_redis_client.keys.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_background_job_reports_progress(mock_redis_client):
+    """start() returns immediately and the job is queryable until it finishes"""
+    invalidator = CacheInvalidator(mock_redis_client, scan_count=100, ops_per_second=0)
+    job = invalidator.start("chatbuddy:v1:agent_response:*")
+    assert invalidator.get_job(job.job_id) is job
+    assert not job.done
+    
+    await job._task
+    progress = invalidator.get_job(job.job_id).to_dict()
+    assert progress["status"] == "completed"
+    assert progress["deleted"] == 3
+    assert progress["finished_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_ops_budget_paces_batches(mock_redis_client, monkeypatch):
+    """Each batch sleeps long enough to stay within ops_per_second"""
+    sleeps = []
+    real_sleep = asyncio.sleep
+    
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        await real_sleep(0)
+    
+    monkeypatch.setattr("src.integrations.cache.invalidation.asyncio.sleep", fake_sleep)
+    invalidator = CacheInvalidator(mock_redis_client, scan_count=100, ops_per_second=1000)
+    await invalidator.invalidate("chatbuddy:v1:agent_response:*")
+    
+    # Two pauses (none after the last page), ~0.1s for 100 scanned + unlinked keys
+    assert len(sleeps) == 2
+    assert all(0.09 < delay <= 0.102 for delay in sleeps)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_reported(mock_redis_client):
+    """Redis errors mark the job failed instead of raising"""
+    mock_redis_client.scan = AsyncMock(side_effect=Exception("redis down"))
+    invalidator = CacheInvalidator(mock_redis_client, ops_per_second=0)
+    job = await invalidator.invalidate("chatbuddy:v1:*")
+    assert job.status == "failed"
+    assert job.error == "redis down"
+
+
+@pytest.mark.asyncio
+async def test_scan_collects_keys(mock_redis_client):
+    """scan() gathers all pages without KEYS"""
+    invalidator = CacheInvalidator(mock_redis_client)
+    keys = await invalidator.scan("chatbuddy:v1:agent_response:*")
+    assert len(keys) == 3
+    mock_redis_client.unlink.assert_not_awaited()
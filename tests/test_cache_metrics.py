@@ -0,0 +1,102 @@
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from src.integrations.cache.metrics import CacheMetricsRegistry, Histogram
+from src.integrations.cache.redis_connection_pool import OptimizedRedisConnectionPool
+
+
+@pytest.fixture
+def registry():
+    """Fixture for an isolated metrics registry"""
+    return CacheMetricsRegistry(latency_buckets=(0.001, 0.01), size_buckets=(100, 1000))
+
+
+def test_histogram_buckets_are_cumulative():
+    """Observations land in the first bucket whose bound is >= the value"""
+    histogram = Histogram((1, 10))
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("1", 2), ("10", 3), ("+Inf", 4)]
+    assert histogram.sum == 56.5
+
+
+def test_snapshot_per_cache_type(registry):
+    """Hits, misses and sizes are summarised per layer and cache type"""
+    registry.hit("redis", "product_info", latency=0.002)
+    registry.miss("redis", "product_info", latency=0.004)
+    registry.record("redis", "product_info", "set", latency=0.001, size=500)
+    registry.miss("redis", "search_result")
+    registry.hit("workflow", "workflow_result")
+    
+    snapshot = registry.snapshot(layer="redis")
+    assert set(snapshot) == {"product_info", "search_result"}
+    assert snapshot["product_info"]["hit_rate"] == 50.0
+    assert snapshot["product_info"]["avg_value_bytes"] == 500
+    assert snapshot["product_info"]["avg_get_ms"] == 3.0
+    assert snapshot["search_result"]["hit_rate"] == 0.0
+    assert "workflow:workflow_result" in registry.snapshot()
+
+
+def test_render_prometheus_text(registry):
+    """Counters, histograms and collector samples use the exposition format"""
+    registry.hit("redis", "product_info", latency=0.005)
+    registry.error("redis", "embedding")
+    registry.register_collector("agents", lambda: [
+        ("chatbuddy_agent_cache_size", "Cached agent instances", "gauge", {}, 3),
+        ("chatbuddy_agent_cache_usage_total", "Uses", "counter", {"agent_type": "general"}, 7)
+    ])
+    
+    text = registry.render()
+    assert "# TYPE chatbuddy_cache_hits_total counter" in text
+    assert 'chatbuddy_cache_hits_total{layer="redis",cache_type="product_info"} 1' in text
+    assert 'chatbuddy_cache_errors_total{layer="redis",cache_type="embedding"} 1' in text
+    assert "# TYPE chatbuddy_cache_operation_seconds histogram" in text
+    assert ('chatbuddy_cache_operation_seconds_bucket{layer="redis",cache_type="product_info",'
+            'operation="get",le="0.001"} 0') in text
+    assert ('chatbuddy_cache_operation_seconds_bucket{layer="redis",cache_type="product_info",'
+            'operation="get",le="+Inf"} 1') in text
+    assert "chatbuddy_agent_cache_size 3" in text
+    assert 'chatbuddy_agent_cache_usage_total{agent_type="general"} 7' in text
+    assert text.endswith("\n")
+
+
+def test_failing_collector_is_skipped(registry):
+    """A broken collector does not break the scrape"""
+    registry.hit("redis", "session")
+    registry.register_collector("broken", MagicMock(side_effect=RuntimeError("boom")))
+    assert "chatbuddy_cache_hits_total" in registry.render()
+
+
+def test_reset_single_layer(registry):
+    """Resetting one layer keeps the others"""
+    registry.hit("redis", "session")
+    registry.hit("workflow", "workflow_result")
+    registry.reset("redis")
+    assert list(registry.snapshot()) == ["workflow:workflow_result"]
+
+
+@pytest.mark.asyncio
+async def test_pool_records_per_cache_type(registry):
+    """The connection pool labels hits, misses and sets with their cache type"""
+    pool = OptimizedRedisConnectionPool()
+    original_client, original_connected = pool._redis_client, pool._connected
+    original_metrics = pool._cache_metrics
+    
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(side_effect=[[True, True], [None, None]])
+    client = MagicMock()
+    client.pipeline.return_value = pipe
+    
+    pool._redis_client, pool._connected, pool._cache_metrics = client, True, registry
+    try:
+        assert await pool.set("p1", {"name": "x" * 10}, cache_type="product_info")
+        assert await pool.get("p2", cache_type="search_result") is None
+    finally:
+        pool._redis_client, pool._connected = original_client, original_connected
+        pool._cache_metrics = original_metrics
+    
+    snapshot = registry.snapshot(layer="redis")
+    assert snapshot["product_info"]["sets"] == 1
+    assert snapshot["product_info"]["avg_value_bytes"] > 0
+    assert snapshot["search_result"]["misses"] == 1
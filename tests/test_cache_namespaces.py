@@ -0,0 +1,98 @@
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from src.integrations.cache.namespaces import NamespaceGenerations, namespace_for
+from src.integrations.cache.redis_connection_pool import OptimizedRedisConnectionPool
+
+
+@pytest.fixture
+def mock_redis_client():
+    """Fixture for a redis client holding namespace counters in a dict"""
+    counters = {}
+    
+    async def incr(key):
+        counters[key] = counters.get(key, 0) + 1
+        return counters[key]
+    
+    client = MagicMock()
+    client.counters = counters
+    client.incr = AsyncMock(side_effect=incr)
+    client.get = AsyncMock(side_effect=lambda key: counters.get(key))
+    client.mget = AsyncMock(side_effect=lambda keys: [counters.get(key) for key in keys])
+    return client
+
+
+def test_namespace_for():
+    """A namespace is one cache type or one scope"""
+    assert namespace_for("product_info") == "product_info"
+    assert namespace_for(user="u1") == "user=u1"
+    with pytest.raises(ValueError):
+        namespace_for("product_info", user="u1")
+    with pytest.raises(ValueError):
+        namespace_for()
+
+
+@pytest.mark.asyncio
+async def test_bump_is_single_incr(mock_redis_client):
+    """Invalidating a namespace is one INCR and is visible locally at once"""
+    generations = NamespaceGenerations(mock_redis_client)
+    assert generations.current("product_info") == 0
+    assert await generations.bump("product_info") == 1
+    assert generations.current("product_info") == 1
+    mock_redis_client.incr.assert_awaited_once_with("chatbuddy:v1:ns:product_info")
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_other_workers(mock_redis_client):
+    """Bumps made elsewhere arrive with the next MGET refresh"""
+    generations = NamespaceGenerations(mock_redis_client)
+    await generations.preload(["product_info", "search_result"])
+    mock_redis_client.counters["chatbuddy:v1:ns:search_result"] = 4
+    
+    assert await generations.refresh() == 1
+    assert generations.current("search_result") == 4
+    assert mock_redis_client.mget.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_reads_unknown_scope_once(mock_redis_client):
+    """A scope seen for the first time is read from Redis, then from the snapshot"""
+    mock_redis_client.counters["chatbuddy:v1:ns:user=u1"] = 7
+    generations = NamespaceGenerations(mock_redis_client)
+    assert await generations.resolve("user=u1") == 7
+    assert await generations.resolve("user=u1") == 7
+    mock_redis_client.get.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_pool_keys_follow_generations(mock_redis_client):
+    """Cache type and scope generations are part of the derived Redis keys"""
+    pool = OptimizedRedisConnectionPool()
+    pool._generations = NamespaceGenerations(mock_redis_client)
+    pool._connected = True
+    
+    assert pool.key_for("product_info", "p1") == "chatbuddy:v1:product_info:g0:p1"
+    assert pool.key_for("session", "s1") == "chatbuddy:v1:session:s1"
+    assert await pool.bump_namespace("product_info") == 1
+    assert pool.key_for("product_info", "p1") == "chatbuddy:v1:product_info:g1:p1"
+    
+    assert await pool.versioned_key("q", user="u1") == "user=u1.g0|q"
+    await pool.bump_namespace(user="u1")
+    assert await pool.versioned_key("q", user="u1") == "user=u1.g1|q"
+
+
+@pytest.mark.asyncio
+async def test_pinned_cache_types_survive_scope_churn(mock_redis_client):
+    """Many user scopes never push a cache type back to generation 0"""
+    generations = NamespaceGenerations(mock_redis_client, max_tracked=3, pinned=("product_info",))
+    await generations.bump("product_info")
+    for user in range(10):
+        await generations.resolve(f"user=u{user}")
+    
+    assert generations.current("product_info") == 1
+    assert len(generations.snapshot()) == 4
+    
+    mock_redis_client.counters["chatbuddy:v1:ns:product_info"] = 5
+    await generations.refresh()
+    assert generations.current("product_info") == 5
@@ -0,0 +1,122 @@
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from src.integrations.cache.namespaces import NamespaceGenerations
+from src.integrations.cache.quotas import (
+    SHARED_TENANT,
+    TenantQuotaManager,
+    get_current_tenant,
+    tenant_of,
+    tenant_scope
+)
+from src.integrations.cache.redis_connection_pool import OptimizedRedisConnectionPool
+
+
+def test_tenant_resolution():
+    """The tenant comes from a tenant namespace in the key, then from the scope"""
+    assert tenant_of("category=phones.g0|tenant=shop1.g3|q") == "shop1"
+    assert tenant_of("shop1:p1") is None
+
+    quotas = TenantQuotaManager()
+    assert quotas.resolve_tenant("p1") == SHARED_TENANT
+    with tenant_scope("shop2"):
+        assert get_current_tenant() == "shop2"
+        assert quotas.resolve_tenant("p1") == "shop2"
+        assert quotas.resolve_tenant("tenant=shop1.g0|q") == "shop1"
+    assert get_current_tenant() is None
+
+
+def test_tenant_over_quota_evicts_own_oldest():
+    """Only the tenant over its quota loses entries, oldest first"""
+    quotas = TenantQuotaManager(default_quota_bytes=250)
+    quotas.record_set("big", "product_info", "k1", 100, now=0)
+    quotas.record_set("small", "product_info", "s1", 100, now=1)
+    quotas.record_set("big", "search_result", "k2", 100, now=2)
+
+    assert quotas.record_set("big", "product_info", "k3", 100, now=3) == ["k1"]
+    assert quotas.usage("big") == 200
+    assert quotas.usage("small") == 100
+
+    # An entry larger than the quota never evicts itself
+    assert quotas.record_set("big", "agent_response", "huge", 1000, now=4) == ["k2", "k3"]
+    assert quotas.usage("big") == 1000
+
+
+def test_expired_entries_are_dropped_before_evicting():
+    """Entries Redis already expired free quota without an eviction"""
+    quotas = TenantQuotaManager(default_quota_bytes=150)
+    quotas.record_set("shop", "product_info", "old", 100, ttl=10, now=0)
+    assert quotas.record_set("shop", "product_info", "new", 100, ttl=10, now=20) == []
+    assert quotas.usage("shop") == 100
+
+
+def test_expiry_heap_drops_only_expired_entries():
+    """Expiry order is independent of write order; overwrites do not grow the heap unbounded"""
+    quotas = TenantQuotaManager(default_quota_bytes=250)
+    quotas.record_set("shop", "product_info", "long", 100, ttl=1000, now=0)
+    quotas.record_set("shop", "product_info", "short", 100, ttl=5, now=1)
+    assert quotas.record_set("shop", "product_info", "new", 100, ttl=1000, now=10) == []
+    assert quotas.usage("shop") == 200
+    assert quotas.record_set("shop", "product_info", "newer", 100, ttl=1000, now=11) == ["long"]
+
+    for _ in range(1000):
+        quotas.record_set("shop", "product_info", "newer", 100, ttl=1000, now=12)
+    assert len(quotas._expiry["shop"]) <= 2 * 2 + 64
+
+
+def test_shared_tenant_unlimited_unless_configured():
+    """Writes without a tenant are accounted but only limited when configured"""
+    quotas = TenantQuotaManager(default_quota_bytes=100)
+    assert quotas.record_set(SHARED_TENANT, "session", "a", 500) == []
+    assert TenantQuotaManager(100, quotas={SHARED_TENANT: 600}).quota_for(SHARED_TENANT) == 600
+
+
+def test_report_and_overwrite():
+    """Rewriting a key replaces its size; the report is grouped by tenant and type"""
+    quotas = TenantQuotaManager(default_quota_bytes=1000)
+    quotas.record_set("shop1", "product_info", "p1", 100)
+    quotas.record_set("shop1", "product_info", "p1", 300)
+    quotas.record_set("shop2", "search_result", "q1", 50)
+    quotas.forget_matching("q*")
+
+    report = quotas.get_report()
+    assert report["total_bytes"] == 300
+    assert list(report["tenants"]) == ["shop1"]
+    assert report["tenants"]["shop1"]["by_cache_type"] == {"product_info": {"bytes": 300, "entries": 1}}
+    assert report["tenants"]["shop1"]["usage_percent"] == 30.0
+
+    samples = quotas.metric_samples()
+    assert samples[0][3] == {"tenant": "shop1", "cache_type": "product_info"}
+
+
+@pytest.mark.asyncio
+async def test_pool_unlinks_entries_over_quota():
+    """The pool accounts its writes and UNLINKs the tenant's oldest entries"""
+    pool = OptimizedRedisConnectionPool()
+    saved = (pool._redis_client, pool._connected, pool._generations, pool._quotas)
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True, True])
+    client = MagicMock()
+    client.pipeline = MagicMock(return_value=pipe)
+    try:
+        pool._redis_client = client
+        pool._connected = True
+        pool._generations = NamespaceGenerations()
+        pool._quotas = TenantQuotaManager(default_quota_bytes=1000)
+
+        with tenant_scope("shop1"):
+            for product_id in ("p1", "p2", "p3"):
+                assert await pool.set(product_id, {"name": "x" * 50}, cache_type="product_info")
+
+        pipe.unlink.assert_called_once_with(
+            "chatbuddy:v1:product_info:g0:p1", "chatbuddy:v1:product_info:g0:p1:meta"
+        )
+        report = pool.get_tenant_memory_report()
+        assert report["tenants"]["shop1"]["evictions"] == 1
+        assert report["tenants"]["shop1"]["entries"] == 2
+
+        await pool.delete("p3", cache_type="product_info")
+        assert pool.get_tenant_memory_report()["tenants"]["shop1"]["entries"] == 1
+    finally:
+        pool._redis_client, pool._connected, pool._generations, pool._quotas = saved
@@ -0,0 +1,241 @@
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from src.integrations.cache.memory_cache import InMemoryCacheBackend, MemoryPipeline
+from src.integrations.cache.warmup import AccessFrequencyRecorder, CacheWarmer
+
+
+@pytest.fixture
+def redis_pool():
+    """Fixture for a pool whose pipelines record the queued commands"""
+    pool = MagicMock()
+    pool.key_for = MagicMock(side_effect=lambda cache_type, key: f"chatbuddy:v1:{cache_type}:{key}")
+    pool.pipe = MagicMock()
+
+    async def execute_pipeline(build, transaction=True):
+        build(pool.pipe)
+        return [[b"p2", b"p1"]]
+
+    pool.execute_pipeline = AsyncMock(side_effect=execute_pipeline)
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_recorder_flushes_counts_to_ranking(redis_pool):
+    """Local counts are added to a trimmed ZSET per cache type in one pipeline"""
+    recorder = AccessFrequencyRecorder(redis_pool, cache_types=("product_info",), max_keys=100)
+    recorder.record("product_info", "p1")
+    recorder.record("product_info", "p1")
+    recorder.record("session", "s1")
+
+    assert await recorder.flush() is True
+    redis_pool.pipe.zincrby.assert_called_once_with("chatbuddy:v1:warmup:product_info", 2, "p1")
+    redis_pool.pipe.zremrangebyrank.assert_called_once_with("chatbuddy:v1:warmup:product_info", 0, -101)
+
+    assert await recorder.top("product_info", 2) == ["p2", "p1"]
+    redis_pool.pipe.zrevrange.assert_called_once_with("chatbuddy:v1:warmup:product_info", 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_recorder_keeps_counts_while_redis_is_down():
+    """ZSET commands are unavailable in degraded mode; counts wait for the next flush"""
+    backend = InMemoryCacheBackend()
+    pool = MagicMock()
+    pool.key_for = MagicMock(side_effect=lambda cache_type, key: f"{cache_type}:{key}")
+
+    async def execute_pipeline(build, transaction=True):
+        try:
+            build(MemoryPipeline(backend))
+        except AttributeError:
+            return None
+
+    pool.execute_pipeline = AsyncMock(side_effect=execute_pipeline)
+    recorder = AccessFrequencyRecorder(pool, cache_types=("product_info",))
+    recorder.record("product_info", "p1", 3)
+
+    assert await recorder.flush() is False
+    assert recorder._pending["product_info"]["p1"] == 3
+
+
+@pytest.mark.asyncio
+async def test_warmer_bounds_concurrency_and_reports_coverage():
+    """Loaders never exceed the concurrency limit; readiness needs the coverage"""
+    recorder = MagicMock()
+    recorder.top = AsyncMock(return_value=["shop:p1", "shop:p2", "shop:p3", "shop:p4", "other:p5"])
+    running = 0
+    peak = 0
+
+    async def loader(key):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if key == "shop:p4":
+            raise RuntimeError("API down")
+        return None if key == "shop:p3" else {"id": key}
+
+    warmer = CacheWarmer(top_n=5, concurrency=2, timeout=5, min_coverage=0.8)
+    warmer.register_source("webshop:shop", "product_info", loader, key_prefix="shop:")
+    assert warmer.readiness()["ready"] is False
+
+    report = await warmer.start(recorder)
+    assert report.state == "completed"
+    assert peak == 2
+    assert (report.attempted, report.warmed, report.failed) == (4, 2, 1)
+    assert report.by_source["webshop:shop"]["attempted"] == 4
+
+    readiness = warmer.readiness()
+    assert readiness["coverage"] == 0.5
+    assert readiness["ready"] is False
+
+    warmer.min_coverage = 0.5
+    assert warmer.readiness()["ready"] is True
+
+
+@pytest.mark.asyncio
+async def test_warmer_timeout_makes_instance_ready():
+    """A slow warm-up never keeps the instance out of rotation past its deadline"""
+    recorder = MagicMock()
+    recorder.top = AsyncMock(return_value=["q1"])
+
+    async def loader(key):
+        await asyncio.sleep(1)
+
+    warmer = CacheWarmer(timeout=0.05)
+    warmer.register_source("question", "question", loader)
+    report = await warmer.start(recorder)
+
+    assert report.state == "timed_out"
+    assert warmer.readiness()["ready"] is True
+
+
+@pytest.mark.asyncio
+async def test_warmup_reads_are_not_recorded(redis_pool):
+    """Reads made by the loaders do not inflate the access rankings"""
+    recorder = AccessFrequencyRecorder(redis_pool, cache_types=("question",))
+    recorder.top = AsyncMock(return_value=["q1"])
+
+    async def loader(key):
+        recorder.record("question", key)
+        return ["result"]
+
+    warmer = CacheWarmer()
+    warmer.register_source("question", "question", loader)
+    await warmer.start(recorder)
+
+    assert recorder._pending == {}
+    warmer.record_access("question", "q2")
+    assert recorder._pending["question"]["q2"] == 1
+
+
+@pytest.mark.asyncio
+async def test_source_registered_during_warmup_joins_the_run():
+    """A source registered while warm-up runs is warmed in the same run"""
+    recorder = MagicMock()
+    recorder.top = AsyncMock(return_value=["q1"])
+    release = asyncio.Event()
+
+    async def slow_loader(key):
+        await release.wait()
+        return ["result"]
+
+    product_loader = AsyncMock(return_value={"id": "q1"})
+    warmer = CacheWarmer(timeout=5)
+    warmer.register_source("question", "question", slow_loader)
+    task = warmer.start(recorder)
+    await asyncio.sleep(0.01)
+    assert warmer.readiness()["ready"] is False
+
+    warmer.register_source("webshop:demo", "product_info", product_loader)
+    release.set()
+    report = await task
+    product_loader.assert_awaited_once_with("q1")
+    assert report.warmed == 2
+    assert not warmer._late_tasks
+
+
+@pytest.mark.asyncio
+async def test_ranked_type_without_source_does_not_hold_back_readiness():
+    """Recorded keys of a cache type nobody registered a source for do not block readiness"""
+    recorder = MagicMock()
+    recorder.cache_types = ("product_info", "question")
+    recorder.top = AsyncMock(return_value=["q1"])
+
+    warmer = CacheWarmer(timeout=5)
+    assert warmer.start(recorder) is None
+    assert warmer.readiness()["state"] == "skipped"
+    assert warmer.readiness()["ready"] is True
+
+
+@pytest.mark.asyncio
+async def test_late_source_warms_without_blocking_readiness():
+    """A source registered after warm-up finished is warmed in the background"""
+    recorder = MagicMock()
+    recorder.cache_types = ()
+    recorder.top = AsyncMock(return_value=["q1"])
+    loader = AsyncMock(return_value=["result"])
+
+    warmer = CacheWarmer()
+    assert warmer.start(recorder) is None
+    assert warmer.readiness()["state"] == "skipped"
+    assert warmer.readiness()["ready"] is True
+
+    warmer.register_source("question", "question", loader)
+    await asyncio.gather(*warmer._late_tasks)
+    loader.assert_awaited_once_with("q1")
+    assert warmer.report.by_source["question"]["warmed"] == 1
+    await warmer.stop()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_registers_sources_and_readiness_waits_for_warmup(monkeypatch):
+    """The app lifespan registers the product and question sources; /health/ready is 503 until they are warm"""
+    monkeypatch.setenv("SECRET_KEY", "test-secret-key-for-cache-warmup-tests")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
+    monkeypatch.setenv("SHOPRENTER_API_KEY", "test-shoprenter-key")
+    monkeypatch.setenv("SHOPRENTER_BASE_URL", "https://shop.example.com/api")
+    from src.integrations.database.vector_operations import VectorOperations
+    from src.integrations.webshop.unified import UnifiedWebshopAPI
+    from src.main import app, lifespan_context, readiness_check
+
+    ranked = {"question": ["q1"], "product_info": ["shoprenter:shoprenter:p1"]}
+    recorder = MagicMock()
+    recorder.cache_types = tuple(ranked)
+    recorder.top = AsyncMock(side_effect=lambda cache_type, limit: ranked[cache_type])
+    cache_service = MagicMock()
+    cache_service.rate_limit_cache = None
+    cache_service.pool.config = MagicMock(warmup_enabled=True, warmup_top_n=10, warmup_concurrency=2,
+                                          warmup_timeout=5, warmup_min_coverage=0.8)
+    cache_service.pool.access_recorder = recorder
+    warmer = CacheWarmer()
+    release = asyncio.Event()
+
+    async def warm_search(self, question_key):
+        await release.wait()
+        return [{"id": "p1"}]
+
+    with patch("src.integrations.cache.warmup._cache_warmer", warmer), \
+            patch("src.integrations.database.vector_operations._vector_operations", None), \
+            patch("src.integrations.webshop.unified._webshop_manager", None), \
+            patch.object(VectorOperations, "warm_search", warm_search), \
+            patch.object(UnifiedWebshopAPI, "get_product", AsyncMock(return_value={"id": "p1"})), \
+            patch("src.main.get_redis_cache_service", AsyncMock(return_value=cache_service)), \
+            patch("src.main.shutdown_redis_cache_service", AsyncMock()), \
+            patch("src.main.setup_csrf_protection"), \
+            patch("src.main.chat_handler.initialize", AsyncMock()), \
+            patch("src.main.initialize_langgraph_auth", AsyncMock()), \
+            patch("src.main.shutdown_langgraph_auth", AsyncMock()):
+        async with lifespan_context(app):
+            assert set(warmer._sources) == {"question", "webshop:shoprenter"}
+            await asyncio.sleep(0.01)
+            assert (await readiness_check()).status_code == 503
+
+            release.set()
+            await warmer._task
+            response = await readiness_check()
+            assert response["status"] == "ready"
+            assert response["cache_warmup"]["warmed"] == 2
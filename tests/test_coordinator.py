@@ -1,7 +1,14 @@
 
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 
+from src.integrations.cache import request_cache_scope
+from src.integrations.cache.namespaces import NamespaceGenerations
+from src.integrations.cache.optimized_redis_service import OptimizedPerformanceCache, OptimizedSessionCache
+from src.integrations.cache.redis_connection_pool import OptimizedRedisConnectionPool
+
 from src.workflows.coordinator import (
     CoordinatorAgent,
     get_coordinator_agent,
@@ -16,6 +23,11 @@ def mock_user():
     """Fixture for a mock User"""
     return User(id="user1", email="test@test.com")
 
+@pytest.fixture
+def secret_key(monkeypatch):
+    """SECRET_KEY for the security config built by CoordinatorAgent"""
+    monkeypatch.setenv("SECRET_KEY", "test-secret-key-for-coordinator-tests")
+
 @pytest.fixture
 @patch('src.workflows.coordinator.get_correct_workflow_manager')
 async def coordinator_agent(mock_get_manager):
@@ -78,3 +90,63 @@ async def test_process_coordinator_message(mock_user):
         mock_process.return_value = AgentResponse(agent_type=AgentType.COORDINATOR, response_text="mocked_response", confidence=0.9)
         response = await process_coordinator_message_single("Test message", user=mock_user)
         assert response.response_text == "mocked_response"
+
+class _CountingPipeline:
+    """Pipeline double: every execute() is one Redis round trip"""
+    
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+    
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append(name)
+    
+    async def execute(self):
+        self.client.round_trips.append(list(self.commands))
+        self.client.in_flight += 1
+        self.client.max_in_flight = max(self.client.max_in_flight, self.client.in_flight)
+        await asyncio.sleep(0.01)
+        self.client.in_flight -= 1
+        return [{} if command == "hgetall" else None for command in self.commands]
+
+
+class _CountingRedis:
+    """Redis client double counting pipelined round trips"""
+    
+    def __init__(self):
+        self.round_trips = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    def pipeline(self, transaction=True):
+        return _CountingPipeline(self)
+    
+    async def get(self, key):
+        self.round_trips.append(["get"])
+        return None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_request_cache_round_trips(secret_key, coordinator_agent, mock_user):
+    """A whole request reads its cache state in two pipelined round trips and writes in one"""
+    pool = OptimizedRedisConnectionPool()
+    client = _CountingRedis()
+    pool._redis_client = client
+    pool._connected = True
+    pool._generations = NamespaceGenerations(client)
+    coordinator_agent._session_cache = OptimizedSessionCache(pool)
+    coordinator_agent._performance_cache = OptimizedPerformanceCache(pool)
+    
+    async with request_cache_scope(pool=pool) as loader:
+        response = await coordinator_agent.process_message("Hello", user=mock_user, session_id="sid")
+    
+    assert "mocked response" in response.response_text
+    reads, writes = client.round_trips[:2], client.round_trips[2:]
+    # Prefetched at entry: user namespace generation and session HASH in one pipeline
+    assert sorted(reads[0]) == ["get", "hgetall"]
+    # Then the versioned response key (value + metadata)
+    assert reads[1] == ["get", "get"]
+    assert loader.get_stats()["round_trips"] == 2
+    assert client.max_in_flight == 1
+    # The response is cached with a single pipelined write
+    assert len(writes) == 1 and writes[0][0] == "setex"
@@ -95,8 +95,9 @@ def mock_supabase_client() -> Mock:
     }
     mock_table.get_vector_statistics = AsyncMock(return_value=mock_stats)
     
-    # Setup get_client mock
+    # Setup get_client / get_async_client mock
     mock_client.get_client = Mock(return_value=mock_client)
+    mock_client.get_async_client = Mock(return_value=mock_client)
     
     return mock_client
 
@@ -339,17 +340,48 @@ class TestVectorOperations:
         mock_redis_cache: None
     ) -> None:
         """Test vector statistics calculation."""
+        mock_rpc = Mock()
+        mock_rpc.execute = AsyncMock(return_value=create_mock_table_response({
+            "total_products": 2,
+            "products_with_embedding": 1,
+            "products_without_embedding": 1,
+            "norms": {"sample_size": 1, "avg": 1.0}
+        }))
+        mock_supabase_client.rpc = Mock(return_value=mock_rpc)
+        
         vector_ops = VectorOperations(mock_supabase_client, openai_api_key="test-key")
-        stats = await vector_ops.get_vector_statistics()
+        stats = await vector_ops.get_vector_statistics(sample_size=500)
         
         assert isinstance(stats, dict)
         assert "total_products" in stats
         assert "products_with_embedding" in stats
-        assert "embedding_coverage" in stats
+        assert stats["embedding_coverage"] == "50.0%"
+        assert stats["norms"]["sample_size"] == 1
+        
+        # Statistics are computed by the database, no embeddings are downloaded
+        mock_supabase_client.rpc.assert_called_once_with("get_vector_statistics", {"sample_size": 500})
+        mock_supabase_client.table.assert_not_called()
+
+    async def test_vector_statistics_without_rpc(
+        self,
+        mock_supabase_client: Mock,
+        mock_redis_cache: None
+    ) -> None:
+        """Test count-only vector statistics when the RPC is not installed."""
+        mock_supabase_client.rpc = Mock(side_effect=Exception("function get_vector_statistics does not exist"))
+        mock_query = Mock()
+        mock_query.select.return_value = mock_query
+        mock_query.not_.is_.return_value = mock_query
+        mock_query.execute = AsyncMock(side_effect=[Mock(count=4), Mock(count=3)])
+        mock_supabase_client.table = Mock(return_value=mock_query)
+        
+        vector_ops = VectorOperations(mock_supabase_client, openai_api_key="test-key")
+        stats = await vector_ops.get_vector_statistics()
         
-        # Verify that the table was queried
-        mock_supabase_client.table.assert_called_once()
-        mock_supabase_client.table().select.assert_called_once()
+        assert stats["total_products"] == 4
+        assert stats["products_without_embedding"] == 1
+        assert stats["embedding_coverage"] == "75.0%"
+        mock_query.select.assert_called_with("id", count="exact", head=True)
 
 
 @pytest.mark.asyncio
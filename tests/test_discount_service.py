@@ -22,7 +22,7 @@ class TestDiscountService:
         """Mock Supabase client"""
         with patch('integrations.marketing.discount_service.get_supabase_client') as mock_client:
             mock_supabase = Mock()
-            mock_client.return_value.get_client.return_value = mock_supabase
+            mock_client.return_value.get_async_client.return_value = mock_supabase
             yield mock_supabase
     
     @pytest.fixture
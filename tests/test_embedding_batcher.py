@@ -0,0 +1,203 @@
+
+import asyncio
+import hashlib
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.integrations.database.embedding_batcher import EmbeddingBatcher, chunk_texts
+from src.integrations.database.vector_operations import VectorOperations
+
+
+class StubEmbedder:
+    """Records every batch call; the embedding of a text is [len(text)]"""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.calls = []
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call():
+    """Requests arriving within the wait window go out as one batch and fan back out"""
+    embedder = StubEmbedder()
+    batcher = EmbeddingBatcher(embedder, max_wait_ms=10)
+
+    texts = ["a" * size for size in range(1, 11)]
+    results = await asyncio.gather(*(batcher.embed(text) for text in texts))
+
+    assert embedder.calls == [texts]
+    assert results == [[float(size)] for size in range(1, 11)]
+    assert batcher.get_stats()["avg_batch_size"] == 10
+
+
+@pytest.mark.asyncio
+async def test_identical_texts_are_deduplicated():
+    """The same text in flight is sent once, every caller gets the result"""
+    embedder = StubEmbedder(delay=0.01)
+    batcher = EmbeddingBatcher(embedder, max_wait_ms=5)
+
+    first = await asyncio.gather(*(batcher.embed(text) for text in ["telefon"] * 4 + ["tok"]))
+    # A még futó batch-hez érkező azonos kérés sem indít új hívást
+    running = asyncio.ensure_future(batcher.embed("laptop"))
+    await asyncio.sleep(0.007)
+    late = await batcher.embed("laptop")
+
+    assert embedder.calls == [["telefon", "tok"], ["laptop"]]
+    assert first == [[7.0]] * 4 + [[3.0]]
+    assert await running == late == [6.0]
+    assert batcher.get_stats()["deduplicated"] == 4
+
+
+@pytest.mark.asyncio
+async def test_batches_are_bounded_by_size_and_tokens():
+    """A full batch is sent immediately; the token budget splits long texts"""
+    embedder = StubEmbedder()
+    batcher = EmbeddingBatcher(embedder, max_batch_size=3, max_wait_ms=1000)
+    await asyncio.wait_for(asyncio.gather(*(batcher.embed(str(i)) for i in range(6))), timeout=1)
+    assert embedder.calls == [["0", "1", "2"], ["3", "4", "5"]]
+
+    embedder = StubEmbedder()
+    batcher = EmbeddingBatcher(embedder, max_batch_tokens=30, max_wait_ms=5)
+    await asyncio.gather(*(batcher.embed(char * 60) for char in "abc"))
+    assert [len(call) for call in embedder.calls] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_batch_error_reaches_every_caller():
+    """A failed batch raises for all of its callers and leaves nothing in flight"""
+    embedder = StubEmbedder(error=RuntimeError("rate limited"))
+    batcher = EmbeddingBatcher(embedder, max_wait_ms=1)
+    results = await asyncio.gather(*(batcher.embed(text) for text in "abcd"), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # Mindkét fél hibázik: a hiba nem szövegfüggő, nincs további felezés
+    assert embedder.calls == [["a", "b", "c", "d"], ["a", "b"], ["c", "d"]]
+    assert batcher.get_stats()["failed_batches"] == 1
+    assert batcher.get_stats()["inflight"] == 0
+
+    batcher.embed_batch = StubEmbedder()
+    assert await batcher.embed("a") == [1.0]
+
+
+@pytest.mark.asyncio
+async def test_rejected_text_fails_only_its_own_callers():
+    """A failed batch is bisected: only the text the API rejects raises"""
+    embedder = StubEmbedder()
+
+    async def reject_poisoned(texts):
+        if "poisoned" in texts:
+            embedder.calls.append(list(texts))
+            raise ValueError("invalid input")
+        return await embedder(texts)
+
+    batcher = EmbeddingBatcher(reject_poisoned, max_wait_ms=1)
+    texts = ["telefon", "tok", "poisoned", "laptop", "cipő", "óra", "kábel", "táska"]
+    results = await asyncio.gather(*(batcher.embed(text) for text in texts), return_exceptions=True)
+
+    assert isinstance(results[2], ValueError)
+    assert [result for index, result in enumerate(results) if index != 2] == [
+        [float(len(text))] for text in texts if text != "poisoned"
+    ]
+    # 1 batch + 2 felezés szintenként (8 -> 4 -> 2 -> 1)
+    assert len(embedder.calls) == 7
+    assert batcher.get_stats()["failed_texts"] == 1
+    assert batcher.get_stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_result():
+    """Cancelling one waiter leaves the other waiters of the same text unaffected"""
+    embedder = StubEmbedder(delay=0.01)
+    batcher = EmbeddingBatcher(embedder, max_wait_ms=1)
+
+    cancelled = asyncio.ensure_future(batcher.embed("cipő"))
+    waiting = asyncio.ensure_future(batcher.embed("cipő"))
+    await asyncio.sleep(0.005)
+    cancelled.cancel()
+
+    assert await waiting == [4.0]
+    assert len(embedder.calls) == 1
+
+
+def test_chunk_texts_respects_size_and_token_budget():
+    """Chunks stop at max_texts or the token budget; an oversized text gets its own chunk"""
+    assert list(chunk_texts(["a", "b", "c"], max_texts=2, max_tokens=100)) == [["a", "b"], ["c"]]
+    assert list(chunk_texts(["x" * 80, "y", "z" * 400], max_texts=10, max_tokens=20)) == [
+        ["x" * 80], ["y"], ["z" * 400]
+    ]
+
+
+@pytest.fixture
+def batch_vector_ops():
+    """VectorOperations with a fake embedding cache and a recording embeddings API"""
+    cache_service = MagicMock()
+    cache_service.performance_cache.get_cached_embeddings = AsyncMock(
+        side_effect=lambda hashes: [
+            np.asarray([9.0], dtype=np.float32) if text_hash == hashlib.md5(b"cached").hexdigest() else None
+            for text_hash in hashes
+        ]
+    )
+    cache_service.performance_cache.cache_embeddings = AsyncMock(side_effect=lambda items: len(items))
+
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'), \
+            patch('src.integrations.database.vector_operations.get_redis_cache_service',
+                  AsyncMock(return_value=cache_service)), \
+            patch('src.integrations.database.vector_operations.EMBEDDING_CHUNK_MAX_TEXTS', 2), \
+            patch('src.integrations.database.vector_operations.EMBEDDING_RETRY_BASE_DELAY', 0):
+        ops = VectorOperations(MagicMock(), openai_api_key="test-key")
+        ops.api_calls = []
+
+        async def create_embeddings(texts):
+            ops.api_calls.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+        ops._create_embeddings = create_embeddings
+        yield ops, cache_service
+
+
+@pytest.mark.asyncio
+async def test_batch_embeddings_skip_cached_texts_and_chunk_the_rest(batch_vector_ops):
+    """Cached and duplicate texts cost no API call; new results are written back per chunk"""
+    ops, cache_service = batch_vector_ops
+    progress = []
+    texts = ["cached", "alma", "", "körte", "alma", "szilva"]
+
+    result = await ops.generate_embeddings_batch(texts, progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert result == [[9.0], [4.0], None, [5.0], [4.0], [6.0]]
+    assert ops.api_calls == [["alma", "körte"], ["szilva"]]
+    assert cache_service.performance_cache.cache_embeddings.await_count == 2
+    assert progress[0] == (1, 4) and progress[-1] == (4, 4)
+
+
+@pytest.mark.asyncio
+async def test_batch_embeddings_retry_and_keep_partial_results(batch_vector_ops):
+    """A chunk is retried with backoff; a chunk that keeps failing leaves None only for its texts"""
+    ops, cache_service = batch_vector_ops
+    attempts = {}
+
+    async def flaky(texts):
+        attempts[texts[0]] = attempts.get(texts[0], 0) + 1
+        if texts[0] == "a" and attempts["a"] == 1:
+            raise RuntimeError("429 rate limited")
+        if texts[0] == "c":
+            raise RuntimeError("400 bad request")
+        return [[1.0] for _ in texts]
+
+    ops._create_embeddings = flaky
+    result = await ops.generate_embeddings_batch(["a", "b", "c", "d"], max_retries=2)
+
+    assert result == [[1.0], [1.0], None, None]
+    assert attempts == {"a": 2, "c": 3}
+    cached_items = cache_service.performance_cache.cache_embeddings.call_args.args[0]
+    assert len(cached_items) == 2
@@ -0,0 +1,53 @@
+
+import numpy as np
+import pytest
+
+from src.integrations.cache.embedding_codec import (
+    decode_embedding,
+    encode_embedding,
+    is_embedding_blob
+)
+
+
+def test_float32_roundtrip_is_compact():
+    """A 1536-d embedding is stored as 4 bytes per component plus the header"""
+    embedding = np.random.default_rng(0).standard_normal(1536).tolist()
+    blob = encode_embedding(embedding)
+    assert len(blob) == 12 + 1536 * 4
+    assert len(blob) * 4 < len(str(embedding))
+    
+    decoded = decode_embedding(blob)
+    assert decoded.dtype == np.float32
+    assert decoded.shape == (1536,)
+    np.testing.assert_allclose(decoded, embedding, rtol=1e-6)
+
+
+def test_float16_roundtrip():
+    """float16 halves the payload at reduced precision"""
+    embedding = [0.5, -0.25, 0.125, 1.0]
+    blob = encode_embedding(embedding, dtype="float16")
+    assert len(blob) == 12 + 4 * 2
+    decoded = decode_embedding(blob)
+    assert decoded.dtype == np.float16
+    np.testing.assert_array_equal(decoded.astype(np.float32), embedding)
+
+
+def test_decode_is_zero_copy_view():
+    """Decoding returns a read-only view of the blob"""
+    decoded = decode_embedding(encode_embedding([1.0, 2.0, 3.0]))
+    assert not decoded.flags.writeable
+    assert not decoded.flags.owndata
+
+
+def test_invalid_blobs_rejected():
+    """Malformed blobs raise ValueError"""
+    blob = encode_embedding([1.0, 2.0])
+    assert is_embedding_blob(blob)
+    assert not is_embedding_blob(b"[0.1, 0.2]")
+    
+    with pytest.raises(ValueError):
+        decode_embedding(b"[0.1, 0.2]")
+    with pytest.raises(ValueError):
+        decode_embedding(blob[:-1])
+    with pytest.raises(ValueError):
+        encode_embedding([1.0], dtype="float64")
@@ -0,0 +1,154 @@
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.integrations.database.vector_operations import (
+    VectorOperations,
+    build_product_embedding_text,
+    embedding_content_hash
+)
+
+MODEL = "text-embedding-3-small"
+
+
+def _product(product_id, name, embedded_name=None):
+    product = {"id": product_id, "name": name, "brand": "Acme", "tags": ["új"]}
+    if embedded_name is not None:
+        product["embedding_hash"] = embedding_content_hash(
+            build_product_embedding_text({**product, "name": embedded_name}), MODEL
+        )
+    return product
+
+
+@pytest.fixture
+def sync_ops():
+    """VectorOperations whose embeddings are [len(text)] and whose bulk RPC echoes the ids"""
+    supabase = MagicMock()
+    client = supabase.get_async_client.return_value
+    client.rpc.side_effect = lambda name, params: MagicMock(
+        execute=AsyncMock(return_value=MagicMock(data=[{"id": row["id"]} for row in params["updates"]]))
+    )
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'):
+        ops = VectorOperations(supabase, openai_api_key="test-key")
+    ops.embedded_texts = []
+
+    async def generate_embeddings_batch(texts, progress_callback=None):
+        ops.embedded_texts.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+    ops.generate_embeddings_batch = generate_embeddings_batch
+    return ops, client
+
+
+def test_content_hash_covers_text_and_model():
+    """The hash changes with the embedded text and with the embedding model"""
+    text = build_product_embedding_text({"name": "Cipő", "tags": ["bőr"], "category": "Lábbeli"})
+    assert text == "Cipő bőr Category: Lábbeli"
+    assert embedding_content_hash(text, MODEL) == embedding_content_hash(text, MODEL)
+    assert embedding_content_hash(text, MODEL) != embedding_content_hash(text + " ", MODEL)
+    assert embedding_content_hash(text, MODEL) != embedding_content_hash(text, "text-embedding-3-large")
+
+
+@pytest.mark.asyncio
+async def test_only_changed_products_are_reembedded_in_bulk(sync_ops):
+    """Unchanged hashes are skipped; changed rows are written in chunked bulk RPC calls"""
+    ops, client = sync_ops
+    products = [
+        _product("p1", "Telefon", embedded_name="Telefon"),
+        _product("p2", "Telefon tok", embedded_name="Tok"),
+        _product("p3", "Laptop"),
+        _product("p4", "Monitor")
+    ]
+
+    with patch('src.integrations.database.vector_operations.EMBEDDING_WRITE_CHUNK_SIZE', 2):
+        results = await ops.batch_update_product_embeddings(products)
+
+    assert results == {"p1": True, "p2": True, "p3": True, "p4": True}
+    assert ops.embedded_texts == [build_product_embedding_text(product) for product in products[1:]]
+    assert [len(call.args[1]["updates"]) for call in client.rpc.call_args_list] == [2, 1]
+    first = client.rpc.call_args_list[0].args[1]["updates"][0]
+    assert first["id"] == "p2"
+    assert first["embedding_hash"] == embedding_content_hash(build_product_embedding_text(products[1]), MODEL)
+    client.table.assert_not_called()
+
+    ops.embedded_texts.clear()
+    await ops.batch_update_product_embeddings(products[:1], force=True)
+    assert len(ops.embedded_texts) == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_write_falls_back_to_row_updates(sync_ops):
+    """Without the bulk RPC each row is updated with its embedding and hash"""
+    ops, client = sync_ops
+    client.rpc.side_effect = Exception("function bulk_update_product_embeddings does not exist")
+    update = client.table.return_value.update
+    update.return_value.eq.return_value.execute = AsyncMock(
+        side_effect=[MagicMock(data=[{"id": "p3"}]), MagicMock(data=[])]
+    )
+
+    results = await ops.batch_update_product_embeddings([_product("p3", "Laptop"), _product("p4", "Monitor")])
+
+    assert results == {"p3": True, "p4": False}
+    assert set(update.call_args_list[0].args[0]) == {"embedding", "embedding_hash", "updated_at"}
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_through_catalog(sync_ops):
+    """The catalog sync reads pages without embeddings and reports what changed"""
+    ops, client = sync_ops
+    pages = [
+        [_product("p1", "Telefon", embedded_name="Telefon"), _product("p2", "Tok", embedded_name="Régi tok")],
+        [_product("p3", "Laptop")]
+    ]
+    query = MagicMock()
+    for method in ("select", "eq", "order", "range"):
+        getattr(query, method).return_value = query
+    query.execute = AsyncMock(side_effect=[MagicMock(data=page) for page in pages])
+    client.table.return_value = query
+
+    stats = await ops.sync_product_embeddings(page_size=2)
+
+    assert stats == {"checked": 3, "reembedded": 2, "failed": 0}
+    assert "embedding," not in query.select.call_args.args[0]
+    query.range.assert_any_call(2, 3)
+
+
+@pytest.mark.asyncio
+async def test_category_only_change_is_reembedded(sync_ops):
+    """The sync selects the category name, so a category-only change alters the hash"""
+    ops, client = sync_ops
+    product = _product("p1", "Telefon")
+    product["categories"] = {"name": "Mobil"}
+    product["embedding_hash"] = embedding_content_hash(
+        build_product_embedding_text({**product, "categories": {"name": "Tartozék"}}), MODEL
+    )
+    query = MagicMock()
+    for method in ("select", "eq", "order", "range"):
+        getattr(query, method).return_value = query
+    query.execute = AsyncMock(return_value=MagicMock(data=[product]))
+    client.table.return_value = query
+
+    stats = await ops.sync_product_embeddings(page_size=10)
+
+    assert "categories(name)" in query.select.call_args.args[0]
+    assert stats == {"checked": 1, "reembedded": 1, "failed": 0}
+    assert ops.embedded_texts == ["Telefon Brand: Acme új Category: Mobil"]
+
+
+@pytest.mark.asyncio
+async def test_sync_updates_index_attributes_of_unchanged_products(sync_ops):
+    """Price and stock of products whose text did not change still reach the local index"""
+    ops, client = sync_ops
+    ops.vector_index = MagicMock()
+    product = {**_product("p1", "Telefon", embedded_name="Telefon"), "price": 990, "stock_quantity": 0}
+    query = MagicMock()
+    for method in ("select", "eq", "order", "range"):
+        getattr(query, method).return_value = query
+    query.execute = AsyncMock(return_value=MagicMock(data=[product]))
+    client.table.return_value = query
+
+    stats = await ops.sync_product_embeddings(page_size=10)
+
+    assert stats["reembedded"] == 0
+    ops.vector_index.update_attributes.assert_called_once_with(product)
+    ops.vector_index.upsert.assert_not_called()
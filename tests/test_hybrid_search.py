@@ -0,0 +1,174 @@
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.integrations.database import hybrid_search
+from src.integrations.database.hybrid_search import (
+    BM25Index, analyze_hungarian, fold_accents, matches_filters, reciprocal_rank_fusion
+)
+from src.integrations.database.vector_index import ProductVectorIndex
+from src.integrations.database.vector_operations import VectorOperations
+
+PRODUCTS = [
+    {"id": "p1", "name": "Samsung Galaxy S24", "brand": "Samsung", "description": "Okostelefon",
+     "price": 350000, "category_id": "phones", "stock_quantity": 4, "embedding": [1.0, 0.0, 0.0]},
+    {"id": "p2", "name": "Galaxy Buds", "brand": "Samsung", "description": "Vezeték nélküli fülhallgató",
+     "price": 40000, "category_id": "audio", "stock_quantity": 0, "embedding": [0.0, 1.0, 0.0]},
+    {"id": "p3", "name": "iPhone 15", "brand": "Apple", "description": "Okostelefon Galaxy alternatíva",
+     "price": 400000, "category_id": "phones", "stock_quantity": 2, "embedding": [0.9, 0.1, 0.0]}
+]
+
+
+@pytest.fixture
+def vector_ops():
+    """Fixture for VectorOperations with local vector and BM25 indexes"""
+    index = ProductVectorIndex(dimension=3, backend="flat")
+    index.upsert_many(PRODUCTS)
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'):
+        ops = VectorOperations(MagicMock(), openai_api_key="test-key", vector_index=index)
+
+    async def generate_embedding(text):
+        return [1.0, 0.0, 0.0]
+
+    ops.generate_embedding = generate_embedding
+    return ops
+
+
+def test_bm25_prefers_name_matches():
+    """A query term in the name outranks the same term in the description"""
+    index = BM25Index.from_products(PRODUCTS)
+    results = index.search("galaxy")
+    assert [item["id"] for item in results][:2] in (["p2", "p1"], ["p1", "p2"])
+    assert results[-1]["id"] == "p3"
+    assert "embedding" not in results[0]
+
+    assert [item["id"] for item in index.search("galaxy", filters={"in_stock": True})] == ["p1", "p3"]
+    index.remove("p1")
+    assert [item["id"] for item in index.search("s24")] == []
+
+
+def test_filters_and_rrf():
+    """Missing fields never exclude a product; RRF rewards agreement between rankings"""
+    assert matches_filters({"price": 100}, {"in_stock": True, "max_price": 200})
+    assert not matches_filters({"price": 100, "category_id": "a"}, {"category_id": "b"})
+
+    fused = reciprocal_rank_fusion({"lexical": ["a", "b", "c"], "vector": ["b", "d"]}, k=60)
+    assert [item_id for item_id, _ in fused] == ["b", "a", "d", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+    weighted = reciprocal_rank_fusion({"lexical": ["a"], "vector": ["d"]}, weights={"vector": 2.0})
+    assert weighted[0][0] == "d"
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_both_legs(vector_ops):
+    """Results carry the RRF score, per-leg ranks and the vector similarity"""
+    results = await vector_ops.hybrid_search("galaxy s24", limit=3, weights={"vector": 2.0})
+
+    # lexical: p1, p2, p3 - vector: p1, p3, p2
+    assert [item["id"] for item in results] == ["p1", "p3", "p2"]
+    assert results[0]["lexical_rank"] == 1 and results[0]["vector_rank"] == 1
+    assert results[0]["similarity_score"] == pytest.approx(1.0)
+    assert results[0]["hybrid_score"] > results[1]["hybrid_score"]
+
+    filtered = await vector_ops.hybrid_search("galaxy", filters={"category_id": "audio"})
+    assert [item["id"] for item in filtered] == ["p2"]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_runs_legs_concurrently(vector_ops):
+    """Both legs start before either finishes; a failing leg leaves the other's results"""
+    started = []
+
+    async def lexical(query_text, limit, filters):
+        started.append("lexical")
+        await asyncio.sleep(0.01)
+        assert "vector" in started
+        return [{"id": "p1", "name": "Samsung Galaxy S24"}]
+
+    async def vector(query_text, limit, filters, search_profile=None):
+        started.append("vector")
+        raise RuntimeError("embedding API down")
+
+    vector_ops._lexical_candidates = lexical
+    vector_ops._vector_candidates = vector
+    results = await vector_ops.hybrid_search("galaxy")
+
+    assert [item["id"] for item in results] == ["p1"]
+    assert results[0]["vector_rank"] is None
+    assert results[0]["similarity_score"] == 0.0
+
+
+def test_hungarian_analyzer_folds_accents_and_stems():
+    """Accented and unaccented, singular and inflected forms share one term"""
+    assert fold_accents("Cipő és fülhallgató") == "Cipo es fulhallgato"
+    with patch.object(hybrid_search, "_SNOWBALL_STEMMER", None):
+        assert analyze_hungarian("cipő") == analyze_hungarian("cipok") == analyze_hungarian("Cipőket")
+        assert analyze_hungarian("telefonokat") == analyze_hungarian("Telefon") == ["telefon"]
+        assert analyze_hungarian("telefon és tok") == ["telefon", "tok"]
+        assert analyze_hungarian("Galaxy S24") == ["galaxy", "s24"]
+
+
+@pytest.mark.asyncio
+async def test_keyword_query_skips_embedding(vector_ops):
+    """Keyword queries are answered by the text index; long questions fall back to hybrid search"""
+    async def generate_embedding(text):
+        raise AssertionError("embedding should not be generated")
+
+    vector_ops.generate_embedding = generate_embedding
+    results = await vector_ops.keyword_first_search("okostelefonok", limit=5)
+    assert sorted(item["id"] for item in results) == ["p1", "p3"]
+    assert all(item["search_method"] == "text" and item["text_score"] > 0 for item in results)
+
+    # Minden szónak egyeznie kell: "galaxy" + "okostelefon" csak p1 és p3
+    results = await vector_ops.search_products_text("galaxy okostelefon", limit=5)
+    assert sorted(item["id"] for item in results) == ["p1", "p3"]
+
+    embedded = []
+
+    async def fallback_embedding(text):
+        embedded.append(text)
+        return [1.0, 0.0, 0.0]
+
+    vector_ops.generate_embedding = fallback_embedding
+    results = await vector_ops.keyword_first_search("melyik a legjobb telefon fotózáshoz este", limit=2)
+    assert embedded and results[0]["search_method"] == "hybrid"
+
+
+@pytest.mark.asyncio
+async def test_lexical_leg_uses_text_search_rpc():
+    """Without a local index the text leg calls search_products_text with any-term matching"""
+    supabase = MagicMock()
+    rpc = supabase.get_async_client.return_value.rpc
+    rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=[{"id": "p1", "name": "Samsung Galaxy S24", "rank": 0.4}]))
+
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'):
+        ops = VectorOperations(supabase, openai_api_key="test-key")
+    results = await ops._lexical_candidates("Samsung telefonok", 5, {"in_stock": True})
+
+    assert results[0]["id"] == "p1" and results[0]["text_score"] == pytest.approx(0.4)
+    rpc.assert_called_once_with("search_products_text", {
+        "query_text": "Samsung telefonok", "search_filters": {"in_stock": True}, "match_count": 5, "match_all": False
+    })
+
+
+@pytest.mark.asyncio
+async def test_lexical_leg_falls_back_to_database():
+    """Without the text search RPC the text leg queries ILIKE candidates and ranks them with BM25"""
+    query = MagicMock()
+    for method in ("select", "eq", "gte", "lte", "gt", "or_", "limit"):
+        getattr(query, method).return_value = query
+    query.execute = AsyncMock(return_value=MagicMock(data=[dict(product) for product in PRODUCTS]))
+    supabase = MagicMock()
+    supabase.get_async_client.return_value.table.return_value = query
+    supabase.get_async_client.return_value.rpc.side_effect = Exception("function search_products_text does not exist")
+
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'):
+        ops = VectorOperations(supabase, openai_api_key="test-key")
+    results = await ops._lexical_candidates("Galaxy S24", 5, {"max_price": 360000})
+
+    assert results[0]["id"] == "p1"
+    query.lte.assert_called_once_with("price", 360000)
+    assert "name.ilike.%galaxy%" in query.or_.call_args.args[0]
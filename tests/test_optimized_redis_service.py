@@ -1,4 +1,8 @@
 
+import asyncio
+import time
+
+import numpy as np
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 
@@ -21,7 +25,23 @@ async def mock_pool():
     pool.expire = AsyncMock(return_value=True)
     pool.get_performance_stats = AsyncMock(return_value={})
     pool.health_check = AsyncMock(return_value={"status": "healthy"})
+    pool.key_for = MagicMock(side_effect=lambda cache_type, key: f"chatbuddy:v1:{cache_type}:{key}")
+    pool.execute_pipeline = AsyncMock(return_value=[1, True, 1, True])
+    pool.read = AsyncMock(return_value=None)
+    pool.run_script = AsyncMock(return_value=1)
+    pool.versioned_key = AsyncMock(side_effect=lambda key, **scope: "|".join(
+        [f"{kind}={value}.g0" for kind, value in sorted(scope.items())] + [key]))
+    pool.bump_namespace = AsyncMock(return_value=1)
     pool.config.session_ttl = 3600
+    pool.config.session_touch_interval = 60
+    pool.config.search_result_stale_ttl = 120
+    pool.config.product_info_stale_ttl = 600
+    pool.config.xfetch_beta = 1.0
+    pool.config.revalidation_lock_ttl = 30
+    pool.config.negative_cache_ttls = {"product_info": 60, "search_result": 30, "order": 30}
+    pool._get_ttl_for_type = MagicMock(return_value=600)
+    pool.ttl_for = MagicMock(return_value=600)
+    pool.observe_refresh = MagicMock(return_value=None)
     return pool
 
 @pytest.fixture
@@ -39,20 +59,92 @@ async def rate_limit_cache(mock_pool):
     """Fixture for OptimizedRateLimitCache"""
     return OptimizedRateLimitCache(mock_pool)
 
+def _session_hash(session_id, user_id):
+    """Session HASH as returned by redis (bytes fields)"""
+    fields = OptimizedSessionData(session_id=session_id, user_id=user_id).to_hash()
+    return {k.encode(): v.encode() for k, v in fields.items()}
+
 @pytest.mark.asyncio
 async def test_create_session(session_cache, mock_pool):
     """Test session creation"""
     session_id = await session_cache.create_session("user1")
     assert session_id is not None
-    mock_pool.set.assert_called()
+    mock_pool.execute_pipeline.assert_awaited_once()
+    
+    pipe = MagicMock()
+    mock_pool.execute_pipeline.call_args.args[0](pipe)
+    pipe.hset.assert_called_once()
+    index_key, members = pipe.zadd.call_args.args
+    assert index_key == "chatbuddy:v1:session:user:user1"
+    assert session_id in members
 
 @pytest.mark.asyncio
 async def test_get_session(session_cache, mock_pool):
     """Test getting a session"""
-    mock_pool.get.return_value = OptimizedSessionData(session_id="sid", user_id="uid").to_dict()
+    mock_pool.read.return_value = _session_hash("sid", "uid")
     session = await session_cache.get_session("session1")
     assert session is not None
     assert session.session_id == "sid"
+    assert session.user_id == "uid"
+    # Reads are read-only: the activity touch is only buffered
+    mock_pool.read.assert_awaited_once_with("hgetall", "chatbuddy:v1:session:data:session1")
+    mock_pool.execute_pipeline.assert_not_awaited()
+    mock_pool.run_script.assert_not_awaited()
+    await session_cache.activity.close()
+
+@pytest.mark.asyncio
+async def test_activity_touches_are_coalesced(session_cache, mock_pool):
+    """Repeated touches of a session become one timestamp write per flush"""
+    for _ in range(5):
+        session_cache.touch_session("sid", "uid")
+    session_cache.touch_session("sid2", "uid")
+    
+    assert await session_cache.activity.flush() == 2
+    mock_pool.run_script.assert_awaited_once()
+    script, keys, args = mock_pool.run_script.call_args.args
+    assert keys == ["data:sid", "user:uid", "data:sid2", "user:uid"]
+    assert args[0] == 3600
+    assert session_cache.activity.get_stats()["writes_saved"] == 4
+    
+    # Nothing pending - no further writes
+    assert await session_cache.activity.flush() == 0
+    await session_cache.activity.close()
+    mock_pool.run_script.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_activity_flush_failure_is_retried(session_cache, mock_pool):
+    """A failed flush keeps the touches for the next interval"""
+    mock_pool.run_script.side_effect = [Exception("redis down"), 1]
+    session_cache.touch_session("sid", "uid")
+    assert await session_cache.activity.flush() == 0
+    assert await session_cache.activity.flush() == 1
+    await session_cache.activity.close()
+
+@pytest.mark.asyncio
+async def test_get_session_missing(session_cache, mock_pool):
+    """Test getting a session that does not exist"""
+    mock_pool.read.return_value = {}
+    assert await session_cache.get_session("missing") is None
+
+@pytest.mark.asyncio
+async def test_update_session_fields_is_partial(session_cache, mock_pool):
+    """Only the given fields are written to the session HASH"""
+    assert await session_cache.update_session_fields("sid", "uid", is_active=False) is True
+    
+    pipe = MagicMock()
+    mock_pool.execute_pipeline.call_args.args[0](pipe)
+    pipe.hset.assert_called_once_with("chatbuddy:v1:session:data:sid", mapping={"is_active": "0"})
+
+@pytest.mark.asyncio
+async def test_get_user_sessions_pipelined(session_cache, mock_pool):
+    """User sessions are listed from the ZSET and fetched in one pipeline"""
+    mock_pool.execute_pipeline.side_effect = [
+        [0, [b"sid1", b"sid2"]],
+        [_session_hash("sid1", "uid"), {}]
+    ]
+    sessions = await session_cache.get_user_sessions("uid")
+    assert [session.session_id for session in sessions] == ["sid1"]
+    assert mock_pool.execute_pipeline.await_count == 2
 
 @pytest.mark.asyncio
 async def test_cache_agent_response(performance_cache, mock_pool):
@@ -60,18 +152,203 @@ async def test_cache_agent_response(performance_cache, mock_pool):
     await performance_cache.cache_agent_response("hash1", {"data": "response"})
     mock_pool.set.assert_called_with(key="hash1", value={"data": "response"}, cache_type='agent_response')
 
+def _revalidating_entry(value, expires_in, delta=0.0):
+    """Stored stale-while-revalidate envelope"""
+    return {"__swr__": 1, "value": value, "expires_at": time.time() + expires_in, "delta": delta}
+
+@pytest.mark.asyncio
+async def test_search_result_miss_loads_once(performance_cache, mock_pool):
+    """Concurrent misses share one loader call; the entry outlives its TTL by the grace window"""
+    loader = AsyncMock(return_value=[{"id": "1"}])
+    results = await asyncio.gather(*(
+        performance_cache.get_or_load_search_result("q", loader) for _ in range(5)
+    ))
+    assert results == [[{"id": "1"}]] * 5
+    loader.assert_awaited_once()
+    mock_pool.set.assert_awaited_once()
+    assert mock_pool.set.call_args.kwargs["ttl"] == 600 + 120
+    assert mock_pool.set.call_args.kwargs["value"]["value"] == [{"id": "1"}]
+
+@pytest.mark.asyncio
+async def test_stale_search_result_served_while_revalidating(performance_cache, mock_pool):
+    """A stale entry is returned immediately and refreshed by one background task"""
+    mock_pool.get = AsyncMock(return_value=_revalidating_entry([{"id": "old"}], expires_in=-5))
+    mock_pool.execute_pipeline = AsyncMock(return_value=[True])
+    loader = AsyncMock(return_value=[{"id": "new"}])
+    
+    results = await asyncio.gather(*(
+        performance_cache.get_or_load_search_result("q", loader) for _ in range(5)
+    ))
+    assert results == [[{"id": "old"}]] * 5
+    
+    await performance_cache.close()
+    loader.assert_awaited_once()
+    assert mock_pool.set.call_args.kwargs["value"]["value"] == [{"id": "new"}]
+    assert (await performance_cache.get_cache_stats())["revalidation"]["stale_hits"] == 5
+
+@pytest.mark.asyncio
+async def test_stale_refresh_skipped_when_locked_elsewhere(performance_cache, mock_pool):
+    """Another worker holding the refresh lock means no recompute here"""
+    mock_pool.get = AsyncMock(return_value=_revalidating_entry({"name": "old"}, expires_in=-5))
+    mock_pool.execute_pipeline = AsyncMock(return_value=[None])
+    loader = AsyncMock(return_value={"name": "new"})
+    
+    assert await performance_cache.get_or_load_product_info("p1", loader) == {"name": "old"}
+    await performance_cache.close()
+    loader.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_refresh_lock_released_only_by_its_owner(performance_cache, mock_pool):
+    """The refresh lock holds a random token and is released with compare-and-delete"""
+    mock_pool.get = AsyncMock(return_value=_revalidating_entry({"name": "old"}, expires_in=-5))
+    mock_pool.execute_pipeline = AsyncMock(return_value=[True])
+    pipe = MagicMock()
+    
+    await performance_cache.get_or_load_product_info("p1", AsyncMock(return_value={"name": "new"}))
+    await performance_cache.close()
+    
+    mock_pool.execute_pipeline.await_args_list[0].args[0](pipe)
+    token = pipe.set.call_args.args[1]
+    assert pipe.set.call_args.kwargs["nx"] is True
+    script, keys, args = mock_pool.run_script.await_args.args
+    assert 'redis.call("GET", KEYS[1]) == ARGV[1]' in script
+    assert keys == ["product_info:p1"] and args == [token]
+    assert mock_pool.run_script.await_args.kwargs["cache_type"] == "refresh_lock"
+    pipe.delete.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_xfetch_early_refresh(performance_cache, mock_pool):
+    """Entries that are slow to recompute get refreshed before they expire"""
+    mock_pool.execute_pipeline = AsyncMock(return_value=[True])
+    loader = AsyncMock(return_value={"name": "new"})
+    
+    # delta is huge compared to the remaining lifetime - refresh is (almost) certain
+    mock_pool.get = AsyncMock(return_value=_revalidating_entry({"name": "old"}, expires_in=1, delta=1000))
+    assert await performance_cache.get_or_load_product_info("p1", loader) == {"name": "old"}
+    await performance_cache.close()
+    loader.assert_awaited_once()
+    
+    # No recompute cost recorded - fresh entries are served as is
+    mock_pool.get = AsyncMock(return_value=_revalidating_entry({"name": "old"}, expires_in=1))
+    await performance_cache.get_or_load_product_info("p1", loader)
+    await performance_cache.close()
+    loader.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_missing_product_cached_as_tombstone(performance_cache, mock_pool):
+    """A product that does not exist is stored as a short-lived negative entry"""
+    loader = AsyncMock(return_value=None)
+    assert await performance_cache.get_or_load_product_info("gone", loader) is None
+    
+    tombstone = mock_pool.set.call_args.kwargs["value"]
+    assert tombstone["negative"] is True
+    assert mock_pool.set.call_args.kwargs["ttl"] == 60
+    mock_pool.observe_refresh.assert_not_called()
+    
+    # The next lookup is answered by the tombstone, not the backend
+    mock_pool.get = AsyncMock(return_value=tombstone)
+    assert await performance_cache.get_or_load_product_info("gone", loader) is None
+    loader.assert_awaited_once()
+    assert (await performance_cache.get_cache_stats())["revalidation"]["negative_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_empty_search_result_cached_briefly(performance_cache, mock_pool):
+    """Searches without hits get the negative TTL instead of the full search TTL"""
+    loader = AsyncMock(return_value=[])
+    assert await performance_cache.get_or_load_search_result("nothing", loader) == []
+    assert mock_pool.set.call_args.kwargs["ttl"] == 30
+    assert mock_pool.set.call_args.kwargs["value"]["value"] == []
+
+@pytest.mark.asyncio
+async def test_failed_load_is_not_cached(performance_cache, mock_pool):
+    """Loader errors propagate and leave no tombstone behind"""
+    loader = AsyncMock(side_effect=RuntimeError("backend down"))
+    with pytest.raises(RuntimeError):
+        await performance_cache.get_or_load_product_info("p1", loader)
+    mock_pool.set.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_load_with_negative_cache_only_caches_misses(performance_cache, mock_pool):
+    """Found orders are not cached; unknown order IDs are"""
+    assert await performance_cache.load_with_negative_cache("o1", "order", AsyncMock(return_value={"id": "o1"})) == {"id": "o1"}
+    mock_pool.set.assert_not_awaited()
+    
+    loader = AsyncMock(return_value=None)
+    assert await performance_cache.load_with_negative_cache("bad", "order", loader) is None
+    assert mock_pool.set.call_args.kwargs["cache_type"] == "order"
+    assert mock_pool.set.call_args.kwargs["ttl"] == 30
+    
+    mock_pool.get = AsyncMock(return_value=mock_pool.set.call_args.kwargs["value"])
+    assert await performance_cache.load_with_negative_cache("bad", "order", loader) is None
+    loader.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_get_cached_product_info_unwraps(performance_cache, mock_pool):
+    """The plain getter returns the value without the bookkeeping envelope"""
+    mock_pool.get = AsyncMock(return_value=_revalidating_entry({"name": "p"}, expires_in=-1))
+    assert await performance_cache.get_cached_product_info("p1") == {"name": "p"}
+
+@pytest.mark.asyncio
+async def test_embedding_cached_as_binary_blob(performance_cache, mock_pool):
+    """Embeddings are written as float32 blobs and read back as numpy arrays"""
+    mock_pool.config.embedding_cache_dtype = "float32"
+    embedding = [0.1] * 1536
+    assert await performance_cache.cache_embedding("h", embedding)
+    blob = mock_pool.set.call_args.kwargs["value"]
+    assert isinstance(blob, bytes)
+    assert len(blob) == 12 + 1536 * 4
+    
+    mock_pool.get = AsyncMock(return_value=blob)
+    cached = await performance_cache.get_cached_embedding("h")
+    assert isinstance(cached, np.ndarray)
+    assert cached.shape == (1536,)
+    
+    # Entries from before the binary format are still readable
+    mock_pool.get = AsyncMock(return_value=[0.5, 0.25])
+    assert (await performance_cache.get_cached_embedding("h")).tolist() == [0.5, 0.25]
+
+@pytest.mark.asyncio
+async def test_embeddings_read_and_written_in_bulk(performance_cache, mock_pool):
+    """Bulk lookups use one get_many round trip; bulk writes report how many were stored"""
+    mock_pool.config.embedding_cache_dtype = "float32"
+    assert await performance_cache.cache_embeddings({"a": [0.5, 0.25], "b": [1.0, 0.0]}) == 2
+    blob = mock_pool.set.call_args.kwargs["value"]
+    
+    mock_pool.get_many = AsyncMock(return_value=[blob, None, [0.5, 0.25]])
+    cached = await performance_cache.get_cached_embeddings(["b", "missing", "legacy"])
+    mock_pool.get_many.assert_awaited_once_with([("b", "embedding"), ("missing", "embedding"), ("legacy", "embedding")])
+    assert cached[0].tolist() == [1.0, 0.0]
+    assert cached[1] is None
+    assert cached[2].tolist() == [0.5, 0.25]
+
+@pytest.mark.asyncio
+async def test_agent_response_scoped_to_user_namespace(performance_cache, mock_pool):
+    """Scoped responses are stored under the user's versioned namespace key"""
+    await performance_cache.cache_agent_response("q", {"response_text": "hi"}, scope={"user": "u1"})
+    assert mock_pool.set.call_args.kwargs["key"] == "user=u1.g0|q"
+    
+    await performance_cache.get_cached_agent_response("q", scope={"user": "u1"})
+    mock_pool.get.assert_awaited_with("user=u1.g0|q", "agent_response")
+    
+    assert await performance_cache.invalidate_namespace(user="u1")
+    mock_pool.bump_namespace.assert_awaited_once_with(None, user="u1")
+
 @pytest.mark.asyncio
 async def test_check_rate_limit_allowed(rate_limit_cache, mock_pool):
     """Test rate limit check when allowed"""
+    mock_pool.run_script = AsyncMock(return_value=[1, 9, 0, 6000])
     result = await rate_limit_cache.check_rate_limit("id1", "type1", 10, 60)
     assert result["allowed"] is True
+    assert result["remaining"] == 9
+    mock_pool.run_script.assert_awaited_once()
 
 @pytest.mark.asyncio
 async def test_check_rate_limit_denied(rate_limit_cache, mock_pool):
     """Test rate limit check when denied"""
-    mock_pool.get.return_value = 10
+    mock_pool.run_script = AsyncMock(return_value=[0, 0, 6000, 60000])
     result = await rate_limit_cache.check_rate_limit("id1", "type1", 10, 60)
     assert result["allowed"] is False
+    assert result["retry_after"] == 6.0
 
 @pytest.mark.asyncio
 async def test_service_get_instance():
@@ -197,6 +197,24 @@ class TestSyncScheduler:
         # Kezdetben nincs job history
         assert stats["total_jobs"] == 0
         assert stats["success_rate"] == 0
+    
+    def test_price_and_inventory_sync_update_vector_index(self, scheduler):
+        """Ár és készlet szinkron után a helyi index szűrő mezői frissülnek"""
+        from src.integrations.database.vector_index import ProductVectorIndex
+        
+        index = ProductVectorIndex(dimension=2, backend="flat")
+        index.upsert({"id": "1001", "price": 100.0, "stock_quantity": 5, "embedding": [1.0, 0.0]})
+        scheduler.vector_index = index
+        
+        prices = {"price_updates": [{"product_id": 1001, "new_price": 50.0}, {"product_id": 4242, "new_price": 1.0}]}
+        inventory = {"inventory_updates": [{"product_id": 1001, "new_stock": 0}]}
+        assert scheduler._update_vector_index(SyncJobType.PRICE_SYNC, prices) == 1
+        assert scheduler._update_vector_index(SyncJobType.INVENTORY_SYNC, inventory) == 1
+        assert scheduler._update_vector_index(SyncJobType.ORDER_SYNC, prices) == 0
+        
+        assert index.search([1.0, 0.0], filters={"max_price": 60}) != []
+        assert index.search([1.0, 0.0], filters={"in_stock": True}) == []
+        assert index.search([1.0, 0.0])[0]["price"] == 50.0
 
 
 class TestConflictResolver:
@@ -6,9 +6,13 @@ Ez a modul teszteli a rate limiting funkcionalitást.
 
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
-from src.config.rate_limiting import RateLimiter, RateLimitConfig, RateLimitType, RateLimitWindow
+from src.config.rate_limiting import (
+    RateLimiter, RateLimitConfig, RateLimitType, RateLimitWindow,
+    GCRARateLimitEngine, GCRA_LUA_SCRIPT
+)
+from src.integrations.cache.optimized_redis_service import OptimizedRateLimitCache
 # Import app only when needed for integration tests
 # from src.main import app
 
@@ -220,6 +224,82 @@ class TestRateLimitPerformance:
         assert True
 
 
+    @pytest.mark.asyncio
+    async def test_gcra_burst_holds_under_contention(self):
+        """Párhuzamos hívók egy kulcson sem lépik túl a burst keretet.
+        
+        Az áteresztőképesség mérése: examples/rate_limit_benchmark.py
+        """
+        engine = GCRARateLimitEngine()
+        
+        async def worker():
+            allowed = 0
+            for _ in range(20):
+                decision = await engine.check("contention:shared", max_requests=1000, window_size=3600, burst_size=100)
+                allowed += decision.allowed
+            return allowed
+        
+        results = await asyncio.gather(*(worker() for _ in range(10)))
+        
+        assert sum(results) == 100
+
+
+class TestGCRARateLimitEngine:
+    """GCRA motor tesztek."""
+    
+    def test_parameters_from_config(self):
+        """Burst keret és emission interval számítása."""
+        emission_interval, burst_tolerance, capacity = GCRARateLimitEngine.parameters(50, 60, 10)
+        assert emission_interval == pytest.approx(1200.0)
+        assert capacity == 10
+        assert burst_tolerance == pytest.approx(12000.0)
+    
+    @pytest.mark.asyncio
+    async def test_cost_consumes_capacity(self):
+        """A kérés költsége arányosan fogyasztja a keretet."""
+        engine = GCRARateLimitEngine()
+        first = await engine.check("cost", max_requests=10, window_size=60, cost=4)
+        second = await engine.check("cost", max_requests=10, window_size=60, cost=4)
+        third = await engine.check("cost", max_requests=10, window_size=60, cost=4)
+        assert first.allowed and second.allowed
+        assert third.allowed is False
+        assert third.retry_after > 0
+    
+    @pytest.mark.asyncio
+    async def test_peek_does_not_consume(self):
+        """commit=False esetén az állapot nem változik."""
+        engine = GCRARateLimitEngine()
+        for _ in range(3):
+            decision = await engine.check("peek", max_requests=2, window_size=60, cost=0, commit=False)
+            assert decision.allowed
+        assert (await engine.check("peek", max_requests=2, window_size=60)).remaining == 1
+    
+    @pytest.mark.asyncio
+    async def test_redis_script_single_round_trip(self):
+        """Redis backend esetén egyetlen script hívás dönt."""
+        script = AsyncMock(return_value=[0, 0, 2500, 60000])
+        redis_client = MagicMock()
+        redis_client.register_script.return_value = script
+        engine = GCRARateLimitEngine(redis_client=redis_client)
+        
+        decision = await engine.check("rate_limit:user:u1", max_requests=10, window_size=60)
+        
+        assert decision.allowed is False
+        assert decision.retry_after == 2.5
+        script.assert_awaited_once()
+        redis_client.register_script.assert_called_once_with(GCRA_LUA_SCRIPT)
+    
+    @pytest.mark.asyncio
+    async def test_redis_error_falls_back_to_local(self):
+        """Redis hiba esetén a processzen belüli motor dönt."""
+        redis_client = MagicMock()
+        redis_client.register_script.return_value = AsyncMock(side_effect=Exception("redis down"))
+        engine = GCRARateLimitEngine(redis_client=redis_client)
+        
+        decision = await engine.check("rate_limit:user:u1", max_requests=10, window_size=60)
+        assert decision.allowed is True
+
+
 # Test utilities
 def test_rate_limit_configuration():
     """Rate limit konfiguráció teszt."""
@@ -259,4 +339,34 @@ async def test_rate_limit_error_handling():
     
     # Test with invalid config key
     allowed, info = await rate_limiter.check_rate_limit("invalid_key", "test_user", cost=1.0)
-    assert allowed is True  # Should allow when config not found 
\ No newline at end of file
+    assert allowed is True  # Should allow when config not found 
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_uses_shared_cache_pool():
+    """A közös cache szolgáltatáshoz kötve a pool scriptje dönt, egységes kulccsal."""
+    configs = {
+        "test_user": RateLimitConfig(
+            limit_type=RateLimitType.USER,
+            window=RateLimitWindow.MINUTE,
+            max_requests=10,
+            window_size=60,
+            enabled=True
+        )
+    }
+    pool = MagicMock()
+    pool.run_script = AsyncMock(return_value=[1, 9, 0, 6000])
+    pool.delete = AsyncMock(return_value=True)
+    rate_limit_cache = OptimizedRateLimitCache(pool)
+    rate_limiter = RateLimiter(configs=configs)
+    rate_limiter.use_cache_service(rate_limit_cache)
+    
+    allowed, info = await rate_limiter.check_rate_limit("test_user", "u1")
+    assert allowed is True
+    assert info["remaining_requests"] == 9
+    assert pool.run_script.await_args.args[1] == ["user:u1"]
+    assert pool.run_script.await_args.kwargs == {"cache_type": "rate_limit"}
+    
+    assert (await rate_limiter.get_rate_limit_info("test_user", "u1"))["backend"] == "redis"
+    assert await rate_limiter.reset_rate_limit("test_user", "u1") is True
+    pool.delete.assert_awaited_once_with("user:u1", "rate_limit")
@@ -1,702 +0,0 @@
-"""
-Comprehensive Redis Cache Tests - Chatbuddy MVP.
-
-Ez a modul teszteli a Redis cache teljes funkcionalitását,
-beleértve a connection pooling, serialization és error handling.
-"""
-
-import pytest
-import asyncio
-import json
-import pickle
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-
-from src.integrations.cache.redis_cache import (
-    RedisCacheManager,
-    SessionCache,
-    PerformanceCache,
-    RateLimitCache,
-    RedisCacheService,
-    CacheConfig,
-    SessionData,
-    CacheEntry,
-    get_redis_cache_service
-)
-
-
-class TestRedisCacheConfig:
-    """Tests for Redis cache configuration."""
-    
-    def test_cache_config_creation(self):
-        """Test cache configuration creation."""
-        config = CacheConfig(
-            session_ttl=86400,
-            session_cleanup_interval=3600,
-            agent_response_ttl=3600,
-            product_info_ttl=1800,
-            search_result_ttl=900,
-            embedding_cache_ttl=7200,
-            rate_limit_window=60,
-            rate_limit_cleanup_interval=300
-        )
-        
-        assert config.session_ttl == 86400
-        assert config.agent_response_ttl == 3600
-        assert config.product_info_ttl == 1800
-        assert config.rate_limit_window == 60
-    
-    def test_cache_config_defaults(self):
-        """Test cache configuration with defaults."""
-        config = CacheConfig()
-        
-        assert config.session_ttl == 86400
-        assert config.agent_response_ttl == 3600
-        assert config.product_info_ttl == 1800
-        assert config.rate_limit_window == 60
-    
-    def test_cache_config_validation(self):
-        """Test cache configuration validation."""
-        # Valid config
-        config = CacheConfig(
-            session_ttl=86400,
-            agent_response_ttl=3600
-        )
-        assert config is not None
-        
-        # Note: CacheConfig doesn't currently validate negative values
-        # This test is kept for future validation implementation
-        config = CacheConfig(session_ttl=-1)
-        assert config.session_ttl == -1
-
-
-class TestRedisCacheConnection:
-    """Tests for Redis cache connection management."""
-    
-    @pytest.mark.asyncio
-    async def test_redis_connection_creation(self):
-        """Test Redis connection creation."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_redis.return_value = AsyncMock()
-            
-            cache = RedisCacheManager()
-            result = await cache.connect()
-            
-            assert result is True
-            assert cache.redis_client is not None
-            mock_redis.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_redis_connection_error_handling(self):
-        """Test Redis connection error handling."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_redis.side_effect = Exception("Connection failed")
-            
-            cache = RedisCacheManager()
-            
-            with pytest.raises(Exception, match="Connection failed"):
-                await cache.connect()
-    
-    @pytest.mark.asyncio
-    async def test_redis_connection_pool(self):
-        """Test Redis connection pool configuration."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_redis.return_value = AsyncMock()
-            
-            config = CacheConfig()
-            cache = RedisCacheManager(config=config)
-            await cache.connect()
-            
-            # Verify connection was established
-            mock_redis.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_redis_connection_health_check(self):
-        """Test Redis connection health check."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_client.ping.return_value = True
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            
-            is_healthy = await cache.health_check()
-            assert is_healthy is True
-            # Note: health_check calls ping twice (once in connect, once in health_check)
-            assert mock_client.ping.call_count >= 1
-    
-    @pytest.mark.asyncio
-    async def test_redis_connection_close(self):
-        """Test Redis connection close."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            await cache.disconnect()
-            
-            mock_client.close.assert_called_once()
-
-
-class TestRedisCacheOperations:
-    """Tests for Redis cache operations."""
-    
-    @pytest.fixture
-    async def mock_redis_cache(self):
-        """Create a mock Redis cache for testing."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            yield cache, mock_client
-    
-    @pytest.mark.asyncio
-    async def test_set_and_get_string(self, mock_redis_cache):
-        """Test setting and getting string values."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test serialization
-        result = await cache._serialize_value("test_value")
-        assert result is not None
-        
-        # Test deserialization
-        value = await cache._deserialize_value(result)
-        assert value == "test_value"
-    
-    @pytest.mark.asyncio
-    async def test_set_and_get_dict(self, mock_redis_cache):
-        """Test setting and getting dictionary values."""
-        cache, mock_client = mock_redis_cache
-        
-        test_data = {"name": "test", "value": 123}
-        
-        # Test serialization
-        serialized = await cache._serialize_value(test_data)
-        assert serialized is not None
-        
-        # Test deserialization
-        value = await cache._deserialize_value(serialized)
-        assert value == test_data
-    
-    @pytest.mark.asyncio
-    async def test_set_and_get_list(self, mock_redis_cache):
-        """Test setting and getting list values."""
-        cache, mock_client = mock_redis_cache
-        
-        test_data = [1, 2, 3, "test"]
-        
-        # Test serialization
-        serialized = await cache._serialize_value(test_data)
-        assert serialized is not None
-        
-        # Test deserialization
-        value = await cache._deserialize_value(serialized)
-        assert value == test_data
-    
-    @pytest.mark.asyncio
-    async def test_set_with_ttl(self, mock_redis_cache):
-        """Test setting values with TTL."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("test", "prefix")
-        assert key == "test:prefix"
-    
-    @pytest.mark.asyncio
-    async def test_get_nonexistent_key(self, mock_redis_cache):
-        """Test getting a non-existent key."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test with None value - should handle gracefully
-        try:
-            value = await cache._deserialize_value(None)
-            assert value is None
-        except TypeError:
-            # Expected behavior for None values
-            pass
-    
-    @pytest.mark.asyncio
-    async def test_delete_key(self, mock_redis_cache):
-        """Test deleting a key."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation for deletion
-        key = cache._generate_key("delete", "test")
-        assert key == "delete:test"
-    
-    @pytest.mark.asyncio
-    async def test_delete_nonexistent_key(self, mock_redis_cache):
-        """Test deleting a non-existent key."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("nonexistent", "key")
-        assert key == "nonexistent:key"
-    
-    @pytest.mark.asyncio
-    async def test_exists_key(self, mock_redis_cache):
-        """Test checking if a key exists."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("exists", "test")
-        assert key == "exists:test"
-    
-    @pytest.mark.asyncio
-    async def test_exists_nonexistent_key(self, mock_redis_cache):
-        """Test checking if a non-existent key exists."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("nonexistent", "exists")
-        assert key == "nonexistent:exists"
-    
-    @pytest.mark.asyncio
-    async def test_ttl_key(self, mock_redis_cache):
-        """Test getting TTL of a key."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("ttl", "test")
-        assert key == "ttl:test"
-    
-    @pytest.mark.asyncio
-    async def test_ttl_nonexistent_key(self, mock_redis_cache):
-        """Test getting TTL of a non-existent key."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("nonexistent", "ttl")
-        assert key == "nonexistent:ttl"
-
-
-class TestRedisCacheHashOperations:
-    """Tests for Redis hash operations."""
-    
-    @pytest.fixture
-    async def mock_redis_cache(self):
-        """Create a mock Redis cache for testing."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            yield cache, mock_client
-    
-    @pytest.mark.asyncio
-    async def test_hset_and_hget(self, mock_redis_cache):
-        """Test hash set and get operations."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("hash", "test")
-        assert key == "hash:test"
-    
-    @pytest.mark.asyncio
-    async def test_hmset_and_hmget(self, mock_redis_cache):
-        """Test hash multiple set and get operations."""
-        cache, mock_client = mock_redis_cache
-        
-        test_data = {"field1": "value1", "field2": "value2"}
-        
-        # Test key generation
-        key = cache._generate_key("hash", "multiple")
-        assert key == "hash:multiple"
-    
-    @pytest.mark.asyncio
-    async def test_hgetall(self, mock_redis_cache):
-        """Test getting all hash fields."""
-        cache, mock_client = mock_redis_cache
-        
-        test_data = {b"field1": b"value1", b"field2": b"value2"}
-        mock_client.hgetall.return_value = test_data
-        
-        # Test key generation
-        key = cache._generate_key("hash", "all")
-        assert key == "hash:all"
-    
-    @pytest.mark.asyncio
-    async def test_hdel(self, mock_redis_cache):
-        """Test hash field deletion."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("hash", "delete")
-        assert key == "hash:delete"
-    
-    @pytest.mark.asyncio
-    async def test_hexists(self, mock_redis_cache):
-        """Test checking if hash field exists."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("hash", "exists")
-        assert key == "hash:exists"
-
-
-class TestRedisCacheListOperations:
-    """Tests for Redis list operations."""
-    
-    @pytest.fixture
-    async def mock_redis_cache(self):
-        """Create a mock Redis cache for testing."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            yield cache, mock_client
-    
-    @pytest.mark.asyncio
-    async def test_lpush_and_lpop(self, mock_redis_cache):
-        """Test list push and pop operations."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("list", "push")
-        assert key == "list:push"
-    
-    @pytest.mark.asyncio
-    async def test_rpush_and_rpop(self, mock_redis_cache):
-        """Test list right push and pop operations."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("list", "rpush")
-        assert key == "list:rpush"
-    
-    @pytest.mark.asyncio
-    async def test_lrange(self, mock_redis_cache):
-        """Test list range operation."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("list", "range")
-        assert key == "list:range"
-    
-    @pytest.mark.asyncio
-    async def test_llen(self, mock_redis_cache):
-        """Test list length operation."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("list", "length")
-        assert key == "list:length"
-
-
-class TestRedisCacheSetOperations:
-    """Tests for Redis set operations."""
-    
-    @pytest.fixture
-    async def mock_redis_cache(self):
-        """Create a mock Redis cache for testing."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            yield cache, mock_client
-    
-    @pytest.mark.asyncio
-    async def test_sadd_and_smembers(self, mock_redis_cache):
-        """Test set add and members operations."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("set", "add")
-        assert key == "set:add"
-    
-    @pytest.mark.asyncio
-    async def test_srem(self, mock_redis_cache):
-        """Test set remove operation."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("set", "remove")
-        assert key == "set:remove"
-    
-    @pytest.mark.asyncio
-    async def test_sismember(self, mock_redis_cache):
-        """Test set membership check."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test key generation
-        key = cache._generate_key("set", "member")
-        assert key == "set:member"
-
-
-class TestRedisCacheSerialization:
-    """Tests for Redis cache serialization."""
-    
-    @pytest.fixture
-    async def mock_redis_cache(self):
-        """Create a mock Redis cache for testing."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            yield cache, mock_client
-    
-    @pytest.mark.asyncio
-    async def test_serialize_complex_object(self, mock_redis_cache):
-        """Test serialization of complex objects."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test with JSON serializable complex object
-        complex_obj = {
-            "nested": {
-                "list": [1, 2, 3],
-                "dict": {"key": "value"},
-                "datetime": datetime.now().isoformat()  # Use ISO format string
-            },
-            "set": [1, 2, 3],  # Convert set to list for JSON
-            "tuple": [1, 2, 3]  # Convert tuple to list for JSON
-        }
-        
-        # Test serialization
-        serialized = await cache._serialize_value(complex_obj)
-        assert serialized is not None
-        
-        # Test deserialization
-        value = await cache._deserialize_value(serialized)
-        assert value == complex_obj
-    
-    @pytest.mark.asyncio
-    async def test_serialize_with_pickle(self, mock_redis_cache):
-        """Test serialization using pickle."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test with dataclass object
-        test_session = SessionData(
-            session_id="test123",
-            user_id="user123",
-            device_info={"browser": "chrome"},
-            ip_address="127.0.0.1"
-        )
-        
-        # Test serialization
-        serialized = await cache._serialize_value(test_session)
-        assert serialized is not None
-        
-        # Test deserialization
-        value = await cache._deserialize_value(serialized)
-        assert isinstance(value, dict)
-        assert value["session_id"] == "test123"
-
-
-class TestRedisCacheErrorHandling:
-    """Tests for Redis cache error handling."""
-    
-    @pytest.fixture
-    async def mock_redis_cache(self):
-        """Create a mock Redis cache for testing."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            yield cache, mock_client
-    
-    @pytest.mark.asyncio
-    async def test_connection_error_handling(self, mock_redis_cache):
-        """Test handling of connection errors."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test with non-serializable object
-        non_serializable = lambda x: x
-        
-        # This should handle the error gracefully
-        try:
-            await cache._serialize_value(non_serializable)
-        except Exception:
-            pass  # Expected to fail
-    
-    @pytest.mark.asyncio
-    async def test_timeout_error_handling(self, mock_redis_cache):
-        """Test handling of timeout errors."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test with invalid JSON
-        try:
-            await cache._deserialize_value("invalid json")
-        except Exception:
-            pass  # Expected to fail
-    
-    @pytest.mark.asyncio
-    async def test_serialization_error_handling(self, mock_redis_cache):
-        """Test handling of serialization errors."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test with non-serializable object
-        non_serializable = lambda x: x
-        
-        # This should handle the error gracefully
-        try:
-            await cache._serialize_value(non_serializable)
-        except Exception:
-            pass  # Expected to fail
-    
-    @pytest.mark.asyncio
-    async def test_deserialization_error_handling(self, mock_redis_cache):
-        """Test handling of deserialization errors."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test with invalid data
-        try:
-            await cache._deserialize_value("invalid json")
-        except Exception:
-            pass  # Expected to fail
-
-
-class TestRedisCachePerformance:
-    """Tests for Redis cache performance."""
-    
-    @pytest.fixture
-    async def mock_redis_cache(self):
-        """Create a mock Redis cache for testing."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            yield cache, mock_client
-    
-    @pytest.mark.asyncio
-    async def test_bulk_operations(self, mock_redis_cache):
-        """Test bulk operations performance."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test bulk serialization
-        bulk_data = {"key1": "value1", "key2": "value2", "key3": "value3"}
-        for key, value in bulk_data.items():
-            serialized = await cache._serialize_value(value)
-            assert serialized is not None
-    
-    @pytest.mark.asyncio
-    async def test_pipeline_operations(self, mock_redis_cache):
-        """Test pipeline operations for better performance."""
-        cache, mock_client = mock_redis_cache
-        
-        # Test multiple operations
-        operations = [
-            ("key1", "value1"),
-            ("key2", "value2"),
-            ("key3", "value3")
-        ]
-        
-        for key, value in operations:
-            serialized = await cache._serialize_value(value)
-            assert serialized is not None
-
-
-class TestRedisCacheIntegration:
-    """Integration tests for Redis cache."""
-    
-    @pytest.mark.asyncio
-    async def test_cache_lifecycle(self):
-        """Test complete cache lifecycle."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            # Mock all operations
-            mock_client.set.return_value = True
-            mock_client.get.return_value = b"test_value"
-            mock_client.delete.return_value = 1
-            mock_client.exists.return_value = 1
-            mock_client.ttl.return_value = 3600
-            
-            cache = RedisCacheManager()
-            
-            # Connect
-            await cache.connect()
-            assert cache.redis_client is not None
-            
-            # Test serialization
-            serialized = await cache._serialize_value("test_value")
-            assert serialized is not None
-            
-            # Test deserialization
-            value = await cache._deserialize_value(serialized)
-            assert value == "test_value"
-            
-            # Test key generation
-            key = cache._generate_key("test", "key")
-            assert key == "test:key"
-            
-            # Close connection
-            await cache.disconnect()
-            mock_client.close.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_cache_with_real_data_types(self):
-        """Test cache with various real data types."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            
-            # Test different data types
-            test_cases = [
-                ("string", "hello world"),
-                ("integer", 42),
-                ("float", 3.14),
-                ("boolean", True),
-                ("list", [1, 2, 3, "test"]),
-                ("dict", {"key": "value", "nested": {"data": 123}}),
-                ("empty_list", []),
-                ("empty_dict", {}),
-            ]
-            
-            for key, value in test_cases:
-                serialized = await cache._serialize_value(value)
-                assert serialized is not None
-                
-                deserialized = await cache._deserialize_value(serialized)
-                assert deserialized == value
-            
-            # Test None value separately
-            try:
-                deserialized = await cache._deserialize_value(None)
-                assert deserialized is None
-            except TypeError:
-                # Expected behavior for None values
-                pass
-    
-    @pytest.mark.asyncio
-    async def test_cache_error_recovery(self):
-        """Test cache error recovery mechanisms."""
-        with patch('redis.asyncio.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            
-            cache = RedisCacheManager()
-            await cache.connect()
-            
-            # Simulate serialization failure
-            try:
-                await cache._serialize_value(lambda x: x)
-            except Exception:
-                pass  # Expected to fail
-            
-            # Test recovery with valid data
-            test_data = {"recovered": "value"}
-            serialized = await cache._serialize_value(test_data)
-            assert serialized is not None
-            
-            value = await cache._deserialize_value(serialized)
-            assert value == test_data 
\ No newline at end of file
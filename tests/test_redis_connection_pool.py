@@ -79,3 +79,16 @@ async def test_pool_serialization(connection_pool):
     data = {'key': 'value'}
     serialized_data = connection_pool._serialize_value(data)
     assert isinstance(serialized_data, bytes)
+
+@pytest.mark.asyncio
+async def test_pool_pattern_operations_use_scan(connection_pool, mock_redis_client):
+    """Pattern lookups and clears walk SCAN cursors instead of KEYS"""
+    mock_redis_client.scan = AsyncMock(return_value=(0, [b"chatbuddy:v1:product_info:g0:p1"]))
+    mock_redis_client.unlink = AsyncMock(return_value=1)
+    
+    keys = await connection_pool.get_keys_by_pattern("p*", "product_info")
+    assert keys == ["p1"]
+    assert await connection_pool.clear_cache_type("product_info") == 1
+    
+    mock_redis_client.keys.assert_not_awaited()
+    assert mock_redis_client.scan.call_args.kwargs["match"] == "chatbuddy:v1:product_info:*"
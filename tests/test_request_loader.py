@@ -0,0 +1,104 @@
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from src.integrations.cache.request_loader import (
+    RequestCacheLoader,
+    get_request_loader,
+    request_cache_scope
+)
+
+
+@pytest.fixture
+def mock_pool():
+    """Fixture for a mock connection pool with a batched get_many"""
+    pool = MagicMock()
+    store = {("sid", "session"): {"session_id": "sid"}, ("resp", "agent_response"): {"response_text": "hi"}}
+    pool.get_many = AsyncMock(side_effect=lambda items: [store.get(item) for item in items])
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced(mock_pool):
+    """Loads issued in the same tick share one round trip"""
+    loader = RequestCacheLoader(mock_pool)
+    session, response, missing = await asyncio.gather(
+        loader.load("sid", "session"),
+        loader.load("resp", "agent_response"),
+        loader.load("nope", "product_info")
+    )
+    assert session == {"session_id": "sid"}
+    assert response == {"response_text": "hi"}
+    assert missing is None
+    assert mock_pool.get_many.await_count == 1
+    assert loader.get_stats()["round_trips"] == 1
+
+
+@pytest.mark.asyncio
+async def test_registered_keys_are_memoized(mock_pool):
+    """Registered keys are fetched once and served from the memo afterwards"""
+    loader = RequestCacheLoader(mock_pool)
+    loader.register([("session", "sid"), ("agent_response", "resp")])
+    assert await loader.load("sid", "session") == {"session_id": "sid"}
+    assert await loader.load("resp", "agent_response") == {"response_text": "hi"}
+    assert await loader.load("sid", "session") == {"session_id": "sid"}
+    assert mock_pool.get_many.await_count == 1
+    assert loader.get_stats()["memo_hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_prime_overrides_fetch(mock_pool):
+    """Values written during the request are served without a round trip"""
+    loader = RequestCacheLoader(mock_pool)
+    loader.prime("sid", "session", {"session_id": "updated"})
+    assert await loader.load("sid", "session") == {"session_id": "updated"}
+    mock_pool.get_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_native_reads_join_the_batch(mock_pool):
+    """Registered native reads share the pipeline with cache loads and are memoized"""
+    mock_pool.get_many = AsyncMock(side_effect=lambda items, commands=(): (
+        [None] * len(items) + [{b"user_id": b"uid"} if command == "hgetall" else b"3" for command, _ in commands]
+    ))
+    loader = RequestCacheLoader(mock_pool)
+    loader.register([("agent_response", "resp")])
+    loader.register_command("hgetall", "chatbuddy:v1:session:data:sid")
+    loader.register_command("get", "chatbuddy:v1:ns:user=uid")
+    response, session, generation = await asyncio.gather(
+        loader.load("resp", "agent_response"),
+        loader.load_command("hgetall", "chatbuddy:v1:session:data:sid"),
+        loader.load_command("get", "chatbuddy:v1:ns:user=uid")
+    )
+    assert (response, session, generation) == (None, {b"user_id": b"uid"}, b"3")
+    mock_pool.get_many.assert_awaited_once_with(
+        [("resp", "agent_response")],
+        commands=[("hgetall", "chatbuddy:v1:session:data:sid"), ("get", "chatbuddy:v1:ns:user=uid")]
+    )
+    
+    # A native write drops the memoized native reads, cache values stay
+    loader.clear_commands()
+    assert await loader.load("resp", "agent_response") is None
+    await loader.load_command("get", "chatbuddy:v1:ns:user=uid")
+    assert mock_pool.get_many.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_error_resolves_to_none(mock_pool):
+    """A failing batch resolves every waiter with None"""
+    mock_pool.get_many = AsyncMock(side_effect=Exception("redis down"))
+    loader = RequestCacheLoader(mock_pool)
+    assert await loader.load("sid", "session") is None
+
+
+@pytest.mark.asyncio
+async def test_request_cache_scope_sets_context(mock_pool):
+    """The scope exposes the loader through the context variable"""
+    assert get_request_loader() is None
+    async with request_cache_scope(pool=mock_pool) as loader:
+        assert get_request_loader() is loader
+        async with request_cache_scope(pool=mock_pool) as nested:
+            assert nested is loader
+    assert get_request_loader() is None
@@ -54,6 +54,10 @@ async def test_create_vector_search_functions(schema_manager, mock_supabase_clie
     result = schema_manager.create_vector_search_functions()
     assert mock_supabase_client.execute_query.call_count > 0
     assert result is True
+    sql = mock_supabase_client.execute_query.call_args.args[0]
+    assert "FUNCTION search_products_tuned(" in sql
+    assert "set_config('hnsw.ef_search', LEAST(1000, GREATEST(ef_search, match_count))::TEXT, true)" in sql
+    assert "set_config('ivfflat.probes'" in sql
 
 @pytest.mark.asyncio
 async def test_setup_products_table(schema_manager, mock_supabase_client):
@@ -62,6 +66,49 @@ async def test_setup_products_table(schema_manager, mock_supabase_client):
     assert mock_supabase_client.execute_query.call_count > 0
     assert result is True
 
+@pytest.mark.asyncio
+async def test_setup_hungarian_full_text_search(schema_manager, mock_supabase_client):
+    """Test Hungarian full-text search setup"""
+    result = schema_manager.setup_hungarian_full_text_search()
+    sql = "\n".join(call.args[0] for call in mock_supabase_client.execute_query.call_args_list)
+    assert result is True
+    assert "WITH unaccent, hungarian_stem" in sql
+    assert "USING GIN (search_vector)" in sql
+    assert "BEFORE INSERT OR UPDATE OF name" in sql
+    assert "FUNCTION search_products_text(" in sql
+
+@pytest.mark.asyncio
+async def test_setup_embedding_sync(schema_manager, mock_supabase_client):
+    """Test embedding hash column and bulk update function setup"""
+    result = schema_manager.setup_embedding_sync()
+    sql = "\n".join(call.args[0] for call in mock_supabase_client.execute_query.call_args_list)
+    assert result is True
+    assert "ADD COLUMN IF NOT EXISTS embedding_hash TEXT" in sql
+    assert "FUNCTION bulk_update_product_embeddings(updates JSONB)" in sql
+
+@pytest.mark.asyncio
+async def test_create_vector_statistics_function(schema_manager, mock_supabase_client):
+    """Test server-side vector statistics function creation"""
+    result = schema_manager.create_vector_statistics_function()
+    sql = mock_supabase_client.execute_query.call_args.args[0]
+    assert result is True
+    assert "FUNCTION get_vector_statistics(sample_size INT DEFAULT 1000)" in sql
+    assert "TABLESAMPLE BERNOULLI (sample_percent)" in sql
+    assert "pg_stat_user_indexes" in sql
+
+@pytest.mark.asyncio
+async def test_create_quantized_vector_indexes(schema_manager, mock_supabase_client):
+    """Test quantized expression indexes and rescoring search function creation"""
+    result = schema_manager.create_quantized_vector_indexes()
+    sql = "\n".join(call.args[0] for call in mock_supabase_client.execute_query.call_args_list)
+    assert result is True
+    assert "(embedding::halfvec(1536)) halfvec_cosine_ops" in sql
+    assert "(binary_quantize(embedding)::bit(1536)) bit_hamming_ops" in sql
+    assert "FUNCTION search_products_quantized(" in sql
+    assert "candidate_count INT := LEAST(1000, match_count * GREATEST(rescore_factor, 1))" in sql
+    assert "set_config('hnsw.ef_search', LEAST(1000, GREATEST(40, candidate_count))::TEXT, true)" in sql
+    assert "ORDER BY p.embedding <=> query_embedding" in sql
+
 @pytest.mark.asyncio
 async def test_setup_complete_schema(schema_manager, mock_supabase_client):
     """Test complete schema setup"""
@@ -1,8 +1,11 @@
 
+import asyncio
 import os
+import httpx
 import pytest
 from unittest.mock import patch, Mock, MagicMock
 
+from src.integrations.database import supabase_client as supabase_client_module
 from src.integrations.database.supabase_client import SupabaseClient, SupabaseConfig, get_supabase_client
 
 # Test data
@@ -66,6 +69,61 @@ def test_get_service_client(supabase_client):
     service_client = supabase_client.get_service_client()
     assert service_client is not None
 
+@patch("src.integrations.database.supabase_client.create_client")
+def test_get_service_client_is_created_once(mock_create_client, supabase_client):
+    """Test that the service role client is reused"""
+    assert supabase_client.get_service_client() is supabase_client.get_service_client()
+    mock_create_client.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_async_clients_share_one_pool(supabase_client):
+    """Test async PostgREST clients: shared HTTP pool, per-role keys, non-blocking execute"""
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=[{"id": "p1"}])
+
+    pool = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.object(supabase_client_module, "_async_http_client", pool):
+        client = supabase_client.get_async_client()
+        service = supabase_client.get_async_client(service_role=True)
+        assert client is supabase_client.get_async_client()
+        assert client.session is service.session is pool
+
+        started = asyncio.get_running_loop().time()
+        results = await asyncio.gather(*(
+            client.table("products").select("id").eq("status", "active").execute() for _ in range(5)
+        ))
+        # A kérések párhuzamosan futnak, nem egymás után
+        assert asyncio.get_running_loop().time() - started < 0.2
+        assert results[0].data == [{"id": "p1"}]
+        assert str(requests[0].url).startswith(f"{TEST_URL}/rest/v1/products")
+        assert requests[0].headers["apikey"] == TEST_KEY
+
+        await service.rpc("get_vector_statistics", {"sample_size": 10}).execute()
+        assert requests[-1].headers["authorization"] == f"Bearer {TEST_SERVICE_KEY}"
+    await pool.aclose()
+
+def test_get_async_client_mock_mode():
+    """Test get_async_client without configuration"""
+    client = SupabaseClient(config=SupabaseConfig(url="", key=""))
+    assert isinstance(client.get_async_client(), Mock)
+    with pytest.raises(ValueError):
+        client.get_async_client(service_role=True)
+
+@pytest.mark.asyncio
+async def test_shared_http_pool_is_tunable_and_closable():
+    """Test the process wide HTTP/2 pool settings and shutdown"""
+    with patch.object(supabase_client_module, "_async_http_client", None):
+        pool = supabase_client_module.get_async_http_client(pool_size=7, timeout=5.0)
+        assert supabase_client_module.get_async_http_client() is pool
+        assert pool._transport._pool._max_connections == 7
+        await supabase_client_module.shutdown_async_database_clients()
+        assert pool.is_closed
+        assert supabase_client_module._async_http_client is None
+
 def test_get_service_client_no_key():
     """Test get_service_client without service key"""
     client = SupabaseClient(config=SupabaseConfig(url=TEST_URL, key=TEST_KEY))
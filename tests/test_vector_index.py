@@ -0,0 +1,232 @@
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.integrations.database.vector_index import ProductVectorIndex
+from src.integrations.database.vector_operations import SEARCH_PROFILES, VectorOperations
+
+
+def _embedding(*values):
+    vector = np.zeros(4, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector.tolist()
+
+
+@pytest.fixture
+def index():
+    """Fixture for a small flat index with three products"""
+    index = ProductVectorIndex(dimension=4, backend="flat", initial_capacity=2)
+    index.upsert_many([
+        {"id": "p1", "name": "Laptop", "price": 300000, "category_id": "c1", "stock_quantity": 5,
+         "embedding": _embedding(1, 0)},
+        {"id": "p2", "name": "Tablet", "price": 120000, "category_id": "c1", "stock_quantity": 0,
+         "embedding": _embedding(0.8, 0.6)},
+        {"id": "p3", "name": "Phone", "price": 90000, "category_id": "c2", "stock_quantity": 3,
+         "embedding": "[0, 1, 0, 0]"}
+    ])
+    return index
+
+
+def test_search_ranks_by_cosine_similarity(index):
+    """Results come back in the search_products RPC shape, most similar first"""
+    results = index.search(_embedding(1, 0), limit=2)
+    assert [item["id"] for item in results] == ["p1", "p2"]
+    assert results[0]["similarity"] == pytest.approx(1.0)
+    assert results[1]["similarity_score"] == pytest.approx(0.8)
+    assert results[0]["name"] == "Laptop"
+
+    assert [item["id"] for item in index.search(_embedding(1, 0), limit=5, similarity_threshold=0.5)] == ["p1", "p2"]
+
+
+def test_search_filters(index):
+    """Category, price and stock filters are applied before ranking"""
+    query = _embedding(1, 0)
+    assert [item["id"] for item in index.search(query, filters={"category_id": "c2"})] == ["p3"]
+    assert [item["id"] for item in index.search(query, filters={"max_price": 150000})] == ["p2", "p3"]
+    assert [item["id"] for item in index.search(query, filters={"in_stock": True, "min_price": 100000})] == ["p1"]
+
+
+def test_incremental_upsert_and_remove(index):
+    """Updates replace a product in place; inactive products leave the index"""
+    index.upsert({"id": "p3", "name": "Phone", "price": 90000, "category_id": "c2"}, _embedding(1, 0.01))
+    assert [item["id"] for item in index.search(_embedding(1, 0), limit=2)] == ["p1", "p3"]
+    assert index.size == 3
+
+    index.upsert({"id": "p1", "status": "archived", "embedding": _embedding(1, 0)})
+    assert "p1" not in index
+    assert index.size == 2
+
+    index.upsert({"id": "p1", "name": "Laptop", "embedding": _embedding(1, 0)})
+    assert index.get_stats()["rows"] == 3
+    assert index.search(_embedding(1, 0), limit=1)[0]["id"] == "p1"
+
+    with pytest.raises(ValueError):
+        index.upsert({"id": "bad", "embedding": [1.0, 0.0]})
+
+
+def test_update_attributes_moves_filters(index):
+    """Price, stock and status syncs reach the filters without a new embedding"""
+    assert index.update_attributes({"id": "p2", "price": 200000, "stock_quantity": 4})
+    query = _embedding(1, 0)
+    assert [item["id"] for item in index.search(query, filters={"in_stock": True, "min_price": 150000})] == ["p1", "p2"]
+    assert index.search(query, limit=2)[1]["stock_quantity"] == 4
+
+    assert not index.update_attributes({"id": "missing", "price": 1})
+    assert not index.update_attributes({"id": "p3", "status": "archived"})
+    assert "p3" not in index
+
+
+def test_hnsw_filtered_search_short_walk_falls_back_to_exact_scan():
+    """A filtered graph walk that reaches fewer than k products still returns the exact top k"""
+    pytest.importorskip("hnswlib")
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(60, 4))
+    # A sparse graph and ef=1: the filtered walk cannot reach every matching product
+    index = ProductVectorIndex(dimension=4, backend="hnsw", initial_capacity=60, m=2, ef_construction=2, ef_search=1)
+    index.upsert_many([
+        {"id": f"p{row}", "category_id": "c1" if row % 6 == 0 else "c2", "embedding": vectors[row].tolist()}
+        for row in range(60)
+    ])
+    query = vectors[1].tolist()
+    filters = {"category_id": "c1"}
+
+    results = index.search(query, limit=10, similarity_threshold=-1.0, filters=filters)
+    expected = index.search(query, limit=10, similarity_threshold=-1.0, filters=filters, exact=True)
+    assert [item["id"] for item in results] == [item["id"] for item in expected]
+    assert len(results) == 10
+
+
+def test_snapshot_is_memory_mapped(index, tmp_path):
+    """A saved snapshot loads memory-mapped and keeps accepting updates"""
+    index.remove("p2")
+    index.save(str(tmp_path))
+
+    loaded = ProductVectorIndex.load(str(tmp_path), backend="flat")
+    assert loaded.get_stats()["memory_mapped"] is True
+    assert loaded.size == 2
+    assert [item["id"] for item in loaded.search(_embedding(0, 1), limit=1)] == ["p3"]
+    assert [item["id"] for item in loaded.search(_embedding(1, 0), filters={"category_id": "c1"})] == ["p1"]
+
+    loaded.upsert({"id": "p4", "name": "Monitor", "embedding": _embedding(0, 0, 1)})
+    assert loaded.search(_embedding(0, 0, 1), limit=1)[0]["id"] == "p4"
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_quantized_search_rescores_with_full_vectors(quantization, tmp_path):
+    """Candidates come from the codes; ranking and similarity use the full vectors"""
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(30, 256))
+    vectors = (centers[np.arange(300) % 30] + rng.normal(scale=0.5, size=(300, 256))).astype(np.float32)
+    products = [{"id": f"p{row}", "price": row, "embedding": vectors[row]} for row in range(300)]
+    exact = ProductVectorIndex(dimension=256, backend="flat")
+    exact.upsert_many(products)
+    index = ProductVectorIndex(dimension=256, backend="flat", initial_capacity=16,
+                               quantization=quantization, rescore_factor=10)
+    index.upsert_many(products)
+
+    query = vectors[5] + rng.normal(scale=0.1, size=256)
+    expected = exact.search(query, limit=5)
+    results = index.search(query, limit=5)
+    assert [item["id"] for item in results] == [item["id"] for item in expected]
+    assert results[0]["similarity"] == pytest.approx(expected[0]["similarity"], abs=1e-5)
+    assert all(item["price"] < 100 for item in index.search(query, limit=5, filters={"max_price": 99}))
+
+    stats = index.get_stats()
+    assert stats["quantization"] == quantization
+    assert stats["code_bytes"] * (3 if quantization == "int8" else 30) < stats["vector_bytes"]
+
+    index.save(str(tmp_path))
+    loaded = ProductVectorIndex.load(str(tmp_path), quantization=quantization)
+    assert np.array_equal(loaded._codes, index._codes[:300])
+    assert [item["id"] for item in loaded.search(query, limit=5)] == [item["id"] for item in expected]
+
+
+def test_quantization_requires_flat_backend():
+    with pytest.raises(ValueError):
+        ProductVectorIndex(dimension=4, backend="hnsw", quantization="int8")
+    with pytest.raises(ValueError):
+        ProductVectorIndex(dimension=4, quantization="pq")
+    assert ProductVectorIndex(dimension=4, quantization="binary").backend == "flat"
+
+
+@pytest.mark.asyncio
+async def test_vector_operations_searches_local_index(index):
+    """A ready local index answers similarity search without the Supabase RPC"""
+    supabase = MagicMock()
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'):
+        vector_ops = VectorOperations(supabase, openai_api_key="test-key", vector_index=index)
+
+    async def generate_embedding(text):
+        return _embedding(0, 1)
+
+    vector_ops.generate_embedding = generate_embedding
+    results = await vector_ops._search_similar_products_uncached("telefon", 5, 0.7)
+
+    assert [item["id"] for item in results] == ["p3"]
+    supabase.get_async_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_vector_operations_quantized_rpc_falls_back_to_full_search():
+    """The quantized RPC is called with the rescore factor; without it search_products answers"""
+    supabase = MagicMock()
+    rpc = supabase.get_async_client.return_value.rpc
+    rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=[{"id": "p1", "similarity": 0.9}]))
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'):
+        vector_ops = VectorOperations(supabase, openai_api_key="test-key", quantization="binary")
+
+    async def generate_embedding(text):
+        return _embedding(1, 0)
+
+    vector_ops.generate_embedding = generate_embedding
+    results = await vector_ops._search_similar_products_uncached("laptop", 5, 0.5)
+    assert results[0]["similarity_score"] == pytest.approx(0.9)
+    name, params = rpc.call_args.args
+    assert name == "search_products_quantized"
+    assert params["quantization"] == "binary" and params["rescore_factor"] == 4
+
+    rpc.return_value.execute = AsyncMock(side_effect=[Exception("function does not exist"),
+                                                      MagicMock(data=[{"id": "p1", "similarity": 0.9}])])
+    results = await vector_ops._search_similar_products_uncached("laptop", 5, 0.5)
+    assert [item["id"] for item in results] == ["p1"]
+    assert rpc.call_args.args[0] == "search_products"
+
+
+def test_search_profile_options(index):
+    """ef_search applies to one HNSW query only; exact bypasses the graph and the codes"""
+    graph = MagicMock()
+    graph.knn_query.return_value = (np.array([[0]]), np.array([[0.0]]))
+    index._graph = graph
+    assert index.search(_embedding(1, 0), limit=1, ef_search=8)[0]["id"] == "p1"
+    assert [call.args[0] for call in graph.set_ef.call_args_list] == [8, index.ef_search]
+
+    graph.reset_mock()
+    assert [item["id"] for item in index.search(_embedding(1, 0), limit=2, exact=True)] == ["p1", "p2"]
+    graph.knn_query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_vector_operations_search_profile_tunes_rpc():
+    """A search profile calls search_products_tuned with its ef_search / probes"""
+    supabase = MagicMock()
+    rpc = supabase.get_async_client.return_value.rpc
+    rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=[{"id": "p1", "similarity": 0.9}]))
+    with patch('src.integrations.database.vector_operations.AsyncOpenAI'):
+        vector_ops = VectorOperations(supabase, openai_api_key="test-key", quantization="halfvec")
+
+    async def generate_embedding(text):
+        return _embedding(1, 0)
+
+    vector_ops.generate_embedding = generate_embedding
+    await vector_ops._search_similar_products_uncached("laptop", 5, 0.5, search_profile=SEARCH_PROFILES["exact"])
+    name, params = rpc.call_args.args
+    assert name == "search_products_tuned"
+    assert params["exact_search"] is True and params["probes"] == 100
+
+    await vector_ops._search_similar_products_uncached("laptop", 5, 0.5, search_profile=SEARCH_PROFILES["fast"])
+    assert rpc.call_args.args[0] == "search_products_quantized"
+
+    with pytest.raises(ValueError):
+        await vector_ops.search_similar_products("laptop", search_profile="turbo")
+
@@ -12,6 +12,7 @@ import pytest
 import asyncio
 from datetime import datetime
 from typing import List
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.integrations.webshop.base import (
     Product, Order, Customer, OrderStatus, ProductCategory, OrderItem
@@ -314,6 +315,70 @@ class TestWebshopManager:
         assert "shoprenter_mock" in results
         assert results["shoprenter_mock"] is not None
         assert results["shoprenter_mock"].name == "iPhone 15 Pro"
+    
+    @pytest.mark.asyncio
+    async def test_same_platform_webshops_do_not_share_product_cache(self, manager):
+        """Azonos platformú webshopok ugyanazzal a termék azonosítóval külön cache kulcsot kapnak"""
+        cached = {}
+        
+        async def get_or_load_product_info(key, loader):
+            if key not in cached:
+                cached[key] = await loader()
+            return cached[key]
+        
+        cache_service = MagicMock()
+        cache_service.performance_cache.get_or_load_product_info = get_or_load_product_info
+        
+        for name, product_name in (("shop_a", "A termék"), ("shop_b", "B termék")):
+            manager.add_webshop(name, WebshopPlatform.MOCK, "mock_key", f"https://{name}.hu")
+            api_client = MagicMock()
+            api_client.get_product = AsyncMock(return_value=Product(
+                id="prod_1", name=product_name, price=1000.0, stock=1,
+                category=ProductCategory.OTHER
+            ))
+            manager.get_webshop(name).api_client = api_client
+        
+        with patch("src.integrations.webshop.unified.get_redis_cache_service",
+                   AsyncMock(return_value=cache_service)):
+            product_a = await manager.get_webshop("shop_a").get_product("prod_1")
+            product_b = await manager.get_webshop("shop_b").get_product("prod_1")
+            warmed = await manager.get_webshop("shop_b").warm_product("shop_b:mock:prod_1")
+            foreign = await manager.get_webshop("shop_b").warm_product("shop_a:mock:prod_1")
+        
+        assert product_a.name == "A termék"
+        assert product_b.name == "B termék"
+        assert set(cached) == {"shop_a:mock:prod_1", "shop_b:mock:prod_1"}
+        assert warmed.name == "B termék"
+        assert foreign is None
+    
+    @pytest.mark.asyncio
+    async def test_same_platform_webshops_do_not_share_order_cache(self, manager):
+        """Egy webshop negatív rendelés bejegyzése nem rejti el a másik webshop rendelését"""
+        cached = {}
+        
+        async def load_with_negative_cache(key, cache_type, loader):
+            if key not in cached:
+                cached[key] = await loader()
+            return cached[key]
+        
+        cache_service = MagicMock()
+        cache_service.performance_cache.load_with_negative_cache = load_with_negative_cache
+        
+        existing_order = MagicMock(id="order_1")
+        for name, order in (("shop_a", None), ("shop_b", existing_order)):
+            manager.add_webshop(name, WebshopPlatform.MOCK, "mock_key", f"https://{name}.hu")
+            api_client = MagicMock()
+            api_client.get_order = AsyncMock(return_value=order)
+            manager.get_webshop(name).api_client = api_client
+        
+        with patch("src.integrations.webshop.unified.get_redis_cache_service",
+                   AsyncMock(return_value=cache_service)):
+            missing = await manager.get_webshop("shop_a").get_order("order_1")
+            found = await manager.get_webshop("shop_b").get_order("order_1")
+        
+        assert missing is None
+        assert found is existing_order
+        assert set(cached) == {"shop_a:mock:order_1", "shop_b:mock:order_1"}
 
 
 class TestFactoryFunctions: